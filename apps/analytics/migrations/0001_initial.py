@@ -0,0 +1,32 @@
+# Generated by Django 2.2.20 on 2026-10-18 08:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('challenges', '0113_leaderboard_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionCountRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(max_length=30)),
+                ('bucket', models.DateTimeField(db_index=True)),
+                ('count', models.IntegerField(default=0)),
+                ('challenge_phase', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_count_rollups', to='challenges.ChallengePhase')),
+            ],
+            options={
+                'db_table': 'submission_count_rollup',
+                'unique_together': {('challenge_phase', 'status', 'bucket')},
+            },
+        ),
+    ]
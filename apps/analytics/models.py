@@ -1 +1,109 @@
-# Create your models here.
+from __future__ import unicode_literals
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from base.models import TimeStampedModel
+from challenges.models import ChallengePhase
+
+
+def get_submission_count_bucket(submitted_at):
+    """Returns the hour bucket of the submission count rollups for a submission time"""
+    return submitted_at.astimezone(timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+class SubmissionCountRollup(TimeStampedModel):
+    """
+    Model to count the submissions of a challenge phase by status and
+    by the hour in which they were submitted, so that the submission
+    histograms don't have to scan the submissions
+    """
+
+    challenge_phase = models.ForeignKey(
+        ChallengePhase,
+        related_name="submission_count_rollups",
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(max_length=30)
+    # Start of the hour in UTC
+    bucket = models.DateTimeField(db_index=True)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return "{} - {} - {}".format(
+            self.challenge_phase_id, self.status, self.bucket
+        )
+
+    class Meta:
+        app_label = "analytics"
+        db_table = "submission_count_rollup"
+        unique_together = ("challenge_phase", "status", "bucket")
+
+
+def count_submissions(challenge_phase_id, status, submitted_at, delta):
+    """
+    Adds `delta` to the count of the rollup of the submissions of a challenge
+    phase with a status, submitted in the hour of `submitted_at`
+    """
+    bucket = get_submission_count_bucket(submitted_at)
+    submission_count_rollups = SubmissionCountRollup.objects.filter(
+        challenge_phase_id=challenge_phase_id, status=status, bucket=bucket
+    )
+    if submission_count_rollups.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            SubmissionCountRollup.objects.create(
+                challenge_phase_id=challenge_phase_id,
+                status=status,
+                bucket=bucket,
+                count=delta,
+            )
+    except IntegrityError:
+        # The rollup was created by another submission in between
+        submission_count_rollups.update(count=F("count") + delta)
+
+
+@receiver(post_save, sender="jobs.Submission")
+def update_submission_count_rollups(sender, instance, created, **kwargs):
+    # `_original_status` and `_original_submitted_at` are only reset by
+    # `Submission.save` after the post_save signal is sent
+    if created:
+        count_submissions(
+            instance.challenge_phase_id,
+            instance.status,
+            instance.submitted_at,
+            1,
+        )
+    elif instance._original_submitted_at is not None and (
+        instance._original_status != instance.status
+        or instance._original_submitted_at != instance.submitted_at
+    ):
+        count_submissions(
+            instance.challenge_phase_id,
+            instance._original_status,
+            instance._original_submitted_at,
+            -1,
+        )
+        count_submissions(
+            instance.challenge_phase_id,
+            instance.status,
+            instance.submitted_at,
+            1,
+        )
+
+
+@receiver(post_delete, sender="jobs.Submission")
+def discount_deleted_submission(sender, instance, **kwargs):
+    # The rollup isn't created when it's missing since it may be deleted
+    # along with the challenge phase of the submission
+    SubmissionCountRollup.objects.filter(
+        challenge_phase_id=instance.challenge_phase_id,
+        status=instance.status,
+        bucket=get_submission_count_bucket(instance.submitted_at),
+    ).update(count=F("count") - 1)
@@ -1,5 +1,15 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
 
+from jobs.models import Submission
+
+from .utils import SUBMISSION_HISTOGRAM_GRANULARITIES
+
+# Range of the submission histograms when their start isn't requested
+SUBMISSION_HISTOGRAM_DEFAULT_RANGE = timedelta(days=30)
+
 
 class ChallengePhaseSubmissionAnalytics(object):
     def __init__(
@@ -62,3 +72,51 @@ class LastSubmissionTimestampSerializer(serializers.Serializer):
         format=None
     )
     challenge_phase = serializers.IntegerField()
+
+
+class SubmissionCountByDurationSerializer(serializers.Serializer):
+    all = serializers.IntegerField()
+    daily = serializers.IntegerField()
+    weekly = serializers.IntegerField()
+    monthly = serializers.IntegerField()
+
+
+class ChallengePhaseOverviewSerializer(
+    ChallengePhaseSubmissionAnalyticsSerializer
+):
+    last_submission_timestamp = serializers.DateTimeField(format=None)
+
+
+class ChallengeOverviewSerializer(serializers.Serializer):
+    challenge = serializers.IntegerField()
+    participant_team_count = serializers.IntegerField()
+    participant_count = serializers.IntegerField()
+    submission_count = SubmissionCountByDurationSerializer()
+    last_submission_timestamp = serializers.DateTimeField(format=None)
+    challenge_phases = ChallengePhaseOverviewSerializer(many=True)
+
+
+class SubmissionHistogramQuerySerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(
+        choices=list(SUBMISSION_HISTOGRAM_GRANULARITIES), default="day"
+    )
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    challenge_phase = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(
+        choices=Submission.STATUS_OPTIONS, required=False
+    )
+
+    def validate(self, data):
+        data.setdefault("end", timezone.now())
+        data.setdefault(
+            "start", data["end"] - SUBMISSION_HISTOGRAM_DEFAULT_RANGE
+        )
+        if data["start"] >= data["end"]:
+            raise serializers.ValidationError("start should be before end")
+        return data
+
+
+class SubmissionHistogramBucketSerializer(serializers.Serializer):
+    bucket = serializers.DateTimeField()
+    count = serializers.IntegerField()
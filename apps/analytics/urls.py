@@ -18,6 +18,11 @@ urlpatterns = [
         views.get_submission_count,
         name="get_submission_count",
     ),
+    url(
+        r"^challenge/(?P<challenge_pk>[0-9]+)/submission/histogram$",
+        views.get_submission_histogram,
+        name="get_submission_histogram",
+    ),
     url(
         r"^challenge/(?P<challenge_pk>[0-9]+)/challenge_phase/(?P<challenge_phase_pk>[0-9]+)/analytics$",
         views.get_challenge_phase_submission_analysis,
@@ -40,6 +45,11 @@ urlpatterns = [
         views.get_last_submission_datetime_analysis,
         name="get_last_submission_datetime_analysis",
     ),
+    url(
+        r"^challenge/(?P<challenge_pk>[0-9]+)/overview$",
+        views.get_challenge_overview,
+        name="get_challenge_overview",
+    ),
     url(
         r"^challenges/(?P<challenge_pk>[0-9]+)/download_all_participants/$",
         views.download_all_participants,
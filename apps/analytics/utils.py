@@ -0,0 +1,213 @@
+from datetime import timedelta
+
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import (
+    TruncDay,
+    TruncHour,
+    TruncMonth,
+    TruncWeek,
+)
+from django.utils import timezone
+
+from jobs.models import Submission
+
+from .models import SubmissionCountRollup, get_submission_count_bucket
+
+SUBMISSION_COUNT_DURATIONS = ("all", "daily", "weekly", "monthly")
+
+SUBMISSION_HISTOGRAM_GRANULARITIES = {
+    "hour": TruncHour,
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+
+def get_submission_count_since_date(duration):
+    """
+    Returns the date since when the submissions are counted for a duration
+
+    Arguments:
+        duration {[str]} -- One of all, daily, weekly and monthly
+
+    Returns:
+        [datetime] -- Midnight of the first day of the duration, None for all
+    """
+    days = {"daily": 0, "weekly": 7, "monthly": 30}.get(duration)
+    if days is None:
+        return None
+    return (timezone.now() - timedelta(days=days)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def get_participant_analytics(challenge):
+    """
+    Counts the participant teams and participants of a challenge with a single query
+
+    Arguments:
+        challenge {[Challenge Class Object]} -- Challenge model class object
+
+    Returns:
+        [dict] -- participant_team_count and participant_count
+    """
+    return challenge.participant_teams.aggregate(
+        participant_team_count=Count("pk", distinct=True),
+        participant_count=Count("participants", distinct=True),
+    )
+
+
+def get_challenge_submission_analytics(challenge):
+    """
+    Counts the submissions of a challenge for every duration and gets the
+    time of the last one with a single query
+
+    Arguments:
+        challenge {[Challenge Class Object]} -- Challenge model class object
+
+    Returns:
+        [dict] -- Submission count per duration and the last submission timestamp
+    """
+    aggregates = {}
+    for duration in SUBMISSION_COUNT_DURATIONS:
+        since_date = get_submission_count_since_date(duration)
+        aggregates[duration] = Count(
+            "pk",
+            filter=Q(submitted_at__gte=since_date) if since_date else None,
+        )
+    analytics = Submission.objects.filter(
+        challenge_phase__challenge=challenge
+    ).aggregate(last_submission_timestamp=Max("created_at"), **aggregates)
+    return {
+        "submission_count": {
+            duration: analytics[duration]
+            for duration in SUBMISSION_COUNT_DURATIONS
+        },
+        "last_submission_timestamp": analytics["last_submission_timestamp"],
+    }
+
+
+def get_submission_analytics_aggregates(prefix=""):
+    """
+    Returns the aggregates of the submission analytics of challenge phases
+
+    Arguments:
+        prefix {[str]} -- Lookup of the submissions from the aggregated model
+
+    Returns:
+        [dict] -- Aggregate expression per analytics field
+    """
+    return {
+        "total_submissions": Count(prefix + "pk"),
+        "participant_team_count": Count(
+            prefix + "participant_team", distinct=True
+        ),
+        "flagged_submissions_count": Count(
+            prefix + "pk", filter=Q(**{prefix + "is_flagged": True})
+        ),
+        "public_submissions_count": Count(
+            prefix + "pk", filter=Q(**{prefix + "is_public": True})
+        ),
+        "last_submission_timestamp": Max(prefix + "created_at"),
+    }
+
+
+def get_challenge_phase_submission_analytics(challenge, challenge_phase):
+    """
+    Counts the submissions of a challenge phase with a single query
+
+    Arguments:
+        challenge {[Challenge Class Object]} -- Challenge model class object
+        challenge_phase {[ChallengePhase Class Object]} -- ChallengePhase model class object
+
+    Returns:
+        [dict] -- Total, flagged and public submission counts, the count of the
+                  participant teams which made them and the last submission timestamp
+    """
+    return Submission.objects.filter(
+        challenge_phase=challenge_phase, challenge_phase__challenge=challenge
+    ).aggregate(**get_submission_analytics_aggregates())
+
+
+def get_challenge_phases_submission_analytics(challenge):
+    """
+    Counts the submissions of every phase of a challenge with a single query
+
+    Arguments:
+        challenge {[Challenge Class Object]} -- Challenge model class object
+
+    Returns:
+        [list] -- Submission analytics of the challenge phases ordered by pk,
+                  including the phases without submissions
+    """
+    return list(
+        challenge.challengephase_set.order_by("pk")
+        .values(challenge_phase=F("pk"))
+        .annotate(**get_submission_analytics_aggregates("submissions__"))
+    )
+
+
+def get_last_submission_timestamps(challenge, challenge_phase):
+    """
+    Gets the time of the last submission in a challenge and in one of its phases with a single query
+
+    Arguments:
+        challenge {[Challenge Class Object]} -- Challenge model class object
+        challenge_phase {[ChallengePhase Class Object]} -- ChallengePhase model class object
+
+    Returns:
+        [dict] -- last_submission_timestamp_in_challenge and
+                  last_submission_timestamp_in_challenge_phase, None without submissions
+    """
+    return Submission.objects.filter(
+        challenge_phase__challenge=challenge
+    ).aggregate(
+        last_submission_timestamp_in_challenge=Max("created_at"),
+        last_submission_timestamp_in_challenge_phase=Max(
+            "created_at", filter=Q(challenge_phase=challenge_phase)
+        ),
+    )
+
+
+def get_submission_count_histogram(
+    challenge, granularity, start, end, challenge_phase_pk=None, status=None
+):
+    """
+    Counts the submissions of a challenge per time bucket from the hourly
+    submission count rollups, without scanning the submissions
+
+    Arguments:
+        challenge {[Challenge Class Object]} -- Challenge model class object
+        granularity {[str]} -- One of the SUBMISSION_HISTOGRAM_GRANULARITIES
+        start {[datetime]} -- Start of the range, rounded down to the hour
+        end {[datetime]} -- End of the range, excluded
+        challenge_phase_pk {[int]} -- Only count the submissions of a challenge phase
+        status {[str]} -- Only count the submissions with a status
+
+    Returns:
+        [list] -- bucket and count of the buckets ordered by time in UTC,
+                  the buckets without submissions are left out
+    """
+    submission_count_rollups = SubmissionCountRollup.objects.filter(
+        challenge_phase__challenge=challenge,
+        bucket__gte=get_submission_count_bucket(start),
+        bucket__lt=end,
+    )
+    if challenge_phase_pk is not None:
+        submission_count_rollups = submission_count_rollups.filter(
+            challenge_phase_id=challenge_phase_pk
+        )
+    if status is not None:
+        submission_count_rollups = submission_count_rollups.filter(
+            status=status
+        )
+    trunc = SUBMISSION_HISTOGRAM_GRANULARITIES[granularity]
+    buckets = (
+        submission_count_rollups.order_by()
+        .values(histogram_bucket=trunc("bucket", tzinfo=timezone.utc))
+        .annotate(count=Sum("count"))
+        .filter(count__gt=0)
+        .values_list("histogram_bucket", "count")
+        .order_by("histogram_bucket")
+    )
+    return [{"bucket": bucket, "count": count} for bucket, count in buckets]
@@ -1,9 +1,6 @@
 import csv
 
-from datetime import timedelta
-
 from django.http import HttpResponse
-from django.utils import timezone
 
 from rest_framework import permissions, status
 from rest_framework.decorators import (
@@ -30,7 +27,6 @@ from jobs.serializers import (
     SubmissionCount,
     SubmissionCountSerializer,
 )
-from participants.models import Participant
 from participants.utils import get_participant_team_id_of_user_for_a_challenge
 from participants.serializers import (
     ParticipantCount,
@@ -40,12 +36,24 @@ from participants.serializers import (
     ChallengeParticipantSerializer,
 )
 from .serializers import (
+    ChallengeOverviewSerializer,
     ChallengePhaseSubmissionAnalytics,
     ChallengePhaseSubmissionAnalyticsSerializer,
     ChallengePhaseSubmissionCount,
     ChallengePhaseSubmissionCountSerializer,
     LastSubmissionTimestamp,
     LastSubmissionTimestampSerializer,
+    SubmissionHistogramBucketSerializer,
+    SubmissionHistogramQuerySerializer,
+)
+from .utils import (
+    get_challenge_phase_submission_analytics,
+    get_challenge_phases_submission_analytics,
+    get_challenge_submission_analytics,
+    get_last_submission_timestamps,
+    get_participant_analytics,
+    get_submission_count_since_date,
+    get_submission_count_histogram,
 )
 
 
@@ -77,10 +85,9 @@ def get_participant_count(request, challenge_pk):
     Returns the number of participants in a challenge
     """
     challenge = get_challenge_model(challenge_pk)
-    participant_teams = challenge.participant_teams.all()
-    participant_count = Participant.objects.filter(
-        team__in=participant_teams
-    ).count()
+    participant_count = get_participant_analytics(challenge)[
+        "participant_count"
+    ]
     participant_count = ParticipantCount(participant_count)
     serializer = ParticipantCountSerializer(participant_count)
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -104,27 +111,8 @@ def get_submission_count(request, challenge_pk, duration):
 
     challenge = get_challenge_model(challenge_pk)
 
-    challenge_phase_ids = challenge.challengephase_set.all().values_list(
-        "id", flat=True
-    )
-
-    q_params = {"challenge_phase__id__in": challenge_phase_ids}
-    since_date = None
-    if duration.lower() == "daily":
-        # Get the midnight time of the day
-        since_date = timezone.now().replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-
-    elif duration.lower() == "weekly":
-        since_date = (timezone.now() - timedelta(days=7)).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-
-    elif duration.lower() == "monthly":
-        since_date = (timezone.now() - timedelta(days=30)).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
+    q_params = {"challenge_phase__challenge": challenge}
+    since_date = get_submission_count_since_date(duration.lower())
     # for `all` we dont need any condition in `q_params`
     if since_date:
         q_params["submitted_at__gte"] = since_date
@@ -231,32 +219,25 @@ def get_last_submission_datetime_analysis(
 
     challenge_phase = get_challenge_phase_model(challenge_phase_pk)
 
-    submissions = Submission.objects.filter(
-        challenge_phase__challenge=challenge
+    last_submission_timestamps = get_last_submission_timestamps(
+        challenge, challenge_phase
     )
-
-    if not submissions:
+    last_submission_timestamp_in_challenge = last_submission_timestamps[
+        "last_submission_timestamp_in_challenge"
+    ]
+    if last_submission_timestamp_in_challenge is None:
         response_data = {
             "message": "You dont have any submissions in this challenge!"
         }
         return Response(response_data, status.HTTP_200_OK)
 
-    last_submission_timestamp_in_challenge = submissions.order_by(
-        "-submitted_at"
-    )[0].created_at
-
-    submissions_in_a_phase = submissions.filter(
-        challenge_phase=challenge_phase
-    )
-
-    if not submissions_in_a_phase:
+    last_submission_timestamp_in_challenge_phase = last_submission_timestamps[
+        "last_submission_timestamp_in_challenge_phase"
+    ]
+    if last_submission_timestamp_in_challenge_phase is None:
         last_submission_timestamp_in_challenge_phase = (
             "You dont have any submissions in this challenge phase!"
         )
-    else:
-        last_submission_timestamp_in_challenge_phase = (
-            submissions_in_a_phase.order_by("-submitted_at")[0].created_at
-        )
 
     last_submission_timestamp = LastSubmissionTimestamp(
         last_submission_timestamp_in_challenge,
@@ -292,24 +273,14 @@ def get_challenge_phase_submission_analysis(
 
     challenge = get_challenge_model(challenge_pk)
     challenge_phase = get_challenge_phase_model(challenge_phase_pk)
-    # Get the total submissions in a challenge phase
-    submissions = Submission.objects.filter(
-        challenge_phase=challenge_phase, challenge_phase__challenge=challenge
+    submission_analytics = get_challenge_phase_submission_analytics(
+        challenge, challenge_phase
     )
-    total_submissions = submissions.count()
-    # Get the total participant teams in a challenge phase
-    participant_team_count = (
-        submissions.values("participant_team").distinct().count()
-    )
-    # Get flagged submission count
-    flagged_submissions_count = submissions.filter(is_flagged=True).count()
-    # Get public submission count
-    public_submissions_count = submissions.filter(is_public=True).count()
     challenge_phase_submission_count = ChallengePhaseSubmissionAnalytics(
-        total_submissions,
-        participant_team_count,
-        flagged_submissions_count,
-        public_submissions_count,
+        submission_analytics["total_submissions"],
+        submission_analytics["participant_team_count"],
+        submission_analytics["flagged_submissions_count"],
+        submission_analytics["public_submissions_count"],
         challenge_phase.pk,
     )
     try:
@@ -323,6 +294,84 @@ def get_challenge_phase_submission_analysis(
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["GET"])
+@throttle_classes([UserRateThrottle])
+@permission_classes(
+    (permissions.IsAuthenticated, HasVerifiedEmail, IsChallengeCreator)
+)
+@authentication_classes((JWTAuthentication, ExpiringTokenAuthentication))
+def get_challenge_overview(request, challenge_pk):
+    """
+    Returns the analytics of the host dashboard in a single response
+    1. Number of participant teams and participants in a challenge
+    2. Number of submissions in a challenge for all time, today, this week and this month
+    3. Last submission time in a challenge
+    4. Submission analytics and last submission time of every challenge phase
+    """
+    challenge = get_challenge_model(challenge_pk)
+    if not is_user_a_host_of_challenge(
+        user=request.user, challenge_pk=challenge.pk
+    ):
+        response_data = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    challenge_overview = {"challenge": challenge.pk}
+    challenge_overview.update(get_participant_analytics(challenge))
+    challenge_overview.update(get_challenge_submission_analytics(challenge))
+    challenge_overview[
+        "challenge_phases"
+    ] = get_challenge_phases_submission_analytics(challenge)
+    serializer = ChallengeOverviewSerializer(challenge_overview)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@throttle_classes([UserRateThrottle])
+@permission_classes(
+    (permissions.IsAuthenticated, HasVerifiedEmail, IsChallengeCreator)
+)
+@authentication_classes((JWTAuthentication, ExpiringTokenAuthentication))
+def get_submission_histogram(request, challenge_pk):
+    """
+    Returns the number of submissions in a challenge per hour, day, week or month
+    Query params:
+        granularity -- One of hour, day (default), week and month
+        start, end -- Range of the histogram, the last 30 days by default
+        challenge_phase -- Only count the submissions of a challenge phase
+        status -- Only count the submissions with a status
+    """
+    challenge = get_challenge_model(challenge_pk)
+    if not is_user_a_host_of_challenge(
+        user=request.user, challenge_pk=challenge.pk
+    ):
+        response_data = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = SubmissionHistogramQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    query = serializer.validated_data
+    buckets = get_submission_count_histogram(
+        challenge,
+        query["granularity"],
+        query["start"],
+        query["end"],
+        challenge_phase_pk=query.get("challenge_phase"),
+        status=query.get("status"),
+    )
+    response_data = {
+        "granularity": query["granularity"],
+        "buckets": SubmissionHistogramBucketSerializer(
+            buckets, many=True
+        ).data,
+    }
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
 @api_view(["GET"])
 @throttle_classes([UserRateThrottle])
 @permission_classes(
@@ -0,0 +1,76 @@
+import pytz
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+from analytics.models import SubmissionCountRollup
+from challenges.models import ChallengePhase
+from jobs.models import Submission
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Rebuilds the hourly submission count rollups of challenge phases "
+        "from their submissions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "challenge_pks",
+            nargs="*",
+            type=int,
+            help="Primary keys of the challenges, all of them if omitted.",
+        )
+
+    def handle(self, *args, **options):
+        challenge_phases = ChallengePhase.objects.order_by("pk")
+        if options["challenge_pks"]:
+            challenge_phases = challenge_phases.filter(
+                challenge__pk__in=options["challenge_pks"]
+            )
+        for challenge_phase_pk in challenge_phases.values_list(
+            "pk", flat=True
+        ):
+            self.backfill(challenge_phase_pk)
+
+    def backfill(self, challenge_phase_pk):
+        counts = (
+            Submission.objects.filter(challenge_phase_id=challenge_phase_pk)
+            .order_by()
+            .values(
+                "status", bucket=TruncHour("submitted_at", tzinfo=pytz.UTC)
+            )
+            .annotate(count=Count("pk"))
+        )
+        # The submissions of the phase are locked so that their status
+        # transitions wait for the rollups to be rebuilt
+        with transaction.atomic():
+            list(
+                Submission.objects.select_for_update()
+                .filter(challenge_phase_id=challenge_phase_pk)
+                .values_list("pk", flat=True)
+            )
+            SubmissionCountRollup.objects.filter(
+                challenge_phase_id=challenge_phase_pk
+            ).delete()
+            submission_count_rollups = (
+                SubmissionCountRollup.objects.bulk_create(
+                    [
+                        SubmissionCountRollup(
+                            challenge_phase_id=challenge_phase_pk, **count
+                        )
+                        for count in counts
+                    ]
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Created {} submission count rollups for the challenge "
+                "phase {}".format(
+                    len(submission_count_rollups), challenge_phase_pk
+                )
+            )
+        )
@@ -0,0 +1,62 @@
+import hashlib
+
+from django.core.management import BaseCommand
+from django.db import connection
+
+from challenges.models import ChallengePhaseSplit, LeaderboardData
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Creates expression indexes on the leaderboard labels of challenge "
+        "phase splits to rank the leaderboard data in the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "challenge_pks",
+            nargs="*",
+            type=int,
+            help="Primary keys of the challenges, all of them if omitted.",
+        )
+
+    def handle(self, *args, **options):
+        challenge_phase_splits = ChallengePhaseSplit.objects.select_related(
+            "leaderboard"
+        ).order_by("pk")
+        if options["challenge_pks"]:
+            challenge_phase_splits = challenge_phase_splits.filter(
+                challenge_phase__challenge__pk__in=options["challenge_pks"]
+            )
+        for challenge_phase_split in challenge_phase_splits:
+            labels = challenge_phase_split.leaderboard.schema.get("labels", [])
+            for label in labels:
+                self.create_index(challenge_phase_split, label)
+
+    def create_index(self, challenge_phase_split, label):
+        # The indexes are partial on the split since the labels are only
+        # defined within a leaderboard. The leaderboard data of a team is
+        # looked up through its submissions along with the value it is
+        # ranked by, which never fails to be computed.
+        index_name = "leaderboard_data_{}_{}".format(
+            challenge_phase_split.pk,
+            hashlib.md5(label.encode("utf-8")).hexdigest()[:10],
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON {} "
+                "(submission_id, leaderboard_label_value(result, %s), "
+                "created_at, id) "
+                "WHERE challenge_phase_split_id = %s".format(
+                    connection.ops.quote_name(index_name),
+                    connection.ops.quote_name(LeaderboardData._meta.db_table),
+                ),
+                (label, challenge_phase_split.pk),
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Created index {} for the label {} of the challenge phase "
+                "split {}".format(index_name, label, challenge_phase_split.pk)
+            )
+        )
@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+
+from jobs.utils import delete_expired_submission_exports
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Deletes the submission CSVs exported in the background which are "
+        "older than SUBMISSION_EXPORTS_TTL seconds."
+    )
+
+    def handle(self, *args, **options):
+        count = delete_expired_submission_exports()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Deleted {} expired submission exports".format(count)
+            )
+        )
@@ -3,14 +3,21 @@ import json
 import logging
 import os
 import re
+import tempfile
+import threading
+import time
 import uuid
+import zipfile
 from contextlib import contextmanager
+from io import BytesIO
 
 import boto3
 import botocore
 import requests
 import sendgrid
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils.deconstruct import deconstructible
 from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
@@ -20,6 +27,10 @@ from settings.common import SQS_RETENTION_PERIOD
 
 logger = logging.getLogger(__name__)
 
+ZIP_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Seconds to connect and to wait for each chunk while downloading a zip file
+ZIP_DOWNLOAD_TIMEOUT = (10, 60)
+
 
 class StandardResultSetPagination(PageNumberPagination):
     page_size = 100
@@ -167,48 +178,243 @@ def get_boto3_client(resource, aws_keys):
         logger.exception(e)
 
 
-def get_or_create_sqs_queue(queue_name, challenge=None):
+# Seconds for which the URL of a SQS queue is reused before it is looked up again
+SQS_QUEUE_URL_TIMEOUT = 60 * 60
+
+# boto3 resources aren't thread safe, so every thread keeps its own
+SQS_RESOURCES = threading.local()
+# Maps the SQS resource arguments and a queue name to the queue URL and its expiry
+SQS_QUEUE_URLS = {}
+SQS_QUEUE_URLS_LOCK = threading.Lock()
+
+
+def get_sqs_resource_kwargs(challenge=None):
+    """
+    Function to get the arguments of the SQS resource used for the queue of a challenge
+
+    Arguments:
+        challenge {[Class object]} -- Challenge model object
+
+    Returns:
+        [dict] -- Keyword arguments of `boto3.resource`
+    """
     if settings.DEBUG or settings.TEST:
-        queue_name = "evalai_submission_queue"
-        sqs = boto3.resource(
-            "sqs",
-            endpoint_url=os.environ.get("AWS_SQS_ENDPOINT", "http://sqs:9324"),
-            region_name=os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
-            aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY", "x"),
-            aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID", "x"),
-        )
-    else:
-        if challenge and challenge.use_host_sqs:
-            sqs = boto3.resource(
-                "sqs",
-                region_name=challenge.queue_aws_region,
-                aws_secret_access_key=challenge.aws_secret_access_key,
-                aws_access_key_id=challenge.aws_access_key_id,
-            )
-        else:
-            sqs = boto3.resource(
-                "sqs",
-                region_name=os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
-                aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
-                aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-            )
+        return {
+            "endpoint_url": os.environ.get(
+                "AWS_SQS_ENDPOINT", "http://sqs:9324"
+            ),
+            "region_name": os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
+            "aws_secret_access_key": os.environ.get(
+                "AWS_SECRET_ACCESS_KEY", "x"
+            ),
+            "aws_access_key_id": os.environ.get("AWS_ACCESS_KEY_ID", "x"),
+        }
+    if challenge and challenge.use_host_sqs:
+        return {
+            "region_name": challenge.queue_aws_region,
+            "aws_secret_access_key": challenge.aws_secret_access_key,
+            "aws_access_key_id": challenge.aws_access_key_id,
+        }
+    return {
+        "region_name": os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
+        "aws_secret_access_key": os.environ.get("AWS_SECRET_ACCESS_KEY"),
+        "aws_access_key_id": os.environ.get("AWS_ACCESS_KEY_ID"),
+    }
+
+
+def get_sqs_resource(resource_kwargs):
+    """
+    Function to get the SQS resource of the current thread for the resource arguments,
+    the resources are created once as creating a boto3 session is expensive
+
+    Arguments:
+        resource_kwargs {[dict]} -- Keyword arguments of `boto3.resource`
+
+    Returns:
+        [Class object] -- SQS resource
+    """
+    # The resources of a parent process aren't reused by its forked children
+    if getattr(SQS_RESOURCES, "pid", None) != os.getpid():
+        SQS_RESOURCES.pid = os.getpid()
+        SQS_RESOURCES.resources = {}
+    key = tuple(sorted(resource_kwargs.items()))
+    if key not in SQS_RESOURCES.resources:
+        SQS_RESOURCES.resources[key] = boto3.resource("sqs", **resource_kwargs)
+    return SQS_RESOURCES.resources[key]
+
+
+def get_sqs_queue(queue_name, challenge=None, create=True):
+    """
+    Function to get a SQS queue, which is created if it doesn't exist. The queue URL
+    is cached per credentials and queue name, so a change of the challenge credentials
+    looks the queue up again.
+
+    Arguments:
+        queue_name {[str]} -- Name of the SQS queue
+        challenge {[Class object]} -- Challenge model object
+        create {[bool]} -- Whether to create the queue if it doesn't exist
+
+    Returns:
+        [Class object] -- SQS queue, None if it doesn't exist and isn't created
+    """
+    resource_kwargs = get_sqs_resource_kwargs(challenge)
+    sqs = get_sqs_resource(resource_kwargs)
+    key = (tuple(sorted(resource_kwargs.items())), queue_name)
+    with SQS_QUEUE_URLS_LOCK:
+        queue_url, expires_at = SQS_QUEUE_URLS.get(key, (None, 0))
+    if queue_url and expires_at > time.monotonic():
+        return sqs.Queue(queue_url)
+
     # Check if the queue exists. If no, then create one
     try:
         queue = sqs.get_queue_by_name(QueueName=queue_name)
     except botocore.exceptions.ClientError as ex:
-        if (
+        queue_exists = (
             ex.response["Error"]["Code"]
             != "AWS.SimpleQueueService.NonExistentQueue"
-        ):
+        )
+        if not create:
+            if queue_exists:
+                raise
+            return None
+        if queue_exists:
             logger.exception("Cannot get queue: {}".format(queue_name))
         sqs_retention_period = SQS_RETENTION_PERIOD if challenge is None else str(challenge.sqs_retention_period)
         queue = sqs.create_queue(
             QueueName=queue_name,
             Attributes={"MessageRetentionPeriod": sqs_retention_period},
         )
+    with SQS_QUEUE_URLS_LOCK:
+        SQS_QUEUE_URLS[key] = (
+            queue.url,
+            time.monotonic() + SQS_QUEUE_URL_TIMEOUT,
+        )
     return queue
 
 
+def get_or_create_sqs_queue(queue_name, challenge=None, create=True):
+    if settings.DEBUG or settings.TEST:
+        queue_name = "evalai_submission_queue"
+    if queue_name == "":
+        queue_name = "evalai_submission_queue"
+    return get_sqs_queue(queue_name, challenge, create=create)
+
+
+# Maximum number of entries of the SQS batch actions
+SQS_MAX_BATCH_SIZE = 10
+
+# Maximum visibility timeout of a SQS message in seconds
+SQS_MAX_VISIBILITY_TIMEOUT = 12 * 60 * 60
+
+
+def receive_sqs_messages(
+    queue,
+    max_number_of_messages=1,
+    wait_time_seconds=None,
+    visibility_timeout=None,
+    attribute_names=None,
+):
+    """
+    Function to receive messages from a SQS queue with long polling
+
+    Arguments:
+        queue {[Class object]} -- SQS queue resource
+        max_number_of_messages {[int]} -- Maximum number of messages, at most 10 are received
+        wait_time_seconds {[int]} -- Seconds to wait for a message if the queue is empty
+        visibility_timeout {[int]} -- Seconds during which the messages stay hidden, the queue default if None
+        attribute_names {[list]} -- System attributes of the messages to receive, e.g. `ApproximateReceiveCount`
+
+    Returns:
+        [list] -- SQS messages
+    """
+    if wait_time_seconds is None:
+        wait_time_seconds = settings.SQS_WAIT_TIME_SECONDS
+    kwargs = {
+        "MaxNumberOfMessages": min(
+            max(max_number_of_messages, 1), SQS_MAX_BATCH_SIZE
+        ),
+        "WaitTimeSeconds": wait_time_seconds,
+    }
+    if visibility_timeout is not None:
+        kwargs["VisibilityTimeout"] = visibility_timeout
+    if attribute_names:
+        kwargs["AttributeNames"] = attribute_names
+    return queue.receive_messages(**kwargs)
+
+
+def get_sqs_message_batches(messages):
+    messages = list(messages)
+    for index in range(0, len(messages), SQS_MAX_BATCH_SIZE):
+        yield messages[index:index + SQS_MAX_BATCH_SIZE]
+
+
+def delete_sqs_messages(queue, messages):
+    """
+    Function to delete processed messages from a SQS queue in batches
+
+    Arguments:
+        queue {[Class object]} -- SQS queue resource
+        messages {[list]} -- SQS messages
+
+    Returns:
+        [list] -- SQS messages which are not deleted
+    """
+    failed_messages = []
+    for batch in get_sqs_message_batches(messages):
+        response = queue.delete_messages(
+            Entries=[
+                {"Id": str(index), "ReceiptHandle": message.receipt_handle}
+                for index, message in enumerate(batch)
+            ]
+        )
+        for failed in response.get("Failed", []):
+            failed_messages.append(batch[int(failed["Id"])])
+            logger.error(
+                "Cannot delete message {} from queue {}: {}".format(
+                    batch[int(failed["Id"])].receipt_handle,
+                    queue.url,
+                    failed.get("Message"),
+                )
+            )
+    return failed_messages
+
+
+def change_sqs_messages_visibility(queue, messages, visibility_timeout):
+    """
+    Function to keep messages being processed hidden from the other consumers of a SQS queue
+
+    Arguments:
+        queue {[Class object]} -- SQS queue resource
+        messages {[list]} -- SQS messages
+        visibility_timeout {[int]} -- Seconds from now during which the messages stay hidden
+
+    Returns:
+        [list] -- SQS messages whose visibility is not changed
+    """
+    failed_messages = []
+    for batch in get_sqs_message_batches(messages):
+        response = queue.change_message_visibility_batch(
+            Entries=[
+                {
+                    "Id": str(index),
+                    "ReceiptHandle": message.receipt_handle,
+                    "VisibilityTimeout": visibility_timeout,
+                }
+                for index, message in enumerate(batch)
+            ]
+        )
+        for failed in response.get("Failed", []):
+            failed_messages.append(batch[int(failed["Id"])])
+            logger.error(
+                "Cannot change visibility of message {} in queue {}: {}".format(
+                    batch[int(failed["Id"])].receipt_handle,
+                    queue.url,
+                    failed.get("Message"),
+                )
+            )
+    return failed_messages
+
+
 def get_slug(param):
     slug = param.replace(" ", "-").lower()
     slug = re.sub(r"\W+", "-", slug)
@@ -301,6 +507,51 @@ def suppress_autotime(model, fields):
                 ]
 
 
+# Memo of the request handled by the current thread, see RequestMemoMiddleware
+REQUEST_MEMOS = threading.local()
+
+
+@contextmanager
+def request_memo():
+    """Keeps a memo for the values computed while handling a request"""
+    REQUEST_MEMOS.memo = {}
+    try:
+        yield REQUEST_MEMOS.memo
+    finally:
+        del REQUEST_MEMOS.memo
+
+
+def get_request_memo():
+    """
+    Function to get the memo of the request handled by the current thread
+
+    Return:
+        {dict} : Memo of the request, None outside of requests
+    """
+    return getattr(REQUEST_MEMOS, "memo", None)
+
+
+def clear_request_memo():
+    """Function to forget the memoized values after the data they depend on changes"""
+    memo = get_request_memo()
+    if memo is not None:
+        memo.clear()
+
+
+def delete_cache_keys_on_commit(cache_keys):
+    """
+    Function to delete cached values computed from rows being changed. They are deleted
+    again once the transaction commits, since concurrent requests still read and may
+    cache the old rows until then.
+
+    Args:
+        cache_keys ([iterable]): Cache keys to delete
+    """
+    cache_keys = list(cache_keys)
+    cache.delete_many(cache_keys)
+    transaction.on_commit(lambda: cache.delete_many(cache_keys))
+
+
 def is_model_field_changed(model_obj, field_name):
     """
     Function to check if a model field is changed or not
@@ -330,3 +581,145 @@ def is_user_a_staff(user):
         {bool} : True/False if the user is staff or not
     """
     return user.is_staff
+
+
+class ZipExtractionError(Exception):
+    pass
+
+
+def spool_zip_file(url, max_size=None):
+    """
+    Function to stream a zip file into memory, or into a temporary file
+    once it grows beyond `ZIP_SPOOL_MAX_MEMORY_SIZE` bytes. The whole file
+    is downloaded before it is extracted since the central directory of a
+    zip file is at its end.
+
+    Args:
+        url ([str]): URL of the zip file
+        max_size ([int]): Maximum size of the zip file in bytes
+
+    Return:
+        {file} : Seekable zip file positioned at its start
+
+    Raises:
+        requests.exceptions.RequestException: When the download fails or times out
+        ZipExtractionError: When the zip file is larger than `max_size`
+    """
+    if max_size is None:
+        max_size = settings.ZIP_EXTRACTION_MAX_SIZE
+    start_time = time.time()
+    # tempfile.SpooledTemporaryFile isn't seekable for zipfile before
+    # Python 3.11
+    spooled_file = BytesIO()
+    try:
+        response = requests.get(
+            url, stream=True, timeout=ZIP_DOWNLOAD_TIMEOUT
+        )
+        try:
+            response.raise_for_status()
+            for chunk in response.iter_content(
+                chunk_size=ZIP_DOWNLOAD_CHUNK_SIZE
+            ):
+                spooled_file.write(chunk)
+                if spooled_file.tell() > max_size:
+                    raise ZipExtractionError(
+                        "The zip file is larger than {} bytes".format(
+                            max_size
+                        )
+                    )
+                if (
+                    isinstance(spooled_file, BytesIO)
+                    and spooled_file.tell()
+                    > settings.ZIP_SPOOL_MAX_MEMORY_SIZE
+                ):
+                    temporary_file = tempfile.TemporaryFile()
+                    temporary_file.write(spooled_file.getbuffer())
+                    spooled_file = temporary_file
+        finally:
+            response.close()
+    except Exception:
+        spooled_file.close()
+        raise
+    size = spooled_file.tell()
+    duration = max(time.time() - start_time, 1e-6)
+    logger.info(
+        "Downloaded zip file of {} bytes in {:.2f}s ({:.2f} MB/s)".format(
+            size, duration, size / duration / 1e6
+        )
+    )
+    spooled_file.seek(0)
+    return spooled_file
+
+
+def extract_zip_archive(
+    zip_file, extract_location, max_size=None, max_entries=None
+):
+    """
+    Function to extract a zip file member by member after checking the
+    number of members and their total size against the limits, so that zip
+    bombs are rejected before anything is written. The size declared by a
+    member can be trusted since reading it fails beyond that size.
+
+    Args:
+        zip_file ([str or file]): Path or seekable file object of the zip file
+        extract_location ([str]): Directory to extract the zip file to
+        max_size ([int]): Maximum total size of the members in bytes
+        max_entries ([int]): Maximum number of members
+
+    Return:
+        {zipfile.ZipFile} : Closed reference to the zip file to list its members
+
+    Raises:
+        zipfile.BadZipfile: When the file isn't a valid zip file
+        ZipExtractionError: When the zip file exceeds the limits
+    """
+    if max_size is None:
+        max_size = settings.ZIP_EXTRACTION_MAX_SIZE
+    if max_entries is None:
+        max_entries = settings.ZIP_EXTRACTION_MAX_ENTRIES
+    start_time = time.time()
+    with zipfile.ZipFile(zip_file, "r") as zip_ref:
+        members = zip_ref.infolist()
+        if len(members) > max_entries:
+            raise ZipExtractionError(
+                "The zip file has {} files, more than the limit of {}".format(
+                    len(members), max_entries
+                )
+            )
+        size = sum(member.file_size for member in members)
+        if size > max_size:
+            raise ZipExtractionError(
+                "The zip file contents are {} bytes, more than the limit "
+                "of {} bytes".format(size, max_size)
+            )
+        for member in members:
+            zip_ref.extract(member, extract_location)
+    duration = max(time.time() - start_time, 1e-6)
+    logger.info(
+        "Extracted {} files of {} bytes to {} in {:.2f}s ({:.2f} MB/s)".format(
+            len(members), size, extract_location, duration, size / duration / 1e6
+        )
+    )
+    return zip_ref
+
+
+def download_and_extract_zip_archive(
+    url, extract_location, max_size=None, max_entries=None
+):
+    """
+    Function to stream a zip file into a temporary file and extract it,
+    without staging the archive on disk unless it is large
+
+    Args:
+        url ([str]): URL of the zip file
+        extract_location ([str]): Directory to extract the zip file to
+        max_size ([int]): Maximum total size of the members in bytes
+        max_entries ([int]): Maximum number of members
+
+    Return:
+        {zipfile.ZipFile} : Closed reference to the zip file to list its members
+    """
+    with spool_zip_file(url, max_size) as zip_file:
+        return extract_zip_archive(
+            zip_file, extract_location, max_size, max_entries
+        )
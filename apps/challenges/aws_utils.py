@@ -951,6 +951,32 @@ def scale_workers(queryset, num_of_tasks):
     return {"count": count, "failures": failures}
 
 
+def scale_challenge_workers(challenge, num_of_tasks):
+    """
+    The function called by the autoscaling controller to set the number of workers of a challenge.
+
+    Stops the workers when scaling to zero, and starts them before scaling when they are inactive.
+
+    Parameters:
+    challenge (<class 'challenges.models.Challenge'>): The challenge object whose workers are scaled.
+    num_of_tasks (int): Number of workers to scale to.
+
+    Returns:
+    dict: keys-> 'count': 1 if the workers were scaled, 0 otherwise.
+                 'failures': a dict of all the failures with their error messages and the challenge pk
+    """
+    current_workers = challenge.workers or 0
+    if num_of_tasks == current_workers:
+        return {"count": 1, "failures": []}
+    if num_of_tasks == 0:
+        return stop_workers([challenge])
+    if current_workers == 0:
+        response = start_workers([challenge])
+        if not response["count"] or num_of_tasks == 1:
+            return response
+    return scale_workers([challenge], num_of_tasks)
+
+
 def scale_resources(challenge, worker_cpu_cores, worker_memory):
     """
     The function called by scale_resources_by_challenge_pk to send the AWS ECS request to update the resources used by
@@ -7,8 +7,8 @@ from django.core.files.base import ContentFile
 
 import re
 from os.path import basename, isfile, join
+from base.utils import ZipExtractionError, download_and_extract_zip_archive
 from challenges.models import ChallengePhase, ChallengePhaseSplit, DatasetSplit, Leaderboard, Challenge
-from rest_framework import status
 
 from yaml.scanner import ScannerError
 
@@ -28,19 +28,6 @@ from .utils import (
 logger = logging.getLogger(__name__)
 
 
-def write_file(output_path, mode, file_content):
-    with open(output_path, mode) as file:
-        file.write(file_content)
-
-
-def extract_zip_file(file_path, mode, output_path):
-    zip_ref = zipfile.ZipFile(file_path, mode)
-    zip_ref.extractall(output_path)
-    logger.info("Zip file extracted to {}".format(output_path))
-    zip_ref.close()
-    return zip_ref
-
-
 def get_yaml_files_from_challenge_config(zip_ref):
     """
     Arguments:
@@ -153,35 +140,35 @@ def is_challenge_phase_config_yaml_html_field_valid(
     return is_valid, message
 
 
-def download_and_write_file(url, stream, output_path, mode):
+def download_and_extract_zip_file(url, output_path):
     """
     Arguments:
-        url {string} -- source file url
-        stream {boolean} -- flag for download in stream mode
-        output_path {string} -- path to write file
-        model {string} -- access mode to write file
+        url {string} -- source zip file url
+        output_path {string} -- path to extract the zip file to
     Returns:
-        is_success {boolean} -- flag for download and write is success
+        zip_ref {zipfile.ZipFile} -- reference to the extracted zip file, None if any error
         message {string} -- error message if any
     """
-    is_success = False
-    message = None
     try:
-        response = requests.get(url, stream=stream)
-        try:
-            if response and response.status_code == status.HTTP_200_OK:
-                write_file(output_path, mode, response.content)
-                is_success = True
-        except IOError:
-            message = (
-                "Unable to process the uploaded zip file. " "Please try again!"
-            )
+        zip_ref = download_and_extract_zip_archive(url, output_path)
     except requests.exceptions.RequestException:
-        message = (
+        return None, (
             "A server error occured while processing zip file. "
             "Please try again!"
         )
-    return is_success, message
+    except zipfile.BadZipfile:
+        return None, (
+            "The zip file contents cannot be extracted. "
+            "Please check the format!"
+        )
+    except ZipExtractionError as e:
+        return None, "{}. Please reduce the size of the zip file!".format(e)
+    except IOError:
+        return None, (
+            "Unable to process the uploaded zip file. " "Please try again!"
+        )
+    logger.info("Zip file extracted to {}".format(output_path))
+    return zip_ref, None
 
 
 def is_challenge_phase_split_mapping_valid(
@@ -0,0 +1,53 @@
+# Generated by Django 2.2.20 on 2026-10-18 06:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0012_remove_docker_repository_uri_from_team'),
+        ('challenges', '0112_challenge_sqs_retention_period'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardRanking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('order_by', models.CharField(max_length=200)),
+                ('only_public_entries', models.BooleanField(default=True)),
+                ('challenge_phase_split', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='challenges.ChallengePhaseSplit')),
+            ],
+            options={
+                'db_table': 'leaderboard_ranking',
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardRankingEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('filtering_score', models.FloatField(default=0)),
+                ('filtering_error', models.FloatField(default=0)),
+                ('leaderboard_data', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='challenges.LeaderboardData')),
+                ('participant_team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='participants.ParticipantTeam')),
+                ('ranking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='challenges.LeaderboardRanking')),
+            ],
+            options={
+                'db_table': 'leaderboard_ranking_entry',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardrankingentry',
+            index=models.Index(fields=['ranking', 'filtering_score', 'filtering_error'], name='leaderboard_ranking_score_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='leaderboardranking',
+            unique_together={('challenge_phase_split', 'order_by', 'only_public_entries')},
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.20 on 2026-10-18 10:49
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0113_leaderboard_ranking'),
+    ]
+
+    operations = [
+        # The rankings may hold duplicate entries, they are rebuilt on the
+        # next read of the leaderboards
+        migrations.RunSQL(
+            "DELETE FROM leaderboard_ranking_entry; DELETE FROM leaderboard_ranking;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterUniqueTogether(
+            name='leaderboardrankingentry',
+            unique_together={('ranking', 'leaderboard_data')},
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.20 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0114_leaderboard_ranking_entry_unique'),
+    ]
+
+    operations = [
+        # Numeric value of a leaderboard label, 0 if it is missing or isn't a
+        # number, so that the expression indexes on the labels never reject
+        # the leaderboard data being written
+        migrations.RunSQL(
+            r"""
+            CREATE OR REPLACE FUNCTION leaderboard_label_value(value jsonb, label text)
+            RETURNS double precision AS $$
+                SELECT CASE
+                    WHEN value->>label ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$'
+                    THEN (value->>label)::double precision
+                    ELSE 0
+                END
+            $$ LANGUAGE SQL IMMUTABLE;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS leaderboard_label_value(jsonb, text);",
+        ),
+        migrations.AddIndex(
+            model_name='leaderboarddata',
+            index=models.Index(fields=['challenge_phase_split', 'submission'], name='leaderboard_data_split_sub_idx'),
+        ),
+    ]
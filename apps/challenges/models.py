@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+from copy import copy
+
 from django.contrib.auth.models import User
 from django.core import serializers
 from django.db.models.signals import pre_save
@@ -13,7 +15,7 @@ from base.models import TimeStampedModel, model_field_name
 from base.utils import RandomFileName, get_slug, is_model_field_changed
 
 
-from participants.models import ParticipantTeam
+from participants.models import Participant, ParticipantTeam
 from hosts.models import ChallengeHost
 
 
@@ -36,6 +38,8 @@ class Challenge(TimeStampedModel):
         self._original_evaluation_script = self.evaluation_script
         self._original_approved_by_admin = self.approved_by_admin
         self._original_sqs_retention_period = self.sqs_retention_period
+        # Copy the list so that in-place updates are detected as a change
+        self._original_banned_email_ids = copy(self.banned_email_ids)
 
     title = models.CharField(max_length=100, db_index=True)
     short_description = models.TextField(null=True, blank=True)
@@ -544,6 +548,265 @@ class LeaderboardData(TimeStampedModel):
     class Meta:
         app_label = "challenges"
         db_table = "leaderboard_data"
+        # Looks up the leaderboard data of a participant team in a split
+        # when its entries of the leaderboard rankings are refreshed
+        indexes = [
+            models.Index(
+                fields=["challenge_phase_split", "submission"],
+                name="leaderboard_data_split_sub_idx",
+            )
+        ]
+
+
+class LeaderboardRanking(TimeStampedModel):
+    """
+    Model to store the materialized ranking of a challenge phase split
+    leaderboard for an `order_by` key. The ranking is built lazily on the first
+    read and its entries are kept up to date as the leaderboard data changes.
+
+    Arguments:
+        TimeStampedModel {[model class]} -- An abstract base class model that provides self-managed `created_at` and
+                                            `modified_at` fields.
+    """
+
+    challenge_phase_split = models.ForeignKey(
+        "ChallengePhaseSplit",
+        related_name="rankings",
+        on_delete=models.CASCADE,
+    )
+    order_by = models.CharField(max_length=200)
+    only_public_entries = models.BooleanField(default=True)
+
+    def __str__(self):
+        return "{0} : {1}".format(self.challenge_phase_split, self.order_by)
+
+    class Meta:
+        app_label = "challenges"
+        db_table = "leaderboard_ranking"
+        unique_together = (
+            ("challenge_phase_split", "order_by", "only_public_entries"),
+        )
+
+
+class LeaderboardRankingEntry(TimeStampedModel):
+    """
+    Model to store an entry, i.e. a leaderboard data row shown on the
+    leaderboard, of a materialized leaderboard ranking
+
+    Arguments:
+        TimeStampedModel {[model class]} -- An abstract base class model that provides self-managed `created_at` and
+                                            `modified_at` fields.
+    """
+
+    ranking = models.ForeignKey(
+        "LeaderboardRanking", related_name="entries", on_delete=models.CASCADE
+    )
+    leaderboard_data = models.ForeignKey(
+        "LeaderboardData", on_delete=models.CASCADE
+    )
+    participant_team = models.ForeignKey(
+        ParticipantTeam, on_delete=models.CASCADE
+    )
+    filtering_score = models.FloatField(default=0)
+    filtering_error = models.FloatField(default=0)
+
+    class Meta:
+        app_label = "challenges"
+        db_table = "leaderboard_ranking_entry"
+        unique_together = (("ranking", "leaderboard_data"),)
+        indexes = [
+            models.Index(
+                fields=["ranking", "filtering_score", "filtering_error"],
+                name="leaderboard_ranking_score_idx",
+            )
+        ]
+
+
+@receiver(signals.post_save, sender="jobs.Submission")
+def refresh_leaderboard_rankings_for_submission(
+    sender, instance, created, raw=False, **kwargs
+):
+    # A new submission doesn't have leaderboard data yet
+    if created or raw:
+        return
+    from jobs.utils import refresh_leaderboard_rankings
+
+    refresh_leaderboard_rankings(
+        ChallengePhaseSplit.objects.filter(
+            challenge_phase=instance.challenge_phase_id
+        ),
+        instance.participant_team_id,
+    )
+
+
+@receiver(signals.post_save, sender="challenges.LeaderboardData")
+def refresh_leaderboard_rankings_for_leaderboard_data(
+    sender, instance, raw=False, **kwargs
+):
+    if raw:
+        return
+    from jobs.utils import refresh_leaderboard_rankings
+
+    refresh_leaderboard_rankings(
+        [instance.challenge_phase_split_id],
+        instance.submission.participant_team_id,
+    )
+
+
+@receiver(signals.post_delete, sender="challenges.LeaderboardData")
+def invalidate_leaderboard_rankings_for_leaderboard_data(
+    sender, instance, **kwargs
+):
+    from jobs.utils import invalidate_leaderboard_rankings
+
+    invalidate_leaderboard_rankings([instance.challenge_phase_split_id])
+
+
+@receiver(signals.post_save, sender="challenges.Challenge")
+def invalidate_leaderboard_rankings_for_banned_email_ids(
+    sender, instance, created, **kwargs
+):
+    field_name = "banned_email_ids"
+    if not created and is_model_field_changed(instance, field_name):
+        from jobs.utils import invalidate_leaderboard_rankings
+        from participants.utils import invalidate_banned_participant_team_ids
+
+        invalidate_banned_participant_team_ids([instance.pk])
+        invalidate_leaderboard_rankings(
+            ChallengePhaseSplit.objects.filter(
+                challenge_phase__challenge=instance
+            )
+        )
+        instance._original_banned_email_ids = copy(instance.banned_email_ids)
+
+
+@receiver(signals.post_save, sender="challenges.ChallengePhase")
+def invalidate_leaderboard_rankings_for_challenge_phase(
+    sender, instance, created, **kwargs
+):
+    if not created:
+        from jobs.utils import invalidate_leaderboard_rankings
+
+        invalidate_leaderboard_rankings(
+            ChallengePhaseSplit.objects.filter(challenge_phase=instance)
+        )
+
+
+@receiver(signals.post_save, sender="challenges.ChallengePhaseSplit")
+def invalidate_leaderboard_rankings_for_challenge_phase_split(
+    sender, instance, created, **kwargs
+):
+    if not created:
+        from jobs.utils import invalidate_leaderboard_rankings
+
+        invalidate_leaderboard_rankings([instance.pk])
+
+
+@receiver(signals.post_save, sender="challenges.Leaderboard")
+def invalidate_leaderboard_rankings_for_leaderboard(
+    sender, instance, created, **kwargs
+):
+    if not created:
+        from jobs.utils import invalidate_leaderboard_rankings
+
+        invalidate_leaderboard_rankings(
+            ChallengePhaseSplit.objects.filter(leaderboard=instance)
+        )
+
+
+@receiver(signals.post_save, sender="hosts.ChallengeHost")
+@receiver(signals.post_delete, sender="hosts.ChallengeHost")
+def invalidate_leaderboard_rankings_for_challenge_host(
+    sender, instance, **kwargs
+):
+    # The submissions of the hosts are excluded from the leaderboard
+    from jobs.utils import invalidate_leaderboard_rankings
+
+    invalidate_leaderboard_rankings(
+        ChallengePhaseSplit.objects.filter(
+            challenge_phase__challenge__creator=instance.team_name_id
+        )
+    )
+
+
+@receiver(signals.post_save, sender="participants.Participant")
+@receiver(signals.post_delete, sender="participants.Participant")
+def invalidate_banned_participant_teams_for_participant(
+    sender, instance, **kwargs
+):
+    # The team membership only matters for the challenges banning the email
+    from jobs.utils import invalidate_leaderboard_rankings
+    from participants.utils import invalidate_banned_participant_team_ids
+
+    challenge_ids = list(
+        Challenge.objects.filter(
+            banned_email_ids__contains=[instance.user.email]
+        ).values_list("pk", flat=True)
+    )
+    if challenge_ids:
+        invalidate_banned_participant_team_ids(challenge_ids)
+        invalidate_leaderboard_rankings(
+            ChallengePhaseSplit.objects.filter(
+                challenge_phase__challenge__in=challenge_ids
+            )
+        )
+
+
+@receiver(signals.post_save, sender="hosts.ChallengeHost")
+@receiver(signals.post_delete, sender="hosts.ChallengeHost")
+def invalidate_challenge_roles_for_challenge_host(sender, instance, **kwargs):
+    from challenges.utils import invalidate_challenge_roles
+
+    invalidate_challenge_roles(
+        [instance.user_id],
+        Challenge.objects.filter(creator=instance.team_name_id).values_list(
+            "pk", flat=True
+        ),
+    )
+
+
+@receiver(signals.post_save, sender="participants.Participant")
+@receiver(signals.post_delete, sender="participants.Participant")
+def invalidate_challenge_roles_for_participant(sender, instance, **kwargs):
+    from challenges.utils import invalidate_challenge_roles
+
+    invalidate_challenge_roles(
+        [instance.user_id],
+        Challenge.objects.filter(
+            participant_teams=instance.team_id
+        ).values_list("pk", flat=True),
+    )
+
+
+@receiver(signals.m2m_changed, sender=Challenge.participant_teams.through)
+def invalidate_challenge_roles_for_participant_teams(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # The participant teams removed by `clear` are only known beforehand
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    from challenges.utils import invalidate_challenge_roles
+
+    if reverse:
+        participant_team_ids = [instance.pk]
+        challenge_pks = (
+            pk_set
+            if pk_set is not None
+            else instance.challenge_set.values_list("pk", flat=True)
+        )
+    else:
+        participant_team_ids = (
+            pk_set
+            if pk_set is not None
+            else instance.participant_teams.values_list("pk", flat=True)
+        )
+        challenge_pks = [instance.pk]
+    invalidate_challenge_roles(
+        Participant.objects.filter(
+            team_id__in=participant_team_ids
+        ).values_list("user_id", flat=True),
+        challenge_pks,
+    )
 
 
 class ChallengeConfiguration(TimeStampedModel):
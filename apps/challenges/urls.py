@@ -49,6 +49,11 @@ urlpatterns = [
         views.get_all_challenges_submission_metrics,
         name="get_all_challenges_submission_metrics",
     ),
+    url(
+        r"^challenge/get_scaling_metrics$",
+        views.get_scaling_metrics_of_challenges,
+        name="get_challenges_scaling_metrics",
+    ),
     url(
         r"^challenge/get_submission_metrics_by_pk/(?P<pk>[0-9]+)/$",
         views.get_challenge_submission_metrics_by_pk,
@@ -100,6 +105,11 @@ urlpatterns = [
         views.download_all_submissions,
         name="download_all_submissions",
     ),
+    url(
+        r"^(?P<challenge_pk>[0-9]+)/submission_exports/(?P<submission_export_pk>[0-9]+)/$",
+        views.get_submission_export,
+        name="get_submission_export",
+    ),
     url(
         r"^challenge/create/leaderboard/step_2/$",
         views.create_leaderboard,
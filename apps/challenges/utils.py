@@ -7,15 +7,22 @@ import uuid
 
 from botocore.exceptions import ClientError
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.base import ContentFile
+from django.db.models import Exists, OuterRef, Subquery
 from moto import mock_ecr, mock_sts
 
 from base.utils import (
+    clear_request_memo,
+    delete_cache_keys_on_commit,
     get_model_object,
     get_boto3_client,
+    get_request_memo,
     mock_if_non_prod_aws,
     send_email,
 )
+from hosts.models import ChallengeHost
+from participants.models import Participant
 
 from .models import (
     Challenge,
@@ -36,6 +43,11 @@ from .serializers import (
 
 logger = logging.getLogger(__name__)
 
+# The cached roles of the users in the challenges are invalidated on changes,
+# the timeout only bounds the staleness for changes which aren't tracked e.g.
+# challenge creators
+CHALLENGE_ROLES_CACHE_TIMEOUT = 60
+
 get_challenge_model = get_model_object(Challenge)
 
 get_challenge_phase_model = get_model_object(ChallengePhase)
@@ -625,3 +637,66 @@ def add_sponsors_to_challenge(yaml_file_data, challenge):
     else:
         challenge.has_sponsors = False
         challenge.save()
+
+
+def get_challenge_roles_cache_key(user_pk, challenge_pk):
+    """Returns the cache key of the roles of a user in a challenge"""
+    return "user_{}_challenge_{}_roles".format(user_pk, challenge_pk)
+
+
+def get_challenge_roles_of_user(user, challenge_pk):
+    """
+    Returns whether a user is a host of a challenge and their participant
+    team in it. The roles are looked up with at most one query per request
+    and cached briefly across requests.
+
+    Arguments:
+        user {[User Class Object]} -- User model class object or its primary key
+        challenge_pk {[int]} -- Challenge primary key
+
+    Returns:
+        [dict] -- `is_host` and `participant_team_id`, None if the user doesn't participate
+    """
+    if getattr(user, "is_anonymous", False):
+        return {"is_host": False, "participant_team_id": None}
+    user_pk = getattr(user, "pk", user)
+    cache_key = get_challenge_roles_cache_key(user_pk, challenge_pk)
+    memo = get_request_memo()
+    if memo is not None and cache_key in memo:
+        return memo[cache_key]
+    roles = cache.get(cache_key)
+    if roles is None:
+        roles = Challenge.objects.filter(pk=challenge_pk).annotate(
+            is_host=Exists(
+                ChallengeHost.objects.filter(
+                    user_id=user_pk, team_name=OuterRef("creator")
+                )
+            ),
+            participant_team_id=Subquery(
+                Participant.objects.filter(
+                    user_id=user_pk, team__challenge=OuterRef("pk")
+                )
+                .order_by("pk")
+                .values("team")[:1]
+            ),
+        ).values("is_host", "participant_team_id").first() or {
+            "is_host": False,
+            "participant_team_id": None,
+        }
+        cache.set(cache_key, roles, CHALLENGE_ROLES_CACHE_TIMEOUT)
+    if memo is not None:
+        memo[cache_key] = roles
+    return roles
+
+
+def invalidate_challenge_roles(user_pks, challenge_pks):
+    """
+    Deletes the cached roles of users in challenges, again once the
+    transaction commits
+    """
+    delete_cache_keys_on_commit(
+        get_challenge_roles_cache_key(user_pk, challenge_pk)
+        for user_pk in user_pks
+        for challenge_pk in challenge_pks
+    )
+    clear_request_memo()
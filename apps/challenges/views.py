@@ -1,4 +1,3 @@
-import csv
 import json
 import logging
 import os
@@ -13,16 +12,17 @@ import yaml
 import zipfile
 
 from os.path import basename, isfile, join
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 from django.core.files.base import ContentFile
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
 from django.db import transaction
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
 
 from rest_framework import permissions, status
@@ -32,6 +32,7 @@ from rest_framework.decorators import (
     permission_classes,
     throttle_classes,
 )
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework_expiring_authtoken.authentication import (
     ExpiringTokenAuthentication,
@@ -47,6 +48,8 @@ from allauth.account.models import EmailAddress
 from accounts.permissions import HasVerifiedEmail
 from accounts.serializers import UserDetailsSerializer
 from base.utils import (
+    ZipExtractionError,
+    download_and_extract_zip_archive,
     get_queue_name,
     get_slug,
     get_url_from_hostname,
@@ -54,6 +57,7 @@ from base.utils import (
     send_email,
     send_slack_notification,
     is_user_a_staff,
+    spool_zip_file,
 )
 from challenges.utils import (
     complete_s3_multipart_file_upload,
@@ -67,15 +71,13 @@ from challenges.utils import (
     get_unique_alpha_numeric_key,
     is_user_in_allowed_email_domains,
     is_user_in_blocked_email_domains,
-    parse_submission_meta_attributes,
     add_domain_to_challenge,
     add_tags_to_challenge,
     add_prizes_to_challenge,
     add_sponsors_to_challenge,
 )
 from challenges.challenge_config_utils import (
-    download_and_write_file,
-    extract_zip_file,
+    download_and_extract_zip_file,
     validate_challenge_config_util,
 )
 from hosts.models import ChallengeHost, ChallengeHostTeam
@@ -86,7 +88,7 @@ from hosts.utils import (
     get_challenge_host_team_model,
 )
 from jobs.filters import SubmissionFilter
-from jobs.models import Submission
+from jobs.models import Submission, SubmissionExport
 from jobs.serializers import (
     SubmissionSerializer,
     ChallengeSubmissionManagementSerializer,
@@ -142,6 +144,7 @@ from .aws_utils import (
     start_workers,
     stop_workers,
     restart_workers,
+    scale_challenge_workers,
     start_ec2_instance,
     stop_ec2_instance,
     restart_ec2_instance,
@@ -160,7 +163,15 @@ from .utils import (
     send_emails,
 )
 
-from jobs.utils import get_submission_model
+from jobs.tasks import export_submissions_csv
+from jobs.utils import (
+    get_challenges_scaling_metrics,
+    get_challenges_submission_metrics,
+    get_submission_exports_storage,
+    get_submission_model,
+    get_submissions_csv_rows,
+    get_submissions_export,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -727,30 +738,58 @@ def get_all_challenges(request, challenge_time, challenge_approved, challenge_pu
 @throttle_classes([AnonRateThrottle])
 def get_all_challenges_submission_metrics(request):
     """
-    Returns the submission metrics for all challenges and their phases
+    Returns the submission metrics for all challenges and their phases,
+    or only for the comma separated challenge pks in the `challenge_pks` query param
     """
     if not is_user_a_staff(request.user):
         response_data = {"error": "Sorry, you are not authorized to make this request"}
         return Response(response_data, status=status.HTTP_403_FORBIDDEN)
-    challenges = Challenge.objects.all()
-    submission_metrics = {}
-
-    submission_statuses = [status[0] for status in Submission.STATUS_OPTIONS]
-
-    for challenge in challenges:
-        challenge_id = challenge.id
-        challenge_metrics = {}
-
-        # Fetch challenge phases for the challenge
-        challenge_phases = ChallengePhase.objects.filter(challenge=challenge)
-
-        for submission_status in submission_statuses:
-            count = Submission.objects.filter(challenge_phase__in=challenge_phases, status=submission_status).count()
-            challenge_metrics[submission_status] = count
+    challenge_pks = request.query_params.get("challenge_pks")
+    if challenge_pks is not None:
+        try:
+            challenge_pks = [
+                int(challenge_pk)
+                for challenge_pk in challenge_pks.split(",")
+                if challenge_pk
+            ]
+        except ValueError:
+            response_data = {
+                "error": "challenge_pks should be comma separated integers"
+            }
+            return Response(
+                response_data, status=status.HTTP_400_BAD_REQUEST
+            )
+    submission_metrics = get_challenges_submission_metrics(challenge_pks)
+    return Response(submission_metrics, status=status.HTTP_200_OK)
 
-        submission_metrics[challenge_id] = challenge_metrics
 
-    return Response(submission_metrics, status=status.HTTP_200_OK)
+@api_view(["GET"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((JWTAuthentication, ExpiringTokenAuthentication))
+def get_scaling_metrics_of_challenges(request):
+    """
+    Returns the signals used to autoscale the workers of the comma separated
+    challenge pks in the `challenge_pks` query param
+    """
+    if not is_user_a_staff(request.user):
+        response_data = {"error": "Sorry, you are not authorized to make this request"}
+        return Response(response_data, status=status.HTTP_403_FORBIDDEN)
+    try:
+        challenge_pks = [
+            int(challenge_pk)
+            for challenge_pk in request.query_params.get(
+                "challenge_pks", ""
+            ).split(",")
+            if challenge_pk
+        ]
+    except ValueError:
+        response_data = {
+            "error": "challenge_pks should be comma separated integers"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    scaling_metrics = get_challenges_scaling_metrics(challenge_pks)
+    return Response(scaling_metrics, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
@@ -762,19 +801,10 @@ def get_challenge_submission_metrics_by_pk(request, pk):
     if not is_user_a_staff(request.user):
         response_data = {"error": "Sorry, you are not authorized to make this request"}
         return Response(response_data, status=status.HTTP_403_FORBIDDEN)
-    challenge = get_challenge_model(pk)
-    challenge_phases = ChallengePhase.objects.filter(challenge=challenge)
-    submission_metrics = {}
-
-    submission_statuses = [status[0] for status in Submission.STATUS_OPTIONS]
-
-    # Fetch challenge phases for the challenge
-    challenge_phases = ChallengePhase.objects.filter(challenge=challenge)
-    for submission_status in submission_statuses:
-        count = Submission.objects.filter(challenge_phase__in=challenge_phases, status=submission_status).count()
-        submission_metrics[submission_status] = count
-
-    return Response(submission_metrics, status=status.HTTP_200_OK)
+    submission_metrics = get_challenges_submission_metrics([int(pk)])
+    if int(pk) not in submission_metrics:
+        raise NotFound("Challenge {} does not exist".format(pk))
+    return Response(submission_metrics[int(pk)], status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
@@ -1099,12 +1129,11 @@ def create_challenge_using_zip_file(request, challenge_host_team_pk):
             template_zip_s3_url = challenge_template.template_file.url
 
         unique_folder_name = get_unique_alpha_numeric_key(10)
-        challenge_template_download_location = join(
-            BASE_LOCATION, "{}.zip".format(unique_folder_name)
-        )
 
+        # The template is passed on to the serializer without reading it
+        # into memory at once
         try:
-            response = requests.get(template_zip_s3_url, stream=True)
+            template_zip_file = spool_zip_file(template_zip_s3_url)
         except Exception as e:
             logger.error(
                 "Failed to fetch file from {}, error {}".format(
@@ -1116,26 +1145,14 @@ def create_challenge_using_zip_file(request, challenge_host_team_pk):
             }
             return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-        if response and response.status_code == status.HTTP_200_OK:
-            with open(challenge_template_download_location, "wb") as f:
-                f.write(response.content)
-
-        try:
-            zip_file = open(challenge_template_download_location, "rb")
-        except Exception:
-            message = (
-                "A server error occured while processing zip file. "
-                "Please try again!"
-            )
-            response_data = {"error": message}
-            logger.exception(message)
-            return Response(
-                response_data, status=status.HTTP_406_NOT_ACCEPTABLE
-            )
-
-        challenge_zip_file = SimpleUploadedFile(
-            zip_file.name, zip_file.read(), content_type="application/zip"
+        template_zip_file.seek(0, os.SEEK_END)
+        challenge_zip_file = UploadedFile(
+            template_zip_file,
+            name="{}.zip".format(unique_folder_name),
+            content_type="application/zip",
+            size=template_zip_file.tell(),
         )
+        template_zip_file.seek(0)
 
         # Copy request data so that we can mutate it to add template
         challenge_data_from_hosts = request.data.copy()
@@ -1156,24 +1173,12 @@ def create_challenge_using_zip_file(request, challenge_host_team_pk):
         response_data = serializer.errors
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
+    # Extract zip file
+    unique_folder_name = get_unique_alpha_numeric_key(10)
     try:
-        response = requests.get(uploaded_zip_file_path, stream=True)
-        unique_folder_name = get_unique_alpha_numeric_key(10)
-        CHALLENGE_ZIP_DOWNLOAD_LOCATION = join(
-            BASE_LOCATION, "{}.zip".format(unique_folder_name)
+        zip_ref = download_and_extract_zip_archive(
+            uploaded_zip_file_path, join(BASE_LOCATION, unique_folder_name)
         )
-        try:
-            if response and response.status_code == 200:
-                with open(CHALLENGE_ZIP_DOWNLOAD_LOCATION, "wb") as zip_file:
-                    zip_file.write(response.content)
-        except IOError:
-            message = (
-                "Unable to process the uploaded zip file. " "Please try again!"
-            )
-            response_data = {"error": message}
-            logger.exception(message)
-            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
-
     except requests.exceptions.RequestException:
         message = (
             "A server error occured while processing zip file. "
@@ -1182,12 +1187,6 @@ def create_challenge_using_zip_file(request, challenge_host_team_pk):
         response_data = {"error": message}
         logger.exception(message)
         return Response(response_data, status=status.HTTP_406_NOT_ACCEPTABLE)
-
-    # Extract zip file
-    try:
-        zip_ref = zipfile.ZipFile(CHALLENGE_ZIP_DOWNLOAD_LOCATION, "r")
-        zip_ref.extractall(join(BASE_LOCATION, unique_folder_name))
-        zip_ref.close()
     except zipfile.BadZipfile:
         message = (
             "The zip file contents cannot be extracted. "
@@ -1195,6 +1194,18 @@ def create_challenge_using_zip_file(request, challenge_host_team_pk):
         )
         response_data = {"error": message}
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    except ZipExtractionError as e:
+        response_data = {
+            "error": "{}. Please reduce the size of the zip file!".format(e)
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    except IOError:
+        message = (
+            "Unable to process the uploaded zip file. " "Please try again!"
+        )
+        response_data = {"error": message}
+        logger.exception(message)
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
     # Search for yaml file
     yaml_file_count = 0
@@ -2153,10 +2164,20 @@ def get_all_submissions_of_challenge(
             description="File type",
             required=True,
         ),
+        openapi.Parameter(
+            name="async",
+            in_=openapi.IN_QUERY,
+            type=openapi.TYPE_BOOLEAN,
+            description="Export the file in the background",
+            required=False,
+        ),
     ],
     operation_id="download_all_submissions",
     responses={
         status.HTTP_200_OK: openapi.Response(""),
+        status.HTTP_202_ACCEPTED: openapi.Response(
+            "{'id': <export id>, 'status': 'pending', 'status_url': '<url of the export status>'}"
+        ),
         status.HTTP_400_BAD_REQUEST: openapi.Response(
             "{'error': 'The file type requested is not valid!'}"
         ),
@@ -2189,10 +2210,20 @@ def get_all_submissions_of_challenge(
             description="File type",
             required=True,
         ),
+        openapi.Parameter(
+            name="async",
+            in_=openapi.IN_QUERY,
+            type=openapi.TYPE_BOOLEAN,
+            description="Export the file in the background",
+            required=False,
+        ),
     ],
     operation_id="download_all_submissions",
     responses={
         status.HTTP_200_OK: openapi.Response(""),
+        status.HTTP_202_ACCEPTED: openapi.Response(
+            "{'id': <export id>, 'status': 'pending', 'status_url': '<url of the export status>'}"
+        ),
         status.HTTP_400_BAD_REQUEST: openapi.Response(
             "{'error': 'The file type requested is not valid!'}"
         ),
@@ -2236,259 +2267,139 @@ def download_all_submissions(
         }
         return Response(response_data, status=status.HTTP_404_NOT_FOUND)
 
-    if request.method == "GET":
-        if file_type == "csv":
-            if is_user_a_host_of_challenge(
-                user=request.user, challenge_pk=challenge_pk
-            ):
-                submissions = Submission.objects.filter(
-                    challenge_phase__challenge=challenge
-                ).order_by("-submitted_at")
-                submissions = ChallengeSubmissionManagementSerializer(
-                    submissions, many=True, context={"request": request}
-                )
-                response = HttpResponse(content_type="text/csv")
-                response[
-                    "Content-Disposition"
-                ] = "attachment; filename=all_submissions.csv"
-                writer = csv.writer(response)
-                writer.writerow(
-                    [
-                        "id",
-                        "Team Name",
-                        "Team Members",
-                        "Team Members Email Id",
-                        "Team Members Affiliaton",
-                        "Challenge Phase",
-                        "Status",
-                        "Created By",
-                        "Execution Time(sec.)",
-                        "Submission Number",
-                        "Submitted File",
-                        "Stdout File",
-                        "Stderr File",
-                        "Environment Log File",
-                        "Submitted At",
-                        "Submission Result File",
-                        "Submission Metadata File",
-                        "Method Name",
-                        "Method Description",
-                        "Publication URL",
-                        "Project URL",
-                        "Submission Meta Attributes",
-                    ]
-                )
-                # Issue: "#" isn't parsed by writer.writerow(), hence it is replaced by "-"
-                # TODO: Find a better way to solve the above issue.
-                for submission in submissions.data:
-                    submission_meta_attributes = (
-                        parse_submission_meta_attributes(submission)
-                    )
-                    writer.writerow(
-                        [
-                            submission["id"],
-                            submission["participant_team"],
-                            ",".join(
-                                username["username"]
-                                for username in submission[
-                                    "participant_team_members"
-                                ]
-                            ),
-                            ",".join(
-                                email["email"]
-                                for email in submission[
-                                    "participant_team_members"
-                                ]
-                            ),
-                            ",".join(
-                                affiliation
-                                for affiliation in submission[
-                                    "participant_team_members_affiliations"
-                                ]
-                            ),
-                            submission["challenge_phase"],
-                            submission["status"],
-                            submission["created_by"],
-                            submission["execution_time"],
-                            submission["submission_number"],
-                            submission["input_file"],
-                            submission["stdout_file"],
-                            submission["stderr_file"],
-                            submission["environment_log_file"],
-                            submission["created_at"],
-                            submission["submission_result_file"],
-                            submission["submission_metadata_file"],
-                            submission["method_name"].replace("#", "-"),
-                            submission["method_description"].replace("#", "-"),
-                            submission["publication_url"],
-                            submission["project_url"],
-                            submission_meta_attributes,
-                        ]
-                    )
-                return response
+    if file_type != "csv":
+        response_data = {"error": "The file type requested is not valid!"}
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-            elif has_user_participated_in_challenge(
-                user=request.user, challenge_id=challenge_pk
-            ):
+    participant_team_pk = None
+    fields = None
+    if is_user_a_host_of_challenge(
+        user=request.user, challenge_pk=challenge_pk
+    ):
+        if request.method == "POST":
+            fields = list(request.data)
+    elif request.method == "POST":
+        response_data = {"error": "Sorry, you do not belong to this Host Team!"}
+        return Response(response_data, status=status.HTTP_401_UNAUTHORIZED)
+    elif has_user_participated_in_challenge(
+        user=request.user, challenge_id=challenge_pk
+    ):
+        # get participant team object for the user for a particular challenge.
+        participant_team_pk = get_participant_team_id_of_user_for_a_challenge(
+            request.user, challenge_pk
+        )
+    else:
+        response_data = {
+            "error": "You are neither host nor participant of the challenge!"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-                # get participant team object for the user for a particular challenge.
-                participant_team_pk = (
-                    get_participant_team_id_of_user_for_a_challenge(
-                        request.user, challenge_pk
-                    )
+    if request.query_params.get("async", "").lower() == "true":
+        file_name = "submission_exports/challenge_{}/{}.csv".format(
+            challenge.pk, uuid.uuid4()
+        )
+        submission_export = SubmissionExport.objects.create(
+            challenge_phase=challenge_phase,
+            created_by=request.user,
+            file_name=file_name,
+        )
+        export_submissions_csv.delay(
+            submission_export.pk, participant_team_pk, fields
+        )
+        response_data = {
+            "id": submission_export.pk,
+            "status": submission_export.status,
+            "status_url": request.build_absolute_uri(
+                reverse(
+                    "challenges:get_submission_export",
+                    kwargs={
+                        "challenge_pk": challenge.pk,
+                        "submission_export_pk": submission_export.pk,
+                    },
                 )
+            ),
+        }
+        return Response(response_data, status=status.HTTP_202_ACCEPTED)
 
-                # Filter submissions on the basis of challenge phase for a participant.
-                submissions = Submission.objects.filter(
-                    participant_team=participant_team_pk,
-                    challenge_phase=challenge_phase,
-                ).order_by("-submitted_at")
-                submissions = ChallengeSubmissionManagementSerializer(
-                    submissions, many=True, context={"request": request}
-                )
-                response = HttpResponse(content_type="text/csv")
-                response[
-                    "Content-Disposition"
-                ] = "attachment; filename=all_submissions.csv"
-                writer = csv.writer(response)
-                writer.writerow(
-                    [
-                        "Team Name",
-                        "Method Name",
-                        "Status",
-                        "Execution Time(sec.)",
-                        "Submitted File",
-                        "Result File",
-                        "Stdout File",
-                        "Stderr File",
-                        "Submitted At",
-                    ]
-                )
-                for submission in submissions.data:
-                    writer.writerow(
-                        [
-                            submission["participant_team"],
-                            submission["method_name"],
-                            submission["status"],
-                            submission["execution_time"],
-                            submission["input_file"],
-                            submission["submission_result_file"],
-                            submission["stdout_file"],
-                            submission["stderr_file"],
-                            submission["created_at"],
-                        ]
-                    )
-                return response
-            else:
-                response_data = {
-                    "error": "You are neither host nor participant of the challenge!"
-                }
-                return Response(
-                    response_data, status=status.HTTP_400_BAD_REQUEST
-                )
-        else:
-            response_data = {"error": "The file type requested is not valid!"}
-            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    submissions, header, get_row = get_submissions_export(
+        challenge.pk, challenge_phase.pk, participant_team_pk, fields
+    )
+    response = StreamingHttpResponse(
+        get_submissions_csv_rows(
+            submissions, header, get_row, context={"request": request}
+        ),
+        content_type="text/csv",
+    )
+    response["Content-Disposition"] = "attachment; filename=all_submissions.csv"
+    return response
 
-    elif request.method == "POST":
-        if file_type == "csv":
-            if is_user_a_host_of_challenge(
-                user=request.user, challenge_pk=challenge_pk
-            ):
-                fields_to_export = {
-                    "participant_team": "Team Name",
-                    "participant_team_members": "Team Members",
-                    "participant_team_members_email": "Team Members Email Id",
-                    "participant_team_members_affiliation": "Team Members Affiliation",
-                    "challenge_phase": "Challenge Phase",
-                    "status": "Status",
-                    "created_by": "Created By",
-                    "execution_time": "Execution Time(sec.)",
-                    "submission_number": "Submission Number",
-                    "input_file": "Submitted File",
-                    "stdout_file": "Stdout File",
-                    "stderr_file": "Stderr File",
-                    "environment_log_file": "Environment Log File",
-                    "created_at": "Submitted At (mm/dd/yyyy hh:mm:ss)",
-                    "submission_result_file": "Submission Result File",
-                    "submission_metadata_file": "Submission Metadata File",
-                    "method_name": "Method Name",
-                    "method_description": "Method Description",
-                    "publication_url": "Publication URL",
-                    "project_url": "Project URL",
-                    "submission_meta_attributes": "Submission Meta Attributes",
-                }
-                submissions = Submission.objects.filter(
-                    challenge_phase__challenge=challenge
-                ).order_by("-submitted_at")
-                submissions = ChallengeSubmissionManagementSerializer(
-                    submissions, many=True, context={"request": request}
-                )
-                response = HttpResponse(content_type="text/csv")
-                response[
-                    "Content-Disposition"
-                ] = "attachment; filename=all_submissions.csv"
-                writer = csv.writer(response)
-                fields = [fields_to_export[field] for field in request.data]
-                fields.insert(0, "id")
-                writer.writerow(fields)
-                for submission in submissions.data:
-                    row = [submission["id"]]
-                    for field in request.data:
-                        if field == "participant_team_members":
-                            row.append(
-                                ",".join(
-                                    username["username"]
-                                    for username in submission[
-                                        "participant_team_members"
-                                    ]
-                                )
-                            )
-                        elif field == "participant_team_members_email":
-                            row.append(
-                                ",".join(
-                                    email["email"]
-                                    for email in submission[
-                                        "participant_team_members"
-                                    ]
-                                )
-                            )
-                        elif field == "participant_team_members_affiliation":
-                            row.append(
-                                ",".join(
-                                    affiliation
-                                    for affiliation in submission[
-                                        "participant_team_members_affiliations"
-                                    ]
-                                )
-                            )
-                        elif field == "created_at":
-                            row.append(
-                                submission["created_at"].strftime(
-                                    "%m/%d/%Y %H:%M:%S"
-                                )
-                            )
-                        elif field == "submission_meta_attributes":
-                            submission_meta_attributes = (
-                                parse_submission_meta_attributes(submission)
-                            )
-                            row.append(submission_meta_attributes)
-                        else:
-                            row.append(submission[field])
-                    writer.writerow(row)
-                return response
 
-            else:
-                response_data = {
-                    "error": "Sorry, you do not belong to this Host Team!"
-                }
-                return Response(
-                    response_data, status=status.HTTP_401_UNAUTHORIZED
-                )
+@swagger_auto_schema(
+    methods=["get"],
+    manual_parameters=[
+        openapi.Parameter(
+            name="challenge_pk",
+            in_=openapi.IN_PATH,
+            type=openapi.TYPE_NUMBER,
+            description="Challenge pk",
+            required=True,
+        ),
+        openapi.Parameter(
+            name="submission_export_pk",
+            in_=openapi.IN_PATH,
+            type=openapi.TYPE_NUMBER,
+            description="Submission export pk",
+            required=True,
+        ),
+    ],
+    operation_id="get_submission_export",
+    responses={
+        status.HTTP_200_OK: openapi.Response(
+            "{'id': <export id>, 'status': 'finished', 'file_url': '<expiring url of the exported file>'}"
+        ),
+        status.HTTP_404_NOT_FOUND: openapi.Response(
+            "{'error': 'Submission export does not exist'}"
+        ),
+    },
+)
+@api_view(["GET"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((JWTAuthentication, ExpiringTokenAuthentication))
+def get_submission_export(request, challenge_pk, submission_export_pk):
+    """
+    API endpoint to get the status of a submissions CSV exported in the background,
+    along with an expiring URL of the file once it is exported
 
-        else:
-            response_data = {"error": "The file type requested is not valid!"}
-            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    Arguments:
+        request {HttpRequest} -- The request object
+        challenge_pk {[int]} -- Challenge primary key
+        submission_export_pk {[int]} -- Submission export primary key
+
+    Returns:
+        Response Object -- An object containing api response
+    """
+    try:
+        submission_export = SubmissionExport.objects.get(
+            pk=submission_export_pk,
+            challenge_phase__challenge=challenge_pk,
+            created_by=request.user,
+            created_at__gte=timezone.now()
+            - timedelta(seconds=settings.SUBMISSION_EXPORTS_TTL),
+        )
+    except SubmissionExport.DoesNotExist:
+        response_data = {"error": "Submission export does not exist"}
+        return Response(response_data, status=status.HTTP_404_NOT_FOUND)
+
+    response_data = {
+        "id": submission_export.pk,
+        "status": submission_export.status,
+    }
+    if submission_export.status == SubmissionExport.FINISHED:
+        response_data["file_url"] = get_submission_exports_storage().url(
+            submission_export.file_name
+        )
+    return Response(response_data, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
@@ -3197,9 +3108,6 @@ def validate_challenge_config(request, challenge_host_team_pk):
 
     BASE_LOCATION = tempfile.mkdtemp()
     unique_folder_name = get_unique_alpha_numeric_key(10)
-    CHALLENGE_ZIP_DOWNLOAD_LOCATION = join(
-        BASE_LOCATION, "{}.zip".format(unique_folder_name)
-    )
 
     challenge_queryset = Challenge.objects.filter(
         github_repository=request.data["GITHUB_REPOSITORY"]
@@ -3218,26 +3126,15 @@ def validate_challenge_config(request, challenge_host_team_pk):
         response_data["error"] = challenge_config_serializer.errors
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-    is_success, error_description = download_and_write_file(
-        uploaded_zip_file_path, True, CHALLENGE_ZIP_DOWNLOAD_LOCATION, "wb"
+    # Extract zip file
+    zip_ref, error_description = download_and_extract_zip_file(
+        uploaded_zip_file_path, join(BASE_LOCATION, unique_folder_name)
     )
 
-    if not is_success:
+    if zip_ref is None:
         response_data["error"] = error_description
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-    # Extract zip file
-    try:
-        zip_ref = extract_zip_file(
-            CHALLENGE_ZIP_DOWNLOAD_LOCATION,
-            "r",
-            join(BASE_LOCATION, unique_folder_name),
-        )
-    except zipfile.BadZipfile:
-        message = "The zip file contents cannot be extracted. Please check the format!"
-        response_data["error"] = message
-        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
-
     error_messages, yaml_file_data, files = validate_challenge_config_util(
         request,
         challenge_host_team,
@@ -3383,14 +3280,14 @@ def manage_worker(request, challenge_pk, action):
             return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
     # make sure that the action is valid.
-    if action not in ("start", "stop", "restart", "delete"):
+    if action not in ("start", "stop", "restart", "delete", "scale"):
         response_data = {
             "error": "The action {} is invalid for worker".format(action)
         }
         return Response(response_data, status=status.HTTP_406_NOT_ACCEPTABLE)
 
-    # Only allow EvalAI admins to delete workers
-    if action == "delete" and not request.user.is_staff:
+    # Only allow EvalAI admins to delete and scale workers
+    if action in ("delete", "scale") and not request.user.is_staff:
         response_data = {
             "error": "Sorry, you are not authorized for access worker operations."
         }
@@ -3398,7 +3295,20 @@ def manage_worker(request, challenge_pk, action):
 
     challenge = get_challenge_model(challenge_pk)
 
-    if challenge.end_date < pytz.UTC.localize(datetime.utcnow()) and action in ("start", "stop", "restart"):
+    if action == "scale":
+        try:
+            num_of_tasks = int(request.data["num_of_tasks"])
+            if num_of_tasks < 0:
+                raise ValueError
+        except (KeyError, TypeError, ValueError):
+            response_data = {
+                "error": "Please specify num_of_tasks as a non-negative integer."
+            }
+            return Response(
+                response_data, status=status.HTTP_400_BAD_REQUEST
+            )
+
+    if challenge.end_date < pytz.UTC.localize(datetime.utcnow()) and action in ("start", "stop", "restart", "scale"):
         response_data = {
             "error": "Action {} worker is not supported for an inactive challenge.".format(action)
         }
@@ -3414,6 +3324,8 @@ def manage_worker(request, challenge_pk, action):
         response = restart_workers([challenge])
     elif action == "delete":
         response = delete_workers([challenge])
+    elif action == "scale":
+        response = scale_challenge_workers(challenge, num_of_tasks)
 
     if response:
         count, failures = response["count"], response["failures"]
@@ -3862,9 +3774,6 @@ def create_or_update_github_challenge(request, challenge_host_team_pk):
 
     BASE_LOCATION = tempfile.mkdtemp()
     unique_folder_name = get_unique_alpha_numeric_key(10)
-    CHALLENGE_ZIP_DOWNLOAD_LOCATION = join(
-        BASE_LOCATION, "{}.zip".format(unique_folder_name)
-    )
 
     data = request.data
     challenge_config_serializer = ChallengeConfigSerializer(
@@ -3879,26 +3788,15 @@ def create_or_update_github_challenge(request, challenge_host_team_pk):
         response_data["error"] = challenge_config_serializer.errors
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-    is_success, error_description = download_and_write_file(
-        uploaded_zip_file_path, True, CHALLENGE_ZIP_DOWNLOAD_LOCATION, "wb"
+    # Extract zip file
+    zip_ref, error_description = download_and_extract_zip_file(
+        uploaded_zip_file_path, join(BASE_LOCATION, unique_folder_name)
     )
 
-    if not is_success:
+    if zip_ref is None:
         response_data["error"] = error_description
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-    # Extract zip file
-    try:
-        zip_ref = extract_zip_file(
-            CHALLENGE_ZIP_DOWNLOAD_LOCATION,
-            "r",
-            join(BASE_LOCATION, unique_folder_name),
-        )
-    except zipfile.BadZipfile:
-        message = "The zip file contents cannot be extracted. Please check the format!"
-        response_data["error"] = message
-        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
-
     error_messages, yaml_file_data, files = validate_challenge_config_util(
         request,
         challenge_host_team,
@@ -1,5 +1,5 @@
 from base.utils import get_model_object, is_user_a_staff
-from challenges.models import Challenge
+from challenges.utils import get_challenge_roles_of_user
 
 from .models import ChallengeHost, ChallengeHostTeam
 
@@ -13,12 +13,7 @@ def get_challenge_host_teams_for_user(user):
 
 def is_user_a_host_of_challenge(user, challenge_pk):
     """Returns boolean if the user is host of a challenge."""
-    if user.is_anonymous:
-        return False
-    challenge_host_teams = get_challenge_host_teams_for_user(user)
-    return Challenge.objects.filter(
-        pk=challenge_pk, creator_id__in=challenge_host_teams
-    ).exists()
+    return get_challenge_roles_of_user(user, challenge_pk)["is_host"]
 
 
 def is_user_part_of_host_team(user, host_team):
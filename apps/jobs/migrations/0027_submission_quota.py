@@ -0,0 +1,36 @@
+# Generated by Django 2.2.20 on 2026-10-18 06:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0012_remove_docker_repository_uri_from_team'),
+        ('challenges', '0113_leaderboard_ranking'),
+        ('jobs', '0026_auto_20230804_1946'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionQuota',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('last_submission_number', models.PositiveIntegerField(default=0)),
+                ('submissions_count', models.PositiveIntegerField(default=0)),
+                ('month', models.DateField(blank=True, null=True)),
+                ('submissions_this_month_count', models.PositiveIntegerField(default=0)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('submissions_today_count', models.PositiveIntegerField(default=0)),
+                ('challenge_phase', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_quotas', to='challenges.ChallengePhase')),
+                ('participant_team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_quotas', to='participants.ParticipantTeam')),
+            ],
+            options={
+                'db_table': 'submission_quota',
+                'unique_together': {('challenge_phase', 'participant_team')},
+            },
+        ),
+    ]
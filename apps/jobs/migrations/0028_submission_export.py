@@ -0,0 +1,32 @@
+# Generated by Django 2.2.20 on 2026-10-18 11:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0114_leaderboard_ranking_entry_unique'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobs', '0027_submission_quota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionExport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('finished', 'finished'), ('failed', 'failed')], default='pending', max_length=30)),
+                ('challenge_phase', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_exports', to='challenges.ChallengePhase')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'submission_export',
+            },
+        ),
+    ]
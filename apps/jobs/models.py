@@ -4,16 +4,16 @@ import logging
 
 from django.contrib.auth.models import User
 from django.contrib.postgres.fields import ArrayField, JSONField
-from django.db import models
-from django.db.models import Max
+from django.db import models, transaction
+from django.db.models import Count, Max, Q
 from rest_framework.exceptions import PermissionDenied
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 
 from base.models import TimeStampedModel
-from base.utils import RandomFileName
+from base.utils import RandomFileName, is_model_field_changed
 from challenges.models import ChallengePhase
 from jobs.constants import submission_status_to_exclude
 from participants.models import ParticipantTeam
@@ -141,6 +141,11 @@ class Submission(TimeStampedModel):
     submission_metadata = JSONField(blank=True, null=True)
     is_verified_by_host = models.BooleanField(default=False)
 
+    def __init__(self, *args, **kwargs):
+        super(Submission, self).__init__(*args, **kwargs)
+        self._original_status = self.status
+        self._original_submitted_at = self.submitted_at
+
     def __str__(self):
         return "{}".format(self.id)
 
@@ -161,109 +166,354 @@ class Submission(TimeStampedModel):
 
     def save(self, *args, **kwargs):
 
-        if not self.pk:
-            sub_num = Submission.objects.filter(
-                challenge_phase=self.challenge_phase,
-                participant_team=self.participant_team,
-            ).aggregate(Max("submission_number"))["submission_number__max"]
-            if sub_num:
-                self.submission_number = sub_num + 1
-            else:
-                self.submission_number = 1
-
-            submissions = Submission.objects.filter(
-                challenge_phase=self.challenge_phase,
-                participant_team=self.participant_team,
-            )
+        with transaction.atomic():
+            if not self.pk:
+                # The quota row stays locked until the submission is saved so
+                # that concurrent submissions are checked one after another
+                submission_quota = get_submission_quota(
+                    self.challenge_phase_id,
+                    self.participant_team_id,
+                    for_update=True,
+                )
+                self.submission_number = (
+                    submission_quota.last_submission_number + 1
+                )
+                (
+                    submissions_done_count,
+                    submissions_done_in_month_count,
+                    submissions_done_today_count,
+                ) = submission_quota.get_submission_counts()
 
-            num_submissions_to_ignore = submissions.filter(
-                status__in=submission_status_to_exclude
-            ).count()
+                successful_count = submissions_done_count + 1
 
-            successful_count = (
-                self.submission_number - num_submissions_to_ignore
-            )
+                if successful_count > self.challenge_phase.max_submissions:
+                    logger.info(
+                        "Checking to see if the successful_count {0} is greater than maximum allowed {1}".format(
+                            successful_count,
+                            self.challenge_phase.max_submissions,
+                        )
+                    )
 
-            if successful_count > self.challenge_phase.max_submissions:
-                logger.info(
-                    "Checking to see if the successful_count {0} is greater than maximum allowed {1}".format(
-                        successful_count, self.challenge_phase.max_submissions
+                    logger.info(
+                        "The submission request is submitted by user {0} from participant_team {1} ".format(
+                            self.created_by.pk, self.participant_team.pk
+                        )
                     )
-                )
 
-                logger.info(
-                    "The submission request is submitted by user {0} from participant_team {1} ".format(
-                        self.created_by.pk, self.participant_team.pk
+                    raise PermissionDenied(
+                        {
+                            "error": "The maximum number of submissions has been reached"
+                        }
+                    )
+                else:
+                    logger.info(
+                        "Submission is below for user {0} form participant_team {1} for challenge_phase {2}".format(
+                            self.created_by.pk,
+                            self.participant_team.pk,
+                            self.challenge_phase.pk,
+                        )
                     )
-                )
 
-                raise PermissionDenied(
-                    {
-                        "error": "The maximum number of submissions has been reached"
-                    }
-                )
-            else:
-                logger.info(
-                    "Submission is below for user {0} form participant_team {1} for challenge_phase {2}".format(
-                        self.created_by.pk,
-                        self.participant_team.pk,
-                        self.challenge_phase.pk,
+                if (
+                    submissions_done_in_month_count
+                    >= self.challenge_phase.max_submissions_per_month
+                ):
+                    logger.info(
+                        "Permission Denied: The maximum number of submission for this month has been reached"
                     )
+                    raise PermissionDenied(
+                        {
+                            "error": "The maximum number of submission for this month has been reached"
+                        }
+                    )
+                if (
+                    submissions_done_today_count
+                    >= self.challenge_phase.max_submissions_per_day
+                ):
+                    logger.info(
+                        "Permission Denied: The maximum number of submission for today has been reached"
+                    )
+                    raise PermissionDenied(
+                        {
+                            "error": "The maximum number of submission for today has been reached"
+                        }
+                    )
+                self.status = Submission.SUBMITTED
+
+                submission_quota.last_submission_number = (
+                    self.submission_number
                 )
+                submission_quota.count_submission(timezone.now(), 1)
+                submission_quota.save()
+            # `submitted_at` is only missing while the submission is created,
+            # e.g. when `save_file` saves it again from `post_save`
+            elif self._original_submitted_at is not None and (
+                is_model_field_changed(self, "status")
+                or is_model_field_changed(self, "submitted_at")
+            ):
+                self.update_submission_quota()
 
-            total_submissions_done = Submission.objects.filter(
-                challenge_phase__challenge=self.challenge_phase.challenge,
-                participant_team=self.participant_team,
-                challenge_phase=self.challenge_phase,
-            )
+            submission_instance = super(Submission, self).save(*args, **kwargs)
+        self._original_status = self.status
+        self._original_submitted_at = self.submitted_at
+        return submission_instance
 
-            submissions_done_today_count = (
-                total_submissions_done.filter(
-                    submitted_at__gte=timezone.now().replace(
-                        hour=0, minute=0, second=0, microsecond=0
-                    )
-                )
-                .exclude(status__in=submission_status_to_exclude)
-                .count()
+    def update_submission_quota(self):
+        """
+        Moves the submission between the counts of its submission quota
+        when its status or submission time is changed
+        """
+        was_counted = self._original_status not in submission_status_to_exclude
+        is_counted = self.status not in submission_status_to_exclude
+        if not (was_counted or is_counted):
+            return
+        submission_quota = get_submission_quota(
+            self.challenge_phase_id, self.participant_team_id, for_update=True
+        )
+        if was_counted:
+            submission_quota.count_submission(self._original_submitted_at, -1)
+        if is_counted:
+            submission_quota.count_submission(self.submitted_at, 1)
+        submission_quota.save()
+
+
+class SubmissionQuota(TimeStampedModel):
+    """
+    Model to count the submissions of a participant team to a challenge
+    phase that are checked against the submission limits of the phase.
+    The submissions with a status in `submission_status_to_exclude` are
+    not counted.
+    """
+
+    challenge_phase = models.ForeignKey(
+        ChallengePhase,
+        related_name="submission_quotas",
+        on_delete=models.CASCADE,
+    )
+    participant_team = models.ForeignKey(
+        ParticipantTeam,
+        related_name="submission_quotas",
+        on_delete=models.CASCADE,
+    )
+    last_submission_number = models.PositiveIntegerField(default=0)
+    submissions_count = models.PositiveIntegerField(default=0)
+    # First day of the month counted by `submissions_this_month_count`
+    month = models.DateField(null=True, blank=True)
+    submissions_this_month_count = models.PositiveIntegerField(default=0)
+    # Day counted by `submissions_today_count`
+    day = models.DateField(null=True, blank=True)
+    submissions_today_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return "{} - {}".format(
+            self.challenge_phase_id, self.participant_team_id
+        )
+
+    class Meta:
+        app_label = "jobs"
+        db_table = "submission_quota"
+        unique_together = ("challenge_phase", "participant_team")
+
+    def get_submission_counts(self):
+        """
+        Returns the number of submissions done in total, this month and today
+        """
+        today = timezone.now().date()
+        submissions_this_month_count = (
+            self.submissions_this_month_count
+            if self.month == today.replace(day=1)
+            else 0
+        )
+        submissions_today_count = (
+            self.submissions_today_count if self.day == today else 0
+        )
+        return (
+            self.submissions_count,
+            submissions_this_month_count,
+            submissions_today_count,
+        )
+
+    def count_submission(self, submitted_at, delta):
+        """
+        Adds `delta` to the counts that include a submission submitted at `submitted_at`
+        """
+        day = submitted_at.date()
+        month = day.replace(day=1)
+        self.submissions_count = max(self.submissions_count + delta, 0)
+        if self.month is None or month > self.month:
+            self.month = month
+            self.submissions_this_month_count = 0
+        if month == self.month:
+            self.submissions_this_month_count = max(
+                self.submissions_this_month_count + delta, 0
+            )
+        if self.day is None or day > self.day:
+            self.day = day
+            self.submissions_today_count = 0
+        if day == self.day:
+            self.submissions_today_count = max(
+                self.submissions_today_count + delta, 0
             )
 
-            submissions_done_in_month_count = (
-                total_submissions_done.filter(
-                    submitted_at__gte=timezone.now().replace(
-                        day=1, hour=0, minute=0, second=0, microsecond=0
-                    )
-                )
-                .exclude(status__in=submission_status_to_exclude)
-                .count()
+
+def get_submission_quotas(
+    challenge_phase_ids, participant_team_id, for_update=False
+):
+    """
+    Returns the submission quotas of a participant team for challenge phases,
+    the missing quotas are created from the existing submissions with a single
+    query grouped by challenge phase
+
+    Arguments:
+        challenge_phase_ids {[list]} -- Challenge phase primary keys
+        participant_team_id {[int]} -- Participant team primary key
+        for_update {[bool]} -- Lock the quotas until the end of the transaction
+
+    Returns:
+        [dict] -- SubmissionQuota model objects by challenge phase primary key
+    """
+    submission_quotas = SubmissionQuota.objects.filter(
+        challenge_phase_id__in=challenge_phase_ids,
+        participant_team_id=participant_team_id,
+    )
+    if for_update:
+        submission_quotas = submission_quotas.select_for_update()
+    submission_quotas_by_phase = {
+        submission_quota.challenge_phase_id: submission_quota
+        for submission_quota in submission_quotas
+    }
+    missing_challenge_phase_ids = [
+        challenge_phase_id
+        for challenge_phase_id in challenge_phase_ids
+        if challenge_phase_id not in submission_quotas_by_phase
+    ]
+    if not missing_challenge_phase_ids:
+        return submission_quotas_by_phase
+
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    counted = ~Q(status__in=submission_status_to_exclude)
+    counts = (
+        Submission.objects.filter(
+            challenge_phase_id__in=missing_challenge_phase_ids,
+            participant_team_id=participant_team_id,
+        )
+        .order_by()
+        .values("challenge_phase_id")
+        .annotate(
+            last_submission_number=Max("submission_number"),
+            submissions_count=Count("pk", filter=counted),
+            submissions_this_month_count=Count(
+                "pk",
+                filter=counted & Q(submitted_at__gte=today.replace(day=1)),
+            ),
+            submissions_today_count=Count(
+                "pk", filter=counted & Q(submitted_at__gte=today)
+            ),
+        )
+    )
+    counts_by_phase = {
+        phase_counts.pop("challenge_phase_id"): phase_counts
+        for phase_counts in counts
+    }
+    # Quotas created by another request in between are kept as they are
+    SubmissionQuota.objects.bulk_create(
+        [
+            SubmissionQuota(
+                challenge_phase_id=challenge_phase_id,
+                participant_team_id=participant_team_id,
+                month=today.date().replace(day=1),
+                day=today.date(),
+                **counts_by_phase.get(challenge_phase_id, {})
+            )
+            for challenge_phase_id in missing_challenge_phase_ids
+        ],
+        ignore_conflicts=True,
+    )
+    submission_quotas_by_phase.update(
+        {
+            submission_quota.challenge_phase_id: submission_quota
+            for submission_quota in submission_quotas.filter(
+                challenge_phase_id__in=missing_challenge_phase_ids
             )
+        }
+    )
+    return submission_quotas_by_phase
 
-            if (
-                self.challenge_phase.max_submissions_per_month
-                - submissions_done_in_month_count
-                == 0
-            ):
-                logger.info(
-                    "Permission Denied: The maximum number of submission for this month has been reached"
-                )
-                raise PermissionDenied(
-                    {
-                        "error": "The maximum number of submission for this month has been reached"
-                    }
-                )
-            if (
-                self.challenge_phase.max_submissions_per_day
-                - submissions_done_today_count
-                == 0
-            ):
-                logger.info(
-                    "Permission Denied: The maximum number of submission for today has been reached"
-                )
-                raise PermissionDenied(
-                    {
-                        "error": "The maximum number of submission for today has been reached"
-                    }
-                )
-            self.status = Submission.SUBMITTED
 
-        submission_instance = super(Submission, self).save(*args, **kwargs)
-        return submission_instance
+def get_submission_quota(
+    challenge_phase_id, participant_team_id, for_update=False
+):
+    """
+    Returns the submission quota of a participant team for a challenge phase
+
+    Arguments:
+        challenge_phase_id {[int]} -- Challenge phase primary key
+        participant_team_id {[int]} -- Participant team primary key
+        for_update {[bool]} -- Lock the quota until the end of the transaction
+
+    Returns:
+        [Class object] -- SubmissionQuota model object
+    """
+    return get_submission_quotas(
+        [challenge_phase_id], participant_team_id, for_update=for_update
+    )[challenge_phase_id]
+
+
+@receiver(post_delete, sender="jobs.Submission")
+def discount_deleted_submission_from_quota(sender, instance, **kwargs):
+    if (
+        instance._original_status in submission_status_to_exclude
+        or instance._original_submitted_at is None
+    ):
+        return
+    # A missing quota isn't created since it may be deleted along with the
+    # challenge phase or the participant team of the submission, it is
+    # created from the remaining submissions when it's needed
+    submission_quota = (
+        SubmissionQuota.objects.select_for_update()
+        .filter(
+            challenge_phase_id=instance.challenge_phase_id,
+            participant_team_id=instance.participant_team_id,
+        )
+        .first()
+    )
+    if submission_quota is None:
+        return
+    submission_quota.count_submission(instance._original_submitted_at, -1)
+    submission_quota.save()
+
+
+class SubmissionExport(TimeStampedModel):
+    """
+    Model to track a submissions CSV exported in the background. The file is
+    private, it's only served to its creator through expiring URLs and is
+    deleted along with the export after `SUBMISSION_EXPORTS_TTL` seconds.
+    """
+
+    PENDING = "pending"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+    STATUS_OPTIONS = (
+        (PENDING, PENDING),
+        (FINISHED, FINISHED),
+        (FAILED, FAILED),
+    )
+
+    challenge_phase = models.ForeignKey(
+        ChallengePhase,
+        related_name="submission_exports",
+        on_delete=models.CASCADE,
+    )
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    file_name = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=30, choices=STATUS_OPTIONS, default=PENDING
+    )
+
+    def __str__(self):
+        return "{} - {}".format(self.challenge_phase_id, self.file_name)
+
+    class Meta:
+        app_label = "jobs"
+        db_table = "submission_export"
@@ -1,14 +1,56 @@
-from django.contrib.auth.models import User
+from django.db.models import Manager, prefetch_related_objects
 
 from rest_framework import serializers
 
+from base.utils import SQS_MAX_BATCH_SIZE, SQS_MAX_VISIBILITY_TIMEOUT
 from challenges.models import ChallengePhase, LeaderboardData
 from hosts.models import ChallengeHost
-from participants.models import Participant, ParticipantTeam
+from participants.models import ParticipantTeam
+from participants.utils import get_participant_team_members
 
 from .models import Submission
 
 
+def get_challenge_host_pks(challenge_phase_pks):
+    """
+    Function to get the hosts of the challenges of challenge phases
+
+    Arguments:
+        challenge_phase_pks {[iterable]} -- Challenge phase primary keys
+
+    Returns:
+        [dict] -- Set of the user primary keys of the hosts per challenge phase primary key
+    """
+    challenge_host_pks = {
+        challenge_phase_pk: set() for challenge_phase_pk in challenge_phase_pks
+    }
+    for challenge_phase_pk, user_pk in ChallengeHost.objects.filter(
+        team_name__challenge_creator__challengephase__in=challenge_host_pks
+    ).values_list("team_name__challenge_creator__challengephase", "user_id"):
+        challenge_host_pks[challenge_phase_pk].add(user_pk)
+    return challenge_host_pks
+
+
+class SubmissionListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        submissions = data.all() if isinstance(data, Manager) else data
+        submissions = list(submissions)
+        # The hosts are only needed to hide the environment logs from others
+        if self.child.created_by:
+            self.child.challenge_host_pks.update(
+                get_challenge_host_pks(
+                    {
+                        submission.challenge_phase_id
+                        for submission in submissions
+                    }
+                    - set(self.child.challenge_host_pks)
+                )
+            )
+        return super(SubmissionListSerializer, self).to_representation(
+            submissions
+        )
+
+
 class SubmissionSerializer(serializers.ModelSerializer):
 
     participant_team_name = serializers.SerializerMethodField()
@@ -17,6 +59,8 @@ class SubmissionSerializer(serializers.ModelSerializer):
     def __init__(self, *args, **kwargs):
         context = kwargs.get("context")
         self.created_by = None
+        # Filled for all the submissions at once by SubmissionListSerializer
+        self.challenge_host_pks = {}
         if context:
             created_by = context.get("request").user
             self.created_by = created_by
@@ -38,6 +82,7 @@ class SubmissionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Submission
+        list_serializer_class = SubmissionListSerializer
         fields = (
             "id",
             "participant_team",
@@ -72,12 +117,17 @@ class SubmissionSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         ret = super().to_representation(instance)
-        challenge_host_team = ChallengePhase.objects.get(pk=ret["challenge_phase"]).challenge.creator
-        challenge_hosts_pk = ChallengeHost.objects.filter(team_name=challenge_host_team).values_list(
-            "user__pk", flat=True
-        )
-        if self.created_by and self.created_by.pk not in challenge_hosts_pk:
-            ret.pop("environment_log_file", None)
+        if self.created_by:
+            challenge_phase_pk = instance.challenge_phase_id
+            if challenge_phase_pk not in self.challenge_host_pks:
+                self.challenge_host_pks.update(
+                    get_challenge_host_pks([challenge_phase_pk])
+                )
+            if (
+                self.created_by.pk
+                not in self.challenge_host_pks[challenge_phase_pk]
+            ):
+                ret.pop("environment_log_file", None)
         return ret
 
     def get_participant_team_name(self, obj):
@@ -113,6 +163,23 @@ class LeaderboardDataSerializer(serializers.ModelSerializer):
         return obj.leaderboard.schema
 
 
+class ChallengeSubmissionManagementListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        submissions = data.all() if isinstance(data, Manager) else data
+        submissions = list(submissions)
+        prefetch_related_objects(
+            submissions, "participant_team", "challenge_phase", "created_by"
+        )
+        self.child.participant_team_members.update(
+            get_participant_team_members(
+                {submission.participant_team_id for submission in submissions}
+            )
+        )
+        return super(
+            ChallengeSubmissionManagementListSerializer, self
+        ).to_representation(submissions)
+
+
 class ChallengeSubmissionManagementSerializer(serializers.ModelSerializer):
 
     participant_team = serializers.SerializerMethodField()
@@ -123,8 +190,16 @@ class ChallengeSubmissionManagementSerializer(serializers.ModelSerializer):
     created_at = serializers.SerializerMethodField()
     participant_team_members = serializers.SerializerMethodField()
 
+    def __init__(self, *args, **kwargs):
+        super(ChallengeSubmissionManagementSerializer, self).__init__(
+            *args, **kwargs
+        )
+        # Members of the participant teams by team id
+        self.participant_team_members = {}
+
     class Meta:
         model = Submission
+        list_serializer_class = ChallengeSubmissionManagementListSerializer
         fields = (
             "id",
             "participant_team",
@@ -166,56 +241,43 @@ class ChallengeSubmissionManagementSerializer(serializers.ModelSerializer):
         return obj.created_by.username
 
     def get_participant_team_members_email_ids(self, obj):
-        try:
-            participant_team = ParticipantTeam.objects.get(
-                team_name=obj.participant_team.team_name
-            )
-        except ParticipantTeam.DoesNotExist:
+        users = self.get_participant_team_member_users(obj)
+        if users is None:
             return "Participant team does not exist"
-
-        participant_ids = Participant.objects.filter(
-            team=participant_team
-        ).values_list("user_id", flat=True)
-        return list(
-            User.objects.filter(id__in=participant_ids).values_list(
-                "email", flat=True
-            )
-        )
+        return [user.email for user in users]
 
     def get_created_at(self, obj):
         return obj.created_at
 
     def get_participant_team_members(self, obj):
-        try:
-            participant_team = ParticipantTeam.objects.get(
-                team_name=obj.participant_team.team_name
-            )
-        except ParticipantTeam.DoesNotExist:
+        users = self.get_participant_team_member_users(obj)
+        if users is None:
             return "Participant team does not exist"
-
-        participant_ids = Participant.objects.filter(
-            team=participant_team
-        ).values_list("user_id", flat=True)
-        return list(
-            User.objects.filter(id__in=participant_ids).values(
-                "username", "email"
-            )
-        )
+        return [
+            {"username": user.username, "email": user.email} for user in users
+        ]
 
     def get_participant_team_members_affiliations(self, obj):
-        try:
-            participant_team = ParticipantTeam.objects.get(
-                team_name=obj.participant_team.team_name
-            )
-        except ParticipantTeam.DoesNotExist:
+        users = self.get_participant_team_member_users(obj)
+        if users is None:
             return "Participant team does not exist"
-
-        participant_ids = Participant.objects.filter(
-            team=participant_team
-        ).values_list("user_id", flat=True)
-        users = User.objects.filter(id__in=participant_ids)
         return [user.profile.affiliation for user in users]
 
+    def get_participant_team_member_users(self, obj):
+        """Returns the members of the team of a submission, None without team"""
+        try:
+            if obj.participant_team is None:
+                return None
+        except ParticipantTeam.DoesNotExist:
+            return None
+        # The list serializer loads the members of all the teams of a page
+        # at once, a single submission has them loaded on first use
+        if obj.participant_team_id not in self.participant_team_members:
+            self.participant_team_members.update(
+                get_participant_team_members([obj.participant_team_id])
+            )
+        return self.participant_team_members.get(obj.participant_team_id, [])
+
 
 class SubmissionCount(object):
     def __init__(self, submission_count):
@@ -270,3 +332,33 @@ class RemainingSubmissionDataSerializer(serializers.ModelSerializer):
 
     def get_limits(self, obj):
         return self.context.get("limits")
+
+
+class SubmissionMessageLeaseSerializer(serializers.Serializer):
+    max_number_of_messages = serializers.IntegerField(
+        min_value=1, max_value=SQS_MAX_BATCH_SIZE, default=1
+    )
+    visibility_timeout = serializers.IntegerField(
+        min_value=0, max_value=SQS_MAX_VISIBILITY_TIMEOUT, required=False
+    )
+
+
+class SubmissionMessageAcknowledgementSerializer(serializers.Serializer):
+    ack = serializers.ListField(child=serializers.CharField(), default=list)
+    nack = serializers.ListField(child=serializers.CharField(), default=list)
+
+    def validate(self, data):
+        if not data["ack"] and not data["nack"]:
+            raise serializers.ValidationError(
+                "Please add the message receipt handles to ack or nack"
+            )
+        return data
+
+
+class SubmissionMessageHeartbeatSerializer(serializers.Serializer):
+    receipt_handles = serializers.ListField(
+        child=serializers.CharField(), min_length=1
+    )
+    visibility_timeout = serializers.IntegerField(
+        min_value=0, max_value=SQS_MAX_VISIBILITY_TIMEOUT
+    )
@@ -1,17 +1,25 @@
 import logging
 import os
 import shutil
+import tempfile
 
 from challenges.models import ChallengePhase
 from django.contrib.auth.models import User
+from django.core.files import File
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.http import HttpRequest
 from evalai.celery import app
 from participants.models import ParticipantTeam
 from participants.utils import get_participant_team_id_of_user_for_a_challenge
-from .models import Submission
+from .models import Submission, SubmissionExport
 from .serializers import SubmissionSerializer
-from .utils import get_file_from_url
+from .utils import (
+    delete_expired_submission_exports,
+    get_file_from_url,
+    get_submission_exports_storage,
+    get_submissions_csv_rows,
+    get_submissions_export,
+)
 from .sender import publish_submission_message
 
 logger = logging.getLogger(__name__)
@@ -85,3 +93,54 @@ def download_file_and_publish_submission_message(
                 e
             )
         )
+
+
+@app.task
+def export_submissions_csv(
+    submission_export_pk, participant_team_pk=None, fields=None
+):
+    """
+    Writes the submissions CSV of a challenge to the private exports storage
+    """
+    delete_expired_submission_exports()
+    try:
+        submission_export = SubmissionExport.objects.select_related(
+            "challenge_phase"
+        ).get(pk=submission_export_pk)
+    except SubmissionExport.DoesNotExist:
+        logger.info(
+            "Submission export {} does not exist".format(submission_export_pk)
+        )
+        return
+    challenge_phase = submission_export.challenge_phase
+    try:
+        submissions, header, get_row = get_submissions_export(
+            challenge_phase.challenge_id,
+            challenge_phase.pk,
+            participant_team_pk,
+            fields,
+        )
+        # Spool the CSV to disk to keep the memory usage constant
+        with tempfile.TemporaryFile() as csv_file:
+            for content in get_submissions_csv_rows(
+                submissions, header, get_row
+            ):
+                csv_file.write(content.encode("utf-8"))
+            csv_file.seek(0)
+            submission_export.file_name = get_submission_exports_storage().save(
+                submission_export.file_name, File(csv_file)
+            )
+    except Exception:
+        logger.exception(
+            "Failed to export submissions to {}".format(
+                submission_export.file_name
+            )
+        )
+        submission_export.status = SubmissionExport.FAILED
+        submission_export.save()
+        return
+    submission_export.status = SubmissionExport.FINISHED
+    submission_export.save()
+    logger.info(
+        "Submissions are exported to {}".format(submission_export.file_name)
+    )
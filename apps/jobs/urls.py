@@ -50,6 +50,11 @@ urlpatterns = [
         views.update_submission,
         name="update_submission",
     ),
+    url(
+        r"^challenge/(?P<challenge_pk>[0-9]+)/update_submissions_status/$",
+        views.update_submissions_status,
+        name="update_submissions_status",
+    ),
     url(
         r"^challenges/(?P<challenge_pk>[0-9]+)/update_partially_evaluated_submission/$",
         views.update_partially_evaluated_submission,
@@ -70,6 +75,21 @@ urlpatterns = [
         views.get_submission_message_from_queue,
         name="get_submission_message_from_queue",
     ),
+    url(
+        r"^challenge/queues/(?P<queue_name>[\w-]+)/lease/$",
+        views.lease_submission_messages_from_queue,
+        name="lease_submission_messages_from_queue",
+    ),
+    url(
+        r"^queues/(?P<queue_name>[\w-]+)/acknowledge/$",
+        views.acknowledge_submission_messages_from_queue,
+        name="acknowledge_submission_messages_from_queue",
+    ),
+    url(
+        r"^queues/(?P<queue_name>[\w-]+)/heartbeat/$",
+        views.extend_submission_messages_visibility,
+        name="extend_submission_messages_visibility",
+    ),
     url(
         r"^submission_files/$",
         views.get_signed_url_for_submission_related_file,
@@ -1,25 +1,50 @@
+import csv
 import datetime
+import functools
 import logging
 import os
 import requests
 import tempfile
 import urllib.request
-from django.db.models import FloatField, Q, F, fields, ExpressionWrapper
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import get_storage_class
+from django.db import IntegrityError, connection, transaction
+from django.db.models import (
+    Count,
+    FloatField,
+    Q,
+    F,
+    fields,
+    ExpressionWrapper,
+)
 from django.db.models.expressions import RawSQL
 from django.utils import timezone
 from rest_framework import status
 
-from challenges.models import ChallengePhaseSplit, LeaderboardData
-from participants.models import ParticipantTeam
-
-from base.utils import get_model_object, suppress_autotime
-from challenges.utils import get_challenge_model, get_challenge_phase_model
+from challenges.models import (
+    Challenge,
+    ChallengePhaseSplit,
+    LeaderboardData,
+    LeaderboardRanking,
+    LeaderboardRankingEntry,
+)
+
+from base.utils import (
+    get_model_object,
+    get_or_create_sqs_queue,
+    suppress_autotime,
+)
+from challenges.utils import parse_submission_meta_attributes
 from hosts.utils import is_user_a_staff_or_host
-from participants.utils import get_participant_team_id_of_user_for_a_challenge
+from participants.utils import get_banned_participant_team_ids
 
-from .constants import submission_status_to_exclude
-from .models import Submission
-from .serializers import SubmissionSerializer
+from .models import Submission, SubmissionExport
+from .serializers import (
+    ChallengeSubmissionManagementSerializer,
+    SubmissionSerializer,
+)
 
 get_submission_model = get_model_object(Submission)
 get_challenge_phase_split_model = get_model_object(ChallengePhaseSplit)
@@ -27,52 +52,21 @@ get_challenge_phase_split_model = get_model_object(ChallengePhaseSplit)
 logger = logging.getLogger(__name__)
 
 
-def get_remaining_submission_for_a_phase(
-    user, challenge_phase_pk, challenge_pk
-):
+def get_remaining_submission_limits(challenge_phase, submission_quota):
     """
-    Returns the number of remaining submissions that a participant can
-    do daily, monthly and in total to a particular challenge phase of a
-    challenge.
+    Returns the number of remaining submissions that a participant team can
+    do daily, monthly and in total to a challenge phase from its submission
+    quota.
     """
-
-    get_challenge_model(challenge_pk)
-    challenge_phase = get_challenge_phase_model(challenge_phase_pk)
-    participant_team_pk = get_participant_team_id_of_user_for_a_challenge(
-        user, challenge_pk
-    )
-
-    # Conditional check for the existence of participant team of the user.
-    if not participant_team_pk:
-        response_data = {"error": "You haven't participated in the challenge"}
-        return response_data, status.HTTP_403_FORBIDDEN
-
     max_submissions_count = challenge_phase.max_submissions
     max_submissions_per_month_count = challenge_phase.max_submissions_per_month
     max_submissions_per_day_count = challenge_phase.max_submissions_per_day
 
-    submissions_done = Submission.objects.filter(
-        challenge_phase__challenge=challenge_pk,
-        challenge_phase=challenge_phase_pk,
-        participant_team=participant_team_pk,
-    ).exclude(status__in=submission_status_to_exclude)
-
-    submissions_done_this_month = submissions_done.filter(
-        submitted_at__gte=timezone.now().replace(
-            day=1, hour=0, minute=0, second=0, microsecond=0
-        )
-    )
-
-    # Get the submissions_done_today by midnight time of the day
-    submissions_done_today = submissions_done.filter(
-        submitted_at__gte=timezone.now().replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-    )
-
-    submissions_done_count = submissions_done.count()
-    submissions_done_this_month_count = submissions_done_this_month.count()
-    submissions_done_today_count = submissions_done_today.count()
+    (
+        submissions_done_count,
+        submissions_done_this_month_count,
+        submissions_done_today_count,
+    ) = submission_quota.get_submission_counts()
 
     # Check for maximum submission limit
     if submissions_done_count >= max_submissions_count:
@@ -278,32 +272,21 @@ def handle_submission_resume(submission, updated_status):
     return message
 
 
-def calculate_distinct_sorted_leaderboard_data(
-    user, challenge_obj, challenge_phase_split, only_public_entries, order_by
-):
+def get_leaderboard_order_by(challenge_phase_split, order_by):
     """
-    Function to calculate and return the sorted leaderboard data
+    Function to get the label used to rank the entries on the leaderboard
 
     Arguments:
-        user {[Class object]} -- User model object
-        challenge_obj {[Class object]} -- Challenge model object
         challenge_phase_split {[Class object]} -- Challenge phase split model object
-        only_public_entries {[Boolean]} -- Boolean value to determine if the user wants to include private entries or not
+        order_by {[str]} -- Label requested to rank the leaderboard entries by
 
     Returns:
-        [list] -- Ranked list of participant teams to be shown on leaderboard
+        [str/dict] -- Label to rank the leaderboard entries by or the error message
         [status] -- HTTP status code (200/400)
     """
-    # Get the leaderboard associated with the Challenge Phase Split
-    leaderboard = challenge_phase_split.leaderboard
-
-    # Get the default order by key to rank the entries on the leaderboard
-    default_order_by = None
-    is_leaderboard_order_descending = (
-        challenge_phase_split.is_leaderboard_order_descending
-    )
+    leaderboard_schema = challenge_phase_split.leaderboard.schema
     try:
-        default_order_by = leaderboard.schema["default_order_by"]
+        default_order_by = leaderboard_schema["default_order_by"]
     except KeyError:
         response_data = {
             "error": "Sorry, default_order_by key is missing in leaderboard schema!"
@@ -311,27 +294,56 @@ def calculate_distinct_sorted_leaderboard_data(
         return response_data, status.HTTP_400_BAD_REQUEST
     # Use order by field from request only if it is valid
     try:
-        if order_by in leaderboard.schema["labels"]:
+        if order_by in leaderboard_schema["labels"]:
             default_order_by = order_by
     except KeyError:
         response_data = {
             "error": "Sorry, labels key is missing in leaderboard schema!"
         }
         return response_data, status.HTTP_400_BAD_REQUEST
+    return default_order_by, status.HTTP_200_OK
+
+
+def is_leaderboard_ordered_descending(challenge_phase_split, order_by):
+    """
+    Function to check if the leaderboard entries are ranked in descending order of a label
 
-    leaderboard_schema = leaderboard.schema
+    Arguments:
+        challenge_phase_split {[Class object]} -- Challenge phase split model object
+        order_by {[str]} -- Label to rank the leaderboard entries by
+
+    Returns:
+        [bool] -- True if a higher value of the label ranks higher on the leaderboard
+    """
+    leaderboard_schema = challenge_phase_split.leaderboard.schema
     if (
         leaderboard_schema.get("metadata") is not None
-        and leaderboard_schema.get("metadata").get(default_order_by)
-        is not None
+        and leaderboard_schema.get("metadata").get(order_by) is not None
     ):
-        is_leaderboard_order_descending = (
-            leaderboard_schema["metadata"][default_order_by].get(
-                "sort_ascending"
-            )
+        return (
+            leaderboard_schema["metadata"][order_by].get("sort_ascending")
             is False
         )
+    return challenge_phase_split.is_leaderboard_order_descending
+
 
+def get_leaderboard_data_queryset(
+    challenge_obj, challenge_phase_split, only_public_entries, order_by
+):
+    """
+    Function to get the leaderboard data which can be shown on the leaderboard,
+    annotated with the score and the error of the label used for ranking
+
+    Arguments:
+        challenge_obj {[Class object]} -- Challenge model object
+        challenge_phase_split {[Class object]} -- Challenge phase split model object
+        only_public_entries {[Boolean]} -- Boolean value to determine if the user wants to include
+            private entries or not
+        order_by {[str]} -- Label to rank the leaderboard entries by
+
+    Returns:
+        [QuerySet] -- LeaderboardData queryset ordered by the latest entries first
+    """
     # Exclude the submissions done by members of the host team
     # while populating leaderboard
     challenge_hosts_emails = (
@@ -343,18 +355,6 @@ def calculate_distinct_sorted_leaderboard_data(
         [] if not is_challenge_phase_public else challenge_hosts_emails
     )
 
-    challenge_host_or_staff = is_user_a_staff_or_host(user, challenge_obj.pk)
-
-    all_banned_email_ids = challenge_obj.banned_email_ids
-
-    # Check if challenge phase leaderboard is public for participant user or not
-    if (
-        challenge_phase_split.visibility != ChallengePhaseSplit.PUBLIC
-        and not challenge_host_or_staff
-    ):
-        response_data = {"error": "Sorry, the leaderboard is not public!"}
-        return response_data, status.HTTP_400_BAD_REQUEST
-
     leaderboard_data = LeaderboardData.objects.exclude(
         Q(submission__created_by__email__in=challenge_hosts_emails)
         & Q(submission__is_baseline=False)
@@ -381,114 +381,79 @@ def calculate_distinct_sorted_leaderboard_data(
                 submission__is_public=True
             )
 
+    leaderboard_data = leaderboard_data.annotate(
+        filtering_score=RawSQL(
+            "result->>%s", (order_by,), output_field=FloatField()
+        ),
+        filtering_error=RawSQL(
+            "error->>%s",
+            ("error_{0}".format(order_by),),
+            output_field=FloatField(),
+        ),
+    )
     if challenge_phase_split.show_execution_time:
         time_diff_expression = ExpressionWrapper(
             F("submission__completed_at") - F("submission__started_at"),
             output_field=fields.DurationField(),
         )
         leaderboard_data = leaderboard_data.annotate(
-            filtering_score=RawSQL(
-                "result->>%s", (default_order_by,), output_field=FloatField()
-            ),
-            filtering_error=RawSQL(
-                "error->>%s",
-                ("error_{0}".format(default_order_by),),
-                output_field=FloatField(),
-            ),
-            submission__execution_time=time_diff_expression,
-        ).values(
-            "id",
-            "submission__participant_team",
-            "submission__participant_team__team_name",
-            "submission__participant_team__team_url",
-            "submission__is_baseline",
-            "submission__is_public",
-            "challenge_phase_split",
-            "result",
-            "error",
-            "filtering_score",
-            "filtering_error",
-            "leaderboard__schema",
-            "submission__submitted_at",
-            "submission__method_name",
-            "submission__id",
-            "submission__submission_metadata",
-            "submission__execution_time",
-            "submission__is_verified_by_host",
-        )
-    else:
-        leaderboard_data = leaderboard_data.annotate(
-            filtering_score=RawSQL(
-                "result->>%s", (default_order_by,), output_field=FloatField()
-            ),
-            filtering_error=RawSQL(
-                "error->>%s",
-                ("error_{0}".format(default_order_by),),
-                output_field=FloatField(),
-            ),
-        ).values(
-            "id",
-            "submission__participant_team",
-            "submission__participant_team__team_name",
-            "submission__participant_team__team_url",
-            "submission__is_baseline",
-            "submission__is_public",
-            "challenge_phase_split",
-            "result",
-            "error",
-            "filtering_score",
-            "filtering_error",
-            "leaderboard__schema",
-            "submission__submitted_at",
-            "submission__method_name",
-            "submission__id",
-            "submission__submission_metadata",
-            "submission__is_verified_by_host",
+            submission__execution_time=time_diff_expression
         )
+    return leaderboard_data
 
-    all_banned_participant_team = []
-    for leaderboard_item in leaderboard_data:
-        participant_team_id = leaderboard_item["submission__participant_team"]
-        participant_team = ParticipantTeam.objects.get(id=participant_team_id)
-        all_participants_email_ids = (
-            participant_team.get_all_participants_email()
-        )
-        for participant_email in all_participants_email_ids:
-            if participant_email in all_banned_email_ids:
-                all_banned_participant_team.append(participant_team_id)
-                break
-        if leaderboard_item["error"] is None:
-            leaderboard_item.update(filtering_error=0)
-        if leaderboard_item["filtering_score"] is None:
-            leaderboard_item.update(filtering_score=0)
-    if challenge_phase_split.show_leaderboard_by_latest_submission:
-        sorted_leaderboard_data = leaderboard_data
-    else:
-        sorted_leaderboard_data = sorted(
-            leaderboard_data,
-            key=lambda k: (
-                float(k["filtering_score"]),
-                float(-k["filtering_error"]),
-            ),
-            reverse=True if is_leaderboard_order_descending else False,
-        )
-    distinct_sorted_leaderboard_data = []
-    team_list = []
-    for data in sorted_leaderboard_data:
-        if (
-            data["submission__participant_team__team_name"] in team_list
-            or data["submission__participant_team"]
-            in all_banned_participant_team
-        ):
-            continue
-        elif data["submission__is_baseline"] is True:
-            distinct_sorted_leaderboard_data.append(data)
-        else:
-            distinct_sorted_leaderboard_data.append(data)
-            team_list.append(data["submission__participant_team__team_name"])
 
-    leaderboard_labels = challenge_phase_split.leaderboard.schema["labels"]
-    for item in distinct_sorted_leaderboard_data:
+def get_leaderboard_data_fields(challenge_phase_split):
+    """
+    Function to get the fields of the leaderboard data shown on the leaderboard
+
+    Arguments:
+        challenge_phase_split {[Class object]} -- Challenge phase split model object
+
+    Returns:
+        [list] -- Fields to be passed to `values()` of the leaderboard data queryset
+    """
+    leaderboard_data_fields = [
+        "id",
+        "submission__participant_team",
+        "submission__participant_team__team_name",
+        "submission__participant_team__team_url",
+        "submission__is_baseline",
+        "submission__is_public",
+        "challenge_phase_split",
+        "result",
+        "error",
+        "filtering_score",
+        "filtering_error",
+        "leaderboard__schema",
+        "submission__submitted_at",
+        "submission__method_name",
+        "submission__id",
+        "submission__submission_metadata",
+    ]
+    if challenge_phase_split.show_execution_time:
+        leaderboard_data_fields.append("submission__execution_time")
+    leaderboard_data_fields.append("submission__is_verified_by_host")
+    return leaderboard_data_fields
+
+
+def format_leaderboard_entries(leaderboard_data, leaderboard_labels):
+    """
+    Function to convert the result and the error of leaderboard data dicts
+    to lists following the order of the leaderboard labels
+
+    Arguments:
+        leaderboard_data {[list]} -- Leaderboard data dicts
+        leaderboard_labels {[list]} -- Labels of the leaderboard schema
+
+    Returns:
+        [list] -- Leaderboard data dicts to be shown on the leaderboard
+    """
+    for item in leaderboard_data:
+        if item["error"] is None or item["filtering_error"] is None:
+            item.update(filtering_error=0)
+        if item["filtering_score"] is None:
+            item.update(filtering_score=0)
+
         item_result = []
         for index in leaderboard_labels:
             # Handle case for partially evaluated submissions
@@ -503,7 +468,346 @@ def calculate_distinct_sorted_leaderboard_data(
                 item["error"]["error_{0}".format(index)]
                 for index in leaderboard_labels
             ]
-    return distinct_sorted_leaderboard_data, status.HTTP_200_OK
+    return leaderboard_data
+
+
+def get_leaderboard_ranking_ordering(
+    challenge_phase_split, is_leaderboard_order_descending
+):
+    """
+    Function to get the ordering of the entries of a materialized leaderboard ranking
+
+    Arguments:
+        challenge_phase_split {[Class object]} -- Challenge phase split model object
+        is_leaderboard_order_descending {[bool]} -- True if a higher score ranks higher
+
+    Returns:
+        [list] -- Pairs of a ranking entry field and a boolean for descending ordering
+    """
+    # Ties are ranked by the latest entry first
+    latest_first = [
+        ("leaderboard_data__created_at", True),
+        ("leaderboard_data_id", True),
+    ]
+    if challenge_phase_split.show_leaderboard_by_latest_submission:
+        return latest_first
+    return [
+        ("filtering_score", is_leaderboard_order_descending),
+        ("filtering_error", not is_leaderboard_order_descending),
+    ] + latest_first
+
+
+# Columns of the distinct leaderboard data query for the ranking entry fields
+LEADERBOARD_RANKING_COLUMNS = {
+    "filtering_score": "ranking_score",
+    "filtering_error": "ranking_error",
+    "leaderboard_data__created_at": "created_at",
+    "leaderboard_data_id": "id",
+}
+
+
+def get_distinct_leaderboard_data_sql(leaderboard_data, order_by, ordering):
+    """
+    Function to build the query ranking the leaderboard data in the database, which keeps the
+    best entry of each participant team along with the baseline entries ranked above it
+
+    Arguments:
+        leaderboard_data {[QuerySet]} -- LeaderboardData queryset returned by `get_leaderboard_data_queryset`
+        order_by {[str]} -- Label to rank the leaderboard entries by
+        ordering {[list]} -- Ordering returned by `get_leaderboard_ranking_ordering`
+
+    Returns:
+        [str] -- SQL query selecting the `id`, `ranking_participant_team`, `ranking_score` and `ranking_error` columns
+        [tuple] -- Parameters of the SQL query
+    """
+    leaderboard_data_sql, params = (
+        leaderboard_data.annotate(
+            ranking_participant_team=F("submission__participant_team"),
+            ranking_is_baseline=F("submission__is_baseline"),
+            # Same expression as the indexes of `create_leaderboard_indexes`
+            ranking_score=RawSQL(
+                "leaderboard_label_value(result, %s)", (order_by,)
+            ),
+            ranking_error=RawSQL(
+                "leaderboard_label_value(error, %s)",
+                ("error_{0}".format(order_by),),
+            ),
+        )
+        .order_by()
+        .values(
+            "id",
+            "created_at",
+            "ranking_participant_team",
+            "ranking_is_baseline",
+            "ranking_score",
+            "ranking_error",
+        )
+        .query.sql_with_params()
+    )
+    window_ordering = ", ".join(
+        "{0} {1}".format(
+            LEADERBOARD_RANKING_COLUMNS[field], "DESC" if descending else "ASC"
+        )
+        for field, descending in ordering
+    )
+    # An entry is kept if no other entry of its team, apart from the baseline
+    # ones, is ranked higher
+    sql = """
+        SELECT id, ranking_participant_team, ranking_score, ranking_error
+        FROM (
+            SELECT *, COUNT(*) FILTER (WHERE NOT ranking_is_baseline) OVER (
+                PARTITION BY ranking_participant_team
+                ORDER BY {ordering}
+                ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+            ) AS entries_ranked_higher
+            FROM ({leaderboard_data}) AS leaderboard_data
+        ) AS ranked_leaderboard_data
+        WHERE entries_ranked_higher = 0
+    """.format(
+        ordering=window_ordering, leaderboard_data=leaderboard_data_sql
+    )
+    return sql, tuple(params)
+
+
+def build_leaderboard_ranking_entries(ranking, participant_team_id=None):
+    """
+    Function to compute and store the entries of a materialized leaderboard ranking,
+    the leaderboard data is ranked in the database and never fetched
+
+    Arguments:
+        ranking {[Class object]} -- LeaderboardRanking model object
+        participant_team_id {[int]} -- Only compute the entries of this participant team if given
+    """
+    challenge_phase_split = ranking.challenge_phase_split
+    challenge_obj = challenge_phase_split.challenge_phase.challenge
+    leaderboard_data = get_leaderboard_data_queryset(
+        challenge_obj,
+        challenge_phase_split,
+        ranking.only_public_entries,
+        ranking.order_by,
+    )
+    if participant_team_id is not None:
+        leaderboard_data = leaderboard_data.filter(
+            submission__participant_team=participant_team_id
+        )
+    banned_participant_team_ids = get_banned_participant_team_ids(
+        challenge_obj
+    )
+    if banned_participant_team_ids:
+        leaderboard_data = leaderboard_data.exclude(
+            submission__participant_team__in=banned_participant_team_ids
+        )
+    distinct_leaderboard_data_sql, params = get_distinct_leaderboard_data_sql(
+        leaderboard_data,
+        ranking.order_by,
+        get_leaderboard_ranking_ordering(
+            challenge_phase_split,
+            is_leaderboard_ordered_descending(
+                challenge_phase_split, ranking.order_by
+            ),
+        ),
+    )
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO {table} (
+                created_at, modified_at, ranking_id, leaderboard_data_id,
+                participant_team_id, filtering_score, filtering_error
+            )
+            SELECT %s, %s, %s, id, ranking_participant_team, ranking_score, ranking_error
+            FROM ({distinct_leaderboard_data}) AS distinct_leaderboard_data
+            """.format(
+                table=LeaderboardRankingEntry._meta.db_table,
+                distinct_leaderboard_data=distinct_leaderboard_data_sql,
+            ),
+            (now, now, ranking.pk) + params,
+        )
+
+
+def get_leaderboard_ranking(
+    challenge_phase_split, only_public_entries, order_by
+):
+    """
+    Function to get the materialized leaderboard ranking, building it if it doesn't exist yet
+
+    Arguments:
+        challenge_phase_split {[Class object]} -- Challenge phase split model object
+        only_public_entries {[Boolean]} -- Boolean value to determine if the user wants to include
+            private entries or not
+        order_by {[str]} -- Label to rank the leaderboard entries by
+
+    Returns:
+        [Class object] -- LeaderboardRanking model object
+    """
+    ranking_filter = {
+        "challenge_phase_split": challenge_phase_split,
+        "only_public_entries": only_public_entries,
+        "order_by": order_by,
+    }
+    try:
+        return LeaderboardRanking.objects.get(**ranking_filter)
+    except LeaderboardRanking.DoesNotExist:
+        pass
+    try:
+        with transaction.atomic():
+            ranking = LeaderboardRanking.objects.create(**ranking_filter)
+            build_leaderboard_ranking_entries(ranking)
+    except IntegrityError:
+        # The ranking has been built by a concurrent request
+        ranking = LeaderboardRanking.objects.get(**ranking_filter)
+    return ranking
+
+
+def refresh_leaderboard_rankings(challenge_phase_splits, participant_team_id):
+    """
+    Function to recompute the entries of a participant team in the materialized
+    leaderboard rankings of challenge phase splits
+
+    Arguments:
+        challenge_phase_splits {[QuerySet/list]} -- Challenge phase splits or their primary keys
+        participant_team_id {[int]} -- Primary key of the participant team
+    """
+    rankings = LeaderboardRanking.objects.filter(
+        challenge_phase_split__in=challenge_phase_splits
+    ).select_related(
+        "challenge_phase_split__challenge_phase__challenge__creator",
+        "challenge_phase_split__leaderboard",
+    )
+    for ranking in rankings:
+        with transaction.atomic():
+            # Concurrent refreshes of a ranking, e.g. by the worker and by
+            # `update_submission`, rebuild its entries one after another
+            if not LeaderboardRanking.objects.select_for_update().filter(
+                pk=ranking.pk
+            ).exists():
+                # The ranking has been invalidated meanwhile
+                continue
+            ranking.entries.filter(
+                participant_team=participant_team_id
+            ).delete()
+            build_leaderboard_ranking_entries(ranking, participant_team_id)
+
+
+def invalidate_leaderboard_rankings(challenge_phase_splits):
+    """
+    Function to delete the materialized leaderboard rankings of challenge phase splits,
+    they are rebuilt on the next read of the leaderboard
+
+    Arguments:
+        challenge_phase_splits {[QuerySet/list]} -- Challenge phase splits or their primary keys
+    """
+    LeaderboardRanking.objects.filter(
+        challenge_phase_split__in=challenge_phase_splits
+    ).delete()
+
+
+class RankedLeaderboardData(object):
+    """
+    Lazy sequence of the entries of a materialized leaderboard ranking. The
+    leaderboard data is only fetched for the sliced entries, so that a page of
+    the leaderboard costs a constant number of queries.
+    """
+
+    def __init__(self, entries, leaderboard_data, leaderboard_labels):
+        self.entries = entries
+        self.leaderboard_data = leaderboard_data
+        self.leaderboard_labels = leaderboard_labels
+
+    def count(self):
+        return self.entries.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        leaderboard_data_ids = list(
+            self.entries[index].values_list("leaderboard_data_id", flat=True)
+        )
+        leaderboard_data = {
+            item["id"]: item
+            for item in self.leaderboard_data.filter(
+                id__in=leaderboard_data_ids
+            )
+        }
+        return format_leaderboard_entries(
+            [
+                leaderboard_data[leaderboard_data_id]
+                for leaderboard_data_id in leaderboard_data_ids
+                if leaderboard_data_id in leaderboard_data
+            ],
+            self.leaderboard_labels,
+        )
+
+
+def calculate_distinct_sorted_leaderboard_data(
+    user, challenge_obj, challenge_phase_split, only_public_entries, order_by
+):
+    """
+    Function to calculate and return the sorted leaderboard data
+
+    Arguments:
+        user {[Class object]} -- User model object
+        challenge_obj {[Class object]} -- Challenge model object
+        challenge_phase_split {[Class object]} -- Challenge phase split model object
+        only_public_entries {[Boolean]} -- Boolean value to determine if the user wants to include
+            private entries or not
+
+    Returns:
+        [RankedLeaderboardData] -- Ranked list of participant teams to be shown on leaderboard
+        [status] -- HTTP status code (200/400)
+    """
+    # Get the default order by key to rank the entries on the leaderboard
+    default_order_by, http_status_code = get_leaderboard_order_by(
+        challenge_phase_split, order_by
+    )
+    if http_status_code == status.HTTP_400_BAD_REQUEST:
+        return default_order_by, http_status_code
+
+    challenge_host_or_staff = is_user_a_staff_or_host(user, challenge_obj.pk)
+
+    # Check if challenge phase leaderboard is public for participant user or not
+    if (
+        challenge_phase_split.visibility != ChallengePhaseSplit.PUBLIC
+        and not challenge_host_or_staff
+    ):
+        response_data = {"error": "Sorry, the leaderboard is not public!"}
+        return response_data, status.HTTP_400_BAD_REQUEST
+
+    ranking = get_leaderboard_ranking(
+        challenge_phase_split, only_public_entries, default_order_by
+    )
+    ordering = get_leaderboard_ranking_ordering(
+        challenge_phase_split,
+        is_leaderboard_ordered_descending(
+            challenge_phase_split, default_order_by
+        ),
+    )
+    entries = ranking.entries.order_by(
+        *[
+            "{0}{1}".format("-" if descending else "", field)
+            for field, descending in ordering
+        ]
+    )
+    leaderboard_data = get_leaderboard_data_queryset(
+        challenge_obj,
+        challenge_phase_split,
+        only_public_entries,
+        default_order_by,
+    ).values(*get_leaderboard_data_fields(challenge_phase_split))
+    return (
+        RankedLeaderboardData(
+            entries,
+            leaderboard_data,
+            challenge_phase_split.leaderboard.schema["labels"],
+        ),
+        status.HTTP_200_OK,
+    )
 
 
 def get_leaderboard_data_model(submission_pk, challenge_phase_split_pk):
@@ -591,3 +895,506 @@ def reorder_submissions_comparator_to_key(comparator):
             return comparator(self.obj, other.obj) != 0
 
     return ComparatorToLambdaKey
+
+
+# Number of submissions serialized at once while exporting them as CSV
+SUBMISSIONS_CSV_CHUNK_SIZE = 1000
+
+HOST_SUBMISSIONS_CSV_HEADER = [
+    "id",
+    "Team Name",
+    "Team Members",
+    "Team Members Email Id",
+    "Team Members Affiliaton",
+    "Challenge Phase",
+    "Status",
+    "Created By",
+    "Execution Time(sec.)",
+    "Submission Number",
+    "Submitted File",
+    "Stdout File",
+    "Stderr File",
+    "Environment Log File",
+    "Submitted At",
+    "Submission Result File",
+    "Submission Metadata File",
+    "Method Name",
+    "Method Description",
+    "Publication URL",
+    "Project URL",
+    "Submission Meta Attributes",
+]
+
+PARTICIPANT_SUBMISSIONS_CSV_HEADER = [
+    "Team Name",
+    "Method Name",
+    "Status",
+    "Execution Time(sec.)",
+    "Submitted File",
+    "Result File",
+    "Stdout File",
+    "Stderr File",
+    "Submitted At",
+]
+
+SUBMISSIONS_CSV_FIELDS = {
+    "participant_team": "Team Name",
+    "participant_team_members": "Team Members",
+    "participant_team_members_email": "Team Members Email Id",
+    "participant_team_members_affiliation": "Team Members Affiliation",
+    "challenge_phase": "Challenge Phase",
+    "status": "Status",
+    "created_by": "Created By",
+    "execution_time": "Execution Time(sec.)",
+    "submission_number": "Submission Number",
+    "input_file": "Submitted File",
+    "stdout_file": "Stdout File",
+    "stderr_file": "Stderr File",
+    "environment_log_file": "Environment Log File",
+    "created_at": "Submitted At (mm/dd/yyyy hh:mm:ss)",
+    "submission_result_file": "Submission Result File",
+    "submission_metadata_file": "Submission Metadata File",
+    "method_name": "Method Name",
+    "method_description": "Method Description",
+    "publication_url": "Publication URL",
+    "project_url": "Project URL",
+    "submission_meta_attributes": "Submission Meta Attributes",
+}
+
+
+class CSVBuffer:
+    """File like object returning what is written to it instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def get_host_submission_csv_row(submission):
+    """
+    Returns the row of a submission in the submissions CSV of challenge hosts
+
+    Arguments:
+        submission {[dict]} -- Serialized submission
+
+    Returns:
+        [list] -- CSV row
+    """
+    # Issue: "#" isn't parsed by writer.writerow(), hence it is replaced by "-"
+    # TODO: Find a better way to solve the above issue.
+    return [
+        submission["id"],
+        submission["participant_team"],
+        ",".join(
+            username["username"]
+            for username in submission["participant_team_members"]
+        ),
+        ",".join(
+            email["email"] for email in submission["participant_team_members"]
+        ),
+        ",".join(
+            affiliation
+            for affiliation in submission[
+                "participant_team_members_affiliations"
+            ]
+        ),
+        submission["challenge_phase"],
+        submission["status"],
+        submission["created_by"],
+        submission["execution_time"],
+        submission["submission_number"],
+        submission["input_file"],
+        submission["stdout_file"],
+        submission["stderr_file"],
+        submission["environment_log_file"],
+        submission["created_at"],
+        submission["submission_result_file"],
+        submission["submission_metadata_file"],
+        submission["method_name"].replace("#", "-"),
+        submission["method_description"].replace("#", "-"),
+        submission["publication_url"],
+        submission["project_url"],
+        parse_submission_meta_attributes(submission),
+    ]
+
+
+def get_participant_submission_csv_row(submission):
+    """
+    Returns the row of a submission in the submissions CSV of participants
+
+    Arguments:
+        submission {[dict]} -- Serialized submission
+
+    Returns:
+        [list] -- CSV row
+    """
+    return [
+        submission["participant_team"],
+        submission["method_name"],
+        submission["status"],
+        submission["execution_time"],
+        submission["input_file"],
+        submission["submission_result_file"],
+        submission["stdout_file"],
+        submission["stderr_file"],
+        submission["created_at"],
+    ]
+
+
+def get_submission_csv_row(submission, fields):
+    """
+    Returns the row of a submission in a submissions CSV with chosen fields
+
+    Arguments:
+        submission {[dict]} -- Serialized submission
+        fields {[list]} -- Keys of SUBMISSIONS_CSV_FIELDS to export
+
+    Returns:
+        [list] -- CSV row
+    """
+    row = [submission["id"]]
+    for field in fields:
+        if field == "participant_team_members":
+            row.append(
+                ",".join(
+                    username["username"]
+                    for username in submission["participant_team_members"]
+                )
+            )
+        elif field == "participant_team_members_email":
+            row.append(
+                ",".join(
+                    email["email"]
+                    for email in submission["participant_team_members"]
+                )
+            )
+        elif field == "participant_team_members_affiliation":
+            row.append(
+                ",".join(
+                    affiliation
+                    for affiliation in submission[
+                        "participant_team_members_affiliations"
+                    ]
+                )
+            )
+        elif field == "created_at":
+            row.append(submission["created_at"].strftime("%m/%d/%Y %H:%M:%S"))
+        elif field == "submission_meta_attributes":
+            row.append(parse_submission_meta_attributes(submission))
+        else:
+            row.append(submission[field])
+    return row
+
+
+def get_submissions_export(
+    challenge_pk, challenge_phase_pk, participant_team_pk=None, fields=None
+):
+    """
+    Returns the submissions to export as CSV along with its header and rows
+
+    Challenge hosts export the submissions of all the phases with all or the
+    chosen fields, participants the submissions of their team to a phase.
+
+    Arguments:
+        challenge_pk {[int]} -- Challenge primary key
+        challenge_phase_pk {[int]} -- Challenge phase primary key
+        participant_team_pk {[int]} -- Participant team primary key for participants
+        fields {[list]} -- Keys of SUBMISSIONS_CSV_FIELDS chosen by challenge hosts
+
+    Returns:
+        [tuple] -- Submissions queryset, CSV header and function returning the CSV row of a serialized submission
+    """
+    if participant_team_pk is not None:
+        submissions = Submission.objects.filter(
+            participant_team=participant_team_pk,
+            challenge_phase=challenge_phase_pk,
+        )
+        header = PARTICIPANT_SUBMISSIONS_CSV_HEADER
+        get_row = get_participant_submission_csv_row
+    else:
+        submissions = Submission.objects.filter(
+            challenge_phase__challenge=challenge_pk
+        )
+        if fields is None:
+            header = HOST_SUBMISSIONS_CSV_HEADER
+            get_row = get_host_submission_csv_row
+        else:
+            header = ["id"] + [
+                SUBMISSIONS_CSV_FIELDS[field] for field in fields
+            ]
+            get_row = functools.partial(get_submission_csv_row, fields=fields)
+    return submissions.order_by("-submitted_at"), header, get_row
+
+
+def get_submission_exports_storage():
+    """Returns the storage of the submission CSVs exported in the background"""
+    return get_storage_class(settings.SUBMISSION_EXPORTS_STORAGE)()
+
+
+def delete_expired_submission_exports():
+    """
+    Function to delete the submission exports older than `SUBMISSION_EXPORTS_TTL`
+    seconds along with their files
+
+    Returns:
+        [int] -- Number of deleted submission exports
+    """
+    storage = get_submission_exports_storage()
+    expired_submission_exports = SubmissionExport.objects.filter(
+        created_at__lt=timezone.now()
+        - datetime.timedelta(seconds=settings.SUBMISSION_EXPORTS_TTL)
+    )
+    count = 0
+    for submission_export in expired_submission_exports.iterator():
+        if storage.exists(submission_export.file_name):
+            storage.delete(submission_export.file_name)
+        submission_export.delete()
+        count += 1
+    return count
+
+
+def get_submissions_csv_rows(submissions, header, get_row, context=None):
+    """
+    Generates a submissions CSV a chunk of rows at a time, so that the
+    submissions are neither loaded nor serialized all at once
+
+    Arguments:
+        submissions {[QuerySet]} -- Submissions to export
+        header {[list]} -- CSV header
+        get_row {[function]} -- Returns the CSV row of a serialized submission
+        context {[dict]} -- Serializer context
+
+    Yields:
+        [str] -- CSV content
+    """
+    writer = csv.writer(CSVBuffer())
+
+    def write_rows(chunk):
+        serializer = ChallengeSubmissionManagementSerializer(
+            chunk, many=True, context=context or {}
+        )
+        return "".join(
+            writer.writerow(get_row(serialized_submission))
+            for serialized_submission in serializer.data
+        )
+
+    yield writer.writerow(header)
+    chunk = []
+    for submission in submissions.iterator(
+        chunk_size=SUBMISSIONS_CSV_CHUNK_SIZE
+    ):
+        chunk.append(submission)
+        if len(chunk) == SUBMISSIONS_CSV_CHUNK_SIZE:
+            yield write_rows(chunk)
+            chunk = []
+    if chunk:
+        yield write_rows(chunk)
+
+
+# The autoscalers poll the metrics every few seconds, a short timeout lets them
+# share the aggregate without the counts going noticeably stale
+SUBMISSION_METRICS_CACHE_TIMEOUT = 5
+
+ALL_CHALLENGES_SUBMISSION_METRICS_CACHE_KEY = "challenges_submission_metrics"
+
+
+def get_challenge_submission_metrics_cache_key(challenge_pk):
+    """Returns the cache key of the submission metrics of a challenge"""
+    return "challenge_{}_submission_metrics".format(challenge_pk)
+
+
+def aggregate_challenges_submission_metrics(challenges):
+    """
+    Counts the submissions of challenges by status with a single query
+
+    Arguments:
+        challenges {[QuerySet]} -- Challenges to count the submissions of
+
+    Returns:
+        [dict] -- Submission count per status per challenge primary key
+    """
+    submission_statuses = [
+        submission_status for submission_status, _ in Submission.STATUS_OPTIONS
+    ]
+    submission_metrics = {}
+    rows = (
+        challenges.order_by()
+        .values_list("pk", "challengephase__submissions__status")
+        .annotate(count=Count("challengephase__submissions"))
+    )
+    for challenge_pk, submission_status, count in rows:
+        challenge_metrics = submission_metrics.setdefault(
+            challenge_pk, dict.fromkeys(submission_statuses, 0)
+        )
+        # Challenges without submissions are left joined to a null status
+        if submission_status is not None:
+            challenge_metrics[submission_status] = count
+    return submission_metrics
+
+
+def get_challenges_submission_metrics(challenge_pks=None):
+    """
+    Returns the submission count per status of challenges, cached for a few seconds
+
+    Arguments:
+        challenge_pks {[list]} -- Challenge primary keys, all the challenges if None
+
+    Returns:
+        [dict] -- Submission count per status per challenge primary key,
+                  challenges which don't exist are left out
+    """
+    if challenge_pks is None:
+        submission_metrics = cache.get(
+            ALL_CHALLENGES_SUBMISSION_METRICS_CACHE_KEY
+        )
+        if submission_metrics is None:
+            submission_metrics = aggregate_challenges_submission_metrics(
+                Challenge.objects.all()
+            )
+            cache.set(
+                ALL_CHALLENGES_SUBMISSION_METRICS_CACHE_KEY,
+                submission_metrics,
+                SUBMISSION_METRICS_CACHE_TIMEOUT,
+            )
+        return submission_metrics
+
+    cache_keys = {
+        get_challenge_submission_metrics_cache_key(challenge_pk): challenge_pk
+        for challenge_pk in set(challenge_pks)
+    }
+    submission_metrics = {
+        cache_keys[cache_key]: challenge_metrics
+        for cache_key, challenge_metrics in cache.get_many(cache_keys).items()
+    }
+    missing_challenge_pks = set(cache_keys.values()) - set(submission_metrics)
+    if missing_challenge_pks:
+        missing_submission_metrics = aggregate_challenges_submission_metrics(
+            Challenge.objects.filter(pk__in=missing_challenge_pks)
+        )
+        cache.set_many(
+            {
+                get_challenge_submission_metrics_cache_key(
+                    challenge_pk
+                ): challenge_metrics
+                for challenge_pk, challenge_metrics in missing_submission_metrics.items()
+            },
+            SUBMISSION_METRICS_CACHE_TIMEOUT,
+        )
+        submission_metrics.update(missing_submission_metrics)
+    return submission_metrics
+
+
+# Statuses of the submissions which still need a worker
+PENDING_SUBMISSION_STATUSES = (
+    Submission.SUBMITTED,
+    Submission.QUEUED,
+    Submission.RUNNING,
+    Submission.RESUMING,
+)
+
+# Number of the latest finished submissions of a challenge whose evaluation
+# times are used to estimate the time a worker takes per submission
+EVALUATION_TIME_SAMPLE_SIZE = 50
+
+# Number of SQS queues whose depth is read at the same time, the threads are
+# kept across requests along with their SQS resources
+SQS_QUEUE_DEPTH_MAX_WORKERS = 10
+SQS_QUEUE_DEPTH_EXECUTOR = None
+
+
+def get_percentile(sorted_values, percentile):
+    """Returns the nearest-rank percentile of sorted values, None if empty"""
+    if not sorted_values:
+        return None
+    index = max(0, -(-len(sorted_values) * percentile // 100) - 1)
+    return sorted_values[int(index)]
+
+
+def get_sqs_queue_depth(challenge):
+    """
+    Returns the approximate number of visible and in flight messages of the
+    queue of a challenge
+
+    Arguments:
+        challenge {[Challenge Model class object]} -- Challenge object
+
+    Returns:
+        [tuple] -- Visible and in flight message counts, None when the queue can't be read
+    """
+    try:
+        # Reading the metrics doesn't create the queue, a queue which
+        # doesn't exist yet has no messages
+        queue = get_or_create_sqs_queue(
+            challenge.queue, challenge, create=False
+        )
+        if queue is None:
+            return 0, 0
+        attributes = queue.meta.client.get_queue_attributes(
+            QueueUrl=queue.url,
+            AttributeNames=[
+                "ApproximateNumberOfMessages",
+                "ApproximateNumberOfMessagesNotVisible",
+            ],
+        )["Attributes"]
+        return (
+            int(attributes["ApproximateNumberOfMessages"]),
+            int(attributes["ApproximateNumberOfMessagesNotVisible"]),
+        )
+    except Exception:
+        logger.exception(
+            "Cannot get the queue depth of challenge {}".format(challenge.pk)
+        )
+        return None, None
+
+
+def get_challenges_scaling_metrics(challenge_pks):
+    """
+    Returns the signals to scale the workers of challenges from: the depth
+    of their queues, their pending submissions and the evaluation times of
+    their latest finished submissions
+
+    Arguments:
+        challenge_pks {[list]} -- Challenge primary keys
+
+    Returns:
+        [dict] -- Scaling metrics per challenge primary key,
+                  challenges which don't exist are left out
+    """
+    global SQS_QUEUE_DEPTH_EXECUTOR
+    submission_metrics = get_challenges_submission_metrics(challenge_pks)
+    challenges = list(Challenge.objects.filter(pk__in=submission_metrics))
+    if SQS_QUEUE_DEPTH_EXECUTOR is None:
+        SQS_QUEUE_DEPTH_EXECUTOR = ThreadPoolExecutor(
+            max_workers=SQS_QUEUE_DEPTH_MAX_WORKERS
+        )
+    queue_depths = SQS_QUEUE_DEPTH_EXECUTOR.map(
+        get_sqs_queue_depth, challenges
+    )
+    scaling_metrics = {}
+    for challenge, (queue_messages, queue_messages_in_flight) in zip(
+        challenges, queue_depths
+    ):
+        evaluation_times = sorted(
+            (completed_at - started_at).total_seconds()
+            for started_at, completed_at in Submission.objects.filter(
+                challenge_phase__challenge=challenge,
+                status=Submission.FINISHED,
+                started_at__isnull=False,
+                completed_at__isnull=False,
+            )
+            .order_by("-completed_at")
+            .values_list("started_at", "completed_at")[
+                :EVALUATION_TIME_SAMPLE_SIZE
+            ]
+        )
+        scaling_metrics[challenge.pk] = {
+            "workers": challenge.workers,
+            "pending_submissions": sum(
+                submission_metrics[challenge.pk][submission_status]
+                for submission_status in PENDING_SUBMISSION_STATUSES
+            ),
+            "queue_messages": queue_messages,
+            "queue_messages_in_flight": queue_messages_in_flight,
+            "evaluation_time_p50": get_percentile(evaluation_times, 50),
+            "evaluation_time_p90": get_percentile(evaluation_times, 90),
+        }
+    return scaling_metrics
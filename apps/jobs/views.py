@@ -32,10 +32,13 @@ from drf_yasg.utils import swagger_auto_schema
 from accounts.permissions import HasVerifiedEmail
 from base.utils import (
     StandardResultSetPagination,
+    change_sqs_messages_visibility,
+    delete_sqs_messages,
     get_boto3_client,
     get_or_create_sqs_queue,
     paginated_queryset,
     is_user_a_staff,
+    receive_sqs_messages,
 )
 from challenges.models import (
     ChallengePhase,
@@ -44,6 +47,7 @@ from challenges.models import (
     ChallengePhaseSplit,
     LeaderboardData,
 )
+from challenges.serializers import ChallengePhaseSerializer
 from challenges.utils import (
     complete_s3_multipart_file_upload,
     generate_presigned_url_for_multipart_upload,
@@ -64,19 +68,22 @@ from participants.utils import (
 )
 from .aws_utils import generate_aws_eks_bearer_token
 from .filters import SubmissionFilter
-from .models import Submission
+from .models import Submission, get_submission_quotas
 from .sender import publish_submission_message
 from .serializers import (
     CreateLeaderboardDataSerializer,
     LeaderboardDataSerializer,
     RemainingSubmissionDataSerializer,
+    SubmissionMessageAcknowledgementSerializer,
+    SubmissionMessageHeartbeatSerializer,
+    SubmissionMessageLeaseSerializer,
     SubmissionSerializer,
 )
 from .tasks import download_file_and_publish_submission_message
 from .utils import (
     calculate_distinct_sorted_leaderboard_data,
     get_leaderboard_data_model,
-    get_remaining_submission_for_a_phase,
+    get_remaining_submission_limits,
     get_submission_model,
     handle_submission_rerun,
     handle_submission_resume,
@@ -875,27 +882,28 @@ def get_remaining_submissions(request, challenge_pk):
         challenge_phases = challenge_phases.filter(
             challenge=challenge, is_public=True
         ).order_by("pk")
+    participant_team = get_participant_team_of_user_for_a_challenge(
+        request.user, challenge_pk
+    )
+    # Conditional check for the existence of participant team of the user.
+    if not participant_team:
+        response_data = {"error": "You haven't participated in the challenge"}
+        return Response(response_data, status=status.HTTP_403_FORBIDDEN)
+    challenge_phases = list(challenge_phases)
+    submission_quotas = get_submission_quotas(
+        [phase.pk for phase in challenge_phases], participant_team.pk
+    )
     phase_data_list = list()
     for phase in challenge_phases:
-        (
-            remaining_submission_message,
-            response_status,
-        ) = get_remaining_submission_for_a_phase(
-            request.user, phase.id, challenge_pk
+        remaining_submission_message, _ = get_remaining_submission_limits(
+            phase, submission_quotas[phase.pk]
         )
-        if response_status != status.HTTP_200_OK:
-            return Response(
-                remaining_submission_message, status=response_status
-            )
         phase_data_list.append(
             RemainingSubmissionDataSerializer(
                 phase, context={"limits": remaining_submission_message}
             ).data
         )
     phases_data["phases"] = phase_data_list
-    participant_team = get_participant_team_of_user_for_a_challenge(
-        request.user, challenge_pk
-    )
     phases_data["participant_team"] = participant_team.team_name
     phases_data["participant_team_id"] = participant_team.id
     return Response(phases_data, status=status.HTTP_200_OK)
@@ -2033,6 +2041,82 @@ def get_submissions_for_challenge(request, challenge_pk):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@api_view(["PATCH"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((JWTAuthentication, ExpiringTokenAuthentication))
+def update_submissions_status(request, challenge_pk):
+    """
+    API endpoint to cancel or fail the pending submissions of a challenge
+    in bulk, e.g. the stale ones found by the monitoring scripts
+
+    Query Parameters:
+
+     - ``submissions``: comma separated submission ids, e.g. 1,2,3 (**required**)
+     - ``submission_status``: `cancelled` or `failed` (**required**)
+
+    Returns the ids of the updated submissions. Submissions which are not
+    pending or not part of the challenge are left as they are.
+    """
+    challenge = get_challenge_model(challenge_pk)
+
+    if not is_user_a_staff(request.user) and not is_user_a_host_of_challenge(
+        request.user, challenge.pk
+    ):
+        response_data = {
+            "error": "Sorry, you are not authorized to make this request!"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    submission_status = request.data.get("submission_status", "").lower()
+    if submission_status not in [Submission.CANCELLED, Submission.FAILED]:
+        response_data = {"error": "Sorry, submission status is invalid"}
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    submission_pks = request.data.get("submissions", "")
+    if isinstance(submission_pks, str):
+        submission_pks = submission_pks.split(",")
+    try:
+        submission_pks = {int(submission_pk) for submission_pk in submission_pks}
+    except (TypeError, ValueError):
+        response_data = {"error": "Invalid submission ids"}
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    if not submission_pks:
+        response_data = {"error": "Please provide the submission ids"}
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    if len(submission_pks) > settings.MAX_BULK_SUBMISSION_UPDATES:
+        response_data = {
+            "error": "Please update at most {} submissions at a time".format(
+                settings.MAX_BULK_SUBMISSION_UPDATES
+            )
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    updated_submission_pks = []
+    completed_at = timezone.now()
+    with transaction.atomic():
+        # The submissions are saved one by one so that their quotas are updated
+        submissions = Submission.objects.select_for_update().filter(
+            pk__in=submission_pks,
+            challenge_phase__challenge=challenge,
+            status__in=[
+                Submission.SUBMITTED,
+                Submission.SUBMITTING,
+                Submission.QUEUED,
+                Submission.RUNNING,
+                Submission.RESUMING,
+            ],
+        )
+        for submission in submissions:
+            submission.status = submission_status
+            submission.completed_at = completed_at
+            submission.save()
+            updated_submission_pks.append(submission.pk)
+
+    response_data = {"updated_submissions": sorted(updated_submission_pks)}
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
 @swagger_auto_schema(
     methods=["get"],
     manual_parameters=[
@@ -2118,7 +2202,8 @@ def get_submission_message_from_queue(request, queue_name):
 
     queue = get_or_create_sqs_queue(queue_name, challenge)
     try:
-        messages = queue.receive_messages()
+        # The request must not hold an API process while the queue is empty
+        messages = receive_sqs_messages(queue, wait_time_seconds=0)
         if len(messages):
             message_receipt_handle = messages[0].receipt_handle
             message_body = json.loads(messages[0].body)
@@ -2229,6 +2314,353 @@ def delete_submission_message_from_queue(request, queue_name):
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
 
+@swagger_auto_schema(
+    methods=["get"],
+    manual_parameters=[
+        openapi.Parameter(
+            name="queue_name",
+            in_=openapi.IN_PATH,
+            type=openapi.TYPE_STRING,
+            description="Queue Name",
+            required=True,
+        ),
+        openapi.Parameter(
+            name="max_number_of_messages",
+            in_=openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            description="Number of messages to lease, at most 10",
+            required=False,
+        ),
+        openapi.Parameter(
+            name="visibility_timeout",
+            in_=openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            description="Seconds during which the leased messages stay hidden",
+            required=False,
+        ),
+    ],
+    operation_id="lease_submission_messages_from_queue",
+    responses={
+        status.HTTP_200_OK: openapi.Response(
+            "{'messages': [{'receipt_handle': <receipt-handle>, 'body': <message-body>, "
+            "'submission': <submission>, 'challenge_phase': <challenge-phase>}]}"
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            "{'error': 'Error message goes here'}"
+        ),
+    },
+)
+@api_view(["GET"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((JWTAuthentication, ExpiringTokenAuthentication))
+def lease_submission_messages_from_queue(request, queue_name):
+    """
+    API to lease a batch of submission messages from AWS SQS queue along
+    with the submissions and the challenge phases they refer to.
+
+    - Arguments:
+        ``queue_name``: AWS SQS queue name
+
+    - Query Parameters:
+        ``max_number_of_messages`` -- Number of messages to lease, at most 10
+        ``visibility_timeout`` -- Seconds during which the leased messages stay hidden
+
+    - Returns:
+        ``messages``: The leased messages with their ``receipt_handle``, ``body``,
+        ``submission`` and ``challenge_phase``
+    """
+    try:
+        challenge = Challenge.objects.get(queue=queue_name)
+    except Challenge.DoesNotExist:
+        response_data = {
+            "error": "Challenge with queue name {} does not exist".format(
+                queue_name
+            )
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    if not is_user_a_host_of_challenge(request.user, challenge.pk):
+        response_data = {
+            "error": "Sorry, you are not authorized to access this resource"
+        }
+        return Response(response_data, status=status.HTTP_401_UNAUTHORIZED)
+
+    serializer = SubmissionMessageLeaseSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    queue = get_or_create_sqs_queue(queue_name, challenge)
+    try:
+        messages = receive_sqs_messages(
+            queue,
+            max_number_of_messages=serializer.validated_data[
+                "max_number_of_messages"
+            ],
+            # The request must not hold an API process while the queue is empty
+            wait_time_seconds=0,
+            visibility_timeout=serializer.validated_data.get(
+                "visibility_timeout"
+            ),
+        )
+    except botocore.exceptions.ClientError as ex:
+        response_data = {"error": ex}
+        logger.exception("Exception raised: {}".format(ex))
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    message_bodies = [json.loads(message.body) for message in messages]
+    submissions = list(
+        Submission.objects.filter(
+            pk__in=[body.get("submission_pk") for body in message_bodies],
+            challenge_phase__challenge=challenge,
+        ).select_related("participant_team")
+    )
+    serialized_submissions = SubmissionSerializer(
+        submissions, many=True, context={"request": request}
+    ).data
+    submissions = {
+        submission.pk: serialized_submission
+        for submission, serialized_submission in zip(
+            submissions, serialized_submissions
+        )
+    }
+    challenge_phases = ChallengePhase.objects.filter(
+        pk__in=[body.get("phase_pk") for body in message_bodies],
+        challenge=challenge,
+    )
+    challenge_phases = {
+        serialized_challenge_phase["id"]: serialized_challenge_phase
+        for serialized_challenge_phase in ChallengePhaseSerializer(
+            challenge_phases, many=True, context={"request": request}
+        ).data
+    }
+
+    response_data = {"messages": []}
+    for message, message_body in zip(messages, message_bodies):
+        logger.info(
+            "A submission is leased with pk {}".format(
+                message_body.get("submission_pk")
+            )
+        )
+        response_data["messages"].append(
+            {
+                "receipt_handle": message.receipt_handle,
+                "body": message_body,
+                "submission": submissions.get(
+                    message_body.get("submission_pk")
+                ),
+                "challenge_phase": challenge_phases.get(
+                    message_body.get("phase_pk")
+                ),
+            }
+        )
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    methods=["post"],
+    manual_parameters=[
+        openapi.Parameter(
+            name="queue_name",
+            in_=openapi.IN_PATH,
+            type=openapi.TYPE_STRING,
+            description="Queue Name",
+            required=True,
+        )
+    ],
+    operation_id="acknowledge_submission_messages_from_queue",
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "ack": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_STRING),
+                description="Receipt handles of the messages to be deleted",
+            ),
+            "nack": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_STRING),
+                description="Receipt handles of the messages to be made visible again",
+            ),
+        },
+    ),
+    responses={
+        status.HTTP_200_OK: openapi.Response(
+            "{'failed': [<receipt-handles-of-the-failed-messages>]}"
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            "{'error': 'Error message goes here'}"
+        ),
+    },
+)
+@api_view(["POST"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((JWTAuthentication, ExpiringTokenAuthentication))
+def acknowledge_submission_messages_from_queue(request, queue_name):
+    """
+    API to delete the processed submission messages from AWS SQS queue and
+    to make the messages which cannot be processed visible again
+
+    - Arguments:
+        ``queue_name``: AWS SQS queue name
+
+    - Request Body:
+        ``ack`` -- The receipt handles of the messages to be deleted
+        ``nack`` -- The receipt handles of the messages to be made visible again
+
+    - Returns:
+        ``failed``: The receipt handles of the messages which are not acknowledged
+    """
+    try:
+        challenge = Challenge.objects.get(queue=queue_name)
+    except Challenge.DoesNotExist:
+        response_data = {
+            "error": "Challenge with queue name {} does not exist".format(
+                queue_name
+            )
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    if not is_user_a_host_of_challenge(request.user, challenge.pk):
+        response_data = {
+            "error": "Sorry, you are not authorized to access this resource"
+        }
+        return Response(response_data, status=status.HTTP_401_UNAUTHORIZED)
+
+    serializer = SubmissionMessageAcknowledgementSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    queue = get_or_create_sqs_queue(queue_name, challenge)
+    try:
+        failed_messages = delete_sqs_messages(
+            queue,
+            [
+                queue.Message(receipt_handle)
+                for receipt_handle in serializer.validated_data["ack"]
+            ],
+        )
+        failed_messages += change_sqs_messages_visibility(
+            queue,
+            [
+                queue.Message(receipt_handle)
+                for receipt_handle in serializer.validated_data["nack"]
+            ],
+            0,
+        )
+    except botocore.exceptions.ClientError as ex:
+        response_data = {"error": ex}
+        logger.exception(
+            "SQS messages are not acknowledged due to {}".format(response_data)
+        )
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    response_data = {
+        "failed": [message.receipt_handle for message in failed_messages]
+    }
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    methods=["post"],
+    manual_parameters=[
+        openapi.Parameter(
+            name="queue_name",
+            in_=openapi.IN_PATH,
+            type=openapi.TYPE_STRING,
+            description="Queue Name",
+            required=True,
+        )
+    ],
+    operation_id="extend_submission_messages_visibility",
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "receipt_handles": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_STRING),
+                description="Receipt handles of the messages being processed",
+            ),
+            "visibility_timeout": openapi.Schema(
+                type=openapi.TYPE_INTEGER,
+                description="Seconds from now during which the messages stay hidden",
+            ),
+        },
+    ),
+    responses={
+        status.HTTP_200_OK: openapi.Response(
+            "{'failed': [<receipt-handles-of-the-failed-messages>]}"
+        ),
+        status.HTTP_400_BAD_REQUEST: openapi.Response(
+            "{'error': 'Error message goes here'}"
+        ),
+    },
+)
+@api_view(["POST"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((JWTAuthentication, ExpiringTokenAuthentication))
+def extend_submission_messages_visibility(request, queue_name):
+    """
+    API for the workers to keep the submission messages they are processing
+    hidden from the other consumers of AWS SQS queue
+
+    - Arguments:
+        ``queue_name``: AWS SQS queue name
+
+    - Request Body:
+        ``receipt_handles`` -- The receipt handles of the messages being processed
+        ``visibility_timeout`` -- Seconds from now during which the messages stay hidden
+
+    - Returns:
+        ``failed``: The receipt handles of the messages whose visibility is not extended
+    """
+    try:
+        challenge = Challenge.objects.get(queue=queue_name)
+    except Challenge.DoesNotExist:
+        response_data = {
+            "error": "Challenge with queue name {} does not exist".format(
+                queue_name
+            )
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    if not is_user_a_host_of_challenge(request.user, challenge.pk):
+        response_data = {
+            "error": "Sorry, you are not authorized to access this resource"
+        }
+        return Response(response_data, status=status.HTTP_401_UNAUTHORIZED)
+
+    serializer = SubmissionMessageHeartbeatSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    queue = get_or_create_sqs_queue(queue_name, challenge)
+    try:
+        failed_messages = change_sqs_messages_visibility(
+            queue,
+            [
+                queue.Message(receipt_handle)
+                for receipt_handle in serializer.validated_data[
+                    "receipt_handles"
+                ]
+            ],
+            serializer.validated_data["visibility_timeout"],
+        )
+    except botocore.exceptions.ClientError as ex:
+        response_data = {"error": ex}
+        logger.exception(
+            "SQS messages visibility is not extended due to {}".format(
+                response_data
+            )
+        )
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    response_data = {
+        "failed": [message.receipt_handle for message in failed_messages]
+    }
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
 @api_view(["GET"])
 @throttle_classes([UserRateThrottle])
 @permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
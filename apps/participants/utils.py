@@ -1,10 +1,17 @@
+from django.core.cache import cache
+
 from challenges.models import Challenge
+from challenges.utils import get_challenge_roles_of_user
 
-from base.utils import get_model_object
+from base.utils import delete_cache_keys_on_commit, get_model_object
 from .models import Participant, ParticipantTeam
 
 get_participant_team_model = get_model_object(ParticipantTeam)
 
+# The cached banned participant teams are invalidated on changes, the timeout
+# only bounds the staleness for changes which aren't tracked e.g. user emails
+BANNED_PARTICIPANT_TEAMS_CACHE_TIMEOUT = 60 * 60
+
 
 def is_user_part_of_participant_team(user, participant_team):
     """Returns boolean if the user belongs to the participant team or not"""
@@ -34,21 +41,17 @@ def is_user_creator_of_participant_team(user, participant_team):
 
 def has_user_participated_in_challenge(user, challenge_id):
     """Returns boolean if the user has participated in a particular challenge"""
-    participant_teams = get_participant_teams_for_user(user)
-    return Challenge.objects.filter(
-        pk=challenge_id, participant_teams__in=participant_teams
-    ).exists()
+    return (
+        get_participant_team_id_of_user_for_a_challenge(user, challenge_id)
+        is not None
+    )
 
 
 def get_participant_team_id_of_user_for_a_challenge(user, challenge_id):
     """Returns the participant team id for a particular user for a particular challenge"""
-    participant_teams = get_participant_teams_for_user(user)
-    for participant_team in participant_teams:
-        if Challenge.objects.filter(
-            pk=challenge_id, participant_teams=participant_team
-        ).exists():
-            return participant_team
-    return
+    return get_challenge_roles_of_user(user, challenge_id)[
+        "participant_team_id"
+    ]
 
 
 def get_participant_team_of_user_for_a_challenge(user, challenge_id):
@@ -71,3 +74,71 @@ def get_list_of_challenges_participated_by_a_user(user):
     """Returns list of challenges participated by a user"""
     participant_teams = get_participant_teams_for_user(user)
     return get_list_of_challenges_for_participant_team(participant_teams)
+
+
+def get_banned_participant_teams_cache_key(challenge_id):
+    """Returns the cache key of the banned participant teams of a challenge"""
+    return "challenge_{}_banned_participant_teams".format(challenge_id)
+
+
+def get_banned_participant_team_ids(challenge):
+    """
+    Returns the ids of the participant teams having a member whose email is banned from a challenge
+
+    Args:
+        challenge ([Challenge Class Object]): Challenge model class object
+
+    Return:
+        {set} : Primary keys of the banned participant teams
+    """
+    if not challenge.banned_email_ids:
+        return set()
+    cache_key = get_banned_participant_teams_cache_key(challenge.pk)
+    banned_participant_team_ids = cache.get(cache_key)
+    if banned_participant_team_ids is None:
+        banned_participant_team_ids = set(
+            Participant.objects.filter(
+                user__email__in=challenge.banned_email_ids
+            ).values_list("team", flat=True)
+        )
+        cache.set(
+            cache_key,
+            banned_participant_team_ids,
+            BANNED_PARTICIPANT_TEAMS_CACHE_TIMEOUT,
+        )
+    return banned_participant_team_ids
+
+
+def invalidate_banned_participant_team_ids(challenge_ids):
+    """Deletes the cached banned participant teams of challenges"""
+    delete_cache_keys_on_commit(
+        get_banned_participant_teams_cache_key(challenge_id)
+        for challenge_id in challenge_ids
+    )
+
+
+def get_participant_team_members(participant_team_ids):
+    """
+    Returns the members of participant teams with their profiles in one query
+
+    Args:
+        participant_team_ids ([list]): Primary keys of the participant teams
+
+    Return:
+        {dict} : Member users ordered by primary key for each participant team id
+    """
+    participant_team_members = {}
+    participants = (
+        Participant.objects.filter(team_id__in=participant_team_ids)
+        .select_related("user__profile")
+        .order_by("user_id")
+    )
+    for participant in participants:
+        participant_team_members.setdefault(participant.team_id, {})
+        participant_team_members[participant.team_id].setdefault(
+            participant.user_id, participant.user
+        )
+    return {
+        participant_team_id: list(members.values())
+        for participant_team_id, members in participant_team_members.items()
+    }
@@ -0,0 +1,3 @@
+from .gzip_request_middleware import GZipRequestMiddleware
+
+__all__ = [GZipRequestMiddleware]
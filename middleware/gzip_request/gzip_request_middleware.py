@@ -0,0 +1,38 @@
+import zlib
+
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig, SuspiciousOperation
+from django.utils.deprecation import MiddlewareMixin
+
+
+class GZipRequestMiddleware(MiddlewareMixin):
+    """
+    Decompresses the request bodies sent with gzip content encoding, like
+    the large submission logs sent by the remote workers
+    """
+
+    def process_request(self, request):
+        if request.META.get("HTTP_CONTENT_ENCODING", "").lower() != "gzip":
+            return
+        max_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            if max_size is None:
+                body = decompressor.decompress(request.body)
+            else:
+                body = decompressor.decompress(request.body, max_size + 1)
+        except zlib.error:
+            raise SuspiciousOperation("The request body is not valid gzip")
+        if max_size is not None and len(body) > max_size:
+            raise RequestDataTooBig(
+                "The decompressed request body exceeds "
+                "settings.DATA_UPLOAD_MAX_MEMORY_SIZE."
+            )
+        if not decompressor.eof:
+            raise SuspiciousOperation("The gzipped request body is truncated")
+        del request.META["HTTP_CONTENT_ENCODING"]
+        request.META["CONTENT_LENGTH"] = str(len(body))
+        request._body = body
+        request._stream = BytesIO(body)
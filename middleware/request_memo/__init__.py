@@ -0,0 +1,3 @@
+from .request_memo_middleware import RequestMemoMiddleware
+
+__all__ = [RequestMemoMiddleware]
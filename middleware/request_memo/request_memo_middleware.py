@@ -0,0 +1,15 @@
+from base.utils import request_memo
+
+
+class RequestMemoMiddleware:
+    """
+    Memoizes values for the duration of a request, like the roles of the
+    user in a challenge which are checked several times per request
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_memo():
+            return self.get_response(request)
@@ -1,9 +1,18 @@
 from datetime import datetime, timedelta
-import time
 import pytz  # Use this to handle timezones if needed
 import os
+from challenge_runner import get_rate_limiter, run_for_challenges
 from evalai_interface import EvalAI_Interface
 
+# Provide your AUTH_TOKEN and EVALAI_API_SERVER
+AUTH_TOKEN = os.environ.get("AUTH_TOKEN")
+EVALAI_API_SERVER = os.environ.get("API_HOST_URL")
+# Number of submissions cancelled per request, at most the
+# `MAX_BULK_SUBMISSION_UPDATES` accepted by the API
+MAX_BULK_SUBMISSION_UPDATES = int(
+    os.environ.get("MAX_BULK_SUBMISSION_UPDATES", 1000)
+)
+
 
 def get_submission_time(submission):
     # Get the submission time based on the presence of "rerun_resumed_at"
@@ -22,7 +31,9 @@ def auto_cancel_submissions(challenge_pk, days_threshold=14):
     :param days_threshold: The number of days after which submissions should be canceled (default is 14).
     """
     try:
-        evalai = EvalAI_Interface(AUTH_TOKEN, EVALAI_API_SERVER)
+        evalai = EvalAI_Interface(
+            AUTH_TOKEN, EVALAI_API_SERVER, get_rate_limiter("evalai")
+        )
 
         submissions = evalai.get_submissions_for_challenge(
             challenge_pk, "submitted"
@@ -35,34 +46,53 @@ def auto_cancel_submissions(challenge_pk, days_threshold=14):
         )
 
         current_time = datetime.now(pytz.utc)
+        stale_submissions = {}
         for submission in submissions:
-            status = submission["status"]
             submission_time = get_submission_time(submission)
             submission_time = pytz.utc.localize(submission_time)
 
             time_difference = current_time - submission_time
             if time_difference > timedelta(days=days_threshold):
-                data = {
-                    "submission": submission["id"],
-                    "submission_status": "cancelled",
-                }
-                evalai.update_submission_data(data, challenge_pk)
+                stale_submissions[submission["id"]] = (
+                    submission["status"],
+                    time_difference,
+                )
+        if not stale_submissions:
+            return []
+
+        # The stale submissions are cancelled in bulk, in as few requests as
+        # the API accepts
+        stale_submission_pks = list(stale_submissions)
+        updated_submissions = []
+        for index in range(
+            0, len(stale_submission_pks), MAX_BULK_SUBMISSION_UPDATES
+        ):
+            response = evalai.update_submissions_status(
+                challenge_pk,
+                stale_submission_pks[
+                    index:index + MAX_BULK_SUBMISSION_UPDATES
+                ],
+                "cancelled",
+            )
+            for submission_pk in response["updated_submissions"]:
+                status, time_difference = stale_submissions[submission_pk]
                 print(
-                    f"Cancelled submission with PK {submission['id']}. Previous status: {status}. Time Lapsed: {time_difference}"
+                    f"Cancelled submission with PK {submission_pk}. "
+                    f"Previous status: {status}. "
+                    f"Time Lapsed: {time_difference}"
                 )
-                time.sleep(1)
+            updated_submissions += response["updated_submissions"]
+        return updated_submissions
     except Exception as e:
-        raise (f"Error in auto-cancel script: {str(e)}")
+        raise Exception(f"Error in auto-cancel script: {str(e)}") from e
 
 
 # Example usage:
 if __name__ == "__main__":
-    # Provide your AUTH_TOKEN and EVALAI_API_SERVER
-    AUTH_TOKEN = os.environ.get("AUTH_TOKEN")
-    EVALAI_API_SERVER = os.environ.get("API_HOST_URL")
-
     # Initialize the EvalAI_Interface
-    evalai = EvalAI_Interface(AUTH_TOKEN, EVALAI_API_SERVER)
+    evalai = EvalAI_Interface(
+        AUTH_TOKEN, EVALAI_API_SERVER, get_rate_limiter("evalai")
+    )
 
     all_challenge_endpoint = "{}/api/challenges/challenge/all/all/all".format(
         EVALAI_API_SERVER
@@ -76,9 +106,7 @@ if __name__ == "__main__":
         challenges.extend(response["results"])
         next_page = response["next"]
 
-    # Loop through all challenges and run the auto-cancel script for each challenge
-    for challenge in challenges:
-        challenge_pk = challenge["id"]
-        print(f"Running auto-cancel script for challenge {challenge_pk}")
-        auto_cancel_submissions(challenge_pk)
-        time.sleep(5)
+    # Run the auto-cancel script for the challenges concurrently
+    run_for_challenges(
+        lambda challenge: auto_cancel_submissions(challenge["id"]), challenges
+    )
@@ -1,11 +1,11 @@
 import json
 import os
-import time
 import warnings
 from datetime import datetime
 
 import boto3
 import pytz
+from challenge_runner import get_rate_limiter, run_for_challenges
 from dateutil.parser import parse
 from evalai_interface import EvalAI_Interface
 
@@ -36,12 +36,16 @@ with open(json_path, "r") as f:
 
 
 def create_evalai_interface(auth_token):
-    evalai_interface = EvalAI_Interface(auth_token, EVALAI_ENDPOINT)
+    evalai_interface = EvalAI_Interface(
+        auth_token, EVALAI_ENDPOINT, get_rate_limiter("evalai")
+    )
     return evalai_interface
 
 
 def get_boto3_client(resource, aws_keys):
-    client = boto3.client(
+    # The default boto3 session is not thread safe, each challenge is scaled
+    # from its own thread
+    client = boto3.session.Session().client(
         resource,
         region_name=aws_keys["AWS_REGION"],
         aws_access_key_id=aws_keys["AWS_ACCESS_KEY_ID"],
@@ -51,7 +55,9 @@ def get_boto3_client(resource, aws_keys):
 
 
 def get_nodegroup_name(eks_client, cluster_name):
-    nodegroup_list = eks_client.list_nodegroups(clusterName=cluster_name)
+    nodegroup_list = get_rate_limiter("aws").call(
+        eks_client.list_nodegroups, clusterName=cluster_name
+    )
     return nodegroup_list["nodegroups"][0]
 
 
@@ -66,8 +72,10 @@ def get_eks_meta(challenge, evalai_interface, aws_keys):
 
 
 def get_scaling_config(eks_client, cluster_name, nodegroup_name):
-    nodegroup_desc = eks_client.describe_nodegroup(
-        clusterName=cluster_name, nodegroupName=nodegroup_name
+    nodegroup_desc = get_rate_limiter("aws").call(
+        eks_client.describe_nodegroup,
+        clusterName=cluster_name,
+        nodegroupName=nodegroup_name,
     )
     scaling_config = nodegroup_desc["nodegroup"]["scalingConfig"]
     return scaling_config
@@ -82,7 +90,8 @@ def start_eks_worker(challenge, pending_submissions, evalai_interface, aws_keys,
         "maxSize": max(new_desired_size, pending_submissions),
         "desiredSize": new_desired_size,
     }
-    response = eks_client.update_nodegroup_config(
+    response = get_rate_limiter("aws").call(
+        eks_client.update_nodegroup_config,
         clusterName=cluster_name,
         nodegroupName=nodegroup_name,
         scalingConfig=scaling_config,
@@ -99,7 +108,8 @@ def stop_eks_worker(challenge, evalai_interface, aws_keys):
         "maxSize": 1,
         "desiredSize": 0,
     }
-    response = eks_client.update_nodegroup_config(
+    response = get_rate_limiter("aws").call(
+        eks_client.update_nodegroup_config,
         clusterName=cluster_name,
         nodegroupName=nodegroup_name,
         scalingConfig=scaling_config,
@@ -206,41 +216,49 @@ def scale_up_or_down_workers(challenge, evalai_interface, staff_evalai_interface
             )
 
 
+def scale_challenge(challenge_id, details, staff_evalai_interface):
+    # Auth Token
+    if "auth_token" not in details:
+        raise NotImplementedError("auth_token is needed for all challenges")
+
+    # Desired Scale Up Size
+    if "scale_up_desired_size" not in details:
+        scale_up_desired_size = SCALE_UP_DESIRED_SIZE
+    else:
+        scale_up_desired_size = details["scale_up_desired_size"]
+
+    # AWS Keys
+    if "aws_keys" in details:
+        aws_keys = details["aws_keys"]
+    else:
+        aws_keys = DEFAULT_AWS_EKS_KEYS
+
+    evalai_interface = create_evalai_interface(details["auth_token"])
+    challenge = evalai_interface.get_challenge_by_pk(challenge_id)
+    assert (
+        challenge["is_docker_based"] and not challenge["remote_evaluation"]
+    ), "Challenge ID: {}, Title: {} is either not docker-based or remote-evaluation. Skipping.".format(
+        challenge["id"], challenge["title"]
+    )
+    scale_up_or_down_workers(challenge, evalai_interface, staff_evalai_interface, aws_keys, scale_up_desired_size)
+
+
 # Cron Job
 def start_job():
 
     # Get metrics
     staff_evalai_interface = create_evalai_interface(STAFF_AUTH_TOKEN)
 
-    for challenge_id, details in INCLUDED_CHALLENGE_PKS.items():
-        # Auth Token
-        if "auth_token" not in details:
-            raise NotImplementedError("auth_token is needed for all challenges")
-
-        # Desired Scale Up Size
-        if "scale_up_desired_size" not in details:
-            scale_up_desired_size = SCALE_UP_DESIRED_SIZE
-        else:
-            scale_up_desired_size = details["scale_up_desired_size"]
-
-        # AWS Keys
-        if "aws_keys" in details:
-            aws_keys = details["aws_keys"]
-        else:
-            aws_keys = DEFAULT_AWS_EKS_KEYS
-
-        try:
-            evalai_interface = create_evalai_interface(details["auth_token"])
-            challenge = evalai_interface.get_challenge_by_pk(challenge_id)
-            assert (
-                challenge["is_docker_based"] and not challenge["remote_evaluation"]
-            ), "Challenge ID: {}, Title: {} is either not docker-based or remote-evaluation. Skipping.".format(
-                challenge["id"], challenge["title"]
-            )
-            scale_up_or_down_workers(challenge, evalai_interface, staff_evalai_interface, aws_keys, scale_up_desired_size)
-            time.sleep(1)
-        except Exception as e:
-            print(e)
+    # The challenge details are only known once fetched with the token of
+    # the challenge, so they are reported by their pks
+    run_for_challenges(
+        lambda challenge: scale_challenge(
+            challenge["id"],
+            INCLUDED_CHALLENGE_PKS[challenge["id"]],
+            staff_evalai_interface,
+        ),
+        [{"id": challenge_id} for challenge_id in INCLUDED_CHALLENGE_PKS],
+    )
 
 
 if __name__ == "__main__":
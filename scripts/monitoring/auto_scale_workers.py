@@ -5,6 +5,7 @@ import warnings
 from datetime import datetime
 from dateutil.parser import parse
 from auto_stop_workers import start_worker, stop_worker
+from challenge_runner import get_rate_limiter, run_for_challenges
 from evalai_interface import EvalAI_Interface
 
 warnings.filterwarnings("ignore")
@@ -26,7 +27,9 @@ def get_pending_submission_count(challenge_metrics):
 
 def scale_down_workers(challenge, num_workers):
     if num_workers > 0:
-        response = stop_worker(challenge["id"])
+        response = get_rate_limiter("evalai").call(
+            stop_worker, challenge["id"]
+        )
         print("AWS API Response: {}".format(response))
         print(
             "Stopped worker for Challenge ID: {}, Title: {}".format(
@@ -43,7 +46,9 @@ def scale_down_workers(challenge, num_workers):
 
 def scale_up_workers(challenge, num_workers):
     if num_workers == 0:
-        response = start_worker(challenge["id"])
+        response = get_rate_limiter("evalai").call(
+            start_worker, challenge["id"]
+        )
         print("AWS API Response: {}".format(response))
         print(
             "Started worker for Challenge ID: {}, Title: {}.".format(
@@ -74,7 +79,9 @@ def scale_up_or_down_workers(challenge, challenge_metrics):
     )
 
     print(
-        "Num Workers: {}, Pending Submissions: {}".format(num_workers, pending_submissions)
+        "Challenge ID: {}, Num Workers: {}, Pending Submissions: {}".format(
+            challenge["id"], num_workers, pending_submissions
+        )
     )
 
     if (
@@ -87,7 +94,6 @@ def scale_up_or_down_workers(challenge, challenge_metrics):
         scale_up_workers(challenge, num_workers)
 
 
-# TODO: Factor in limits for the APIs
 def scale_up_or_down_workers_for_challenge(challenge, challenge_metrics):
     if ENV == "prod":
         try:
@@ -102,17 +108,27 @@ def scale_up_or_down_workers_for_challenge(challenge, challenge_metrics):
             print(e)
 
 
-def scale_up_or_down_workers_for_challenges(response, evalai_interface):
-    for challenge in response["results"]:
-        try:
-            challenge_metrics = evalai_interface.get_challenge_submission_metrics_by_pk(challenge["id"])
-            scale_up_or_down_workers_for_challenge(challenge, challenge_metrics)
-        except Exception as e:
-            print(e)
+def scale_up_or_down_workers_for_challenges(challenges, evalai_interface):
+    try:
+        submission_metrics = evalai_interface.get_challenges_submission_metrics(
+            [challenge["id"] for challenge in challenges]
+        )
+    except Exception as e:
+        print(e)
+        return
+
+    def scale_challenge(challenge):
+        # The metrics are keyed by the challenge pks as strings in JSON
+        challenge_metrics = submission_metrics[str(challenge["id"])]
+        scale_up_or_down_workers_for_challenge(challenge, challenge_metrics)
+
+    run_for_challenges(scale_challenge, challenges)
 
 
 def create_evalai_interface(auth_token, evalai_endpoint):
-    evalai_interface = EvalAI_Interface(auth_token, evalai_endpoint)
+    evalai_interface = EvalAI_Interface(
+        auth_token, evalai_endpoint, get_rate_limiter("evalai")
+    )
     return evalai_interface
 
 
@@ -120,12 +136,14 @@ def create_evalai_interface(auth_token, evalai_endpoint):
 def start_job():
     evalai_interface = create_evalai_interface(auth_token, evalai_endpoint)
     response = evalai_interface.get_challenges()
-    scale_up_or_down_workers_for_challenges(response, evalai_interface)
+    challenges = response["results"]
     next_page = response["next"]
     while next_page is not None:
         response = evalai_interface.make_request(next_page, "GET")
-        scale_up_or_down_workers_for_challenges(response, evalai_interface)
+        challenges.extend(response["results"])
         next_page = response["next"]
+    # The metrics of all the challenges are fetched with a single request
+    scale_up_or_down_workers_for_challenges(challenges, evalai_interface)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,263 @@
+import json
+import os
+import time
+import warnings
+from datetime import datetime
+
+import boto3
+import pytz
+from autoscaling_policy import AutoscalingController, ScalingPolicy
+from dateutil.parser import parse
+from evalai_interface import EvalAI_Interface
+
+warnings.filterwarnings("ignore")
+
+ENV = os.environ.get("ENV", "dev")
+evalai_endpoint = os.environ.get("API_HOST_URL", "http://localhost:8000")
+auth_token = os.environ.get("AUTH_TOKEN")
+
+# Seconds between two scaling decisions
+AUTOSCALING_INTERVAL = int(os.environ.get("AUTOSCALING_INTERVAL", 30))
+# Seconds between two refreshes of the list of challenges
+CHALLENGES_REFRESH_INTERVAL = int(
+    os.environ.get("CHALLENGES_REFRESH_INTERVAL", 600)
+)
+# Number of challenges whose scaling metrics are fetched per request
+SCALING_METRICS_BATCH_SIZE = 100
+
+# JSON file of the code upload challenges whose EKS nodegroups are scaled,
+# in the format used by auto_scale_eks_nodes.py
+EKS_CHALLENGES_JSON_PATH = os.environ.get("EKS_CHALLENGES_JSON_PATH")
+DEFAULT_AWS_EKS_KEYS = {
+    "AWS_ACCESS_KEY_ID": os.environ.get("EKS_AWS_ACCESS_KEY_ID"),
+    "AWS_SECRET_ACCESS_KEY": os.environ.get("EKS_AWS_SECRET_ACCESS_KEY"),
+    "AWS_REGION": os.environ.get("EKS_AWS_REGION"),
+}
+
+
+def get_scaling_policy():
+    return ScalingPolicy(
+        target_drain_time=int(
+            os.environ.get("AUTOSCALING_TARGET_DRAIN_TIME", 600)
+        ),
+        max_workers=int(os.environ.get("AUTOSCALING_MAX_WORKERS", 10)),
+        scale_up_cooldown=int(
+            os.environ.get("AUTOSCALING_SCALE_UP_COOLDOWN", 60)
+        ),
+        scale_down_window=int(
+            os.environ.get("AUTOSCALING_SCALE_DOWN_WINDOW", 600)
+        ),
+        scale_down_tolerance=float(
+            os.environ.get("AUTOSCALING_SCALE_DOWN_TOLERANCE", 0.2)
+        ),
+    )
+
+
+class ECSWorkers:
+    """Scales the ECS workers of challenges through the EvalAI API"""
+
+    def __init__(self, evalai_interface):
+        self.evalai_interface = evalai_interface
+
+    def get_max_workers(self, challenge):
+        # A code upload challenge has a single worker, which submits the
+        # jobs to its cluster
+        return 1 if challenge["is_docker_based"] else None
+
+    def get_workers(self, challenge, metrics):
+        return metrics["workers"] or 0
+
+    def scale(self, challenge, num_of_tasks):
+        return self.evalai_interface.scale_challenge_workers(
+            challenge["id"], num_of_tasks
+        )
+
+
+class EKSNodegroups:
+    """
+    Scales the nodegroups of code upload challenges. The boto3 clients and
+    the nodegroup names are kept for the lifetime of the controller.
+    """
+
+    def __init__(self, challenge_details):
+        self.challenge_details = challenge_details
+        self.clients = {}
+        self.nodegroups = {}
+
+    def get_client(self, aws_keys):
+        key = (aws_keys["AWS_ACCESS_KEY_ID"], aws_keys["AWS_REGION"])
+        if key not in self.clients:
+            self.clients[key] = boto3.client(
+                "eks",
+                region_name=aws_keys["AWS_REGION"],
+                aws_access_key_id=aws_keys["AWS_ACCESS_KEY_ID"],
+                aws_secret_access_key=aws_keys["AWS_SECRET_ACCESS_KEY"],
+            )
+        return self.clients[key]
+
+    def get_nodegroup(self, challenge):
+        """
+        Returns:
+            [tuple] -- EKS client, cluster name and nodegroup name of a challenge
+        """
+        details = self.challenge_details[str(challenge["id"])]
+        eks_client = self.get_client(
+            details.get("aws_keys", DEFAULT_AWS_EKS_KEYS)
+        )
+        if challenge["id"] not in self.nodegroups:
+            evalai_interface = EvalAI_Interface(
+                details["auth_token"], evalai_endpoint
+            )
+            cluster_name = evalai_interface.get_aws_eks_cluster_details(
+                challenge["id"]
+            )["name"]
+            nodegroup_name = eks_client.list_nodegroups(
+                clusterName=cluster_name
+            )["nodegroups"][0]
+            self.nodegroups[challenge["id"]] = (cluster_name, nodegroup_name)
+        return (eks_client,) + self.nodegroups[challenge["id"]]
+
+    def get_max_workers(self, challenge):
+        return self.challenge_details[str(challenge["id"])].get(
+            "scale_up_desired_size"
+        )
+
+    def get_workers(self, challenge, metrics):
+        eks_client, cluster_name, nodegroup_name = self.get_nodegroup(
+            challenge
+        )
+        nodegroup = eks_client.describe_nodegroup(
+            clusterName=cluster_name, nodegroupName=nodegroup_name
+        )
+        return nodegroup["nodegroup"]["scalingConfig"]["desiredSize"]
+
+    def scale(self, challenge, num_of_nodes):
+        eks_client, cluster_name, nodegroup_name = self.get_nodegroup(
+            challenge
+        )
+        return eks_client.update_nodegroup_config(
+            clusterName=cluster_name,
+            nodegroupName=nodegroup_name,
+            scalingConfig={
+                "minSize": min(num_of_nodes, 1),
+                "maxSize": max(num_of_nodes, 1),
+                "desiredSize": num_of_nodes,
+            },
+        )
+
+
+def get_active_challenges(evalai_interface):
+    """Returns the challenges whose workers are autoscaled"""
+    response = evalai_interface.get_challenges()
+    challenges = response["results"]
+    while response["next"] is not None:
+        response = evalai_interface.make_request(response["next"], "GET")
+        challenges.extend(response["results"])
+    now = pytz.UTC.localize(datetime.utcnow())
+    # The workers of ended challenges are deleted by auto_stop_workers.py
+    return [
+        challenge
+        for challenge in challenges
+        if parse(challenge["end_date"]) > now
+        and not (ENV == "prod" and challenge["remote_evaluation"])
+    ]
+
+
+def get_scaling_metrics(evalai_interface, challenges):
+    scaling_metrics = {}
+    for index in range(0, len(challenges), SCALING_METRICS_BATCH_SIZE):
+        scaling_metrics.update(
+            evalai_interface.get_challenges_scaling_metrics(
+                [
+                    challenge["id"]
+                    for challenge in challenges[
+                        index:index + SCALING_METRICS_BATCH_SIZE
+                    ]
+                ]
+            )
+        )
+    return scaling_metrics
+
+
+def scale_challenge(controller, scaler, challenge, metrics):
+    current_workers = scaler.get_workers(challenge, metrics)
+    target_workers = controller.get_target_workers(
+        challenge["id"],
+        metrics,
+        current_workers,
+        scaler.get_max_workers(challenge),
+    )
+    if target_workers == current_workers:
+        return
+    response = scaler.scale(challenge, target_workers)
+    controller.record_scaling(challenge["id"], current_workers, target_workers)
+    print(
+        "Scaled workers of Challenge ID: {}, Title: {} from {} to {}, "
+        "Response: {}".format(
+            challenge["id"],
+            challenge["title"],
+            current_workers,
+            target_workers,
+            response,
+        )
+    )
+
+
+def run_controller(controller, evalai_interface, ecs_workers, eks_nodegroups):
+    challenges = []
+    challenges_refreshed_at = None
+    while True:
+        started_at = time.monotonic()
+        try:
+            if (
+                challenges_refreshed_at is None
+                or started_at - challenges_refreshed_at
+                >= CHALLENGES_REFRESH_INTERVAL
+            ):
+                challenges = get_active_challenges(evalai_interface)
+                challenges_refreshed_at = started_at
+            # The metrics are keyed by the challenge pks as strings in JSON
+            scaling_metrics = get_scaling_metrics(evalai_interface, challenges)
+        except Exception as e:
+            print(e)
+            scaling_metrics = {}
+        for challenge in challenges:
+            if str(challenge["id"]) in eks_nodegroups.challenge_details:
+                scaler = eks_nodegroups
+            else:
+                scaler = ecs_workers
+            try:
+                scale_challenge(
+                    controller,
+                    scaler,
+                    challenge,
+                    scaling_metrics[str(challenge["id"])],
+                )
+            except Exception as e:
+                print(
+                    "Unable to scale workers of Challenge ID: {}, Title: {}: {}".format(
+                        challenge["id"], challenge["title"], e
+                    )
+                )
+        time.sleep(
+            max(0, AUTOSCALING_INTERVAL - (time.monotonic() - started_at))
+        )
+
+
+def main():
+    evalai_interface = EvalAI_Interface(auth_token, evalai_endpoint)
+    eks_challenge_details = {}
+    if EKS_CHALLENGES_JSON_PATH:
+        with open(os.path.expanduser(EKS_CHALLENGES_JSON_PATH), "r") as f:
+            eks_challenge_details = json.load(f)
+    run_controller(
+        AutoscalingController(get_scaling_policy()),
+        evalai_interface,
+        ECSWorkers(evalai_interface),
+        EKSNodegroups(eks_challenge_details),
+    )
+
+
+if __name__ == "__main__":
+    print("Starting worker autoscaling controller")
+    main()
@@ -0,0 +1,145 @@
+import math
+import time
+from collections import deque
+
+# Seconds a worker is assumed to take per submission before any submission
+# of the challenge has finished
+DEFAULT_EVALUATION_TIME = 300
+
+
+class ScalingPolicy:
+    """
+    Computes the number of workers a challenge needs to evaluate its
+    backlog within `target_drain_time` seconds, given how long its latest
+    evaluations took.
+
+    Scaling up is limited by `scale_up_cooldown` and `max_workers`. Scaling
+    down uses the highest recommendation of the last `scale_down_window`
+    seconds, and is skipped while the overcapacity stays within
+    `scale_down_tolerance`, so that short lulls don't make the workers flap.
+    """
+
+    def __init__(
+        self,
+        target_drain_time=600,
+        max_workers=10,
+        scale_up_cooldown=60,
+        scale_down_window=600,
+        scale_down_tolerance=0.2,
+    ):
+        self.target_drain_time = target_drain_time
+        self.max_workers = max_workers
+        self.scale_up_cooldown = scale_up_cooldown
+        self.scale_down_window = scale_down_window
+        self.scale_down_tolerance = scale_down_tolerance
+
+    def get_backlog(self, metrics):
+        """
+        Returns the number of submissions waiting for or being evaluated,
+        from the queue depth when it is known and the submission statuses
+        """
+        backlog = metrics.get("pending_submissions") or 0
+        if metrics.get("queue_messages") is not None:
+            backlog = max(
+                backlog,
+                metrics["queue_messages"]
+                + (metrics.get("queue_messages_in_flight") or 0),
+            )
+        return backlog
+
+    def get_desired_workers(self, metrics, max_workers=None):
+        """
+        Arguments:
+            metrics {[dict]} -- Scaling metrics of a challenge
+            max_workers {[int]} -- Cap of the challenge, the policy cap if None
+
+        Returns:
+            [int] -- Number of workers needed by the challenge
+        """
+        backlog = self.get_backlog(metrics)
+        if backlog == 0:
+            return 0
+        evaluation_time = (
+            metrics.get("evaluation_time_p90")
+            or metrics.get("evaluation_time_p50")
+            or DEFAULT_EVALUATION_TIME
+        )
+        desired = math.ceil(
+            backlog * evaluation_time / self.target_drain_time
+        )
+        # A worker evaluates a single submission at a time
+        return max(
+            1,
+            min(
+                desired,
+                backlog,
+                self.max_workers if max_workers is None else max_workers,
+            ),
+        )
+
+
+class AutoscalingController:
+    """
+    Applies a scaling policy to the metrics of challenges over time. It only
+    decides, the callers scale the workers and report it with
+    `record_scaling`, so that the same controller drives the workers and
+    the simulator.
+    """
+
+    def __init__(self, policy, clock=time.monotonic):
+        self.policy = policy
+        self.clock = clock
+        self.last_scaled_up_at = {}
+        self.observed_since = {}
+        self.recommendations = {}
+
+    def get_target_workers(
+        self, challenge_pk, metrics, current_workers, max_workers=None
+    ):
+        """
+        Arguments:
+            challenge_pk {[int]} -- Challenge primary key
+            metrics {[dict]} -- Scaling metrics of the challenge
+            current_workers {[int]} -- Number of workers of the challenge
+            max_workers {[int]} -- Cap of the challenge, the policy cap if None
+
+        Returns:
+            [int] -- Number of workers to scale to, `current_workers` to keep them
+        """
+        now = self.clock()
+        desired = self.policy.get_desired_workers(metrics, max_workers)
+        observed_since = self.observed_since.setdefault(challenge_pk, now)
+        recommendations = self.recommendations.setdefault(
+            challenge_pk, deque()
+        )
+        recommendations.append((now, desired))
+        while recommendations[0][0] < now - self.policy.scale_down_window:
+            recommendations.popleft()
+
+        if desired > current_workers:
+            last_scaled_up_at = self.last_scaled_up_at.get(challenge_pk)
+            if (
+                last_scaled_up_at is not None
+                and now - last_scaled_up_at < self.policy.scale_up_cooldown
+            ):
+                return current_workers
+            return desired
+
+        # Scaling down waits for a whole window of recommendations
+        if now - observed_since < self.policy.scale_down_window:
+            return current_workers
+        target = max(
+            recommendation for _, recommendation in recommendations
+        )
+        if target >= current_workers:
+            return current_workers
+        if target > 0 and target >= current_workers * (
+            1 - self.policy.scale_down_tolerance
+        ):
+            return current_workers
+        return target
+
+    def record_scaling(self, challenge_pk, previous_workers, workers):
+        """Records that the workers of a challenge were scaled"""
+        if workers > previous_workers:
+            self.last_scaled_up_at[challenge_pk] = self.clock()
@@ -0,0 +1,205 @@
+"""
+Replays the historical submissions of a challenge against an autoscaling
+policy to compare policies offline, before changing the controller.
+
+The submissions are read from a CSV file with the `submitted_at`,
+`started_at` and `completed_at` columns of the finished submissions,
+e.g. exported with:
+
+    Submission.objects.filter(
+        challenge_phase__challenge=challenge, status="finished"
+    ).values_list("submitted_at", "started_at", "completed_at")
+
+Usage:
+    python autoscaling_simulator.py submissions.csv --max-workers 5
+"""
+import argparse
+import csv
+import heapq
+from collections import deque
+
+from autoscaling_policy import AutoscalingController, ScalingPolicy
+from dateutil.parser import parse
+
+EVALUATION_TIME_SAMPLE_SIZE = 50
+
+
+def load_submissions(path):
+    """
+    Returns:
+        [list] -- Submission time as a UNIX timestamp and evaluation time in seconds
+                  of the submissions, by submission time
+    """
+    submissions = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if not row["started_at"] or not row["completed_at"]:
+                continue
+            evaluation_time = (
+                parse(row["completed_at"]) - parse(row["started_at"])
+            ).total_seconds()
+            submissions.append(
+                (parse(row["submitted_at"]).timestamp(), evaluation_time)
+            )
+    return sorted(submissions)
+
+
+def get_percentile(values, percentile):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, -(-len(values) * percentile // 100) - 1)]
+
+
+class Simulation:
+    """
+    Simulates the workers of a challenge evaluating submissions in order of
+    submission, with the scaling decisions taken every `interval` seconds.
+    New workers evaluate submissions after `startup_time` seconds and
+    workers are only removed once idle.
+    """
+
+    def __init__(self, submissions, policy, interval=30, startup_time=120):
+        self.submissions = submissions
+        self.interval = interval
+        self.startup_time = startup_time
+        self.now = submissions[0][0] if submissions else 0
+        self.controller = AutoscalingController(
+            policy, clock=lambda: self.now
+        )
+        # Time from which each worker is free
+        self.workers = []
+        self.workers_to_remove = 0
+        self.waiting = deque()
+        self.next_submission = 0
+        self.evaluation_times = deque(maxlen=EVALUATION_TIME_SAMPLE_SIZE)
+        self.running = []
+        self.wait_times = []
+        self.worker_seconds = 0
+        self.scaling_actions = 0
+
+    def evaluate_until(self, end):
+        """Starts the waiting submissions which a worker picks before `end`"""
+        while (
+            self.next_submission < len(self.submissions)
+            and self.submissions[self.next_submission][0] < end
+        ):
+            self.waiting.append(self.submissions[self.next_submission])
+            self.next_submission += 1
+        while self.waiting and self.workers:
+            submitted_at, evaluation_time = self.waiting[0]
+            started_at = max(submitted_at, self.workers[0])
+            if started_at >= end:
+                break
+            self.waiting.popleft()
+            heapq.heapreplace(self.workers, started_at + evaluation_time)
+            heapq.heappush(
+                self.running, (started_at + evaluation_time, evaluation_time)
+            )
+            self.wait_times.append(started_at - submitted_at)
+
+    def get_metrics(self):
+        while self.running and self.running[0][0] <= self.now:
+            self.evaluation_times.append(heapq.heappop(self.running)[1])
+        waiting = sum(
+            1 for submitted_at, _ in self.waiting if submitted_at <= self.now
+        )
+        return {
+            "workers": len(self.workers),
+            "pending_submissions": waiting + len(self.running),
+            "queue_messages": waiting,
+            "queue_messages_in_flight": len(self.running),
+            "evaluation_time_p50": get_percentile(self.evaluation_times, 50),
+            "evaluation_time_p90": get_percentile(self.evaluation_times, 90),
+        }
+
+    def remove_idle_workers(self):
+        busy_workers = [
+            free_at for free_at in self.workers if free_at > self.now
+        ]
+        idle_workers = len(self.workers) - len(busy_workers)
+        removed = min(self.workers_to_remove, idle_workers)
+        self.workers = busy_workers + [self.now] * (idle_workers - removed)
+        heapq.heapify(self.workers)
+        self.workers_to_remove -= removed
+
+    def scale(self):
+        current_workers = len(self.workers) - self.workers_to_remove
+        target_workers = self.controller.get_target_workers(
+            0, self.get_metrics(), current_workers
+        )
+        if target_workers == current_workers:
+            return
+        self.scaling_actions += 1
+        self.controller.record_scaling(0, current_workers, target_workers)
+        if target_workers > current_workers:
+            added = target_workers - current_workers
+            # Workers being removed are kept instead of starting new ones
+            kept = min(added, self.workers_to_remove)
+            self.workers_to_remove -= kept
+            for _ in range(added - kept):
+                heapq.heappush(self.workers, self.now + self.startup_time)
+        else:
+            self.workers_to_remove += current_workers - target_workers
+
+    def run(self):
+        while (
+            self.next_submission < len(self.submissions)
+            or self.waiting
+            or self.running
+        ):
+            self.remove_idle_workers()
+            self.scale()
+            self.evaluate_until(self.now + self.interval)
+            self.worker_seconds += len(self.workers) * self.interval
+            self.now += self.interval
+        return self.get_report()
+
+    def get_report(self):
+        return {
+            "submissions": len(self.wait_times),
+            "mean_wait_time": (
+                sum(self.wait_times) / len(self.wait_times)
+                if self.wait_times
+                else 0
+            ),
+            "p50_wait_time": get_percentile(self.wait_times, 50),
+            "p95_wait_time": get_percentile(self.wait_times, 95),
+            "max_wait_time": max(self.wait_times, default=None),
+            "worker_hours": self.worker_seconds / 3600,
+            "scaling_actions": self.scaling_actions,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replays historical submissions against an autoscaling policy"
+    )
+    parser.add_argument("submissions_csv")
+    parser.add_argument("--interval", type=int, default=30)
+    parser.add_argument("--startup-time", type=int, default=120)
+    parser.add_argument("--target-drain-time", type=int, default=600)
+    parser.add_argument("--max-workers", type=int, default=10)
+    parser.add_argument("--scale-up-cooldown", type=int, default=60)
+    parser.add_argument("--scale-down-window", type=int, default=600)
+    parser.add_argument("--scale-down-tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    policy = ScalingPolicy(
+        target_drain_time=args.target_drain_time,
+        max_workers=args.max_workers,
+        scale_up_cooldown=args.scale_up_cooldown,
+        scale_down_window=args.scale_down_window,
+        scale_down_tolerance=args.scale_down_tolerance,
+    )
+    report = Simulation(
+        load_submissions(args.submissions_csv),
+        policy,
+        interval=args.interval,
+        startup_time=args.startup_time,
+    ).run()
+    for key, value in report.items():
+        print("{}: {}".format(key, value))
+
+
+if __name__ == "__main__":
+    main()
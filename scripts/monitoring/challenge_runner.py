@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of challenges processed at the same time by the monitoring scripts
+MONITORING_MAX_WORKERS = int(os.environ.get("MONITORING_MAX_WORKERS", 10))
+# Requests per second sent by a monitoring script to each API
+API_RATE_LIMITS = {
+    "evalai": float(os.environ.get("EVALAI_REQUESTS_PER_SECOND", 10)),
+    "aws": float(os.environ.get("AWS_REQUESTS_PER_SECOND", 5)),
+}
+
+RATE_LIMITERS = {}
+RATE_LIMITERS_LOCK = threading.Lock()
+
+
+class RateLimiter:
+    """
+    Token bucket shared by the threads of a script, which allows bursts of
+    up to one second of requests
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request can be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.rate,
+                    self.tokens + (now - self.updated_at) * self.rate,
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+    def call(self, function, *args, **kwargs):
+        """Calls a function, e.g. a boto3 client method, within the rate"""
+        self.acquire()
+        return function(*args, **kwargs)
+
+
+def get_rate_limiter(api):
+    """
+    Returns the rate limiter of an API shared by the whole script
+
+    Arguments:
+        api {[str]} -- Key of the API in `API_RATE_LIMITS`
+
+    Returns:
+        [RateLimiter] -- Rate limiter of the API
+    """
+    with RATE_LIMITERS_LOCK:
+        if api not in RATE_LIMITERS:
+            RATE_LIMITERS[api] = RateLimiter(API_RATE_LIMITS[api])
+        return RATE_LIMITERS[api]
+
+
+def run_for_challenges(
+    function, challenges, max_workers=MONITORING_MAX_WORKERS
+):
+    """
+    Calls `function(challenge)` for every challenge on a bounded thread
+    pool, and reports how long each challenge took and which ones failed
+
+    Arguments:
+        function {[callable]} -- Function processing a challenge
+        challenges {[list]} -- Challenges, as dicts with their `id` and `title`
+        max_workers {[int]} -- Number of challenges processed at the same time
+
+    Returns:
+        [dict] -- Result of the function per challenge pk, the exception if it raised one
+    """
+
+    def run(challenge):
+        started_at = time.monotonic()
+        try:
+            result = function(challenge)
+        except Exception as e:
+            result = e
+        return result, time.monotonic() - started_at
+
+    started_at = time.monotonic()
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for challenge, (result, duration) in zip(
+            challenges, executor.map(run, challenges)
+        ):
+            results[challenge["id"]] = result
+            print(
+                "Challenge ID: {}, Title: {} took {:.2f}s{}".format(
+                    challenge["id"],
+                    challenge.get("title"),
+                    duration,
+                    ", Error: {}".format(result)
+                    if isinstance(result, Exception)
+                    else "",
+                )
+            )
+    failures = sum(
+        1 for result in results.values() if isinstance(result, Exception)
+    )
+    print(
+        "Processed {} challenges with {} failures in {:.2f}s".format(
+            len(results), failures, time.monotonic() - started_at
+        )
+    )
+    return results
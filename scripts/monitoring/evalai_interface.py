@@ -1,9 +1,27 @@
+import gzip
 import logging
+import os
+import random
 
 import requests
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for connecting to EvalAI and for its responses
+EVALAI_CONNECT_TIMEOUT = float(os.environ.get("EVALAI_CONNECT_TIMEOUT", 10))
+EVALAI_READ_TIMEOUT = float(os.environ.get("EVALAI_READ_TIMEOUT", 120))
+EVALAI_MAX_RETRIES = int(os.environ.get("EVALAI_MAX_RETRIES", 5))
+EVALAI_RETRY_BACKOFF_FACTOR = float(
+    os.environ.get("EVALAI_RETRY_BACKOFF_FACTOR", 1)
+)
+# Number of connections kept alive to EvalAI
+EVALAI_POOL_MAXSIZE = int(os.environ.get("EVALAI_POOL_MAXSIZE", 10))
+# Request bodies of at least this many bytes are sent gzipped, 0 disables it
+EVALAI_GZIP_MIN_SIZE = int(os.environ.get("EVALAI_GZIP_MIN_SIZE", 0))
+
 
 URLS = {
     "get_message_from_sqs_queue": "/api/jobs/challenge/queues/{}/",
@@ -13,6 +31,7 @@ URLS = {
     "get_challenge_by_queue_name": "/api/challenges/challenge/queues/{}/",
     "get_challenge_phase_by_pk": "/api/challenges/challenge/{}/challenge_phase/{}",
     "update_submission_data": "/api/jobs/challenge/{}/update_submission/",
+    "update_submissions_status": "/api/jobs/challenge/{}/update_submissions_status/",
     "get_aws_eks_bearer_token": "/api/jobs/challenge/{}/eks_bearer_token/",
     "get_aws_eks_cluster_details": "/api/challenges/{}/evaluation_cluster/",
     "get_challenge_by_pk": "/api/challenges/challenge/{}/",
@@ -20,15 +39,85 @@ URLS = {
     "get_submissions_for_challenge": "/api/jobs/challenge/{}/submission/",
     "get_challenges_submission_metrics": "/api/challenges/challenge/get_submission_metrics",
     "get_challenge_submission_metrics_by_pk": "/api/challenges/challenge/get_submission_metrics_by_pk/{}/",
+    "get_challenges_scaling_metrics": "/api/challenges/challenge/get_scaling_metrics",
+    "manage_worker": "/api/challenges/{}/manage_worker/{}/",
     "manage_ec2_instance": "/api/challenges/{}/manage_ec2_instance/{}",
     "get_ec2_instance_details": "/api/challenges/{}/get_ec2_instance_details/",
 }
 
 
+class JitteredRetry(Retry):
+    """
+    Retries with a random backoff of up to the exponential one, so that
+    the workers failing together do not retry together
+    """
+
+    def get_backoff_time(self):
+        return random.uniform(0, super(JitteredRetry, self).get_backoff_time())
+
+
+def create_session():
+    """
+    Creates a session keeping the connections to EvalAI alive which retries
+    the failed idempotent requests with backoff
+
+    Returns:
+        [requests.Session] -- HTTP session
+    """
+    retry = JitteredRetry(
+        total=EVALAI_MAX_RETRIES,
+        backoff_factor=EVALAI_RETRY_BACKOFF_FACTOR,
+        status_forcelist=(429, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=EVALAI_POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def send_request(session, method, url, headers=None, data=None):
+    """
+    Sends a request to EvalAI with timeouts, gzipping its body if it is large
+
+    Arguments:
+        session {[requests.Session]} -- HTTP session
+        method {[string]} -- HTTP method
+        url {[string]} -- Request URL
+        headers {[dict]} -- Request headers
+        data {[dict]} -- Request body
+
+    Returns:
+        [requests.Response] -- HTTP response
+    """
+    request = session.prepare_request(
+        requests.Request(method=method, url=url, headers=headers, data=data)
+    )
+    body = request.body
+    if EVALAI_GZIP_MIN_SIZE and body and len(body) >= EVALAI_GZIP_MIN_SIZE:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        request.body = gzip.compress(body)
+        request.headers["Content-Encoding"] = "gzip"
+        request.headers["Content-Length"] = str(len(request.body))
+    settings = session.merge_environment_settings(
+        request.url, {}, None, None, None
+    )
+    return session.send(
+        request,
+        timeout=(EVALAI_CONNECT_TIMEOUT, EVALAI_READ_TIMEOUT),
+        **settings,
+    )
+
+
 class EvalAI_Interface:
-    def __init__(self, AUTH_TOKEN, EVALAI_API_SERVER):
+    def __init__(self, AUTH_TOKEN, EVALAI_API_SERVER, rate_limiter=None):
         self.AUTH_TOKEN = AUTH_TOKEN
         self.EVALAI_API_SERVER = EVALAI_API_SERVER
+        self.session = create_session()
+        # Shared by the interfaces of a script to limit its requests to EvalAI
+        self.rate_limiter = rate_limiter
 
     def get_request_headers(self):
         headers = {"Authorization": "Bearer {}".format(self.AUTH_TOKEN)}
@@ -36,9 +125,11 @@ class EvalAI_Interface:
 
     def make_request(self, url, method, data=None):
         headers = self.get_request_headers()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
         try:
-            response = requests.request(
-                method=method, url=url, headers=headers, data=data
+            response = send_request(
+                self.session, method, url, headers=headers, data=data
             )
             response.raise_for_status()
         except requests.exceptions.RequestException:
@@ -106,6 +197,20 @@ class EvalAI_Interface:
         response = self.make_request(url, "PATCH", data=data)
         return response
 
+    def update_submissions_status(
+        self, challenge_pk, submission_pks, submission_status
+    ):
+        url = URLS.get("update_submissions_status").format(challenge_pk)
+        url = self.return_url_per_environment(url)
+        data = {
+            "submissions": ",".join(
+                str(submission_pk) for submission_pk in submission_pks
+            ),
+            "submission_status": submission_status,
+        }
+        response = self.make_request(url, "PATCH", data=data)
+        return response
+
     def get_aws_eks_bearer_token(self, challenge_pk):
         url = URLS.get("get_aws_eks_bearer_token").format(challenge_pk)
         url = self.return_url_per_environment(url)
@@ -139,9 +244,13 @@ class EvalAI_Interface:
         response = self.make_request(url, "GET")
         return response
 
-    def get_challenges_submission_metrics(self):
+    def get_challenges_submission_metrics(self, challenge_pks=None):
         url = URLS.get("get_challenges_submission_metrics")
         url = self.return_url_per_environment(url)
+        if challenge_pks is not None:
+            url += "?challenge_pks={}".format(
+                ",".join(str(challenge_pk) for challenge_pk in challenge_pks)
+            )
         response = self.make_request(url, "GET")
         return response
 
@@ -152,6 +261,23 @@ class EvalAI_Interface:
         response = self.make_request(url, "GET")
         return response
 
+    def get_challenges_scaling_metrics(self, challenge_pks):
+        url = URLS.get("get_challenges_scaling_metrics")
+        url = self.return_url_per_environment(url)
+        url += "?challenge_pks={}".format(
+            ",".join(str(challenge_pk) for challenge_pk in challenge_pks)
+        )
+        response = self.make_request(url, "GET")
+        return response
+
+    def scale_challenge_workers(self, challenge_pk, num_of_tasks):
+        url_template = URLS.get("manage_worker")
+        url = url_template.format(challenge_pk, "scale")
+        url = self.return_url_per_environment(url)
+        data = {"num_of_tasks": num_of_tasks}
+        response = self.make_request(url, "PUT", data=data)
+        return response
+
     def get_ec2_instance_details(self, challenge_pk):
         url_template = URLS.get("get_ec2_instance_details")
         url = url_template.format(challenge_pk)
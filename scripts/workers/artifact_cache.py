@@ -0,0 +1,381 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from os.path import join
+
+from .downloader import download_file, request_first_segment
+
+logger = logging.getLogger(__name__)
+
+# The cache has to outlive the worker, unlike its temp directory
+ARTIFACT_CACHE_DIR = os.environ.get(
+    "WORKER_ARTIFACT_CACHE_DIR",
+    join(os.path.expanduser("~"), ".cache", "evalai", "artifacts"),
+)
+# Budget of the downloaded artifacts in bytes, the least recently used
+# ones are evicted beyond it
+ARTIFACT_CACHE_SIZE = int(
+    os.environ.get("WORKER_ARTIFACT_CACHE_SIZE", 20 * 1024 * 1024 * 1024)
+)
+ARTIFACT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def get_file_sha256(path):
+    """Returns the hex SHA-256 digest of the content of a file"""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(ARTIFACT_DOWNLOAD_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_directory_size(path):
+    """Returns the size in bytes of the files in a directory tree"""
+    size = 0
+    for directory, _, file_names in os.walk(path):
+        for file_name in file_names:
+            with contextlib.suppress(OSError):
+                size += os.lstat(join(directory, file_name)).st_size
+    return size
+
+
+def copy_file(source, destination):
+    """
+    Copies `source` to `destination`, so that the destination stays valid
+    when the source is evicted and writing to it leaves the source untouched
+    """
+    if os.path.lexists(destination):
+        os.remove(destination)
+    shutil.copyfile(source, destination)
+
+
+class ArtifactCache:
+    """
+    Persistent on-disk cache of the challenge artifacts downloaded by the
+    worker, e.g. evaluation scripts and annotation files.
+
+    Artifacts are looked up by a stable key, e.g. their storage name, since
+    their URLs may be presigned. The content is stored once per SHA-256 and
+    revalidated with conditional GETs using the ETag and Last-Modified of the
+    last download. The index is shared by the workers on the host under a
+    file lock.
+
+    The installed requirements of the challenges count towards the size
+    budget as well. A worker holds a shared lock on the requirements it
+    installed, so that they are not evicted while it uses them.
+    """
+
+    def __init__(self, root=ARTIFACT_CACHE_DIR, max_size=ARTIFACT_CACHE_SIZE):
+        self.root = root
+        self.max_size = max_size
+        self.objects_dir = join(root, "objects")
+        self.requirements_dir = join(root, "requirements")
+        self.index_path = join(root, "index.json")
+        self.lock_path = join(root, "index.lock")
+        self.requirements_locks = {}
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.requirements_dir, exist_ok=True)
+
+    @contextlib.contextmanager
+    def locked_index(self):
+        """Yields the index of the cache and saves it back while locked"""
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.index_path) as index_file:
+                        index = json.load(index_file)
+                except (OSError, ValueError):
+                    index = {}
+                yield index
+                temp_index_path = "{}.{}".format(self.index_path, os.getpid())
+                with open(temp_index_path, "w") as index_file:
+                    json.dump(index, index_file)
+                os.replace(temp_index_path, self.index_path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_object_path(self, sha256):
+        return join(self.objects_dir, sha256)
+
+    def get_requirements_path(self, sha256):
+        return join(self.requirements_dir, sha256)
+
+    def get_entry_path(self, entry):
+        """Returns the path of the cached content of an index entry"""
+        if entry.get("requirements"):
+            return self.get_requirements_path(entry["sha256"])
+        return self.get_object_path(entry["sha256"])
+
+    def get_requirements_lock_path(self, sha256):
+        return join(self.requirements_dir, "{}.lock".format(sha256))
+
+    def lock_requirements(self, sha256):
+        """
+        Holds a shared lock on installed requirements for the lifetime of
+        the cache, it blocks while another worker evicts them
+        """
+        if sha256 in self.requirements_locks:
+            return
+        lock_file = open(self.get_requirements_lock_path(sha256), "a")
+        fcntl.flock(lock_file, fcntl.LOCK_SH)
+        self.requirements_locks[sha256] = lock_file
+
+    def remove_requirements(self, sha256):
+        """
+        Removes installed requirements unless a worker uses them
+
+        Returns:
+            [bool] -- Whether the requirements were removed
+        """
+        with open(self.get_requirements_lock_path(sha256), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                shutil.rmtree(
+                    self.get_requirements_path(sha256), ignore_errors=True
+                )
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return True
+
+    def get_validators(self, key):
+        """Returns the conditional request headers of a cached artifact"""
+        with self.locked_index() as index:
+            entry = index.get(key)
+            if entry is None or not os.path.exists(
+                self.get_object_path(entry["sha256"])
+            ):
+                return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        # Without validators the content can't be revalidated, it is
+        # downloaded again
+        return headers
+
+    def touch(self, key):
+        """
+        Marks a cached artifact as used and returns its path, None if it was
+        evicted in between
+        """
+        with self.locked_index() as index:
+            entry = index.get(key)
+            if entry is None:
+                return None
+            entry["last_used"] = time.time()
+            object_path = self.get_object_path(entry["sha256"])
+        return object_path if os.path.exists(object_path) else None
+
+    def store(self, key, path, response):
+        """Moves a downloaded artifact into the cache and returns its path"""
+        digest = get_file_sha256(path)
+        size = os.path.getsize(path)
+        object_path = self.get_object_path(digest)
+        # The cached content is shared by the workers and never modified
+        os.chmod(path, 0o444)
+        os.replace(path, object_path)
+        with self.locked_index() as index:
+            previous_entry = index.get(key)
+            index[key] = {
+                "sha256": digest,
+                "size": size,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "last_used": time.time(),
+            }
+            # The previous content of the artifact is removed unless it is
+            # shared by another artifact
+            if previous_entry and previous_entry["sha256"] not in {
+                entry["sha256"] for entry in index.values()
+            }:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.get_object_path(previous_entry["sha256"]))
+            self.evict(index, keep=object_path)
+        return object_path
+
+    def evict(self, index, keep=None):
+        """
+        Removes the least recently used artifacts and requirements from the
+        index until the cached content fits in the size budget. The content
+        is shared by the keys with the same path and is deleted with the last
+        of them. Requirements used by a worker are kept.
+        """
+        last_used = {}
+        sizes = {}
+        for entry in index.values():
+            path = self.get_entry_path(entry)
+            last_used[path] = max(last_used.get(path, 0), entry["last_used"])
+            sizes[path] = entry["size"]
+        total_size = sum(sizes.values())
+        for path in sorted(last_used, key=last_used.get):
+            if total_size <= self.max_size:
+                break
+            if path == keep:
+                continue
+            keys = [
+                key
+                for key, entry in index.items()
+                if self.get_entry_path(entry) == path
+            ]
+            if index[keys[0]].get("requirements"):
+                if not self.remove_requirements(index[keys[0]]["sha256"]):
+                    continue
+            else:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+            for key in keys:
+                del index[key]
+            total_size -= sizes[path]
+            logger.info("Evicted {} from the cache".format(path))
+
+    def fetch(self, key, url, revalidate=True):
+        """
+        Returns the path of the cached content of an artifact, downloading it
+        only when it changed since the last download. The cached content is
+        used when the artifact can't be revalidated.
+
+        Arguments:
+            key {[str]} -- Stable key of the artifact e.g. its storage name
+            url {[str]} -- URL of the artifact
+            revalidate {[bool]} -- Whether the cached content can be reused
+
+        Returns:
+            [str] -- Path of the cached content, None if it couldn't be downloaded
+        """
+        headers = self.get_validators(key) if revalidate else {}
+        try:
+            response = request_first_segment(url, headers)
+            if response.status_code == 304 and headers:
+                response.close()
+                logger.info("Artifact {} is unchanged".format(key))
+                object_path = self.touch(key)
+                if object_path is not None:
+                    return object_path
+                # Evicted by another worker since the request was made
+                return self.fetch(key, url, revalidate=False)
+            with tempfile.NamedTemporaryFile(
+                dir=self.objects_dir, prefix=".download-", delete=False
+            ) as temp_file:
+                pass
+            try:
+                response = download_file(
+                    url, temp_file.name, response=response
+                )
+                return self.store(key, temp_file.name, response)
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(temp_file.name)
+        except Exception as e:
+            if headers:
+                logger.warning(
+                    "Using the cached artifact {}, it couldn't be revalidated "
+                    "from {}, error {}".format(key, url, e)
+                )
+                return self.touch(key)
+            logger.error(
+                "Failed to fetch artifact {} from {}, error {}".format(
+                    key, url, e
+                )
+            )
+            return None
+
+    def fetch_to(self, key, url, destination):
+        """
+        Fetches an artifact and copies it to `destination`
+
+        Returns:
+            [bool] -- Whether the artifact is available at `destination`
+        """
+        path = self.fetch(key, url)
+        if path is None:
+            return False
+        copy_file(path, destination)
+        return True
+
+    def install_requirements(self, requirements_path):
+        """
+        Installs the requirements of a challenge once per content of the
+        requirements file into a cached directory, and appends it to
+        `sys.path`. The packages of the worker come first so that a challenge
+        can't replace them, the challenge gets the other packages it requires.
+
+        `sys.path` and the imported modules are shared by the whole process,
+        so a worker must only load the requirements of a single challenge,
+        i.e. it runs with `CHALLENGE_PK` set as in production.
+
+        Arguments:
+            requirements_path {[str]} -- Path of the requirements.txt file
+
+        Returns:
+            [str] -- Path of the directory of the installed requirements
+        """
+        digest = get_file_sha256(requirements_path)
+        target = self.get_requirements_path(digest)
+        self.lock_requirements(digest)
+        if not os.path.isdir(target):
+            # Requirements that failed to install half way are not reused
+            staging = tempfile.mkdtemp(
+                dir=self.requirements_dir, prefix=".install-"
+            )
+            try:
+                subprocess.check_output(
+                    [
+                        sys.executable,
+                        "-m",
+                        "pip",
+                        "install",
+                        "--target",
+                        staging,
+                        "-r",
+                        requirements_path,
+                    ]
+                )
+                try:
+                    os.rename(staging, target)
+                except OSError:
+                    # Installed by another worker in between
+                    shutil.rmtree(staging, ignore_errors=True)
+            except Exception:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        else:
+            logger.info(
+                "Reusing the requirements installed in {}".format(target)
+            )
+        with self.locked_index() as index:
+            index["requirements/{}".format(digest)] = {
+                "sha256": digest,
+                "size": get_directory_size(target),
+                "last_used": time.time(),
+                "requirements": True,
+            }
+            self.evict(index, keep=target)
+        loaded_requirements = [
+            path
+            for path in sys.path
+            if os.path.dirname(path) == self.requirements_dir
+            and path != target
+        ]
+        if loaded_requirements:
+            logger.warning(
+                "The requirements in {} are loaded along with {}, the "
+                "worker should only load a single challenge".format(
+                    target, ", ".join(loaded_requirements)
+                )
+            )
+        if target not in sys.path:
+            sys.path.append(target)
+        return target
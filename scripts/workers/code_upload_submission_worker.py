@@ -3,6 +3,7 @@ import logging
 import os
 import signal
 import sys
+import threading
 import time
 
 import yaml
@@ -10,7 +11,13 @@ from kubernetes import client
 
 # TODO: Add exception in all the commands
 from kubernetes.client.rest import ApiException
+from kubernetes_client_manager import KubernetesClientManager
 from statsd_utils import increment_and_push_metrics_to_statsd
+from submission_job_tracker import (
+    KubernetesWatchSource,
+    SubmissionJobTracker,
+    get_submission_labels,
+)
 from worker_utils import EvalAI_Interface
 
 
@@ -42,6 +49,15 @@ EVALAI_API_SERVER = os.environ.get(
     "EVALAI_API_SERVER", "http://localhost:8000"
 )
 QUEUE_NAME = os.environ.get("QUEUE_NAME", "evalai_submission_queue")
+# Track submission jobs with Kubernetes watches, the queue is then only
+# used for intake
+WATCH_SUBMISSION_JOBS = (
+    os.environ.get("WATCH_SUBMISSION_JOBS", "False").lower() == "true"
+)
+# Seconds to wait before polling an empty queue again, doubled up to the
+# maximum while the queue stays empty
+QUEUE_POLL_INTERVAL = float(os.environ.get("QUEUE_POLL_INTERVAL", 2))
+QUEUE_POLL_MAX_INTERVAL = float(os.environ.get("QUEUE_POLL_MAX_INTERVAL", 30))
 script_config_map_name = "evalai-scripts-cm"
 
 
@@ -148,12 +164,13 @@ def get_submission_meta_update_curl(submission_pk):
     return curl_request
 
 
-def get_job_object(submission_pk, spec):
+def get_job_object(submission_pk, spec, labels=None):
     """Function to instantiate the AWS EKS Job object
 
     Arguments:
         submission_pk {[int]} -- Submission id
         spec {[V1JobSpec]} -- Specification of deployment of job
+        labels {[dict]} -- Labels identifying the submission of the job
 
     Returns:
         [AWS EKS Job class object] -- AWS EKS Job class object
@@ -163,7 +180,7 @@ def get_job_object(submission_pk, spec):
         api_version="batch/v1",
         kind="Job",
         metadata=client.V1ObjectMeta(
-            name="submission-{0}".format(submission_pk)
+            name="submission-{0}".format(submission_pk), labels=labels
         ),
         spec=spec,
     )
@@ -227,6 +244,7 @@ def create_job_object(message, environment_image, challenge):
     )
     MESSAGE_BODY_ENV = client.V1EnvVar(name="BODY", value=json.dumps(message))
     submission_pk = message["submission_pk"]
+    submission_labels = get_submission_labels(message)
     image = message["submitted_image_uri"]
     submission_meta = message["submission_meta"]
     SUBMISSION_TIME_LIMIT_ENV = client.V1EnvVar(
@@ -260,7 +278,9 @@ def create_job_object(message, environment_image, challenge):
     volume_list = get_volume_list()
     # Create and configurate a spec section
     template = client.V1PodTemplateSpec(
-        metadata=client.V1ObjectMeta(labels={"app": "evaluation"}),
+        metadata=client.V1ObjectMeta(
+            labels=dict(submission_labels, app="evaluation")
+        ),
         spec=client.V1PodSpec(
             init_containers=[init_container],
             containers=[environment_container, agent_container],
@@ -271,7 +291,7 @@ def create_job_object(message, environment_image, challenge):
     # Create the specification of deployment
     spec = client.V1JobSpec(backoff_limit=1, template=template)
     # Instantiate the job object
-    job = get_job_object(submission_pk, spec)
+    job = get_job_object(submission_pk, spec, submission_labels)
     return job
 
 
@@ -292,6 +312,7 @@ def create_static_code_upload_submission_job_object(message, challenge):
     challenge_pk = message["challenge_pk"]
     phase_pk = message["phase_pk"]
     submission_meta = message["submission_meta"]
+    submission_labels = get_submission_labels(message)
     SUBMISSION_PK_ENV = client.V1EnvVar(
         name="SUBMISSION_PK", value=str(submission_pk)
     )
@@ -377,7 +398,9 @@ def create_static_code_upload_submission_job_object(message, challenge):
     )
     # Create and configurate a spec section
     template = client.V1PodTemplateSpec(
-        metadata=client.V1ObjectMeta(labels={"app": "evaluation"}),
+        metadata=client.V1ObjectMeta(
+            labels=dict(submission_labels, app="evaluation")
+        ),
         spec=client.V1PodSpec(
             init_containers=[init_container],
             containers=[sidecar_container, submission_container],
@@ -389,7 +412,7 @@ def create_static_code_upload_submission_job_object(message, challenge):
     # Create the specification of deployment
     spec = client.V1JobSpec(backoff_limit=1, template=template)
     # Instantiate the job object
-    job = get_job_object(submission_pk, spec)
+    job = get_job_object(submission_pk, spec, submission_labels)
     return job
 
 
@@ -434,6 +457,9 @@ def process_submission_callback(api_instance, body, challenge_phase, challenge,
     Arguments:
         body {[dict]} -- Submission message body from AWS SQS Queue
         evalai {[EvalAI class object]} -- EvalAI class object imported from worker_utils
+
+    Returns:
+        [V1Job object] -- Created job, None if it couldn't be created
     """
     try:
         logger.info("[x] Received submission message %s" % body)
@@ -449,54 +475,14 @@ def process_submission_callback(api_instance, body, challenge_phase, challenge,
             "job_name": response.metadata.name,
         }
         evalai.update_submission_status(submission_data, body["challenge_pk"])
+        return response
     except Exception as e:
         logger.exception(
             "Exception while receiving message from submission queue with error {}".format(
                 e
             )
         )
-
-
-def get_api_object(cluster_name, cluster_endpoint, challenge, evalai):
-    configuration = client.Configuration()
-    aws_eks_api = evalai.get_aws_eks_bearer_token(challenge.get("id"))
-    configuration.host = cluster_endpoint
-    configuration.verify_ssl = True
-    configuration.ssl_ca_cert = "/code/scripts/workers/certificate.crt"
-    configuration.api_key["authorization"] = aws_eks_api[
-        "aws_eks_bearer_token"
-    ]
-    configuration.api_key_prefix["authorization"] = "Bearer"
-    api_instance = client.BatchV1Api(client.ApiClient(configuration))
-    return api_instance
-
-
-def get_api_client(cluster_name, cluster_endpoint, challenge, evalai):
-    configuration = client.Configuration()
-    aws_eks_api = evalai.get_aws_eks_bearer_token(challenge.get("id"))
-    configuration.host = cluster_endpoint
-    configuration.verify_ssl = True
-    configuration.ssl_ca_cert = "/code/scripts/workers/certificate.crt"
-    configuration.api_key["authorization"] = aws_eks_api[
-        "aws_eks_bearer_token"
-    ]
-    configuration.api_key_prefix["authorization"] = "Bearer"
-    api_instance = client.ApiClient(configuration)
-    return api_instance
-
-
-def get_core_v1_api_object(cluster_name, cluster_endpoint, challenge, evalai):
-    configuration = client.Configuration()
-    aws_eks_api = evalai.get_aws_eks_bearer_token(challenge.get("id"))
-    configuration.host = cluster_endpoint
-    configuration.verify_ssl = True
-    configuration.ssl_ca_cert = "/code/scripts/workers/certificate.crt"
-    configuration.api_key["authorization"] = aws_eks_api[
-        "aws_eks_bearer_token"
-    ]
-    configuration.api_key_prefix["authorization"] = "Bearer"
-    api_instance = client.CoreV1Api(client.ApiClient(configuration))
-    return api_instance
+        return None
 
 
 def get_running_jobs(api_instance):
@@ -671,10 +657,10 @@ def update_failed_jobs_and_send_logs(
         )
 
 
-def install_gpu_drivers(api_instance):
+def install_gpu_drivers(apps_v1_api_instance):
     """Function to get the status of a running job on AWS EKS cluster
     Arguments:
-        api_instance {[AWS EKS API object]} -- API object for creating deamonset
+        apps_v1_api_instance {[AWS EKS API object]} -- API object for creating deamonset
     """
     logging.info("Installing Nvidia-GPU Drivers ...")
     # Original manifest source: https://raw.githubusercontent.com/NVIDIA/k8s-device-plugin/v1.11/nvidia-device-plugin.yml
@@ -682,10 +668,11 @@ def install_gpu_drivers(api_instance):
     logging.info("Using daemonset file: %s", manifest_path)
     nvidia_manifest = open(manifest_path).read()
     daemonset_spec = yaml.load(nvidia_manifest, yaml.FullLoader)
-    ext_client = client.AppsV1Api(api_instance)
     try:
         namespace = daemonset_spec["metadata"]["namespace"]
-        ext_client.create_namespaced_daemon_set(namespace, daemonset_spec)
+        apps_v1_api_instance.create_namespaced_daemon_set(
+            namespace, daemonset_spec
+        )
     except ApiException as e:
         if e.status == 409:
             logging.info(
@@ -710,33 +697,50 @@ def main():
     challenge = evalai.get_challenge_by_queue_name()
     is_remote = int(challenge.get("remote_evaluation"))
     cluster_details = evalai.get_aws_eks_cluster_details(challenge.get("id"))
-    cluster_name = cluster_details.get("name")
     cluster_endpoint = cluster_details.get("cluster_endpoint")
-    api_instance_client = get_api_client(
-        cluster_name, cluster_endpoint, challenge, evalai
+    # The API clients and the bearer token are reused across messages, the
+    # token is refreshed shortly before it expires
+    client_manager = KubernetesClientManager(
+        cluster_endpoint,
+        lambda: evalai.get_aws_eks_bearer_token(challenge.get("id"))[
+            "aws_eks_bearer_token"
+        ],
     )
     # Install GPU drivers for GPU only challenges
     if not challenge.get("cpu_only_jobs"):
-        install_gpu_drivers(api_instance_client)
-    api_instance = get_api_object(
-        cluster_name, cluster_endpoint, challenge, evalai
-    )
-    core_v1_api_instance = get_core_v1_api_object(
-        cluster_name, cluster_endpoint, challenge, evalai
-    )
+        install_gpu_drivers(client_manager.apps_v1_api)
+    api_instance = client_manager.batch_v1_api
+    core_v1_api_instance = client_manager.core_v1_api
     if challenge.get("is_static_dataset_code_upload"):
         # Create and Mount Script Volume
         script_config_map = create_script_config_map(script_config_map_name)
         create_configmap(core_v1_api_instance, script_config_map)
+    if WATCH_SUBMISSION_JOBS:
+        tracker = SubmissionJobTracker(
+            evalai, api_instance, core_v1_api_instance
+        )
+        watch_source = KubernetesWatchSource(
+            api_instance, core_v1_api_instance, challenge.get("id")
+        )
+        threading.Thread(
+            target=tracker.run,
+            args=(watch_source, lambda: killer.kill_now),
+            daemon=True,
+        ).start()
     submission_meta = {}
     submission_meta["submission_time_limit"] = challenge.get(
         "submission_time_limit"
     )
+    poll_interval = QUEUE_POLL_INTERVAL
     while True:
-        time.sleep(2)
         message = evalai.get_message_from_sqs_queue()
         message_body = message.get("body")
-        if message_body:
+        if not message_body:
+            # The message API returns at once when the queue is empty
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, QUEUE_POLL_MAX_INTERVAL)
+        else:
+            poll_interval = QUEUE_POLL_INTERVAL
             if challenge.get(
                 "is_static_dataset_code_upload"
             ) and not message_body.get(
@@ -744,12 +748,6 @@ def main():
             ):
                 time.sleep(35)
                 continue
-            api_instance = get_api_object(
-                cluster_name, cluster_endpoint, challenge, evalai
-            )
-            core_v1_api_instance = get_core_v1_api_object(
-                cluster_name, cluster_endpoint, challenge, evalai
-            )
             message_body["submission_meta"] = submission_meta
             submission_pk = message_body.get("submission_pk")
             challenge_pk = message_body.get("challenge_pk")
@@ -825,11 +823,21 @@ def main():
                     challenge_phase = evalai.get_challenge_phase_by_pk(
                         challenge_pk, phase_pk
                     )
-                    process_submission_callback(
+                    job = process_submission_callback(
                         api_instance, message_body, challenge_phase, challenge, evalai
                     )
+                    if job and WATCH_SUBMISSION_JOBS:
+                        # The job is tracked by its watch events from now on
+                        evalai.delete_message_from_sqs_queue(
+                            message.get("receipt_handle")
+                        )
+                        increment_and_push_metrics_to_statsd(
+                            QUEUE_NAME, is_remote
+                        )
 
         if killer.kill_now:
+            if WATCH_SUBMISSION_JOBS:
+                watch_source.stop()
             break
 
 
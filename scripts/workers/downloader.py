@@ -0,0 +1,250 @@
+import contextlib
+import hashlib
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Objects larger than a segment are fetched with parallel range requests
+DOWNLOAD_SEGMENT_SIZE = int(
+    os.environ.get("WORKER_DOWNLOAD_SEGMENT_SIZE", 64 * 1024 * 1024)
+)
+DOWNLOAD_MAX_CONNECTIONS = int(
+    os.environ.get("WORKER_DOWNLOAD_MAX_CONNECTIONS", 4)
+)
+# Attempts to resume a segment, the backoff doubles from a second
+DOWNLOAD_MAX_RETRIES = int(os.environ.get("WORKER_DOWNLOAD_MAX_RETRIES", 5))
+DOWNLOAD_TIMEOUT = (10, 60)
+
+CONTENT_RANGE_REGEX = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+MD5_ETAG_REGEX = re.compile(r'^"?([0-9a-fA-F]{32})"?$')
+
+# Sessions are not shared with the forked evaluation processes
+DOWNLOAD_SESSIONS = {}
+
+
+class DownloadError(Exception):
+    pass
+
+
+def get_download_session():
+    """Returns the pooled HTTP session of the current process"""
+    pid = os.getpid()
+    if pid not in DOWNLOAD_SESSIONS:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=DOWNLOAD_MAX_CONNECTIONS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        DOWNLOAD_SESSIONS.clear()
+        DOWNLOAD_SESSIONS[pid] = session
+    return DOWNLOAD_SESSIONS[pid]
+
+
+def request_first_segment(url, headers=None):
+    """
+    Requests the first segment of a file, servers which don't support range
+    requests answer with the whole file
+
+    Arguments:
+        url {[str]} -- URL of the file
+        headers {[dict]} -- Additional request headers e.g. conditional ones
+
+    Returns:
+        [Response] -- Streamed response
+    """
+    headers = dict(headers or {})
+    headers["Range"] = "bytes=0-{}".format(DOWNLOAD_SEGMENT_SIZE - 1)
+    return get_download_session().get(
+        url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+    )
+
+
+def get_expected_md5(response):
+    """
+    Returns the MD5 of the file in the ETag of S3, which is only the MD5 of
+    the content for objects uploaded at once without SSE-KMS or SSE-C
+    """
+    if "x-amz-request-id" not in response.headers:
+        return None
+    if response.headers.get("x-amz-server-side-encryption") == "aws:kms":
+        return None
+    if "x-amz-server-side-encryption-customer-algorithm" in response.headers:
+        return None
+    match = MD5_ETAG_REGEX.match(response.headers.get("ETag", ""))
+    return match.group(1).lower() if match else None
+
+
+def verify_file(destination, size, sha256=None, md5=None):
+    """
+    Checks the size and the checksums of a downloaded file
+
+    Raises:
+        DownloadError -- When the file doesn't match
+    """
+    actual_size = os.path.getsize(destination)
+    if size is not None and actual_size != size:
+        raise DownloadError(
+            "Downloaded {} bytes instead of {}".format(actual_size, size)
+        )
+    if sha256 is None and md5 is None:
+        return
+    sha256_hash = hashlib.sha256()
+    md5_hash = hashlib.md5()
+    with open(destination, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+            md5_hash.update(chunk)
+    if sha256 is not None and sha256_hash.hexdigest() != sha256:
+        raise DownloadError("The SHA-256 checksum doesn't match")
+    if md5 is not None and md5_hash.hexdigest() != md5:
+        raise DownloadError("The MD5 checksum doesn't match the ETag")
+
+
+def write_response(response, destination, offset):
+    """
+    Writes the body of a response to a file from `offset`
+
+    Returns:
+        [int] -- Offset after the last byte written
+    """
+    with contextlib.closing(response), open(destination, "r+b") as f:
+        f.seek(offset)
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            f.write(chunk)
+            offset += len(chunk)
+    return offset
+
+
+def fetch_segment(url, destination, start, end, etag=None, response=None):
+    """
+    Fetches the bytes from `start` to `end` (excluded) of a file, resuming
+    from the last byte written when the transfer fails
+
+    Arguments:
+        etag {[str]} -- ETag of the file, the download fails if it changes
+        response {[Response]} -- Response already requested for the segment
+    """
+    offset = start
+    for attempt in range(DOWNLOAD_MAX_RETRIES + 1):
+        try:
+            if response is None:
+                headers = {"Range": "bytes={}-{}".format(offset, end - 1)}
+                if etag:
+                    headers["If-Match"] = etag
+                response = get_download_session().get(
+                    url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+                )
+                if response.status_code == 412:
+                    raise DownloadError("The file changed while downloading")
+                if response.status_code != 206:
+                    response.raise_for_status()
+                    raise DownloadError(
+                        "Range requests stopped being supported"
+                    )
+            offset = write_response(response, destination, offset)
+            if offset >= end:
+                return
+            error = "Connection closed at byte {}".format(offset)
+        except (requests.RequestException, OSError) as e:
+            error = e
+        response = None
+        if attempt < DOWNLOAD_MAX_RETRIES:
+            logger.warning(
+                "Resuming the download of {} from byte {}, error {}".format(
+                    url, offset, error
+                )
+            )
+            time.sleep(2**attempt)
+    raise DownloadError(
+        "Failed to fetch bytes {}-{} after {} attempts, error {}".format(
+            offset, end - 1, DOWNLOAD_MAX_RETRIES + 1, error
+        )
+    )
+
+
+def download_file(url, destination, sha256=None, response=None):
+    """
+    Downloads a file with large buffers. Files larger than a segment are
+    fetched with parallel range requests, every segment is resumed when its
+    transfer fails and the file is verified once downloaded.
+
+    Arguments:
+        url {[str]} -- URL of the file
+        destination {[str]} -- Path of the downloaded file
+        sha256 {[str]} -- Expected hex SHA-256 of the file
+        response {[Response]} -- Response of `request_first_segment` if already requested
+
+    Returns:
+        [Response] -- Response of the first request, whose headers describe the file
+
+    Raises:
+        DownloadError -- When the file can't be downloaded or doesn't match
+    """
+    try:
+        if response is None:
+            response = request_first_segment(url)
+        if response.status_code == 206:
+            match = CONTENT_RANGE_REGEX.match(
+                response.headers.get("Content-Range", "")
+            )
+            if not match or match.group(3) == "*":
+                raise DownloadError(
+                    "Invalid Content-Range {}".format(
+                        response.headers.get("Content-Range")
+                    )
+                )
+            size = int(match.group(3))
+            etag = response.headers.get("ETag")
+            with open(destination, "wb") as f:
+                f.truncate(size)
+            segments = [(0, min(DOWNLOAD_SEGMENT_SIZE, size))] + [
+                (start, min(start + DOWNLOAD_SEGMENT_SIZE, size))
+                for start in range(
+                    DOWNLOAD_SEGMENT_SIZE, size, DOWNLOAD_SEGMENT_SIZE
+                )
+            ]
+            with ThreadPoolExecutor(
+                max_workers=min(DOWNLOAD_MAX_CONNECTIONS, len(segments))
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        fetch_segment,
+                        url,
+                        destination,
+                        start,
+                        end,
+                        etag,
+                        response if start == 0 else None,
+                    )
+                    for start, end in segments
+                ]
+                for future in futures:
+                    future.result()
+        elif response.status_code == 200:
+            # Without range requests the transfer can't be resumed
+            size = response.headers.get("Content-Length")
+            size = int(size) if size is not None else None
+            with open(destination, "wb"):
+                pass
+            write_response(response, destination, 0)
+        else:
+            response.close()
+            response.raise_for_status()
+            raise DownloadError(
+                "Unexpected status {}".format(response.status_code)
+            )
+        verify_file(destination, size, sha256, get_expected_md5(response))
+    except Exception as e:
+        with contextlib.suppress(OSError):
+            os.remove(destination)
+        if isinstance(e, DownloadError):
+            raise
+        raise DownloadError(str(e)) from e
+    return response
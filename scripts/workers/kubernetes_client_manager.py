@@ -0,0 +1,152 @@
+import base64
+import functools
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+logger = logging.getLogger(__name__)
+
+EKS_BEARER_TOKEN_PREFIX = "k8s-aws-v1."
+# EKS accepts a bearer token for 15 minutes after it is signed, whatever
+# the expiry of the presigned URL inside it
+EKS_BEARER_TOKEN_LIFETIME = 15 * 60
+# Seconds before the expiry of the token at which it is refreshed
+EKS_BEARER_TOKEN_REFRESH_MARGIN = int(
+    os.environ.get("EKS_BEARER_TOKEN_REFRESH_MARGIN", 120)
+)
+EKS_CLUSTER_SSL_CA_CERT = "/code/scripts/workers/certificate.crt"
+
+
+def get_eks_bearer_token_expiry(token, fetched_at):
+    """
+    Returns the time at which an EKS bearer token expires, from the signing
+    date of the presigned STS URL it encodes
+
+    Arguments:
+        token {[str]} -- EKS bearer token
+        fetched_at {[float]} -- Time at which the token was fetched
+
+    Returns:
+        [float] -- Expiry as a UNIX timestamp
+    """
+    signed_at = fetched_at
+    try:
+        encoded_url = token[len(EKS_BEARER_TOKEN_PREFIX):]
+        url = base64.urlsafe_b64decode(
+            encoded_url + "=" * (-len(encoded_url) % 4)
+        ).decode("utf-8")
+        amz_date = parse_qs(urlparse(url).query)["X-Amz-Date"][0]
+        signed_at = min(
+            signed_at,
+            datetime.strptime(amz_date, "%Y%m%dT%H%M%SZ")
+            .replace(tzinfo=timezone.utc)
+            .timestamp(),
+        )
+    except (KeyError, ValueError, UnicodeDecodeError):
+        logger.warning(
+            "Failed to read the signing date of the EKS bearer token, "
+            "assuming it was signed when fetched"
+        )
+    return signed_at + EKS_BEARER_TOKEN_LIFETIME
+
+
+class RefreshingApi:
+    """
+    Wraps a Kubernetes API object so that the bearer token is refreshed
+    before it expires and calls rejected with a 401 are retried once with a
+    new token
+    """
+
+    def __init__(self, manager, api):
+        self.manager = manager
+        self.api = api
+
+    def __getattr__(self, name):
+        attribute = getattr(self.api, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            self.manager.refresh_token()
+            try:
+                return attribute(*args, **kwargs)
+            except ApiException as e:
+                if e.status != 401:
+                    raise
+                logger.info(
+                    "Kubernetes API rejected the bearer token, refreshing it"
+                )
+                self.manager.refresh_token(force=True)
+                return attribute(*args, **kwargs)
+
+        return call
+
+
+class KubernetesClientManager:
+    """
+    Holds a single API client of an EKS cluster for the lifetime of a worker,
+    so that its connection pool and TLS sessions are reused across
+    submissions. The bearer token is fetched from EvalAI only when it is
+    about to expire.
+    """
+
+    def __init__(
+        self,
+        cluster_endpoint,
+        get_bearer_token,
+        ssl_ca_cert=EKS_CLUSTER_SSL_CA_CERT,
+        refresh_margin=EKS_BEARER_TOKEN_REFRESH_MARGIN,
+    ):
+        """
+        Arguments:
+            cluster_endpoint {[str]} -- Endpoint of the EKS cluster
+            get_bearer_token {[callable]} -- Returns a new EKS bearer token
+            ssl_ca_cert {[str]} -- Path of the CA certificate of the cluster
+            refresh_margin {[int]} -- Seconds before expiry to refresh the token
+        """
+        self.get_bearer_token = get_bearer_token
+        self.refresh_margin = refresh_margin
+        self.token_expiry = 0
+        self.lock = threading.Lock()
+        configuration = client.Configuration()
+        configuration.host = cluster_endpoint
+        configuration.verify_ssl = True
+        configuration.ssl_ca_cert = ssl_ca_cert
+        configuration.api_key_prefix["authorization"] = "Bearer"
+        self.configuration = configuration
+        self.api_client = client.ApiClient(configuration)
+        self.batch_v1_api = RefreshingApi(
+            self, client.BatchV1Api(self.api_client)
+        )
+        self.core_v1_api = RefreshingApi(
+            self, client.CoreV1Api(self.api_client)
+        )
+        self.apps_v1_api = RefreshingApi(
+            self, client.AppsV1Api(self.api_client)
+        )
+
+    def refresh_token(self, force=False):
+        """
+        Fetches a new bearer token when the current one is about to expire.
+        The API client reads the token from its configuration on every
+        request, so it keeps its connections.
+
+        Arguments:
+            force {[bool]} -- Fetch a new token even if the current one is valid
+        """
+        with self.lock:
+            fetched_at = time.time()
+            if not force and fetched_at < (
+                self.token_expiry - self.refresh_margin
+            ):
+                return
+            token = self.get_bearer_token()
+            self.configuration.api_key["authorization"] = token
+            self.token_expiry = get_eks_bearer_token_expiry(token, fetched_at)
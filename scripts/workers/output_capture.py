@@ -0,0 +1,179 @@
+import io
+import logging
+import os
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Bytes of output kept per stream of an evaluation, the middle of longer
+# outputs is dropped
+SUBMISSION_LOG_MAX_SIZE = int(
+    os.environ.get("SUBMISSION_LOG_MAX_SIZE", 10 * 1024 * 1024)
+)
+OUTPUT_CAPTURE_READ_SIZE = 64 * 1024
+# Seconds to wait for the subprocesses of an evaluation to close the
+# captured file descriptor once the evaluation returns
+OUTPUT_CAPTURE_DRAIN_TIMEOUT = 5
+
+
+def write_to_fd(fd, data):
+    while data:
+        written = os.write(fd, data)
+        data = data[written:]
+
+
+class CapturedStream(io.TextIOBase):
+    """Python stream swapped in for `sys.stdout` or `sys.stderr` by a capture"""
+
+    def __init__(self, output_capture, stream):
+        self.output_capture = output_capture
+        self.stream = stream
+
+    def write(self, data):
+        self.output_capture.write(data)
+        if self.output_capture.echo:
+            self.stream.write(data)
+        return len(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class OutputCapture:
+    """
+    Captures what is written to a file descriptor, e.g. the stdout of an
+    evaluation including the output of C extensions and subprocesses, into a
+    file while echoing it to the original file descriptor.
+
+    Only the first and the last `max_size / 2` bytes are kept so that the
+    captured output stays bounded. The file descriptor is redirected for the
+    whole process, so it is only redirected when the process runs nothing but
+    the evaluation. Otherwise `redirect_fd` is False and only the matching
+    `sys.stdout` or `sys.stderr` is swapped, which leaves the logs of the
+    worker out of the captured output.
+    """
+
+    def __init__(
+        self,
+        fd,
+        path,
+        max_size=SUBMISSION_LOG_MAX_SIZE,
+        echo=True,
+        redirect_fd=True,
+    ):
+        self.fd = fd
+        self.path = path
+        self.echo = echo
+        self.redirect_fd = redirect_fd
+        self.stream_name = (
+            "stderr" if fd == sys.__stderr__.fileno() else "stdout"
+        )
+        self.saved_stream = None
+        self.head_size = max_size // 2
+        self.tail_size = max_size - self.head_size
+        self.head_written = 0
+        self.tail = bytearray()
+        self.size = 0
+        self.file = open(path, "wb")
+        self.lock = threading.Lock()
+        self.saved_fd = None
+        self.reader = None
+
+    def write(self, data):
+        """Captures output of the worker itself, e.g. tracebacks"""
+        if isinstance(data, str):
+            data = data.encode("utf-8", "replace")
+        with self.lock:
+            if self.file.closed:
+                return
+            head = data[: self.head_size - self.head_written]
+            if head:
+                self.file.write(head)
+                self.head_written += len(head)
+            self.tail += data[len(head):]
+            if len(self.tail) > self.tail_size:
+                del self.tail[: len(self.tail) - self.tail_size]
+            self.size += len(data)
+
+    def read_pipe(self, read_fd):
+        try:
+            while True:
+                data = os.read(read_fd, OUTPUT_CAPTURE_READ_SIZE)
+                if not data:
+                    break
+                self.write(data)
+                if self.echo:
+                    try:
+                        write_to_fd(self.saved_fd, data)
+                    except OSError:
+                        pass
+        finally:
+            os.close(read_fd)
+
+    def flush_streams(self):
+        for stream in (sys.stdout, sys.stderr, sys.__stdout__, sys.__stderr__):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        self.flush_streams()
+        if not self.redirect_fd:
+            self.saved_stream = getattr(sys, self.stream_name)
+            setattr(
+                sys, self.stream_name, CapturedStream(self, self.saved_stream)
+            )
+            return self
+        self.saved_fd = os.dup(self.fd)
+        read_fd, write_fd = os.pipe()
+        os.dup2(write_fd, self.fd)
+        os.close(write_fd)
+        self.reader = threading.Thread(
+            target=self.read_pipe, args=(read_fd,), daemon=True
+        )
+        self.reader.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush_streams()
+        if not self.redirect_fd:
+            setattr(sys, self.stream_name, self.saved_stream)
+            return False
+        # Restoring the file descriptor closes the write end of the pipe
+        os.dup2(self.saved_fd, self.fd)
+        self.reader.join(OUTPUT_CAPTURE_DRAIN_TIMEOUT)
+        if self.reader.is_alive():
+            logger.warning(
+                "Stopped capturing the output written to {} by processes "
+                "left running by the evaluation".format(self.path)
+            )
+        return False
+
+    def close(self):
+        """Completes the captured file with the kept end of the output"""
+        with self.lock:
+            if self.file.closed:
+                return
+            truncated_size = self.size - self.head_written - len(self.tail)
+            if truncated_size:
+                self.file.write(
+                    "\n... {} bytes truncated ...\n".format(
+                        truncated_size
+                    ).encode("utf-8")
+                )
+            self.file.write(self.tail)
+            self.tail = bytearray()
+            self.file.close()
+        if self.saved_fd is not None and not self.reader.is_alive():
+            os.close(self.saved_fd)
+            self.saved_fd = None
+
+    def open(self):
+        """
+        Returns the completed captured output opened for reading, so that it
+        is streamed to the storage as is
+        """
+        self.close()
+        return open(self.path, "rb")
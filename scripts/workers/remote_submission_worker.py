@@ -13,12 +13,16 @@ import signal
 import shutil
 import sys
 import tempfile
+import threading
 import time
 import traceback
 import zipfile
 
 from os.path import join
 
+from scripts.monitoring.evalai_interface import create_session, send_request
+from scripts.workers.downloader import DownloadError, download_file
+
 # all challenge and submission will be stored in temp directory
 BASE_TEMP_DIR = tempfile.mkdtemp()
 COMPUTE_DIRECTORY_PATH = join(BASE_TEMP_DIR, "compute")
@@ -29,6 +33,16 @@ AUTH_TOKEN = os.environ.get("AUTH_TOKEN")
 DJANGO_SERVER = os.environ.get("DJANGO_SERVER", "localhost")
 DJANGO_SERVER_PORT = os.environ.get("DJANGO_SERVER_PORT", "8000")
 QUEUE_NAME = os.environ.get("QUEUE_NAME", "evalai_submission_queue")
+# number of messages leased from the queue at once and the seconds during
+# which they stay hidden from the other workers unless extended
+SUBMISSION_LEASE_SIZE = int(os.environ.get("SUBMISSION_LEASE_SIZE", 1))
+SUBMISSION_LEASE_TIMEOUT = int(
+    os.environ.get("SUBMISSION_LEASE_TIMEOUT", 3600)
+)
+# Seconds to wait before polling an empty queue again, doubled up to the
+# maximum while the queue stays empty
+QUEUE_POLL_INTERVAL = float(os.environ.get("QUEUE_POLL_INTERVAL", 2))
+QUEUE_POLL_MAX_INTERVAL = float(os.environ.get("QUEUE_POLL_MAX_INTERVAL", 30))
 
 CHALLENGE_DATA_BASE_DIR = join(COMPUTE_DIRECTORY_PATH, "challenge_data")
 SUBMISSION_DATA_BASE_DIR = join(COMPUTE_DIRECTORY_PATH, "submission_files")
@@ -45,6 +59,12 @@ EVALUATION_SCRIPTS = {}
 URLS = {
     "get_message_from_sqs_queue": "/api/jobs/challenge/queues/{}/",
     "delete_message_from_sqs_queue": "/api/jobs/queues/{}/",
+    "lease_messages_from_sqs_queue": (
+        "/api/jobs/challenge/queues/{}/lease/"
+        "?max_number_of_messages={}&visibility_timeout={}"
+    ),
+    "acknowledge_messages_from_sqs_queue": "/api/jobs/queues/{}/acknowledge/",
+    "extend_messages_visibility": "/api/jobs/queues/{}/heartbeat/",
     "get_submission_by_pk": "/api/jobs/submission/{}",
     "get_challenge_phases_by_challenge_pk": "/api/challenges/{}/phases/",
     "get_challenge_by_queue_name": "/api/challenges/challenge/queues/{}/",
@@ -53,6 +73,9 @@ URLS = {
 }
 EVALAI_ERROR_CODES = [400, 401, 406]
 
+# keeps the connections to EvalAI alive across the requests
+EVALAI_SESSION = create_session()
+
 # map of challenge id : phase id : phase annotation file name
 # Use: On arrival of submission message, lookup here to fetch phase file name
 # this saves db query just to fetch phase annotation file name
@@ -102,15 +125,10 @@ def download_and_extract_file(url, download_location):
     * `download_location` should include name of file as well.
     """
     try:
-        response = requests.get(url)
+        download_file(url, download_location)
     except Exception as e:
         logger.error("Failed to fetch file from {}, error {}".format(url, e))
-        traceback.print_exc()
-        response = None
-
-    if response and response.status_code == 200:
-        with open(download_location, "wb") as f:
-            f.write(response.content)
+        raise
 
 
 def download_and_extract_zip_file(url, download_location, extract_location):
@@ -119,28 +137,24 @@ def download_and_extract_zip_file(url, download_location, extract_location):
     * `download_location` should include name of file as well.
     """
     try:
-        response = requests.get(url)
+        download_file(url, download_location)
     except Exception as e:
         logger.error("Failed to fetch file from {}, error {}".format(url, e))
-        response = None
-
-    if response and response.status_code == 200:
-        with open(download_location, "wb") as f:
-            f.write(response.content)
-        # extract zip file
-        zip_ref = zipfile.ZipFile(download_location, "r")
-        zip_ref.extractall(extract_location)
-        zip_ref.close()
-        # delete zip file
-        try:
-            os.remove(download_location)
-        except Exception as e:
-            logger.error(
-                "Failed to remove zip file {}, error {}".format(
-                    download_location, e
-                )
+        raise
+    # extract zip file
+    zip_ref = zipfile.ZipFile(download_location, "r")
+    zip_ref.extractall(extract_location)
+    zip_ref.close()
+    # delete zip file
+    try:
+        os.remove(download_location)
+    except Exception as e:
+        logger.error(
+            "Failed to remove zip file {}, error {}".format(
+                download_location, e
             )
-            traceback.print_exc()
+        )
+        traceback.print_exc()
 
 
 def create_dir(directory):
@@ -245,10 +259,12 @@ def extract_challenge_data(challenge, phases):
         raise
 
 
-def process_submission_callback(body):
+def process_submission_callback(body, submission=None, challenge_phase=None):
     try:
         logger.info("[x] Received submission message %s" % body)
-        process_submission_message(body)
+        process_submission_message(
+            body, submission=submission, challenge_phase=challenge_phase
+        )
     except Exception as e:
         logger.exception(
             "Exception while processing message from submission queue with error {}".format(
@@ -257,22 +273,43 @@ def process_submission_callback(body):
         )
 
 
-def process_submission_message(message):
+def process_submission_message(message, submission=None, challenge_phase=None):
     """
     Extracts the submission related metadata from the message
     and send the submission object for evaluation
+
+    The submission and the challenge phase leased along with the message
+    are fetched from EvalAI if they are not given.
     """
     challenge_pk = int(message.get("challenge_pk"))
     phase_pk = message.get("phase_pk")
     submission_pk = message.get("submission_pk")
-    submission_instance = extract_submission_data(submission_pk)
+    try:
+        submission_instance = extract_submission_data(
+            submission_pk, submission
+        )
+    except DownloadError as e:
+        # The submission can't be evaluated, it is failed instead of
+        # staying submitted once its message is acknowledged
+        submission_data = {
+            "challenge_phase": phase_pk,
+            "submission": submission_pk,
+            "submission_status": "failed",
+            "stdout": " ",
+            "stderr": "Failed to download the submission file, error {}".format(
+                e
+            ),
+        }
+        update_submission_data(submission_data, challenge_pk, submission_pk)
+        return
 
     # so that the further execution does not happen
     if not submission_instance:
         return
     challenge = get_challenge_by_queue_name()
     remote_evaluation = challenge.get("remote_evaluation")
-    challenge_phase = get_challenge_phase_by_pk(challenge_pk, phase_pk)
+    if not challenge_phase:
+        challenge_phase = get_challenge_phase_by_pk(challenge_pk, phase_pk)
     if not challenge_phase:
         logger.exception(
             "Challenge Phase {} does not exist for queue {}".format(
@@ -293,12 +330,13 @@ def process_submission_message(message):
     )
 
 
-def extract_submission_data(submission_pk):
+def extract_submission_data(submission_pk, submission=None):
     """
     * Expects submission id and extracts input file for it.
     """
 
-    submission = get_submission_by_pk(submission_pk)
+    if not submission:
+        submission = get_submission_by_pk(submission_pk)
     if not submission:
         logger.critical("Submission {} does not exist".format(submission_pk))
         traceback.print_exc()
@@ -332,65 +370,24 @@ def get_request_headers():
 
 def make_request(url, method, data=None):
     headers = get_request_headers()
-    if method == "GET":
-        try:
-            response = requests.get(url=url, headers=headers)
-            response.raise_for_status()
-        except requests.exceptions.RequestException:
-            logger.info(
-                "The worker is not able to establish connection with EvalAI"
-            )
-            raise
-        return response.json()
-
-    elif method == "PUT":
-        try:
-            response = requests.put(url=url, headers=headers, data=data)
-            response.raise_for_status()
-        except requests.exceptions.RequestException:
-            logger.exception(
-                "The worker is not able to establish connection with EvalAI due to {}"
-                % (response.json())
-            )
-            raise
-        except requests.exceptions.HTTPError:
-            logger.exception(
-                f"The request to URL {url} is failed due to {response.json()}"
-            )
-            raise
-        return response.json()
-
-    elif method == "PATCH":
-        try:
-            response = requests.patch(url=url, headers=headers, data=data)
-            response.raise_for_status()
-        except requests.exceptions.RequestException:
-            logger.info(
-                "The worker is not able to establish connection with EvalAI"
-            )
-            raise
-        except requests.exceptions.HTTPError:
-            logger.info(
-                f"The request to URL {url} is failed due to {response.json()}"
-            )
-            raise
-        return response.json()
-
-    elif method == "POST":
-        try:
-            response = requests.post(url=url, headers=headers, data=data)
-            response.raise_for_status()
-        except requests.exceptions.RequestException:
-            logger.info(
-                "The worker is not able to establish connection with EvalAI"
-            )
-            raise
-        except requests.exceptions.HTTPError:
-            logger.info(
-                f"The request to URL {url} is failed due to {response.json()}"
+    try:
+        response = send_request(
+            EVALAI_SESSION, method, url, headers=headers, data=data
+        )
+        response.raise_for_status()
+    except requests.exceptions.HTTPError:
+        logger.exception(
+            "The request to URL {} is failed due to {}".format(
+                url, response.text
             )
-            raise
-        return response.json()
+        )
+        raise
+    except requests.exceptions.RequestException:
+        logger.exception(
+            "The worker is not able to establish connection with EvalAI"
+        )
+        raise
+    return response.json()
 
 
 def get_message_from_sqs_queue():
@@ -409,6 +406,64 @@ def delete_message_from_sqs_queue(receipt_handle):
     return response
 
 
+def lease_messages_from_sqs_queue(max_number_of_messages):
+    url = URLS.get("lease_messages_from_sqs_queue").format(
+        QUEUE_NAME, max_number_of_messages, SUBMISSION_LEASE_TIMEOUT
+    )
+    url = return_url_per_environment(url)
+    response = make_request(url, "GET")
+    return response
+
+
+def acknowledge_messages_from_sqs_queue(ack=(), nack=()):
+    url = URLS.get("acknowledge_messages_from_sqs_queue").format(QUEUE_NAME)
+    url = return_url_per_environment(url)
+    response = make_request(
+        url, "POST", data={"ack": list(ack), "nack": list(nack)}
+    )
+    return response
+
+
+def extend_messages_visibility(receipt_handles):
+    url = URLS.get("extend_messages_visibility").format(QUEUE_NAME)
+    url = return_url_per_environment(url)
+    response = make_request(
+        url,
+        "POST",
+        data={
+            "receipt_handles": list(receipt_handles),
+            "visibility_timeout": SUBMISSION_LEASE_TIMEOUT,
+        },
+    )
+    return response
+
+
+@contextlib.contextmanager
+def extend_messages_visibility_in_background(receipt_handles):
+    """
+    Extends the lease of messages every half lease timeout from a background
+    thread, so that they stay hidden from the other workers while a message
+    is processed for longer than `SUBMISSION_LEASE_TIMEOUT`
+    """
+    stopped = threading.Event()
+
+    def heartbeat():
+        while not stopped.wait(SUBMISSION_LEASE_TIMEOUT / 2):
+            try:
+                extend_messages_visibility(receipt_handles)
+            except Exception:
+                # The lease is extended again at the next heartbeat
+                pass
+
+    thread = threading.Thread(target=heartbeat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
 def get_submission_by_pk(submission_pk):
     url = URLS.get("get_submission_by_pk").format(submission_pk)
     url = return_url_per_environment(url)
@@ -588,32 +643,68 @@ def main():
     create_dir_as_python_package(SUBMISSION_DATA_BASE_DIR)
     load_challenge()
 
+    poll_interval = QUEUE_POLL_INTERVAL
     while True:
         logger.info(
             "Fetching new messages from the queue {}".format(QUEUE_NAME)
         )
-        message = get_message_from_sqs_queue()
-        message_body = message.get("body")
-        if message_body:
-            submission_pk = message_body.get("submission_pk")
-            submission = get_submission_by_pk(submission_pk)
-            if submission:
-                if submission.get("status") == "finished":
-                    message_receipt_handle = message.get("receipt_handle")
-                    delete_message_from_sqs_queue(message_receipt_handle)
-                elif submission.get("status") == "running":
-                    continue
-                else:
-                    message_receipt_handle = message.get("receipt_handle")
-                    logger.info(
-                        "Processing message body: {}".format(message_body)
+        # The messages are leased along with their submissions and
+        # challenge phases, so no other request is needed to process them
+        messages = lease_messages_from_sqs_queue(SUBMISSION_LEASE_SIZE).get(
+            "messages", []
+        )
+        for index, message in enumerate(messages):
+            if killer.kill_now:
+                # Let the other workers process the remaining messages
+                acknowledge_messages_from_sqs_queue(
+                    nack=[
+                        waiting_message.get("receipt_handle")
+                        for waiting_message in messages[index:]
+                    ]
+                )
+                break
+            if index:
+                # Keep the messages waiting for their turn leased
+                extend_messages_visibility(
+                    [
+                        waiting_message.get("receipt_handle")
+                        for waiting_message in messages[index:]
+                    ]
+                )
+            message_body = message.get("body")
+            message_receipt_handle = message.get("receipt_handle")
+            submission = message.get("submission")
+            if not submission or submission.get("status") == "finished":
+                acknowledge_messages_from_sqs_queue(
+                    ack=[message_receipt_handle]
+                )
+            elif submission.get("status") == "running":
+                continue
+            else:
+                logger.info("Processing message body: {}".format(message_body))
+                with extend_messages_visibility_in_background(
+                    [
+                        waiting_message.get("receipt_handle")
+                        for waiting_message in messages[index:]
+                    ]
+                ):
+                    process_submission_callback(
+                        message_body,
+                        submission=submission,
+                        challenge_phase=message.get("challenge_phase"),
                     )
-                    process_submission_callback(message_body)
-                    # Let the queue know that the message is processed
-                    delete_message_from_sqs_queue(message_receipt_handle)
-        time.sleep(5)
+                # Let the queue know that the message is processed
+                acknowledge_messages_from_sqs_queue(
+                    ack=[message_receipt_handle]
+                )
         if killer.kill_now:
             break
+        if messages:
+            poll_interval = QUEUE_POLL_INTERVAL
+        else:
+            # The lease API returns at once when the queue is empty
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, QUEUE_POLL_MAX_INTERVAL)
 
 
 if __name__ == "__main__":
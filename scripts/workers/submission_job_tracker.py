@@ -0,0 +1,369 @@
+import logging
+import queue
+import threading
+import time
+
+from kubernetes import client, watch
+from kubernetes.client.rest import ApiException
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_LABEL = "submission_pk"
+CHALLENGE_LABEL = "challenge_pk"
+PHASE_LABEL = "phase_pk"
+# Containers whose termination ends the evaluation of a submission
+EVALUATION_CONTAINERS = ("agent", "submission", "environment")
+SUBMISSION_DONE_STATUSES = ("finished", "failed", "cancelled")
+SUBMISSION_JOB_ERROR = "Submission Job Failed."
+POD_LOG_MAX_SIZE = 10000
+# Seconds after which a watch is restarted by the API server, kept below
+# the lifetime of the bearer token so that it is refreshed in between
+WATCH_TIMEOUT = 300
+WATCH_RETRY_DELAY = 5
+# Seconds between two checks of the status of the tracked submissions,
+# which is how cancelled submissions are noticed
+RESYNC_INTERVAL = 60
+
+
+def get_submission_labels(message):
+    """
+    Returns the labels identifying the submission of a job and of its pods
+
+    Arguments:
+        message {[dict]} -- Submission message from AWS SQS queue
+
+    Returns:
+        [dict] -- Kubernetes labels
+    """
+    return {
+        SUBMISSION_LABEL: str(message["submission_pk"]),
+        CHALLENGE_LABEL: str(message["challenge_pk"]),
+        PHASE_LABEL: str(message["phase_pk"]),
+    }
+
+
+class KubernetesWatchSource:
+    """
+    Streams the events of the submission jobs of a challenge and of their
+    pods, restarting the watches when they expire or fail
+    """
+
+    def __init__(
+        self,
+        batch_v1_api_instance,
+        core_v1_api_instance,
+        challenge_pk,
+        namespace="default",
+    ):
+        self.list_functions = {
+            "job": batch_v1_api_instance.list_namespaced_job,
+            "pod": core_v1_api_instance.list_namespaced_pod,
+        }
+        self.label_selector = "{},{}={}".format(
+            SUBMISSION_LABEL, CHALLENGE_LABEL, challenge_pk
+        )
+        self.namespace = namespace
+        self.events_queue = queue.Queue()
+        self.stopped = threading.Event()
+
+    def watch(self, kind):
+        resource_version = None
+        while not self.stopped.is_set():
+            kwargs = {
+                "label_selector": self.label_selector,
+                "timeout_seconds": WATCH_TIMEOUT,
+            }
+            if resource_version:
+                kwargs["resource_version"] = resource_version
+            try:
+                for event in watch.Watch().stream(
+                    self.list_functions[kind], self.namespace, **kwargs
+                ):
+                    resource_version = event[
+                        "object"
+                    ].metadata.resource_version
+                    self.events_queue.put((kind, event))
+            except ApiException as e:
+                if e.status == 410:
+                    # The events since the last resource version are gone,
+                    # the watch starts over with the current objects
+                    resource_version = None
+                    continue
+                logger.exception("Failed to watch {}s: {}".format(kind, e))
+                self.stopped.wait(WATCH_RETRY_DELAY)
+            except Exception as e:
+                logger.exception("Failed to watch {}s: {}".format(kind, e))
+                self.stopped.wait(WATCH_RETRY_DELAY)
+
+    def events(self):
+        """
+        Yields `(kind, event)` tuples, or None every second without events
+        so that the consumer can do periodic work
+        """
+        for kind in self.list_functions:
+            threading.Thread(
+                target=self.watch, args=(kind,), daemon=True
+            ).start()
+        while not self.stopped.is_set():
+            try:
+                yield self.events_queue.get(timeout=1)
+            except queue.Empty:
+                yield None
+
+    def stop(self):
+        self.stopped.set()
+
+
+class SubmissionJobTracker:
+    """
+    Drives the submissions of a code upload challenge from the events of
+    their jobs and pods: marks them running once their pods start, reports
+    failures with the logs of the containers and deletes the jobs of
+    finished submissions. The tracked submissions are rebuilt from the job
+    labels, so nothing is lost when the worker restarts.
+    """
+
+    def __init__(
+        self,
+        evalai,
+        batch_v1_api_instance,
+        core_v1_api_instance,
+        namespace="default",
+        resync_interval=RESYNC_INTERVAL,
+    ):
+        self.evalai = evalai
+        self.batch_v1_api_instance = batch_v1_api_instance
+        self.core_v1_api_instance = core_v1_api_instance
+        self.namespace = namespace
+        self.resync_interval = resync_interval
+        self.submissions = {}
+        self.deleted_jobs = set()
+        self.disable_logs = {}
+
+    def run(self, source, should_stop=lambda: False):
+        """
+        Handles the events of a source until it is exhausted or
+        `should_stop` returns True
+
+        Arguments:
+            source {[KubernetesWatchSource]} -- Source of job and pod events
+            should_stop {[callable]} -- Returns True once the worker is stopping
+        """
+        next_resync = time.monotonic() + self.resync_interval
+        for item in source.events():
+            if item is not None:
+                kind, event = item
+                try:
+                    if kind == "job":
+                        self.handle_job_event(event)
+                    else:
+                        self.handle_pod_event(event)
+                except Exception as e:
+                    logger.exception(
+                        "Exception while handling {} event: {}".format(
+                            kind, e
+                        )
+                    )
+            if time.monotonic() >= next_resync:
+                self.resync()
+                next_resync = time.monotonic() + self.resync_interval
+            if should_stop():
+                break
+
+    def track(self, metadata, job_name):
+        """
+        Starts tracking the submission of a job, whose current status is
+        fetched once
+
+        Returns:
+            [dict] -- Tracked submission, None if it is already done
+        """
+        labels = metadata.labels
+        submission_pk = int(labels[SUBMISSION_LABEL])
+        if submission_pk in self.submissions:
+            return self.submissions[submission_pk]
+        if job_name in self.deleted_jobs:
+            return None
+        submission = {
+            "challenge_pk": int(labels[CHALLENGE_LABEL]),
+            "phase_pk": int(labels[PHASE_LABEL]),
+            "job_name": job_name,
+            "status": self.evalai.get_submission_by_pk(submission_pk).get(
+                "status"
+            ),
+        }
+        if submission["status"] in SUBMISSION_DONE_STATUSES:
+            self.delete_job(job_name)
+            return None
+        self.submissions[submission_pk] = submission
+        return submission
+
+    def handle_job_event(self, event):
+        job = event["object"]
+        submission_pk = int(job.metadata.labels[SUBMISSION_LABEL])
+        if event["type"] == "DELETED":
+            self.deleted_jobs.discard(job.metadata.name)
+            if submission_pk in self.submissions:
+                logger.info(
+                    "Job {} of submission {} was deleted".format(
+                        job.metadata.name, submission_pk
+                    )
+                )
+                self.finish_submission(submission_pk)
+            return
+        if job.metadata.deletion_timestamp:
+            return
+        if not self.track(job.metadata, job.metadata.name):
+            return
+        for condition in (job.status and job.status.conditions) or []:
+            if condition.type == "Failed" and condition.status == "True":
+                self.finish_submission(submission_pk)
+                return
+
+    def handle_pod_event(self, event):
+        pod = event["object"]
+        if event["type"] == "DELETED" or pod.metadata.deletion_timestamp:
+            return
+        submission_pk = int(pod.metadata.labels[SUBMISSION_LABEL])
+        submission = self.track(
+            pod.metadata, pod.metadata.labels.get("job-name")
+        )
+        # Pods which are not assigned to a node yet have no containers
+        if not submission or not pod.status.container_statuses:
+            return
+        if submission["status"] != "running":
+            submission_data = {
+                "submission_status": "running",
+                "submission": submission_pk,
+                "job_name": submission["job_name"],
+            }
+            self.evalai.update_submission_status(
+                submission_data, submission["challenge_pk"]
+            )
+            submission["status"] = "running"
+        terminated_containers = [
+            container.name
+            for container in pod.status.container_statuses
+            if container.name in EVALUATION_CONTAINERS
+            and container.state.terminated is not None
+        ]
+        if terminated_containers:
+            self.finish_submission(
+                submission_pk, pod.metadata.name, terminated_containers
+            )
+
+    def finish_submission(
+        self, submission_pk, pod_name=None, terminated_containers=()
+    ):
+        """
+        Reports a submission as failed with the logs of its terminated
+        containers unless the evaluation already reported its result, then
+        deletes its job
+        """
+        submission = self.submissions.pop(submission_pk, None)
+        if submission is None:
+            return
+        try:
+            status = self.evalai.get_submission_by_pk(submission_pk).get(
+                "status"
+            )
+            if status not in SUBMISSION_DONE_STATUSES:
+                stderr, environment_log = self.get_failure_logs(
+                    submission, pod_name, terminated_containers
+                )
+                submission_data = {
+                    "challenge_phase": submission["phase_pk"],
+                    "submission": submission_pk,
+                    "stdout": "",
+                    "stderr": stderr,
+                    "environment_log": environment_log,
+                    "submission_status": "FAILED",
+                    "result": "[]",
+                    "metadata": "",
+                }
+                self.evalai.update_submission_data(
+                    submission_data,
+                    submission["challenge_pk"],
+                    submission["phase_pk"],
+                )
+        except Exception as e:
+            logger.exception(
+                "Exception while cleanup Submission {}:  {}".format(
+                    submission_pk, e
+                )
+            )
+        self.delete_job(submission["job_name"])
+
+    def get_failure_logs(self, submission, pod_name, terminated_containers):
+        """
+        Returns:
+            [tuple] -- Submission error and environment log of a failed submission
+        """
+        key = (submission["challenge_pk"], submission["phase_pk"])
+        if key not in self.disable_logs:
+            challenge_phase = self.evalai.get_challenge_phase_by_pk(*key)
+            self.disable_logs[key] = challenge_phase.get("disable_logs")
+        if self.disable_logs[key]:
+            return None, None
+        submission_error = SUBMISSION_JOB_ERROR
+        environment_log = SUBMISSION_JOB_ERROR
+        for container_name in terminated_containers:
+            try:
+                response = self.core_v1_api_instance.read_namespaced_pod_log(
+                    name=pod_name,
+                    namespace=self.namespace,
+                    _return_http_data_only=True,
+                    _preload_content=False,
+                    container=container_name,
+                )
+            except ApiException as e:
+                logger.exception(
+                    "Exception while reading Job logs {}".format(e)
+                )
+                continue
+            pod_log = response.data.decode("utf-8")[-POD_LOG_MAX_SIZE:]
+            if container_name == "environment":
+                environment_log = pod_log
+            else:
+                submission_error = pod_log
+        return submission_error, environment_log
+
+    def delete_job(self, job_name):
+        self.deleted_jobs.add(job_name)
+        try:
+            self.batch_v1_api_instance.delete_namespaced_job(
+                name=job_name,
+                namespace=self.namespace,
+                body=client.V1DeleteOptions(
+                    propagation_policy="Foreground", grace_period_seconds=5
+                ),
+            )
+            logger.info("Deleted job {}".format(job_name))
+        except ApiException as e:
+            if e.status == 404:
+                self.deleted_jobs.discard(job_name)
+            else:
+                logger.exception(
+                    "Failed to delete submission job: {}".format(e)
+                )
+
+    def resync(self):
+        """
+        Deletes the jobs of the tracked submissions which were finished or
+        cancelled without their containers terminating
+        """
+        for submission_pk, submission in list(self.submissions.items()):
+            try:
+                status = self.evalai.get_submission_by_pk(submission_pk).get(
+                    "status"
+                )
+            except Exception as e:
+                logger.exception(
+                    "Exception while fetching submission {}: {}".format(
+                        submission_pk, e
+                    )
+                )
+                continue
+            if status in SUBMISSION_DONE_STATUSES:
+                del self.submissions[submission_pk]
+                self.delete_job(submission["job_name"])
@@ -5,27 +5,27 @@ import contextlib
 import importlib
 import json
 import logging
+import multiprocessing
 import os
 import shutil
 import signal
-import subprocess
 import sys
 import tempfile
 import time
 import traceback
-import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from os.path import join
 
-import boto3
-import botocore
 import django
-import requests
 import yaml
+from django.core.files import File
 from django.core.files.base import ContentFile
 from django.utils import timezone
 
-from settings.common import SQS_RETENTION_PERIOD
-
+from .artifact_cache import ArtifactCache
+from .downloader import DownloadError, download_file
+from .output_capture import OutputCapture
 from .statsd_utils import increment_and_push_metrics_to_statsd
 
 # all challenge and submission will be stored in temp directory
@@ -45,6 +45,9 @@ logger.setLevel(logging.INFO)
 
 django.setup()
 
+from base.utils import (change_sqs_messages_visibility,  # noqa:E402
+                        delete_sqs_messages, extract_zip_archive,
+                        get_sqs_queue, receive_sqs_messages)
 from challenges.models import (Challenge, ChallengePhase,  # noqa:E402
                                ChallengePhaseSplit, LeaderboardData)
 # Load django app settings
@@ -58,6 +61,16 @@ LIMIT_CONCURRENT_SUBMISSION_PROCESSING = os.environ.get(
 DJANGO_SETTINGS_MODULE = os.environ.get(
     "DJANGO_SETTINGS_MODULE", "settings.dev"
 )
+# Time limit in seconds for the evaluation of a submission, the
+# `submission_time_limit` of the challenge if unset, 0 disables it
+SUBMISSION_EXECUTION_TIME_LIMIT = os.environ.get(
+    "SUBMISSION_EXECUTION_TIME_LIMIT"
+)
+# Number of times a submission is evaluated before it is failed when its
+# evaluation process keeps dying, e.g. when it runs out of memory
+SUBMISSION_MAX_RECEIVE_COUNT = int(
+    os.environ.get("SUBMISSION_MAX_RECEIVE_COUNT", 3)
+)
 
 CHALLENGE_DATA_BASE_DIR = join(COMPUTE_DIRECTORY_PATH, "challenge_data")
 SUBMISSION_DATA_BASE_DIR = join(COMPUTE_DIRECTORY_PATH, "submission_files")
@@ -78,6 +91,11 @@ EVALUATION_SCRIPTS = {}
 PHASE_ANNOTATION_FILE_NAME_MAP = {}
 WORKER_LOGS_PREFIX = "WORKER_LOG"
 SUBMISSION_LOGS_PREFIX = "SUBMISSION_LOG"
+# Created on first use since it lives outside of the temp directory
+ARTIFACT_CACHE = None
+# Set in the evaluation processes, which only run evaluations so that their
+# file descriptors can be captured
+IS_EVALUATION_PROCESS = False
 
 django.db.close_old_connections()
 
@@ -97,39 +115,45 @@ class ExecutionTimeLimitExceeded(Exception):
     pass
 
 
-class MultiOut(object):
-    def __init__(self, *args):
-        self.handles = args
-
-    def write(self, s):
-        for f in self.handles:
-            f.write(s)
-
-    def flush(self):
-        for f in self.handles:
-            f.flush()
+def alarm_handler(signum, frame):
+    raise ExecutionTimeLimitExceeded
 
 
 @contextlib.contextmanager
-def stdout_redirect(where):
-    sys.stdout = where
+def execution_time_limit(seconds):
+    """
+    Raises `ExecutionTimeLimitExceeded` in the block if it runs for more than `seconds`
+    """
+    if not seconds:
+        yield
+        return
+    signal.signal(signal.SIGALRM, alarm_handler)
+    signal.alarm(seconds)
     try:
-        yield where
+        yield
     finally:
-        sys.stdout = sys.__stdout__
+        signal.alarm(0)
 
 
-@contextlib.contextmanager
-def stderr_redirect(where):
-    sys.stderr = where
-    try:
-        yield where
-    finally:
-        sys.stderr = sys.__stderr__
+def get_execution_time_limit(challenge):
+    """
+    Returns the time limit in seconds for the evaluation of a submission of a
+    challenge, 0 if it is disabled
+    """
+    if SUBMISSION_EXECUTION_TIME_LIMIT is not None:
+        return int(SUBMISSION_EXECUTION_TIME_LIMIT)
+    return challenge.submission_time_limit
 
 
-def alarm_handler(signum, frame):
-    raise ExecutionTimeLimitExceeded
+def fail_submission(submission, error):
+    """
+    Marks a submission which can't be evaluated as failed, with the error in
+    its stderr file
+    """
+    submission.status = Submission.FAILED
+    submission.completed_at = timezone.now()
+    submission.stderr_file.save("stderr.txt", ContentFile(error), save=False)
+    submission.save()
 
 
 def download_and_extract_file(url, download_location):
@@ -138,33 +162,25 @@ def download_and_extract_file(url, download_location):
     * `download_location` should include name of file as well.
     """
     try:
-        response = requests.get(url, stream=True)
+        download_file(url, download_location)
     except Exception as e:
         logger.error(
             "{} Failed to fetch file from {}, error {}".format(
                 WORKER_LOGS_PREFIX, url, e
             )
         )
-        traceback.print_exc()
-        response = None
-
-    if response and response.status_code == 200:
-        with open(download_location, "wb") as f:
-            for chunk in response.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
+        raise
 
 
 def extract_zip_file(download_location, extract_location):
     """
-    Helper function to extract zip file
+    Helper function to extract zip file within the size and entry count
+    limits of `ZIP_EXTRACTION_MAX_SIZE` and `ZIP_EXTRACTION_MAX_ENTRIES`
     Params:
         * `download_location`: Location of zip file
         * `extract_location`: Location of directory for extracted file
     """
-    zip_ref = zipfile.ZipFile(download_location, "r")
-    zip_ref.extractall(extract_location)
-    zip_ref.close()
+    extract_zip_archive(download_location, extract_location)
 
 
 def delete_zip_file(download_location):
@@ -234,24 +250,18 @@ def download_and_extract_zip_file(url, download_location, extract_location):
     * `download_location` should include name of file as well.
     """
     try:
-        response = requests.get(url, stream=True)
+        download_file(url, download_location)
     except Exception as e:
         logger.error(
             "{} Failed to fetch file from {}, error {}".format(
                 WORKER_LOGS_PREFIX, url, e
             )
         )
-        response = None
-
-    if response and response.status_code == 200:
-        with open(download_location, "wb") as f:
-            for chunk in response.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
-        # extract zip file
-        extract_zip_file(download_location, extract_location)
-        # delete zip file
-        delete_zip_file(download_location)
+        raise
+    # extract zip file
+    extract_zip_file(download_location, extract_location)
+    # delete zip file
+    delete_zip_file(download_location)
 
 
 def create_dir(directory):
@@ -274,6 +284,17 @@ def create_dir_as_python_package(directory):
         pass
 
 
+def get_artifact_cache():
+    """
+    Returns the cache of the evaluation scripts, annotation files and
+    requirements that is kept across worker restarts
+    """
+    global ARTIFACT_CACHE
+    if ARTIFACT_CACHE is None:
+        ARTIFACT_CACHE = ArtifactCache()
+    return ARTIFACT_CACHE
+
+
 def return_file_url_per_environment(url):
     if (
         DJANGO_SETTINGS_MODULE == "settings.dev"
@@ -310,14 +331,26 @@ def extract_challenge_data(challenge, phases):
     challenge_zip_file = join(
         challenge_data_directory, "challenge_{}.zip".format(challenge.id)
     )
-    download_and_extract_zip_file(
-        evaluation_script_url, challenge_zip_file, challenge_data_directory
-    )
+    # The evaluation script and the annotation files are only downloaded
+    # when they changed since the worker last fetched them
+    artifact_cache = get_artifact_cache()
+    if not artifact_cache.fetch_to(
+        challenge.evaluation_script.name,
+        evaluation_script_url,
+        challenge_zip_file,
+    ):
+        raise DownloadError(
+            "Failed to fetch the evaluation script of challenge {}".format(
+                challenge.id
+            )
+        )
+    extract_zip_file(challenge_zip_file, challenge_data_directory)
+    delete_zip_file(challenge_zip_file)
 
     try:
         requirements_location = join(challenge_data_directory, "requirements.txt")
         if os.path.isfile(requirements_location):
-            subprocess.check_output([sys.executable, "-m", "pip", "install", "-r", requirements_location])
+            artifact_cache.install_requirements(requirements_location)
         else:
             logger.info("No custom requirements for challenge {}".format(challenge.id))
     except Exception as e:
@@ -347,7 +380,16 @@ def extract_challenge_data(challenge, phases):
             phase_id=phase.id,
             annotation_file=annotation_file_name,
         )
-        download_and_extract_file(annotation_file_url, annotation_file_path)
+        if not artifact_cache.fetch_to(
+            phase.test_annotation.name,
+            annotation_file_url,
+            annotation_file_path,
+        ):
+            raise DownloadError(
+                "Failed to fetch the annotation file of challenge phase {}".format(
+                    phase.id
+                )
+            )
 
     try:
         # import the challenge after everything is finished
@@ -429,9 +471,19 @@ def extract_submission_data(submission_id):
     # create submission directory
     create_dir_as_python_package(submission_data_directory)
 
-    download_and_extract_file(
-        submission_input_file, submission_input_file_path
-    )
+    try:
+        download_and_extract_file(
+            submission_input_file, submission_input_file_path
+        )
+    except DownloadError as e:
+        # The submission can't be evaluated, it is failed instead of
+        # staying submitted
+        fail_submission(
+            submission,
+            "Failed to download the submission file, error {}".format(e),
+        )
+        delete_submission_data_directory(submission_data_directory)
+        return None
 
     return submission
 
@@ -476,8 +528,18 @@ def run_submission(
     stdout_file = join(temp_run_dir, "temp_stdout.txt")
     stderr_file = join(temp_run_dir, "temp_stderr.txt")
 
-    stdout = open(stdout_file, "a+")
-    stderr = open(stderr_file, "a+")
+    # Evaluations run in the worker process itself don't redirect its file
+    # descriptors, the logs of the worker would be captured otherwise
+    stdout = OutputCapture(
+        sys.__stdout__.fileno(),
+        stdout_file,
+        redirect_fd=IS_EVALUATION_PROCESS,
+    )
+    stderr = OutputCapture(
+        sys.__stderr__.fileno(),
+        stderr_file,
+        redirect_fd=IS_EVALUATION_PROCESS,
+    )
 
     remote_evaluation = submission.challenge_phase.challenge.remote_evaluation
 
@@ -488,36 +550,34 @@ def run_submission(
                     SUBMISSION_LOGS_PREFIX, submission.id
                 )
             )
-            with stdout_redirect(
-                MultiOut(stdout, sys.__stdout__)
-            ) as new_stdout, stderr_redirect(  # noqa
-                MultiOut(stderr, sys.__stderr__)
-            ) as new_stderr:  # noqa
+            with stdout, stderr, execution_time_limit(
+                get_execution_time_limit(submission.challenge_phase.challenge)
+            ):
                 submission_output = EVALUATION_SCRIPTS[challenge_id].evaluate(
                     annotation_file_path,
                     user_annotation_file_path,
                     challenge_phase.codename,
                     submission_metadata=submission_serializer.data,
                 )
+            stderr.close()
+            stdout.close()
             return
         except Exception:
             stderr.write(traceback.format_exc())
-            stderr.close()
-            stdout.close()
             submission.status = Submission.FAILED
             submission.completed_at = timezone.now()
             submission.save()
             if not challenge_phase.disable_logs:
-                with open(stdout_file, "r") as stdout:
-                    stdout_content = stdout.read()
+                with stdout.open() as stdout_content:
                     submission.stdout_file.save(
-                        "stdout.txt", ContentFile(stdout_content)
+                        "stdout.txt", File(stdout_content)
                     )
-                with open(stderr_file, "r") as stderr:
-                    stderr_content = stderr.read()
+                with stderr.open() as stderr_content:
                     submission.stderr_file.save(
-                        "stderr.txt", ContentFile(stderr_content)
+                        "stderr.txt", File(stderr_content)
                     )
+            stderr.close()
+            stdout.close()
 
             # delete the complete temp run directory
             shutil.rmtree(temp_run_dir)
@@ -526,11 +586,12 @@ def run_submission(
     # call `main` from globals and set `status` to running and hence `started_at`
     try:
         successful_submission_flag = True
-        with stdout_redirect(
-            MultiOut(stdout, sys.__stdout__)
-        ) as new_stdout, stderr_redirect(  # noqa
-            MultiOut(stderr, sys.__stderr__)
-        ) as new_stderr:  # noqa
+        # In the evaluation processes the output is captured at the file
+        # descriptor level so that the output of C extensions and
+        # subprocesses is captured as well
+        with stdout, stderr, execution_time_limit(
+            get_execution_time_limit(submission.challenge_phase.challenge)
+        ):
             submission_output = EVALUATION_SCRIPTS[challenge_id].evaluate(
                 annotation_file_path,
                 user_annotation_file_path,
@@ -666,22 +727,17 @@ def run_submission(
         )
         submission.save()
 
-    stderr.close()
-    stdout.close()
-    stderr_content = open(stderr_file, "r").read()
-    stdout_content = open(stdout_file, "r").read()
-
     # TODO :: see if two updates can be combine into a single update.
     if not challenge_phase.disable_logs:
-        with open(stdout_file, "r") as stdout:
-            stdout_content = stdout.read()
-            submission.stdout_file.save("stdout.txt", ContentFile(stdout_content))
+        with stdout.open() as stdout_content:
+            submission.stdout_file.save("stdout.txt", File(stdout_content))
         if submission_status is Submission.FAILED:
-            with open(stderr_file, "r") as stderr:
-                stderr_content = stderr.read().encode("utf-8")
+            with stderr.open() as stderr_content:
                 submission.stderr_file.save(
-                    "stderr.txt", ContentFile(stderr_content)
+                    "stderr.txt", File(stderr_content)
                 )
+    stderr.close()
+    stdout.close()
 
     # delete the complete temp run directory
     shutil.rmtree(temp_run_dir)
@@ -772,46 +828,9 @@ def get_or_create_sqs_queue(queue_name, challenge=None):
     Returns:
         Returns the SQS Queue object
     """
-    if settings.DEBUG or settings.TEST:
-        sqs = boto3.resource(
-            "sqs",
-            endpoint_url=os.environ.get("AWS_SQS_ENDPOINT", "http://sqs:9324"),
-            region_name=os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
-            aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
-            aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-        )
-    else:
-        if challenge and challenge.use_host_sqs:
-            sqs = boto3.resource(
-                "sqs",
-                region_name=challenge.queue_aws_region,
-                aws_secret_access_key=challenge.aws_secret_access_key,
-                aws_access_key_id=challenge.aws_access_key_id,
-            )
-        else:
-            sqs = boto3.resource(
-                "sqs",
-                region_name=os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
-                aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
-                aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-            )
     if queue_name == "":
         queue_name = "evalai_submission_queue"
-    # Check if the queue exists. If no, then create one
-    try:
-        queue = sqs.get_queue_by_name(QueueName=queue_name)
-    except botocore.exceptions.ClientError as ex:
-        if (
-            ex.response["Error"]["Code"]
-            != "AWS.SimpleQueueService.NonExistentQueue"
-        ):
-            logger.exception("Cannot get queue: {}".format(queue_name))
-        sqs_retention_period = SQS_RETENTION_PERIOD if challenge is None else str(challenge.sqs_retention_period)
-        queue = sqs.create_queue(
-            QueueName=queue_name,
-            Attributes={"MessageRetentionPeriod": sqs_retention_period},
-        )
-    return queue
+    return get_sqs_queue(queue_name, challenge)
 
 
 def load_challenge_and_return_max_submissions(q_params):
@@ -831,6 +850,179 @@ def load_challenge_and_return_max_submissions(q_params):
     return maximum_concurrent_submissions, challenge
 
 
+def get_evaluation_slots(maximum_concurrent_submissions):
+    """
+    Returns the number of submissions that the worker evaluates at a time
+    """
+    return max(
+        min(maximum_concurrent_submissions, multiprocessing.cpu_count()), 1
+    )
+
+
+def initialize_evaluation_process():
+    """
+    Runs in every evaluation process, the challenge modules are already
+    imported in the worker process before the evaluation processes are forked
+    """
+    global IS_EVALUATION_PROCESS
+    IS_EVALUATION_PROCESS = True
+    # The worker process receives the shutdown signals and drains the
+    # submissions being evaluated before quitting
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+def create_evaluation_pool(evaluation_slots):
+    return ProcessPoolExecutor(
+        max_workers=evaluation_slots,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=initialize_evaluation_process,
+    )
+
+
+def finish_submission_messages(
+    futures, in_progress, queue, queue_name, is_remote
+):
+    """
+    Deletes the messages of the evaluated submissions from the queue in a batch,
+    the messages of the submissions whose evaluation process died are redelivered
+    until they were received `SUBMISSION_MAX_RECEIVE_COUNT` times
+
+    Returns:
+        bool -- False if the evaluation pool is broken and needs to be recreated
+    """
+    messages = []
+    unprocessed_messages = []
+    is_pool_broken = False
+    for future in futures:
+        message = in_progress.pop(future)
+        try:
+            future.result()
+        except BrokenProcessPool:
+            logger.exception(
+                "{} Evaluation process died while processing message body: {}".format(
+                    WORKER_LOGS_PREFIX, message.body
+                )
+            )
+            is_pool_broken = True
+            receive_count = int(
+                message.attributes.get("ApproximateReceiveCount", 1)
+            )
+            if receive_count < SUBMISSION_MAX_RECEIVE_COUNT:
+                unprocessed_messages.append(message)
+                continue
+            # The submission keeps killing its evaluation process and the
+            # other submissions being evaluated along with it
+            submission = Submission.objects.filter(
+                pk=yaml.safe_load(message.body).get("submission_pk")
+            ).first()
+            if submission is not None:
+                fail_submission(
+                    submission,
+                    "The evaluation process died {} times while evaluating "
+                    "the submission".format(receive_count),
+                )
+        messages.append(message)
+        increment_and_push_metrics_to_statsd(queue_name, is_remote)
+    # Let the queue know that the messages are processed
+    delete_sqs_messages(queue, messages)
+    if unprocessed_messages:
+        change_sqs_messages_visibility(queue, unprocessed_messages, 0)
+    return not is_pool_broken
+
+
+def process_submission_messages_concurrently(
+    queue,
+    queue_name,
+    is_remote,
+    challenge,
+    maximum_concurrent_submissions,
+    killer,
+):
+    """
+    Evaluates the submissions of the queue in a pool of evaluation processes,
+    the messages are deleted from the queue once their evaluation is finished
+    """
+    evaluation_slots = get_evaluation_slots(maximum_concurrent_submissions)
+    logger.info(
+        "{} Evaluating up to {} submissions at a time".format(
+            WORKER_LOGS_PREFIX, evaluation_slots
+        )
+    )
+    # The messages being evaluated are kept hidden from the other workers
+    visibility_timeout = int(queue.attributes.get("VisibilityTimeout", 30))
+    visibility_changed_at = time.time()
+    evaluation_pool = create_evaluation_pool(evaluation_slots)
+    in_progress = {}
+    while not killer.kill_now:
+        if in_progress:
+            done, _ = wait(in_progress, timeout=1, return_when=FIRST_COMPLETED)
+            if done and not finish_submission_messages(
+                done, in_progress, queue, queue_name, is_remote
+            ):
+                evaluation_pool.shutdown(wait=False)
+                evaluation_pool = create_evaluation_pool(evaluation_slots)
+            if time.time() - visibility_changed_at > visibility_timeout / 2:
+                change_sqs_messages_visibility(
+                    queue, in_progress.values(), visibility_timeout
+                )
+                visibility_changed_at = time.time()
+
+        free_slots = evaluation_slots - len(in_progress)
+        if not free_slots:
+            continue
+        # Long poll only while no submission is being evaluated so that the
+        # finished evaluations are not kept waiting
+        messages = receive_sqs_messages(
+            queue,
+            free_slots,
+            wait_time_seconds=0 if in_progress else None,
+            attribute_names=["ApproximateReceiveCount"],
+        )
+        messages = [
+            message
+            for message in messages
+            if not json.loads(message.body).get(
+                "is_static_dataset_code_upload_submission"
+            )
+        ]
+        if not messages:
+            continue
+        current_running_submissions_count = Submission.objects.filter(
+            challenge_phase__challenge=challenge.id, status="running"
+        ).count()
+        free_slots = min(
+            free_slots,
+            maximum_concurrent_submissions - current_running_submissions_count,
+        )
+        free_slots = max(free_slots, 0)
+        if len(messages) > free_slots:
+            # The other workers can evaluate the messages which don't fit
+            change_sqs_messages_visibility(queue, messages[free_slots:], 0)
+        # The forked evaluation processes must not share the database connection
+        django.db.connections.close_all()
+        for message in messages[:free_slots]:
+            logger.info(
+                "{} Processing message body: {}".format(
+                    WORKER_LOGS_PREFIX, message.body
+                )
+            )
+            future = evaluation_pool.submit(
+                process_submission_callback, message.body
+            )
+            in_progress[future] = message
+
+    logger.info(
+        "{} Waiting for {} submissions being evaluated".format(
+            WORKER_LOGS_PREFIX, len(in_progress)
+        )
+    )
+    finish_submission_messages(
+        wait(in_progress).done, in_progress, queue, queue_name, is_remote
+    )
+    evaluation_pool.shutdown()
+
+
 def main():
     killer = GracefulKiller()
     logger.info(
@@ -844,6 +1036,8 @@ def main():
 
     q_params = {}
     q_params["end_date__gt"] = timezone.now()
+    # Submissions are evaluated one at a time when all challenges are loaded
+    maximum_concurrent_submissions = None
 
     challenge_pk = os.environ.get("CHALLENGE_PK")
     if challenge_pk:
@@ -877,67 +1071,35 @@ def main():
     queue_name = os.environ.get("CHALLENGE_QUEUE", "evalai_submission_queue")
     queue = get_or_create_sqs_queue(queue_name, challenge)
     is_remote = int(challenge.remote_evaluation)
+    if maximum_concurrent_submissions is not None:
+        process_submission_messages_concurrently(
+            queue,
+            queue_name,
+            is_remote,
+            challenge,
+            maximum_concurrent_submissions,
+            killer,
+        )
+        return
     while True:
-        for message in queue.receive_messages():
+        # A single message is received at a time since the messages waiting
+        # for their evaluation would become visible to the other workers
+        for message in receive_sqs_messages(queue):
             if json.loads(message.body).get(
                 "is_static_dataset_code_upload_submission"
             ):
                 continue
-            if settings.DEBUG or settings.TEST:
-                if eval(LIMIT_CONCURRENT_SUBMISSION_PROCESSING):
-                    current_running_submissions_count = (
-                        Submission.objects.filter(
-                            challenge_phase__challenge=challenge.id,
-                            status="running",
-                        ).count()
-                    )
-                    if (
-                        current_running_submissions_count
-                        == maximum_concurrent_submissions
-                    ):
-                        pass
-                    else:
-                        logger.info(
-                            "{} Processing message body: {}".format(
-                                WORKER_LOGS_PREFIX, message.body
-                            )
-                        )
-                        process_submission_callback(message.body)
-                        # Let the queue know that the message is processed
-                        message.delete()
-                        increment_and_push_metrics_to_statsd(queue_name, is_remote)
-                else:
-                    logger.info(
-                        "{} Processing message body: {}".format(
-                            WORKER_LOGS_PREFIX, message.body
-                        )
-                    )
-                    process_submission_callback(message.body)
-                    # Let the queue know that the message is processed
-                    message.delete()
-                    increment_and_push_metrics_to_statsd(queue_name, is_remote)
-            else:
-                current_running_submissions_count = Submission.objects.filter(
-                    challenge_phase__challenge=challenge.id, status="running"
-                ).count()
-                if (
-                    current_running_submissions_count
-                    == maximum_concurrent_submissions
-                ):
-                    pass
-                else:
-                    logger.info(
-                        "{} Processing message body: {}".format(
-                            WORKER_LOGS_PREFIX, message.body
-                        )
-                    )
-                    process_submission_callback(message.body)
-                    # Let the queue know that the message is processed
-                    message.delete()
-                    increment_and_push_metrics_to_statsd(queue_name, is_remote)
+            logger.info(
+                "{} Processing message body: {}".format(
+                    WORKER_LOGS_PREFIX, message.body
+                )
+            )
+            process_submission_callback(message.body)
+            # Let the queue know that the message is processed
+            message.delete()
+            increment_and_push_metrics_to_statsd(queue_name, is_remote)
         if killer.kill_now:
             break
-        time.sleep(0.1)
 
 
 if __name__ == "__main__":
@@ -83,6 +83,7 @@ INSTALLED_APPS = DEFAULT_APPS + OUR_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
     "middleware.statsd.StatsdMetricsMiddleware",
+    "middleware.gzip_request.GZipRequestMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -91,6 +92,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "middleware.request_memo.RequestMemoMiddleware",
 ]
 
 ROOT_URLCONF = "evalai.urls"
@@ -407,3 +409,25 @@ EKS_CLUSTER_TRUST_RELATION = {
 
 # SQS Queue Message Retention Period
 SQS_RETENTION_PERIOD = "345600"
+
+# Seconds for which the workers long poll the SQS queues for submission
+# messages, the message APIs don't wait since they run in synchronous processes
+SQS_WAIT_TIME_SECONDS = 20
+
+# Zip files are downloaded into a temporary file kept in memory up to this
+# size, and are rejected when their content exceeds the extraction limits
+ZIP_SPOOL_MAX_MEMORY_SIZE = 16 * 1024 * 1024
+ZIP_EXTRACTION_MAX_SIZE = int(
+    os.environ.get("ZIP_EXTRACTION_MAX_SIZE", 10 * 1024 * 1024 * 1024)
+)
+ZIP_EXTRACTION_MAX_ENTRIES = int(
+    os.environ.get("ZIP_EXTRACTION_MAX_ENTRIES", 100000)
+)
+
+# Number of submissions whose status can be updated with a single request
+MAX_BULK_SUBMISSION_UPDATES = 1000
+
+# Storage of the submission CSVs exported in the background, the default
+# storage if None. The exports are deleted after `SUBMISSION_EXPORTS_TTL` seconds
+SUBMISSION_EXPORTS_STORAGE = None
+SUBMISSION_EXPORTS_TTL = 24 * 60 * 60
@@ -1,6 +1,10 @@
 from storages.backends.s3boto import S3BotoStorage
 
-from .prod import STATICFILES_LOCATION, MEDIAFILES_LOCATION
+from .prod import (
+    MEDIAFILES_LOCATION,
+    PRESIGNED_URL_EXPIRY_TIME,
+    STATICFILES_LOCATION,
+)
 
 # In order to make sure that both static and media files are stored in
 # different directories
@@ -12,3 +16,11 @@ class StaticStorage(S3BotoStorage):
 
 class MediaStorage(S3BotoStorage):
     location = MEDIAFILES_LOCATION
+
+
+class PrivateMediaStorage(MediaStorage):
+    """Media files only served through expiring signed URLs"""
+
+    default_acl = "private"
+    querystring_auth = True
+    querystring_expire = PRESIGNED_URL_EXPIRY_TIME
@@ -58,6 +58,8 @@ MEDIA_URL = "http://%s.s3.amazonaws.com/%s/" % (
     MEDIAFILES_LOCATION,
 )
 DEFAULT_FILE_STORAGE = "settings.custom_storages.MediaStorage"
+# The submission exports contain the emails of the participants
+SUBMISSION_EXPORTS_STORAGE = "settings.custom_storages.PrivateMediaStorage"
 
 # Setup Email Backend related settings
 DEFAULT_FROM_EMAIL = "noreply@cloudcv.org"
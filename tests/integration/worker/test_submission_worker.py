@@ -484,13 +484,13 @@ class RunSubmissionTestClass(BaseTestClass):
             user_annotation_file_path,
         )
 
-        self.assertEqual(
-            mock_open.return_value.write.call_args_list[0],
-            mock.call(
-                "ORGINIAL EXCEPTION: No such relation between Challenge Phase and DatasetSplit"
-                " specified by Challenge Host \n"
-            ),
-        )
+        with open(os.path.join(temp_run_dir, "temp_stderr.txt")) as stderr:
+            self.assertTrue(
+                stderr.read().startswith(
+                    "ORGINIAL EXCEPTION: No such relation between Challenge Phase and DatasetSplit"
+                    " specified by Challenge Host \n"
+                )
+            )
 
         annotation_file_path = "mocked/dir/challenge_data/challenge_{}/phase_data/phase_{}/test_annotation_file.txt".format(
             challenge_pk, phase_pk
@@ -57,3 +57,13 @@ class TestStringMethods(BaseAPITestClass):
                 self.challenge.pk
             ),
         )
+
+    def test_get_challenge_overview_url(self):
+        url = reverse_lazy(
+            "analytics:get_challenge_overview",
+            kwargs={"challenge_pk": self.challenge.pk},
+        )
+        self.assertEqual(
+            str(url),
+            "/api/analytics/challenge/{0}/overview".format(self.challenge.pk),
+        )
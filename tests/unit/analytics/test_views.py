@@ -8,9 +8,13 @@ from datetime import timedelta
 from django.urls import reverse_lazy
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from allauth.account.models import EmailAddress
+from analytics.models import SubmissionCountRollup
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 
@@ -1017,3 +1021,211 @@ class GetParticipantTeamsTest(BaseAPITestClass):
         response = self.client.get(self.url, {})
         self.assertEqual(response.data, expected)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GetChallengeOverviewTest(BaseAPITestClass):
+    def setUp(self):
+        super(GetChallengeOverviewTest, self).setUp()
+        self.url = reverse_lazy(
+            "analytics:get_challenge_overview",
+            kwargs={"challenge_pk": self.challenge1.pk},
+        )
+        self.challenge1.participant_teams.add(
+            self.participant_team, self.participant_team3
+        )
+        self.submission = Submission.objects.create(
+            participant_team=self.participant_team,
+            challenge_phase=self.challenge_phase1,
+            created_by=self.participant_team.created_by,
+            status="submitted",
+            input_file=self.challenge_phase1.test_annotation,
+            method_name="Test Method",
+            is_public=False,
+        )
+        self.submission2 = Submission.objects.create(
+            participant_team=self.participant_team3,
+            challenge_phase=self.challenge_phase1,
+            created_by=self.participant_team3.created_by,
+            status="finished",
+            input_file=self.challenge_phase1.test_annotation,
+            method_name="Test Method",
+            is_public=True,
+            is_flagged=True,
+        )
+
+    def test_get_challenge_overview(self):
+        last_submission_timestamp = self.submission2.created_at
+        expected = {
+            "challenge": self.challenge1.pk,
+            "participant_team_count": 2,
+            "participant_count": 2,
+            "submission_count": {
+                "all": 2,
+                "daily": 2,
+                "weekly": 2,
+                "monthly": 2,
+            },
+            "last_submission_timestamp": last_submission_timestamp,
+            "challenge_phases": [
+                {
+                    "total_submissions": 2,
+                    "participant_team_count": 2,
+                    "flagged_submissions_count": 1,
+                    "public_submissions_count": 1,
+                    "challenge_phase": self.challenge_phase1.pk,
+                    "last_submission_timestamp": last_submission_timestamp,
+                },
+                {
+                    "total_submissions": 0,
+                    "participant_team_count": 0,
+                    "flagged_submissions_count": 0,
+                    "public_submissions_count": 0,
+                    "challenge_phase": self.challenge_phase2.pk,
+                    "last_submission_timestamp": None,
+                },
+            ],
+        }
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_challenge_overview_queries_do_not_grow_with_challenge_phases(
+        self,
+    ):
+        # Checking the email, fetching the challenge, checking the host and
+        # aggregating the participants, the submissions and the challenge phases
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url, {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_challenge_overview_when_user_is_not_host(self):
+        expected = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GetSubmissionHistogramTest(BaseAPITestClass):
+    def setUp(self):
+        super(GetSubmissionHistogramTest, self).setUp()
+        self.url = reverse_lazy(
+            "analytics:get_submission_histogram",
+            kwargs={"challenge_pk": self.challenge1.pk},
+        )
+        self.submissions = [
+            Submission.objects.create(
+                participant_team=self.participant_team,
+                challenge_phase=challenge_phase,
+                created_by=self.participant_team.created_by,
+                status="submitted",
+                input_file=challenge_phase.test_annotation,
+                method_name="Test Method",
+            )
+            for challenge_phase in (
+                self.challenge_phase1,
+                self.challenge_phase1,
+                self.challenge_phase2,
+            )
+        ]
+        self.hour = self.submissions[0].submitted_at.replace(
+            minute=0, second=0, microsecond=0
+        )
+        # Move the last submission a day back
+        self.submissions[2].submitted_at -= timedelta(days=1)
+        self.submissions[2].save()
+        self.submissions[0].status = "finished"
+        self.submissions[0].save()
+
+    def get_histogram(self, **query_params):
+        response = self.client.get(self.url, query_params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            (bucket["bucket"], bucket["count"])
+            for bucket in response.data["buckets"]
+        ]
+
+    def test_get_submission_histogram(self):
+        bucket = "{}Z".format(self.hour.isoformat().replace("+00:00", ""))
+        previous_day_bucket = "{}Z".format(
+            (self.hour - timedelta(days=1)).isoformat().replace("+00:00", "")
+        )
+        self.assertEqual(
+            self.get_histogram(granularity="hour"),
+            [(previous_day_bucket, 1), (bucket, 2)],
+        )
+        self.assertEqual(
+            self.get_histogram(
+                granularity="hour", challenge_phase=self.challenge_phase1.pk
+            ),
+            [(bucket, 2)],
+        )
+        self.assertEqual(
+            self.get_histogram(granularity="hour", status="submitted"),
+            [(previous_day_bucket, 1), (bucket, 1)],
+        )
+        self.assertEqual(
+            self.get_histogram(
+                granularity="hour",
+                start=(self.hour - timedelta(hours=1)).isoformat(),
+            ),
+            [(bucket, 2)],
+        )
+        self.assertEqual(
+            sum(count for _, count in self.get_histogram(granularity="month")),
+            3,
+        )
+
+    def test_get_submission_histogram_does_not_query_submissions(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get_histogram(granularity="day")
+        self.assertFalse(
+            any(
+                'FROM "submission"' in query["sql"]
+                for query in queries.captured_queries
+            )
+        )
+
+    def test_get_submission_histogram_after_submission_is_deleted(self):
+        self.submissions[1].delete()
+        self.assertEqual(
+            sum(count for _, count in self.get_histogram(granularity="day")),
+            2,
+        )
+
+    def test_get_submission_histogram_with_invalid_granularity(self):
+        response = self.client.get(self.url, {"granularity": "year"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("granularity", response.data)
+
+    def test_get_submission_histogram_when_user_is_not_host(self):
+        expected = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_backfill_submission_count_rollups(self):
+        expected = set(
+            SubmissionCountRollup.objects.filter(count__gt=0).values_list(
+                "challenge_phase", "status", "bucket", "count"
+            )
+        )
+        SubmissionCountRollup.objects.all().delete()
+        call_command(
+            "backfill_submission_count_rollups",
+            self.challenge1.pk,
+            stdout=io.StringIO(),
+        )
+        self.assertEqual(
+            set(
+                SubmissionCountRollup.objects.values_list(
+                    "challenge_phase", "status", "bucket", "count"
+                )
+            ),
+            expected,
+        )
@@ -1,19 +1,41 @@
+import botocore
+import mock
 import os
 import requests
 import responses
+import shutil
+import tempfile
+import threading
+import zipfile
+
+from io import BytesIO
+from os.path import join
 
 from datetime import timedelta
 
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from allauth.account.models import EmailAddress
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 
-from base.utils import RandomFileName, send_slack_notification, is_user_a_staff
+from base.utils import (
+    RandomFileName,
+    ZIP_DOWNLOAD_TIMEOUT,
+    ZipExtractionError,
+    change_sqs_messages_visibility,
+    delete_sqs_messages,
+    download_and_extract_zip_archive,
+    extract_zip_archive,
+    get_sqs_queue,
+    receive_sqs_messages,
+    send_slack_notification,
+    is_user_a_staff,
+)
 from challenges.models import Challenge, ChallengePhase
 from hosts.models import ChallengeHostTeam
 from jobs.models import Submission
@@ -157,3 +179,234 @@ class TestUserIsStaff(BaseAPITestClass):
         self.user.is_staff = False
         self.user.save()
         self.assertFalse(is_user_a_staff(self.user))
+
+
+class TestSQSMessages(BaseAPITestClass):
+    def setUp(self):
+        super(TestSQSMessages, self).setUp()
+        self.queue = mock.Mock(url="queue_url")
+        self.queue.delete_messages.return_value = {}
+        self.queue.change_message_visibility_batch.return_value = {}
+        self.messages = [
+            mock.Mock(receipt_handle="receipt_handle_{}".format(index))
+            for index in range(12)
+        ]
+
+    def test_receive_sqs_messages(self):
+        receive_sqs_messages(self.queue, 20)
+        self.queue.receive_messages.assert_called_with(
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=settings.SQS_WAIT_TIME_SECONDS,
+        )
+        receive_sqs_messages(self.queue, wait_time_seconds=0)
+        self.queue.receive_messages.assert_called_with(
+            MaxNumberOfMessages=1, WaitTimeSeconds=0
+        )
+        receive_sqs_messages(
+            self.queue, wait_time_seconds=0, visibility_timeout=60
+        )
+        self.queue.receive_messages.assert_called_with(
+            MaxNumberOfMessages=1, WaitTimeSeconds=0, VisibilityTimeout=60
+        )
+        receive_sqs_messages(
+            self.queue,
+            wait_time_seconds=0,
+            attribute_names=["ApproximateReceiveCount"],
+        )
+        self.queue.receive_messages.assert_called_with(
+            MaxNumberOfMessages=1,
+            WaitTimeSeconds=0,
+            AttributeNames=["ApproximateReceiveCount"],
+        )
+
+    def test_delete_sqs_messages(self):
+        delete_sqs_messages(self.queue, self.messages)
+        self.assertEqual(self.queue.delete_messages.call_count, 2)
+        self.queue.delete_messages.assert_called_with(
+            Entries=[
+                {"Id": "0", "ReceiptHandle": "receipt_handle_10"},
+                {"Id": "1", "ReceiptHandle": "receipt_handle_11"},
+            ]
+        )
+
+    @mock.patch("base.utils.logger.error")
+    def test_delete_sqs_messages_when_deletion_fails(self, mock_logger):
+        self.queue.delete_messages.return_value = {
+            "Failed": [{"Id": "1", "Message": "Error description"}]
+        }
+        failed_messages = delete_sqs_messages(self.queue, self.messages[:2])
+        self.assertEqual(failed_messages, [self.messages[1]])
+        mock_logger.assert_called_with(
+            "Cannot delete message receipt_handle_1 from queue queue_url: Error description"
+        )
+
+    def test_change_sqs_messages_visibility(self):
+        change_sqs_messages_visibility(self.queue, self.messages[:1], 60)
+        self.queue.change_message_visibility_batch.assert_called_once_with(
+            Entries=[
+                {
+                    "Id": "0",
+                    "ReceiptHandle": "receipt_handle_0",
+                    "VisibilityTimeout": 60,
+                }
+            ]
+        )
+
+
+@mock.patch("base.utils.boto3.resource")
+class TestGetSQSQueue(BaseAPITestClass):
+    def setUp(self):
+        super(TestGetSQSQueue, self).setUp()
+        # Start every test with empty caches
+        for patcher in [
+            mock.patch("base.utils.SQS_QUEUE_URLS", {}),
+            mock.patch("base.utils.SQS_RESOURCES", threading.local()),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.challenge.use_host_sqs = True
+        self.challenge.queue_aws_region = "us-east-1"
+        self.challenge.aws_access_key_id = "access_key_id"
+        self.challenge.aws_secret_access_key = "secret_access_key"
+
+    def test_get_sqs_queue_is_cached(self, mock_resource):
+        sqs = mock_resource.return_value
+        sqs.get_queue_by_name.return_value.url = "queue_url"
+
+        queue = get_sqs_queue("queue", self.challenge)
+        self.assertEqual(queue, sqs.get_queue_by_name.return_value)
+        queue = get_sqs_queue("queue", self.challenge)
+        self.assertEqual(queue, sqs.Queue.return_value)
+
+        sqs.Queue.assert_called_once_with("queue_url")
+        sqs.get_queue_by_name.assert_called_once_with(QueueName="queue")
+        self.assertEqual(mock_resource.call_count, 1)
+
+    @mock.patch("base.utils.settings.TEST", False)
+    @mock.patch("base.utils.settings.DEBUG", False)
+    def test_get_sqs_queue_after_credentials_change(self, mock_resource):
+        get_sqs_queue("queue", self.challenge)
+        self.challenge.aws_secret_access_key = "new_secret_access_key"
+        get_sqs_queue("queue", self.challenge)
+
+        self.assertEqual(mock_resource.call_count, 2)
+        mock_resource.assert_called_with(
+            "sqs",
+            region_name="us-east-1",
+            aws_secret_access_key="new_secret_access_key",
+            aws_access_key_id="access_key_id",
+        )
+        self.assertEqual(
+            mock_resource.return_value.get_queue_by_name.call_count, 2
+        )
+
+    @mock.patch("base.utils.SQS_QUEUE_URL_TIMEOUT", 0)
+    def test_get_sqs_queue_after_queue_url_expires(self, mock_resource):
+        get_sqs_queue("queue", self.challenge)
+        get_sqs_queue("queue", self.challenge)
+
+        self.assertEqual(mock_resource.call_count, 1)
+        self.assertEqual(
+            mock_resource.return_value.get_queue_by_name.call_count, 2
+        )
+
+    def test_get_sqs_queue_without_creating_it(self, mock_resource):
+        sqs = mock_resource.return_value
+        sqs.get_queue_by_name.side_effect = botocore.exceptions.ClientError(
+            {"Error": {"Code": "AWS.SimpleQueueService.NonExistentQueue"}},
+            "GetQueueUrl",
+        )
+
+        self.assertIsNone(
+            get_sqs_queue("queue", self.challenge, create=False)
+        )
+
+        sqs.create_queue.assert_not_called()
+
+
+class TestZipArchives(TestCase):
+    def setUp(self):
+        self.extract_location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.extract_location)
+        self.url = "http://testserver/media/challenge_config.zip"
+        self.zip_file = BytesIO()
+        with zipfile.ZipFile(
+            self.zip_file, mode="w", compression=zipfile.ZIP_DEFLATED
+        ) as zipper:
+            zipper.writestr("challenge/challenge_config.yaml", b"title: Test")
+            zipper.writestr("challenge/annotations.txt", b"0" * 1000)
+
+    @responses.activate
+    def test_download_and_extract_zip_archive(self):
+        responses.add(
+            responses.GET, self.url, body=self.zip_file.getvalue(), status=200
+        )
+
+        zip_ref = download_and_extract_zip_archive(
+            self.url, self.extract_location
+        )
+
+        self.assertIn("challenge/challenge_config.yaml", zip_ref.namelist())
+        with open(
+            join(self.extract_location, "challenge", "annotations.txt"), "rb"
+        ) as f:
+            self.assertEqual(f.read(), b"0" * 1000)
+
+    @responses.activate
+    @override_settings(ZIP_SPOOL_MAX_MEMORY_SIZE=10)
+    def test_download_and_extract_zip_archive_spooled_to_disk(self):
+        responses.add(
+            responses.GET, self.url, body=self.zip_file.getvalue(), status=200
+        )
+
+        with mock.patch(
+            "base.utils.tempfile.TemporaryFile",
+            side_effect=tempfile.TemporaryFile,
+        ) as mock_temporary_file:
+            download_and_extract_zip_archive(self.url, self.extract_location)
+
+        mock_temporary_file.assert_called_once_with()
+        self.assertTrue(
+            os.path.exists(
+                join(self.extract_location, "challenge", "annotations.txt")
+            )
+        )
+
+    @responses.activate
+    def test_download_and_extract_zip_archive_with_timeout(self):
+        responses.add(
+            responses.GET, self.url, body=self.zip_file.getvalue(), status=200
+        )
+
+        with mock.patch(
+            "base.utils.requests.get", side_effect=requests.get
+        ) as mock_get:
+            download_and_extract_zip_archive(self.url, self.extract_location)
+
+        mock_get.assert_called_once_with(
+            self.url, stream=True, timeout=ZIP_DOWNLOAD_TIMEOUT
+        )
+
+    @responses.activate
+    def test_download_and_extract_zip_archive_when_download_fails(self):
+        responses.add(responses.GET, self.url, status=404)
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            download_and_extract_zip_archive(self.url, self.extract_location)
+
+    def test_extract_zip_archive_when_content_is_too_large(self):
+        # The archive is much smaller than its content
+        with self.assertRaises(ZipExtractionError):
+            extract_zip_archive(
+                self.zip_file, self.extract_location, max_size=500
+            )
+
+        self.assertEqual(os.listdir(self.extract_location), [])
+
+    def test_extract_zip_archive_when_it_has_too_many_files(self):
+        with self.assertRaises(ZipExtractionError):
+            extract_zip_archive(
+                self.zip_file, self.extract_location, max_entries=1
+            )
+
+        self.assertEqual(os.listdir(self.extract_location), [])
@@ -17,12 +17,17 @@ from challenges.models import (Challenge, ChallengeConfiguration,
                                LeaderboardData, ChallengePrize, ChallengeSponsor)
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy
 from django.utils import timezone
 from hosts.models import ChallengeHost, ChallengeHostTeam
-from jobs.models import Submission
+from jobs.models import Submission, SubmissionExport
+from jobs.tasks import export_submissions_csv
 from jobs.serializers import ChallengeSubmissionManagementSerializer
 from moto import mock_s3
 from participants.models import Participant, ParticipantTeam
@@ -3175,7 +3180,7 @@ class CreateChallengePhaseTest(BaseChallengePhaseClass):
         )
         with mock.patch("challenges.views.requests.get") as m:
             resp = mock.Mock()
-            resp.content = self.test_zip_file.read()
+            resp.iter_content.return_value = [self.test_zip_file.read()]
             resp.status_code = 200
             m.return_value = resp
             response = self.client.post(
@@ -3233,7 +3238,7 @@ class CreateChallengePhaseTest(BaseChallengePhaseClass):
         )
         with mock.patch("challenges.views.requests.get") as m:
             resp = mock.Mock()
-            resp.content = self.test_zip_file.read()
+            resp.iter_content.return_value = [self.test_zip_file.read()]
             resp.status_code = 200
             m.return_value = resp
             response = self.client.post(
@@ -4147,7 +4152,7 @@ class CreateChallengeUsingZipFile(APITestCase):
 
         with mock.patch("challenges.views.requests.get") as m:
             resp = mock.Mock()
-            resp.content = self.test_zip_file.read()
+            resp.iter_content.return_value = [self.test_zip_file.read()]
             resp.status_code = 200
             m.return_value = resp
             response = self.client.post(
@@ -4461,6 +4466,46 @@ class GetAllSubmissionsTest(BaseAPITestClass):
         self.assertEqual(response_phase2.data["results"], [])
         self.assertEqual(response_phase2.status_code, status.HTTP_200_OK)
 
+    def test_get_all_submissions_queries_do_not_grow_with_submissions(self):
+        self.url = reverse_lazy(
+            "challenges:get_all_submissions_of_challenge",
+            kwargs={
+                "challenge_pk": self.challenge5.pk,
+                "challenge_phase_pk": self.challenge5_phase1.pk,
+            },
+        )
+        self.client.force_authenticate(user=self.user5)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {})
+
+        Participant.objects.create(
+            user=self.user7,
+            status=Participant.SELF,
+            team=self.participant_team7,
+        )
+        with self.settings(MEDIA_ROOT="/tmp/evalai"):
+            for index in range(3):
+                Submission.objects.create(
+                    participant_team=self.participant_team7,
+                    challenge_phase=self.challenge5_phase1,
+                    created_by=self.user7,
+                    status="submitted",
+                    input_file=SimpleUploadedFile(
+                        "test_sample_file.txt",
+                        b"Dummy file content",
+                        content_type="text/plain",
+                    ),
+                    method_name="Test Method {}".format(index),
+                )
+
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(self.url, {})
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertEqual(
+            response.data["results"][0]["participant_team_members"],
+            [{"username": self.user7.username, "email": self.user7.email}],
+        )
+
     def test_get_all_submissions_when_user_is_participant_of_challenge(self):
         self.url = reverse_lazy(
             "challenges:get_all_submissions_of_challenge",
@@ -4583,6 +4628,193 @@ class GetAllSubmissionsTest(BaseAPITestClass):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, expected_response)
 
+    def create_staff_user(self):
+        staff_user = User.objects.create(
+            username="admin_test",
+            password="admin@123",
+            is_staff=True,
+        )
+        EmailAddress.objects.create(
+            user=staff_user,
+            email="user8@test.com",
+            primary=True,
+            verified=True,
+        )
+        return staff_user
+
+    def test_get_challenges_submission_metrics_for_challenge_pks(self):
+        self.client.force_authenticate(user=self.create_staff_user())
+        url = reverse_lazy("challenges:get_all_challenges_submission_metrics")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                url, {"challenge_pks": "{},{}".format(self.challenge5.pk, 0)}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), [self.challenge5.pk])
+        self.assertEqual(response.data[self.challenge5.pk]["submitted"], 3)
+        self.assertEqual(response.data[self.challenge5.pk]["finished"], 0)
+        self.assertEqual(
+            len(
+                [
+                    query
+                    for query in queries.captured_queries
+                    if '"submission"' in query["sql"]
+                ]
+            ),
+            1,
+        )
+
+    def test_get_challenges_submission_metrics_with_invalid_challenge_pks(
+        self,
+    ):
+        self.client.force_authenticate(user=self.create_staff_user())
+        url = reverse_lazy("challenges:get_all_challenges_submission_metrics")
+        response = self.client.get(url, {"challenge_pks": "1,a"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {"error": "challenge_pks should be comma separated integers"},
+        )
+
+    def test_get_challenge_submission_metrics_by_pk(self):
+        self.client.force_authenticate(user=self.create_staff_user())
+        url = reverse_lazy(
+            "challenges:get_challenge_submission_metrics_by_pk",
+            kwargs={"pk": self.challenge5.pk},
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["submitted"], 3)
+        self.assertEqual(response.data["running"], 0)
+
+    def test_get_challenge_submission_metrics_by_pk_when_challenge_does_not_exist(
+        self,
+    ):
+        self.client.force_authenticate(user=self.create_staff_user())
+        url = reverse_lazy(
+            "challenges:get_challenge_submission_metrics_by_pk",
+            kwargs={"pk": self.challenge5.pk + 10},
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            response.data,
+            {
+                "detail": "Challenge {} does not exist".format(
+                    self.challenge5.pk + 10
+                )
+            },
+        )
+
+    @mock.patch("jobs.utils.get_or_create_sqs_queue")
+    def test_get_challenges_scaling_metrics(self, mock_get_queue):
+        mock_get_queue.return_value.meta.client.get_queue_attributes.return_value = {
+            "Attributes": {
+                "ApproximateNumberOfMessages": "2",
+                "ApproximateNumberOfMessagesNotVisible": "1",
+            }
+        }
+        self.submission1.status = Submission.FINISHED
+        self.submission1.started_at = timezone.now() - timedelta(seconds=90)
+        self.submission1.completed_at = timezone.now()
+        self.submission1.save()
+        self.client.force_authenticate(user=self.create_staff_user())
+        url = reverse_lazy("challenges:get_challenges_scaling_metrics")
+
+        response = self.client.get(
+            url, {"challenge_pks": "{},{}".format(self.challenge5.pk, 0)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), [self.challenge5.pk])
+        metrics = response.data[self.challenge5.pk]
+        self.assertEqual(metrics["pending_submissions"], 2)
+        self.assertEqual(metrics["queue_messages"], 2)
+        self.assertEqual(metrics["queue_messages_in_flight"], 1)
+        self.assertAlmostEqual(metrics["evaluation_time_p50"], 90, delta=1)
+        self.assertEqual(
+            metrics["evaluation_time_p50"], metrics["evaluation_time_p90"]
+        )
+        mock_get_queue.assert_called_once_with(
+            self.challenge5.queue, self.challenge5, create=False
+        )
+
+    @mock.patch("jobs.utils.get_or_create_sqs_queue")
+    def test_get_challenges_scaling_metrics_when_queue_does_not_exist(
+        self, mock_get_queue
+    ):
+        mock_get_queue.return_value = None
+        self.client.force_authenticate(user=self.create_staff_user())
+        url = reverse_lazy("challenges:get_challenges_scaling_metrics")
+
+        response = self.client.get(
+            url, {"challenge_pks": str(self.challenge5.pk)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = response.data[self.challenge5.pk]
+        self.assertEqual(metrics["queue_messages"], 0)
+        self.assertEqual(metrics["queue_messages_in_flight"], 0)
+
+    @mock.patch("jobs.utils.get_or_create_sqs_queue")
+    def test_get_challenges_scaling_metrics_when_queue_is_unavailable(
+        self, mock_get_queue
+    ):
+        mock_get_queue.side_effect = Exception("Queue is unavailable")
+        self.client.force_authenticate(user=self.create_staff_user())
+        url = reverse_lazy("challenges:get_challenges_scaling_metrics")
+
+        response = self.client.get(
+            url, {"challenge_pks": str(self.challenge5.pk)}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = response.data[self.challenge5.pk]
+        self.assertIsNone(metrics["queue_messages"])
+        self.assertIsNone(metrics["evaluation_time_p90"])
+        self.assertEqual(metrics["pending_submissions"], 3)
+
+    def test_get_challenges_scaling_metrics_when_user_is_not_staff(self):
+        url = reverse_lazy("challenges:get_challenges_scaling_metrics")
+        response = self.client.get(
+            url, {"challenge_pks": str(self.challenge5.pk)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @mock.patch("challenges.views.scale_challenge_workers")
+    def test_manage_worker_scale(self, mock_scale_challenge_workers):
+        mock_scale_challenge_workers.return_value = {
+            "count": 1,
+            "failures": [],
+        }
+        self.client.force_authenticate(user=self.create_staff_user())
+        url = reverse_lazy(
+            "challenges:manage_worker",
+            kwargs={"challenge_pk": self.challenge5.pk, "action": "scale"},
+        )
+
+        response = self.client.put(url, {"num_of_tasks": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"action": "Success"})
+        mock_scale_challenge_workers.assert_called_once()
+        self.assertEqual(mock_scale_challenge_workers.call_args[0][1], 3)
+
+    def test_manage_worker_scale_with_invalid_num_of_tasks(self):
+        self.client.force_authenticate(user=self.create_staff_user())
+        url = reverse_lazy(
+            "challenges:manage_worker",
+            kwargs={"challenge_pk": self.challenge5.pk, "action": "scale"},
+        )
+
+        response = self.client.put(url, {"num_of_tasks": -1})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {"error": "Please specify num_of_tasks as a non-negative integer."},
+        )
+
 
 class DownloadAllSubmissionsFileTest(BaseAPITestClass):
     def setUp(self):
@@ -4730,6 +4962,21 @@ class DownloadAllSubmissionsFileTest(BaseAPITestClass):
         response = self.client.get(self.url, {})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_submission_management_serializer_when_team_does_not_exist(self):
+        submission = Submission(
+            participant_team_id=ParticipantTeam.objects.latest("pk").pk + 1,
+            challenge_phase=self.challenge_phase,
+            created_by=self.user,
+        )
+        serializer = ChallengeSubmissionManagementSerializer()
+
+        for members in (
+            serializer.get_participant_team_members(submission),
+            serializer.get_participant_team_members_email_ids(submission),
+            serializer.get_participant_team_members_affiliations(submission),
+        ):
+            self.assertEqual(members, "Participant team does not exist")
+
     def test_download_all_submissions_for_host_with_custom_fields(self):
         self.url = reverse_lazy(
             "challenges:download_all_submissions",
@@ -4782,9 +5029,152 @@ class DownloadAllSubmissionsFileTest(BaseAPITestClass):
                     row.append(submission[field])
             expected_submissions.writerow(row)
         response = self.client.post(self.url, self.data)
-        self.assertEqual(response.content.decode("utf-8"), expected.getvalue())
+        self.assertEqual(
+            b"".join(response.streaming_content).decode("utf-8"),
+            expected.getvalue(),
+        )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    @mock.patch("challenges.views.export_submissions_csv.delay")
+    def test_download_all_submissions_in_background(self, mock_delay):
+        self.url = reverse_lazy(
+            "challenges:download_all_submissions",
+            kwargs={
+                "challenge_pk": self.challenge.pk,
+                "challenge_phase_pk": self.challenge_phase.pk,
+                "file_type": self.file_type_csv,
+            },
+        )
+        response = self.client.get("{}?async=true".format(self.url))
+        submission_export = SubmissionExport.objects.get(
+            challenge_phase=self.challenge_phase
+        )
+        mock_delay.assert_called_once_with(submission_export.pk, None, None)
+        self.assertEqual(submission_export.created_by, self.user)
+        self.assertTrue(
+            submission_export.file_name.startswith(
+                "submission_exports/challenge_{}/".format(self.challenge.pk)
+            )
+        )
+        expected = {
+            "id": submission_export.pk,
+            "status": SubmissionExport.PENDING,
+            "status_url": "http://testserver{}".format(
+                reverse_lazy(
+                    "challenges:get_submission_export",
+                    kwargs={
+                        "challenge_pk": self.challenge.pk,
+                        "submission_export_pk": submission_export.pk,
+                    },
+                )
+            ),
+        }
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_export_submissions_csv(self):
+        submission_export = SubmissionExport.objects.create(
+            challenge_phase=self.challenge_phase,
+            created_by=self.user,
+            file_name="submission_exports/challenge_{}/test.csv".format(
+                self.challenge.pk
+            ),
+        )
+        with self.settings(MEDIA_ROOT="/tmp/evalai"):
+            export_submissions_csv(submission_export.pk, fields=["status"])
+            submission_export.refresh_from_db()
+            with default_storage.open(submission_export.file_name) as csv_file:
+                content = csv_file.read().decode("utf-8")
+            default_storage.delete(submission_export.file_name)
+        self.assertEqual(submission_export.status, SubmissionExport.FINISHED)
+        self.assertEqual(
+            content,
+            "id,Status\r\n{},submitted\r\n".format(self.submission.pk),
+        )
+
+    def test_export_submissions_csv_deletes_expired_exports(self):
+        expired_submission_export = SubmissionExport.objects.create(
+            challenge_phase=self.challenge_phase,
+            created_by=self.user,
+            file_name="submission_exports/challenge_{}/expired.csv".format(
+                self.challenge.pk
+            ),
+        )
+        SubmissionExport.objects.filter(
+            pk=expired_submission_export.pk
+        ).update(
+            created_at=timezone.now()
+            - timedelta(seconds=settings.SUBMISSION_EXPORTS_TTL + 1)
+        )
+        submission_export = SubmissionExport.objects.create(
+            challenge_phase=self.challenge_phase,
+            created_by=self.user,
+            file_name="submission_exports/challenge_{}/test.csv".format(
+                self.challenge.pk
+            ),
+        )
+        with self.settings(MEDIA_ROOT="/tmp/evalai"):
+            default_storage.save(
+                expired_submission_export.file_name, ContentFile(b"id\r\n")
+            )
+            export_submissions_csv(submission_export.pk)
+            submission_export.refresh_from_db()
+            self.assertFalse(
+                default_storage.exists(expired_submission_export.file_name)
+            )
+            default_storage.delete(submission_export.file_name)
+        self.assertFalse(
+            SubmissionExport.objects.filter(
+                pk=expired_submission_export.pk
+            ).exists()
+        )
+
+    def test_get_submission_export_when_export_is_finished(self):
+        submission_export = SubmissionExport.objects.create(
+            challenge_phase=self.challenge_phase,
+            created_by=self.user,
+            file_name="submission_exports/challenge_{}/test.csv".format(
+                self.challenge.pk
+            ),
+            status=SubmissionExport.FINISHED,
+        )
+        self.url = reverse_lazy(
+            "challenges:get_submission_export",
+            kwargs={
+                "challenge_pk": self.challenge.pk,
+                "submission_export_pk": submission_export.pk,
+            },
+        )
+        expected = {
+            "id": submission_export.pk,
+            "status": SubmissionExport.FINISHED,
+            "file_url": default_storage.url(submission_export.file_name),
+        }
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_submission_export_when_user_did_not_create_it(self):
+        submission_export = SubmissionExport.objects.create(
+            challenge_phase=self.challenge_phase,
+            created_by=self.user1,
+            file_name="submission_exports/challenge_{}/test.csv".format(
+                self.challenge.pk
+            ),
+            status=SubmissionExport.FINISHED,
+        )
+        self.url = reverse_lazy(
+            "challenges:get_submission_export",
+            kwargs={
+                "challenge_pk": self.challenge.pk,
+                "submission_export_pk": submission_export.pk,
+            },
+        )
+        expected = {"error": "Submission export does not exist"}
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_download_all_submissions_when_user_is_challenge_participant(self):
         self.url = reverse_lazy(
             "challenges:download_all_submissions",
@@ -5842,7 +6232,7 @@ class CreateOrUpdateGithubChallengeTest(APITestCase):
 
         with mock.patch("challenges.views.requests.get") as m:
             resp = mock.Mock()
-            resp.content = self.test_zip_file.read()
+            resp.iter_content.return_value = [self.test_zip_file.read()]
             resp.status_code = 200
             m.return_value = resp
             response = self.client.post(
@@ -5956,7 +6346,7 @@ class ValidateChallengeTest(APITestCase):
 
         with mock.patch("challenges.views.requests.get") as m:
             resp = mock.Mock()
-            resp.content = self.test_zip_file.read()
+            resp.iter_content.return_value = [self.test_zip_file.read()]
             resp.status_code = 200
             m.return_value = resp
             response = self.client.post(
@@ -5983,7 +6373,7 @@ class ValidateChallengeTest(APITestCase):
 
         with mock.patch("challenges.views.requests.get") as m:
             resp = mock.Mock()
-            resp.content = self.test_zip_incorrect_file.read()
+            resp.iter_content.return_value = [self.test_zip_incorrect_file.read()]
             resp.status_code = 200
 
             m.return_value = resp
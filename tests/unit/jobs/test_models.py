@@ -7,10 +7,11 @@ from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
 
 from challenges.models import Challenge, ChallengePhase
 from hosts.models import ChallengeHostTeam
-from jobs.models import Submission
+from jobs.models import Submission, SubmissionQuota
 from participants.models import ParticipantTeam
 
 
@@ -80,3 +81,77 @@ class SubmissionTestCase(BaseTestCase):
         self.assertEqual(
             "{}".format(self.submission.id), self.submission.__str__()
         )
+
+
+class SubmissionQuotaTestCase(BaseTestCase):
+    def setUp(self):
+        super(SubmissionQuotaTestCase, self).setUp()
+        self.challenge_phase.max_submissions_per_day = 2
+        self.challenge_phase.save()
+
+    def create_submission(self):
+        return Submission.objects.create(
+            participant_team=self.participant_team,
+            challenge_phase=self.challenge_phase,
+            created_by=self.user,
+            status="submitted",
+            input_file=self.challenge_phase.test_annotation,
+        )
+
+    def get_submission_counts(self):
+        return SubmissionQuota.objects.get(
+            challenge_phase=self.challenge_phase,
+            participant_team=self.participant_team,
+        ).get_submission_counts()
+
+    def test_submission_quota_is_created_from_existing_submissions(self):
+        submission = self.create_submission()
+        SubmissionQuota.objects.all().delete()
+        self.assertEqual(self.create_submission().submission_number, 2)
+        self.assertEqual(self.get_submission_counts(), (2, 2, 2))
+        self.assertEqual(submission.submission_number, 1)
+
+    def test_submission_quota_when_submission_fails(self):
+        submission = self.create_submission()
+        self.assertEqual(self.get_submission_counts(), (1, 1, 1))
+        submission.status = "failed"
+        submission.save()
+        self.assertEqual(self.get_submission_counts(), (0, 0, 0))
+        submission.status = "submitted"
+        submission.save()
+        self.assertEqual(self.get_submission_counts(), (1, 1, 1))
+
+    def test_submission_quota_when_submission_is_deleted(self):
+        self.create_submission()
+        failed_submission = self.create_submission()
+        failed_submission.status = "failed"
+        failed_submission.save()
+        submission = Submission.objects.filter(status="submitted").get()
+        submission.delete()
+        failed_submission.delete()
+        self.assertEqual(self.get_submission_counts(), (0, 0, 0))
+        self.create_submission()
+        self.create_submission()
+        self.assertEqual(self.get_submission_counts(), (2, 2, 2))
+
+    def test_submission_quota_when_submission_is_made_a_day_back(self):
+        submission = self.create_submission()
+        submission.submitted_at = submission.submitted_at - timedelta(days=1)
+        submission.save()
+        total_count, _, today_count = self.get_submission_counts()
+        self.assertEqual((total_count, today_count), (1, 0))
+
+    def test_submission_when_daily_limit_is_reached(self):
+        self.create_submission()
+        self.create_submission()
+        with self.assertRaises(PermissionDenied):
+            self.create_submission()
+        self.assertEqual(self.get_submission_counts(), (2, 2, 2))
+        self.assertEqual(Submission.objects.count(), 2)
+
+    def test_submission_after_failed_submission_frees_daily_limit(self):
+        self.create_submission()
+        submission = self.create_submission()
+        submission.status = "cancelled"
+        submission.save()
+        self.assertEqual(self.create_submission().submission_number, 3)
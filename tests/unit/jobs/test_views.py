@@ -1,5 +1,6 @@
 import boto3
 import collections
+import gzip
 import json
 import mock
 import os
@@ -8,6 +9,7 @@ import shutil
 
 from datetime import timedelta
 from moto import mock_s3
+from urllib.parse import urlencode
 
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth.models import User
@@ -16,7 +18,7 @@ from django.urls import reverse_lazy
 
 from allauth.account.models import EmailAddress
 from rest_framework import status
-from rest_framework.test import APITestCase, APIClient
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
 
 from challenges.models import (
     Challenge,
@@ -27,7 +29,8 @@ from challenges.models import (
     LeaderboardData,
 )
 from hosts.models import ChallengeHostTeam, ChallengeHost
-from jobs.models import Submission
+from jobs.models import Submission, SubmissionQuota
+from jobs.serializers import SubmissionSerializer
 from participants.models import ParticipantTeam, Participant
 
 
@@ -699,6 +702,36 @@ class GetChallengeSubmissionTest(BaseAPITestClass):
         self.assertEqual(response.data["results"], expected)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_challenge_hosts_are_looked_up_once_for_all_submissions(self):
+        ChallengeHost.objects.create(
+            user=self.user,
+            team_name=self.challenge_host_team,
+            status=ChallengeHost.ACCEPTED,
+            permissions=ChallengeHost.ADMIN,
+        )
+        submissions = [self.submission] + [
+            Submission.objects.create(
+                participant_team=self.participant_team,
+                challenge_phase=self.challenge_phase,
+                created_by=self.challenge_host_team.created_by,
+                status="submitted",
+                input_file=self.challenge_phase.test_annotation,
+                method_name="Test Method",
+            )
+            for _ in range(2)
+        ]
+        for user, is_host in [(self.user, True), (self.user1, False)]:
+            request = APIRequestFactory().get("/")
+            request.user = user
+            with self.assertNumQueries(1):
+                data = SubmissionSerializer(
+                    submissions, many=True, context={"request": request}
+                ).data
+            self.assertEqual(
+                ["environment_log_file" in submission for submission in data],
+                [is_host] * len(submissions),
+            )
+
 
 class GetRemainingSubmissionTest(BaseAPITestClass):
     def setUp(self):
@@ -861,6 +894,34 @@ class GetRemainingSubmissionTest(BaseAPITestClass):
         self.assertEqual(response.data["phases"][0]["limits"], expected)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_remaining_submission_when_submission_quotas_are_missing(
+        self,
+    ):
+        self.url = reverse_lazy(
+            "jobs:get_remaining_submissions",
+            kwargs={"challenge_pk": self.challenge.pk},
+        )
+        self.submission3.status = "cancelled"
+        self.submission3.save()
+        SubmissionQuota.objects.all().delete()
+        expected = {
+            "remaining_submissions_today_count": 8,
+            "remaining_submissions_this_month_count": 18,
+            "remaining_submissions_count": 98,
+        }
+
+        self.challenge.participant_teams.add(self.participant_team)
+        self.challenge.save()
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["phases"][0]["limits"], expected)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            SubmissionQuota.objects.filter(
+                participant_team=self.participant_team
+            ).count(),
+            len(response.data["phases"]),
+        )
+
     def get_remaining_submission_time_when_max_limit_is_exhausted(self):
         self.url = reverse_lazy(
             "jobs:get_remaining_submissions",
@@ -2287,6 +2348,144 @@ class ChallengeLeaderboardTest(BaseAPITestClass):
         self.assertEqual(response.data, expected)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_get_leaderboard_after_new_leaderboard_data_is_added(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        response = self.client.get(self.url, {})
+        self.assertEqual(
+            response.data["results"][0]["id"], self.leaderboard_data.id
+        )
+
+        leaderboard_data = LeaderboardData.objects.create(
+            challenge_phase_split=self.challenge_phase_split,
+            submission=self.submission,
+            leaderboard=self.leaderboard,
+            result={"score": 90.0, "test-score": 95.0},
+        )
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["id"], leaderboard_data.id)
+        self.assertEqual(response.data["results"][0]["result"], [90.0, 95.0])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_after_submission_is_flagged(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+
+        self.submission.is_flagged = True
+        self.submission.save()
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 0)
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_after_participant_is_banned(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        self.challenge.participant_teams.add(self.participant_team)
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+
+        self.challenge.banned_email_ids = [self.user1.email]
+        self.challenge.save()
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 0)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_ordered_by_another_label(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        self.host_participant_team_submission.is_baseline = True
+        self.host_participant_team_submission.save()
+        LeaderboardData.objects.create(
+            challenge_phase_split=self.challenge_phase_split,
+            submission=self.submission_2,
+            leaderboard=self.leaderboard,
+            result={"score": 1.0, "test-score": 99.0},
+        )
+
+        response = self.client.get(self.url, {"order_by": "test-score"})
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(response.data["results"][0]["filtering_score"], 80.0)
+        self.assertEqual(response.data["results"][1]["filtering_score"], 75.0)
+
+        self.submission_2.is_public = True
+        self.submission_2.save()
+
+        response = self.client.get(self.url, {"order_by": "test-score"})
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(response.data["results"][0]["filtering_score"], 99.0)
+        self.assertEqual(response.data["results"][1]["filtering_score"], 80.0)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_in_ascending_order(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        self.challenge_phase_split.is_leaderboard_order_descending = False
+        self.challenge_phase_split.save()
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            response.data["results"][0]["id"], self.leaderboard_data_2.id
+        )
+        self.assertEqual(
+            response.data["results"][0]["filtering_score"],
+            self.result_json_2["score"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_by_latest_submission(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        self.challenge_phase_split.show_leaderboard_by_latest_submission = (
+            True
+        )
+        self.challenge_phase_split.save()
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            response.data["results"][0]["id"], self.leaderboard_data_2.id
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_when_label_value_is_not_a_number(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        self.leaderboard_data.result = {"score": "N/A", "test-score": 20.0}
+        self.leaderboard_data.save()
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            response.data["results"][0]["id"], self.leaderboard_data_2.id
+        )
+        self.assertEqual(
+            response.data["results"][0]["filtering_score"],
+            self.result_json_2["score"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
 
 class UpdateSubmissionTest(BaseAPITestClass):
     def setUp(self):
@@ -2454,6 +2653,45 @@ class UpdateSubmissionTest(BaseAPITestClass):
         self.assertEqual(response.data, expected)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_update_submission_with_gzipped_request_body(self):
+        self.url = reverse_lazy(
+            "jobs:update_submission",
+            kwargs={"challenge_pk": self.challenge.pk},
+        )
+        self.data = {
+            "challenge_phase": self.challenge_phase.id,
+            "submission": self.submission.id,
+            "submission_status": "FINISHED",
+            "stdout": "qwerty" * 1000,
+            "stderr": "qwerty",
+            "result": json.dumps(
+                [
+                    {
+                        "split": self.datasetSplit.codename,
+                        "show_to_participant": True,
+                        "accuracies": {"metric1": 60, "metric2": 30},
+                    }
+                ]
+            ),
+        }
+        expected = {
+            "success": "Submission result has been successfully updated"
+        }
+        self.client.force_authenticate(user=self.challenge_host.user)
+        response = self.client.put(
+            self.url,
+            gzip.compress(urlencode(self.data).encode("utf-8")),
+            content_type="application/x-www-form-urlencoded",
+            HTTP_CONTENT_ENCODING="gzip",
+        )
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.submission.refresh_from_db()
+        self.assertEqual(
+            self.submission.stdout_file.read().decode("utf-8"),
+            "qwerty" * 1000,
+        )
+
     def test_update_submission_for_invalid_data_in_result_key(self):
         self.url = reverse_lazy(
             "jobs:update_submission",
@@ -2578,6 +2816,79 @@ class UpdateSubmissionTest(BaseAPITestClass):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class UpdateSubmissionsStatusTest(BaseAPITestClass):
+    def setUp(self):
+        super(UpdateSubmissionsStatusTest, self).setUp()
+        self.challenge_host = ChallengeHost.objects.create(
+            user=self.user,
+            team_name=self.challenge_host_team,
+            status=ChallengeHost.ACCEPTED,
+            permissions=ChallengeHost.ADMIN,
+        )
+        self.submissions = [
+            Submission.objects.create(
+                participant_team=self.participant_team,
+                challenge_phase=self.challenge_phase,
+                created_by=self.challenge_host_team.created_by,
+                status="submitted",
+                input_file=self.challenge_phase.test_annotation,
+                method_name="Test Method",
+            )
+            for _ in range(3)
+        ]
+        self.submissions[1].status = Submission.RUNNING
+        self.submissions[1].save()
+        self.submissions[2].status = Submission.FINISHED
+        self.submissions[2].save()
+        self.url = reverse_lazy(
+            "jobs:update_submissions_status",
+            kwargs={"challenge_pk": self.challenge.pk},
+        )
+        self.data = {
+            "submissions": ",".join(
+                str(submission.pk) for submission in self.submissions
+            ),
+            "submission_status": "cancelled",
+        }
+
+    def test_update_submissions_status_when_user_is_not_a_host(self):
+        expected = {
+            "error": "Sorry, you are not authorized to make this request!"
+        }
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.patch(self.url, self.data)
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_submissions_status_for_invalid_submission_status(self):
+        self.data["submission_status"] = "finished"
+        expected = {"error": "Sorry, submission status is invalid"}
+        self.client.force_authenticate(user=self.user)
+        response = self.client.patch(self.url, self.data)
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_submissions_status_cancels_pending_submissions(self):
+        expected = {
+            "updated_submissions": [
+                self.submissions[0].pk,
+                self.submissions[1].pk,
+            ]
+        }
+        self.client.force_authenticate(user=self.user)
+        response = self.client.patch(self.url, self.data)
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [
+            Submission.objects.get(pk=submission.pk).status
+            for submission in self.submissions
+        ]
+        self.assertEqual(
+            statuses,
+            [Submission.CANCELLED, Submission.CANCELLED, Submission.FINISHED],
+        )
+
+
 @mock_s3
 class PresignedURLSubmissionTest(BaseAPITestClass):
     def setUp(self):
@@ -2692,3 +3003,193 @@ class PresignedURLSubmissionTest(BaseAPITestClass):
 
         self.assertEqual(response.data, expected)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class SubmissionMessagesFromQueueTest(BaseAPITestClass):
+    def setUp(self):
+        super(SubmissionMessagesFromQueueTest, self).setUp()
+        self.challenge.queue = "test_queue"
+        self.challenge.save()
+
+        self.submission = Submission.objects.create(
+            participant_team=self.participant_team,
+            challenge_phase=self.challenge_phase,
+            created_by=self.user1,
+            status="submitted",
+            input_file=self.challenge_phase.test_annotation,
+            method_name="Test Method",
+        )
+        self.queue = mock.Mock(url="queue_url")
+        self.queue.Message.side_effect = lambda receipt_handle: mock.Mock(
+            receipt_handle=receipt_handle
+        )
+        self.queue.delete_messages.return_value = {}
+        self.queue.change_message_visibility_batch.return_value = {}
+
+    @mock.patch("jobs.views.get_or_create_sqs_queue")
+    def test_lease_submission_messages_from_queue(self, mock_get_queue):
+        self.client.force_authenticate(user=self.user)
+        mock_get_queue.return_value = self.queue
+        self.queue.receive_messages.return_value = [
+            mock.Mock(
+                receipt_handle="receipt_handle_{}".format(submission_pk),
+                body=json.dumps(
+                    {
+                        "challenge_pk": self.challenge.pk,
+                        "phase_pk": self.challenge_phase.pk,
+                        "submission_pk": submission_pk,
+                    }
+                ),
+            )
+            for submission_pk in [self.submission.pk, self.submission.pk + 1]
+        ]
+        self.url = reverse_lazy(
+            "jobs:lease_submission_messages_from_queue",
+            kwargs={"queue_name": self.challenge.queue},
+        )
+
+        response = self.client.get(
+            self.url, {"max_number_of_messages": 2, "visibility_timeout": 600}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.queue.receive_messages.assert_called_once_with(
+            MaxNumberOfMessages=2,
+            WaitTimeSeconds=0,
+            VisibilityTimeout=600,
+        )
+        leased_message, missing_submission_message = response.data["messages"]
+        self.assertEqual(
+            leased_message["receipt_handle"],
+            "receipt_handle_{}".format(self.submission.pk),
+        )
+        self.assertEqual(
+            leased_message["body"]["submission_pk"], self.submission.pk
+        )
+        self.assertEqual(leased_message["submission"]["id"], self.submission.pk)
+        self.assertEqual(
+            leased_message["challenge_phase"]["id"], self.challenge_phase.pk
+        )
+        self.assertIsNone(missing_submission_message["submission"])
+        self.assertEqual(
+            missing_submission_message["challenge_phase"]["id"],
+            self.challenge_phase.pk,
+        )
+
+    @mock.patch("jobs.views.get_or_create_sqs_queue")
+    def test_lease_submission_messages_from_queue_when_user_is_not_host(
+        self, mock_get_queue
+    ):
+        self.url = reverse_lazy(
+            "jobs:lease_submission_messages_from_queue",
+            kwargs={"queue_name": self.challenge.queue},
+        )
+        self.client.force_authenticate(user=self.user1)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        mock_get_queue.assert_not_called()
+
+    @mock.patch("jobs.views.get_or_create_sqs_queue")
+    def test_lease_too_many_submission_messages_from_queue(
+        self, mock_get_queue
+    ):
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse_lazy(
+            "jobs:lease_submission_messages_from_queue",
+            kwargs={"queue_name": self.challenge.queue},
+        )
+
+        response = self.client.get(self.url, {"max_number_of_messages": 11})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("max_number_of_messages", response.data)
+        mock_get_queue.assert_not_called()
+
+    @mock.patch("jobs.views.get_or_create_sqs_queue")
+    def test_acknowledge_submission_messages_from_queue(self, mock_get_queue):
+        self.client.force_authenticate(user=self.user)
+        mock_get_queue.return_value = self.queue
+        self.queue.delete_messages.return_value = {
+            "Failed": [{"Id": "1", "Message": "Error description"}]
+        }
+        self.url = reverse_lazy(
+            "jobs:acknowledge_submission_messages_from_queue",
+            kwargs={"queue_name": self.challenge.queue},
+        )
+
+        response = self.client.post(
+            self.url,
+            {
+                "ack": ["receipt_handle_1", "receipt_handle_2"],
+                "nack": ["receipt_handle_3"],
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"failed": ["receipt_handle_2"]})
+        self.queue.delete_messages.assert_called_once_with(
+            Entries=[
+                {"Id": "0", "ReceiptHandle": "receipt_handle_1"},
+                {"Id": "1", "ReceiptHandle": "receipt_handle_2"},
+            ]
+        )
+        self.queue.change_message_visibility_batch.assert_called_once_with(
+            Entries=[
+                {
+                    "Id": "0",
+                    "ReceiptHandle": "receipt_handle_3",
+                    "VisibilityTimeout": 0,
+                }
+            ]
+        )
+
+    @mock.patch("jobs.views.get_or_create_sqs_queue")
+    def test_acknowledge_submission_messages_without_receipt_handles(
+        self, mock_get_queue
+    ):
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse_lazy(
+            "jobs:acknowledge_submission_messages_from_queue",
+            kwargs={"queue_name": self.challenge.queue},
+        )
+
+        response = self.client.post(self.url, {})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_get_queue.assert_not_called()
+
+    @mock.patch("jobs.views.get_or_create_sqs_queue")
+    def test_extend_submission_messages_visibility(self, mock_get_queue):
+        self.client.force_authenticate(user=self.user)
+        mock_get_queue.return_value = self.queue
+        self.url = reverse_lazy(
+            "jobs:extend_submission_messages_visibility",
+            kwargs={"queue_name": self.challenge.queue},
+        )
+
+        response = self.client.post(
+            self.url,
+            {
+                "receipt_handles": ["receipt_handle_1", "receipt_handle_2"],
+                "visibility_timeout": 600,
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"failed": []})
+        self.queue.change_message_visibility_batch.assert_called_once_with(
+            Entries=[
+                {
+                    "Id": "0",
+                    "ReceiptHandle": "receipt_handle_1",
+                    "VisibilityTimeout": 600,
+                },
+                {
+                    "Id": "1",
+                    "ReceiptHandle": "receipt_handle_2",
+                    "VisibilityTimeout": 600,
+                },
+            ]
+        )
@@ -0,0 +1,253 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from base.utils import request_memo
+from challenges.models import Challenge
+from challenges.utils import (
+    get_challenge_roles_cache_key,
+    invalidate_challenge_roles,
+)
+from hosts.models import ChallengeHost, ChallengeHostTeam
+from hosts.utils import is_user_a_host_of_challenge, is_user_a_staff_or_host
+from participants.models import Participant, ParticipantTeam
+from participants.utils import (
+    get_banned_participant_team_ids,
+    get_banned_participant_teams_cache_key,
+    get_participant_team_id_of_user_for_a_challenge,
+    has_user_participated_in_challenge,
+    invalidate_banned_participant_team_ids,
+)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class GetBannedParticipantTeamIdsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            username="user", email="user@test.com", password="password"
+        )
+        self.banned_user = User.objects.create(
+            username="banned_user",
+            email="banned_user@test.com",
+            password="password",
+        )
+        self.challenge_host_team = ChallengeHostTeam.objects.create(
+            team_name="Test Challenge Host Team", created_by=self.user
+        )
+        self.challenge = Challenge.objects.create(
+            title="Test Challenge",
+            description="Description for test challenge",
+            terms_and_conditions="Terms and conditions for test challenge",
+            submission_guidelines="Submission guidelines for test challenge",
+            creator=self.challenge_host_team,
+            start_date=timezone.now() - timedelta(days=2),
+            end_date=timezone.now() + timedelta(days=1),
+            banned_email_ids=[self.banned_user.email],
+        )
+        self.participant_team = ParticipantTeam.objects.create(
+            team_name="Participant Team", created_by=self.user
+        )
+        Participant.objects.create(
+            user=self.user,
+            status=Participant.SELF,
+            team=self.participant_team,
+        )
+        self.banned_participant_team = ParticipantTeam.objects.create(
+            team_name="Banned Participant Team", created_by=self.banned_user
+        )
+        Participant.objects.create(
+            user=self.banned_user,
+            status=Participant.SELF,
+            team=self.banned_participant_team,
+        )
+
+    def test_get_banned_participant_team_ids(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_banned_participant_team_ids(self.challenge),
+                {self.banned_participant_team.pk},
+            )
+        with self.assertNumQueries(0):
+            get_banned_participant_team_ids(self.challenge)
+
+    def test_get_banned_participant_team_ids_after_member_joins_team(self):
+        get_banned_participant_team_ids(self.challenge)
+        Participant.objects.create(
+            user=self.banned_user,
+            status=Participant.ACCEPTED,
+            team=self.participant_team,
+        )
+        self.assertEqual(
+            get_banned_participant_team_ids(self.challenge),
+            {self.participant_team.pk, self.banned_participant_team.pk},
+        )
+
+    def test_get_banned_participant_team_ids_after_banned_emails_change(self):
+        get_banned_participant_team_ids(self.challenge)
+        self.challenge.banned_email_ids = [self.user.email]
+        self.challenge.save()
+        self.assertEqual(
+            get_banned_participant_team_ids(self.challenge),
+            {self.participant_team.pk},
+        )
+
+    def test_get_banned_participant_team_ids_without_banned_emails(self):
+        self.challenge.banned_email_ids = []
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_banned_participant_team_ids(self.challenge), set()
+            )
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class InvalidateBannedParticipantTeamIdsTest(TransactionTestCase):
+    def test_teams_cached_before_commit_are_deleted(self):
+        cache_key = get_banned_participant_teams_cache_key(1)
+        with transaction.atomic():
+            invalidate_banned_participant_team_ids([1])
+            # A concurrent request caches the teams from the old rows
+            cache.set(cache_key, set())
+            self.assertEqual(cache.get(cache_key), set())
+        self.assertIsNone(cache.get(cache_key))
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class GetChallengeRolesOfUserTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            username="user", email="user@test.com", password="password"
+        )
+        self.challenge_host_team = ChallengeHostTeam.objects.create(
+            team_name="Test Challenge Host Team", created_by=self.user
+        )
+        self.challenge = Challenge.objects.create(
+            title="Test Challenge",
+            description="Description for test challenge",
+            terms_and_conditions="Terms and conditions for test challenge",
+            submission_guidelines="Submission guidelines for test challenge",
+            creator=self.challenge_host_team,
+            start_date=timezone.now() - timedelta(days=2),
+            end_date=timezone.now() + timedelta(days=1),
+        )
+        self.participant_team = ParticipantTeam.objects.create(
+            team_name="Participant Team", created_by=self.user
+        )
+        Participant.objects.create(
+            user=self.user,
+            status=Participant.SELF,
+            team=self.participant_team,
+        )
+        self.challenge.participant_teams.add(self.participant_team)
+
+    def test_roles_are_looked_up_once_per_request(self):
+        with request_memo(), override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+                }
+            }
+        ):
+            with self.assertNumQueries(1):
+                self.assertFalse(
+                    is_user_a_host_of_challenge(self.user, self.challenge.pk)
+                )
+                self.assertFalse(
+                    is_user_a_staff_or_host(self.user, self.challenge.pk)
+                )
+                self.assertTrue(
+                    has_user_participated_in_challenge(
+                        self.user, self.challenge.pk
+                    )
+                )
+                self.assertEqual(
+                    get_participant_team_id_of_user_for_a_challenge(
+                        self.user, self.challenge.pk
+                    ),
+                    self.participant_team.pk,
+                )
+
+    def test_roles_are_cached_across_requests(self):
+        with self.assertNumQueries(1):
+            is_user_a_host_of_challenge(self.user, self.challenge.pk)
+        with self.assertNumQueries(0):
+            has_user_participated_in_challenge(self.user, self.challenge.pk)
+
+    def test_roles_after_user_becomes_host(self):
+        with request_memo():
+            self.assertFalse(
+                is_user_a_host_of_challenge(self.user, self.challenge.pk)
+            )
+            ChallengeHost.objects.create(
+                user=self.user,
+                team_name=self.challenge_host_team,
+                status=ChallengeHost.ACCEPTED,
+                permissions=ChallengeHost.ADMIN,
+            )
+            self.assertTrue(
+                is_user_a_host_of_challenge(self.user, self.challenge.pk)
+            )
+
+    def test_roles_after_participant_team_leaves_challenge(self):
+        with request_memo():
+            self.assertTrue(
+                has_user_participated_in_challenge(
+                    self.user, self.challenge.pk
+                )
+            )
+            self.participant_team.challenge_set.remove(self.challenge)
+            self.assertFalse(
+                has_user_participated_in_challenge(
+                    self.user, self.challenge.pk
+                )
+            )
+
+    def test_roles_after_user_leaves_participant_team(self):
+        self.assertTrue(
+            has_user_participated_in_challenge(self.user, self.challenge.pk)
+        )
+        Participant.objects.filter(user=self.user).delete()
+        self.assertIsNone(
+            get_participant_team_id_of_user_for_a_challenge(
+                self.user, self.challenge.pk
+            )
+        )
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class InvalidateChallengeRolesTest(TransactionTestCase):
+    def test_roles_cached_before_commit_are_deleted(self):
+        cache_key = get_challenge_roles_cache_key(1, 1)
+        with transaction.atomic():
+            invalidate_challenge_roles([1], [1])
+            # A concurrent request caches the roles from the old rows
+            cache.set(cache_key, {})
+            self.assertEqual(cache.get(cache_key), {})
+        self.assertIsNone(cache.get(cache_key))
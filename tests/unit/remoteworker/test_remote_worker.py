@@ -1,24 +1,40 @@
+import gzip
 import mock
 import os
+import requests
 import responses
 import shutil
 import tempfile
+import time
 
 from os.path import join
 
 from unittest import TestCase
+from urllib3.exceptions import ConnectTimeoutError
 
+from scripts.monitoring.evalai_interface import (
+    JitteredRetry,
+    create_session,
+    send_request,
+)
+from scripts.workers.downloader import DownloadError
 from scripts.workers.remote_submission_worker import (
+    EVALAI_SESSION,
     create_dir_as_python_package,
     make_request,
     get_message_from_sqs_queue,
     delete_message_from_sqs_queue,
+    lease_messages_from_sqs_queue,
+    acknowledge_messages_from_sqs_queue,
+    extend_messages_visibility,
+    extend_messages_visibility_in_background,
     download_and_extract_file,
     get_submission_by_pk,
     get_challenge_phases_by_challenge_pk,
     get_challenge_by_queue_name,
     get_challenge_phase_by_pk,
     process_submission_callback,
+    process_submission_message,
     update_submission_data,
     update_submission_status,
     return_url_per_environment,
@@ -43,6 +59,17 @@ class BaseTestClass(TestCase):
     def delete_message_from_sqs_queue_url(self, queue_name):
         return "/api/jobs/queues/{}/".format(queue_name)
 
+    def lease_messages_from_sqs_queue_url(self, queue_name):
+        return "/api/jobs/challenge/queues/{}/lease/?max_number_of_messages=5&visibility_timeout=3600".format(
+            queue_name
+        )
+
+    def acknowledge_messages_from_sqs_queue_url(self, queue_name):
+        return "/api/jobs/queues/{}/acknowledge/".format(queue_name)
+
+    def extend_messages_visibility_url(self, queue_name):
+        return "/api/jobs/queues/{}/heartbeat/".format(queue_name)
+
     def get_submission_by_pk_url(self, submission_pk):
         return "/api/jobs/submission/{}".format(submission_pk)
 
@@ -64,36 +91,106 @@ class BaseTestClass(TestCase):
 @mock.patch(
     "scripts.workers.remote_submission_worker.AUTH_TOKEN", "test_token"
 )
-@mock.patch("scripts.workers.remote_submission_worker.requests")
+@mock.patch("scripts.workers.remote_submission_worker.send_request")
 class MakeRequestTestClass(BaseTestClass):
     def setUp(self):
         super(MakeRequestTestClass, self).setUp()
         self.url = super(MakeRequestTestClass, self).make_request_url()
 
-    def test_make_request_get(self, mock_make_request):
+    def test_make_request_get(self, mock_send_request):
         make_request(self.url, "GET")
-        mock_make_request.get.assert_called_with(
-            url=self.url, headers=self.headers
+        mock_send_request.assert_called_with(
+            EVALAI_SESSION, "GET", self.url, headers=self.headers, data=None
         )
 
-    def test_make_request_put(self, mock_make_request):
+    def test_make_request_put(self, mock_send_request):
         make_request(self.url, "PUT", data=self.data)
-        mock_make_request.put.assert_called_with(
-            url=self.url, headers=self.headers, data=self.data
+        mock_send_request.assert_called_with(
+            EVALAI_SESSION,
+            "PUT",
+            self.url,
+            headers=self.headers,
+            data=self.data,
         )
 
-    def test_make_request_patch(self, mock_make_request):
+    def test_make_request_patch(self, mock_send_request):
         make_request(self.url, "PATCH", data=self.data)
-        mock_make_request.patch.assert_called_with(
-            url=self.url, headers=self.headers, data=self.data
+        mock_send_request.assert_called_with(
+            EVALAI_SESSION,
+            "PATCH",
+            self.url,
+            headers=self.headers,
+            data=self.data,
         )
 
-    def test_make_request_post(self, mock_make_request):
+    def test_make_request_post(self, mock_send_request):
         make_request(self.url, "POST", data=self.data)
-        mock_make_request.post.assert_called_with(
-            url=self.url, headers=self.headers, data=self.data
+        mock_send_request.assert_called_with(
+            EVALAI_SESSION,
+            "POST",
+            self.url,
+            headers=self.headers,
+            data=self.data,
+        )
+
+    @mock.patch("scripts.workers.remote_submission_worker.logger.exception")
+    def test_make_request_when_request_fails(
+        self, mock_logger, mock_send_request
+    ):
+        mock_send_request.return_value.text = "Error description"
+        mock_send_request.return_value.raise_for_status.side_effect = (
+            requests.exceptions.HTTPError()
+        )
+        with self.assertRaises(requests.exceptions.HTTPError):
+            make_request(self.url, "PUT", data=self.data)
+        mock_logger.assert_called_with(
+            "The request to URL {} is failed due to Error description".format(
+                self.url
+            )
+        )
+
+
+class SendRequestTestClass(BaseTestClass):
+    def setUp(self):
+        super(SendRequestTestClass, self).setUp()
+        self.req_url = "{}{}".format(self.testserver, self.make_request_url())
+        self.data = {"stdout": "a" * 1000}
+
+    @responses.activate
+    @mock.patch(
+        "scripts.monitoring.evalai_interface.EVALAI_GZIP_MIN_SIZE", 100
+    )
+    def test_send_request_gzips_large_body(self):
+        responses.add(responses.PUT, self.req_url, json={}, status=200)
+        send_request(create_session(), "PUT", self.req_url, data=self.data)
+        request = responses.calls[0].request
+        self.assertEqual(request.headers["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(request.body).decode("utf-8"),
+            "stdout={}".format("a" * 1000),
         )
 
+    @responses.activate
+    @mock.patch(
+        "scripts.monitoring.evalai_interface.EVALAI_GZIP_MIN_SIZE", 10000
+    )
+    def test_send_request_does_not_gzip_small_body(self):
+        responses.add(responses.PUT, self.req_url, json={}, status=200)
+        send_request(create_session(), "PUT", self.req_url, data=self.data)
+        request = responses.calls[0].request
+        self.assertNotIn("Content-Encoding", request.headers)
+        self.assertEqual(request.body, "stdout={}".format("a" * 1000))
+
+    @mock.patch("scripts.monitoring.evalai_interface.random.uniform")
+    def test_jittered_retry_backoff_time(self, mock_uniform):
+        retry = JitteredRetry(total=5, backoff_factor=1)
+        for _ in range(3):
+            retry = retry.increment(
+                method="GET", url=self.req_url, error=ConnectTimeoutError()
+            )
+        retry.get_backoff_time()
+        mock_uniform.assert_called_with(0, 4)
+
 
 @mock.patch(
     "scripts.workers.remote_submission_worker.QUEUE_NAME",
@@ -124,6 +221,41 @@ class APICallsTestClass(BaseTestClass):
         }
         mock_make_request.assert_called_with(url, "POST", data=expected_data)
 
+    def test_lease_messages_from_sqs_queue(self, mock_make_request, mock_url):
+        url = self.lease_messages_from_sqs_queue_url("evalai_submission_queue")
+        lease_messages_from_sqs_queue(5)
+        mock_url.assert_called_with(url)
+        url = mock_url(url)
+        mock_make_request.assert_called_with(url, "GET")
+
+    def test_acknowledge_messages_from_sqs_queue(
+        self, mock_make_request, mock_url
+    ):
+        url = self.acknowledge_messages_from_sqs_queue_url(
+            "evalai_submission_queue"
+        )
+        acknowledge_messages_from_sqs_queue(
+            ack=["receipt_handle_1"], nack=["receipt_handle_2"]
+        )
+        mock_url.assert_called_with(url)
+        url = mock_url(url)
+        expected_data = {
+            "ack": ["receipt_handle_1"],
+            "nack": ["receipt_handle_2"],
+        }
+        mock_make_request.assert_called_with(url, "POST", data=expected_data)
+
+    def test_extend_messages_visibility(self, mock_make_request, mock_url):
+        url = self.extend_messages_visibility_url("evalai_submission_queue")
+        extend_messages_visibility(["receipt_handle_1", "receipt_handle_2"])
+        mock_url.assert_called_with(url)
+        url = mock_url(url)
+        expected_data = {
+            "receipt_handles": ["receipt_handle_1", "receipt_handle_2"],
+            "visibility_timeout": 3600,
+        }
+        mock_make_request.assert_called_with(url, "POST", data=expected_data)
+
     def test_get_challenge_by_queue_name(self, mock_make_request, mock_url):
         url = self.get_challenge_by_queue_name_url("evalai_submission_queue")
         get_challenge_by_queue_name()
@@ -205,7 +337,9 @@ class ProcessSubmissionCallback(BaseTestClass):
         mock_logger.assert_called_with(
             "[x] Received submission message {}".format(message)
         )
-        mock_process_submission_message.assert_called_with(message)
+        mock_process_submission_message.assert_called_with(
+            message, submission=None, challenge_phase=None
+        )
 
     @mock.patch("scripts.workers.remote_submission_worker.logger.exception")
     def test_process_submission_callback_with_exception(
@@ -228,6 +362,67 @@ class ProcessSubmissionCallback(BaseTestClass):
         )
 
 
+class ProcessSubmissionMessageTest(BaseTestClass):
+    @mock.patch(
+        "scripts.workers.remote_submission_worker.update_submission_data"
+    )
+    @mock.patch(
+        "scripts.workers.remote_submission_worker.extract_submission_data"
+    )
+    def test_process_submission_message_when_download_fails(
+        self, mock_extract_submission_data, mock_update_submission_data
+    ):
+        mock_extract_submission_data.side_effect = DownloadError(
+            "The SHA-256 checksum doesn't match"
+        )
+        message = {
+            "challenge_pk": self.challenge_pk,
+            "phase_pk": self.challenge_phase_pk,
+            "submission_pk": self.submission_pk,
+        }
+
+        process_submission_message(message)
+
+        mock_update_submission_data.assert_called_once_with(
+            {
+                "challenge_phase": self.challenge_phase_pk,
+                "submission": self.submission_pk,
+                "submission_status": "failed",
+                "stdout": " ",
+                "stderr": "Failed to download the submission file, error "
+                "The SHA-256 checksum doesn't match",
+            },
+            self.challenge_pk,
+            self.submission_pk,
+        )
+
+
+class ExtendMessagesVisibilityInBackgroundTest(BaseTestClass):
+    @mock.patch(
+        "scripts.workers.remote_submission_worker.SUBMISSION_LEASE_TIMEOUT",
+        0.02,
+    )
+    @mock.patch(
+        "scripts.workers.remote_submission_worker.extend_messages_visibility"
+    )
+    def test_lease_is_extended_while_processing(
+        self, mock_extend_messages_visibility
+    ):
+        with extend_messages_visibility_in_background(["receipt_handle_1"]):
+            time.sleep(0.1)
+        call_count = mock_extend_messages_visibility.call_count
+        time.sleep(0.05)
+
+        self.assertGreater(call_count, 1)
+        mock_extend_messages_visibility.assert_called_with(
+            ["receipt_handle_1"]
+        )
+        # The lease isn't extended once the message is processed
+        self.assertEqual(
+            mock_extend_messages_visibility.call_count, call_count
+        )
+
+
 class CreateDirAsPythonPackageTest(BaseTestClass):
     def setUp(self):
         super(CreateDirAsPythonPackageTest, self).setUp()
@@ -286,7 +481,8 @@ class DownloadAndExtractFileTest(BaseTestClass):
             self.req_url, error
         )
 
-        download_and_extract_file(self.req_url, self.download_location)
+        with self.assertRaises(DownloadError):
+            download_and_extract_file(self.req_url, self.download_location)
 
         mock_logger.assert_called_with(expected)
         self.assertFalse(os.path.exists(self.download_location))
@@ -0,0 +1,201 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from os.path import join
+from unittest import TestCase
+
+import mock
+import responses
+
+from scripts.workers.artifact_cache import ArtifactCache, get_file_sha256
+
+
+class ArtifactCacheTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = ArtifactCache(root=join(self.root, "cache"), max_size=10)
+        self.destination = join(self.root, "annotation.txt")
+        self.url = "http://testserver/media/annotation.txt"
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    @responses.activate
+    def test_fetch_to_downloads_artifact(self):
+        responses.add(
+            responses.GET,
+            self.url,
+            body=b"content",
+            headers={"ETag": '"v1"'},
+            status=200,
+        )
+
+        self.assertTrue(
+            self.cache.fetch_to("annotation.txt", self.url, self.destination)
+        )
+
+        with open(self.destination, "rb") as f:
+            self.assertEqual(f.read(), b"content")
+        self.assertNotIn("If-None-Match", responses.calls[0].request.headers)
+
+    @responses.activate
+    def test_fetch_to_copies_cached_artifact(self):
+        responses.add(responses.GET, self.url, body=b"content", status=200)
+
+        self.assertTrue(
+            self.cache.fetch_to("annotation.txt", self.url, self.destination)
+        )
+        # An evaluation script writing to its annotation file
+        with open(self.destination, "wb") as f:
+            f.write(b"modified")
+
+        with open(self.cache.touch("annotation.txt"), "rb") as f:
+            self.assertEqual(f.read(), b"content")
+
+    @responses.activate
+    def test_fetch_revalidates_cached_artifact(self):
+        responses.add(
+            responses.GET,
+            self.url,
+            body=b"content",
+            headers={"ETag": '"v1"'},
+            status=200,
+        )
+        path = self.cache.fetch("annotation.txt", self.url)
+        responses.replace(responses.GET, self.url, status=304)
+
+        self.assertEqual(self.cache.fetch("annotation.txt", self.url), path)
+
+        self.assertEqual(
+            responses.calls[1].request.headers["If-None-Match"], '"v1"'
+        )
+
+    @responses.activate
+    def test_fetch_replaces_changed_artifact(self):
+        responses.add(
+            responses.GET,
+            self.url,
+            body=b"content",
+            headers={"ETag": '"v1"'},
+            status=200,
+        )
+        old_path = self.cache.fetch("annotation.txt", self.url)
+        responses.replace(
+            responses.GET,
+            self.url,
+            body=b"changed",
+            headers={"ETag": '"v2"'},
+            status=200,
+        )
+
+        path = self.cache.fetch("annotation.txt", self.url)
+
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"changed")
+        self.assertFalse(os.path.exists(old_path))
+
+    @responses.activate
+    def test_fetch_uses_cached_artifact_when_revalidation_fails(self):
+        responses.add(
+            responses.GET,
+            self.url,
+            body=b"content",
+            headers={"ETag": '"v1"'},
+            status=200,
+        )
+        path = self.cache.fetch("annotation.txt", self.url)
+        responses.replace(responses.GET, self.url, status=503)
+
+        self.assertEqual(self.cache.fetch("annotation.txt", self.url), path)
+
+    @responses.activate
+    def test_fetch_when_download_fails(self):
+        responses.add(responses.GET, self.url, status=404)
+
+        self.assertIsNone(self.cache.fetch("annotation.txt", self.url))
+        self.assertFalse(
+            self.cache.fetch_to("annotation.txt", self.url, self.destination)
+        )
+        self.assertFalse(os.path.exists(self.destination))
+
+    @responses.activate
+    def test_fetch_evicts_least_recently_used_artifacts(self):
+        for name, body in (("a", b"aaaa"), ("b", b"bbbb"), ("c", b"cccc")):
+            responses.add(
+                responses.GET,
+                "http://testserver/media/{}".format(name),
+                body=body,
+                headers={"ETag": name},
+                status=200,
+            )
+        path_a = self.cache.fetch("a", "http://testserver/media/a")
+        path_b = self.cache.fetch("b", "http://testserver/media/b")
+
+        path_c = self.cache.fetch("c", "http://testserver/media/c")
+
+        self.assertFalse(os.path.exists(path_a))
+        self.assertTrue(os.path.exists(path_b))
+        self.assertTrue(os.path.exists(path_c))
+        self.assertEqual(self.cache.get_validators("a"), {})
+
+    @mock.patch("scripts.workers.artifact_cache.subprocess.check_output")
+    def test_install_requirements_once_per_requirements_content(
+        self, mock_check_output
+    ):
+        requirements_path = join(self.root, "requirements.txt")
+        with open(requirements_path, "w") as f:
+            f.write("numpy==1.19.5\n")
+        target = join(
+            self.cache.requirements_dir, get_file_sha256(requirements_path)
+        )
+        self.addCleanup(
+            lambda: target in sys.path and sys.path.remove(target)
+        )
+
+        self.assertEqual(
+            self.cache.install_requirements(requirements_path), target
+        )
+        self.assertEqual(
+            self.cache.install_requirements(requirements_path), target
+        )
+
+        mock_check_output.assert_called_once()
+        self.assertIn("--target", mock_check_output.call_args[0][0])
+        self.assertTrue(os.path.isdir(target))
+        self.assertEqual(sys.path[-1], target)
+
+    @mock.patch("scripts.workers.artifact_cache.subprocess.check_output")
+    def test_install_requirements_evicts_unused_requirements(
+        self, mock_check_output
+    ):
+        def install(command):
+            with open(join(command[command.index("--target") + 1], "a"), "w") as f:
+                f.write("aaaaaaaa")
+
+        mock_check_output.side_effect = install
+        other_cache = ArtifactCache(root=self.cache.root, max_size=10)
+        targets = []
+        for cache, requirements in (
+            (other_cache, "numpy==1.19.5\n"),
+            (self.cache, "torch==1.8.0\n"),
+        ):
+            requirements_path = join(self.root, "requirements.txt")
+            with open(requirements_path, "w") as f:
+                f.write(requirements)
+            targets.append(cache.install_requirements(requirements_path))
+        self.addCleanup(
+            lambda: [sys.path.remove(path) for path in targets if path in sys.path]
+        )
+
+        # The requirements are in use by the other cache
+        self.assertTrue(os.path.isdir(targets[0]))
+        for lock_file in other_cache.requirements_locks.values():
+            lock_file.close()
+
+        with self.cache.locked_index() as index:
+            self.cache.evict(index, keep=targets[1])
+
+        self.assertFalse(os.path.isdir(targets[0]))
+        self.assertTrue(os.path.isdir(targets[1]))
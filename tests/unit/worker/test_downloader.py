@@ -0,0 +1,139 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+
+from os.path import join
+from unittest import TestCase
+
+import mock
+import responses
+
+from scripts.workers.downloader import DownloadError, download_file
+
+
+@mock.patch("scripts.workers.downloader.time.sleep")
+@mock.patch("scripts.workers.downloader.DOWNLOAD_SEGMENT_SIZE", 4)
+class DownloadFileTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.destination = join(self.root, "input_file.txt")
+        self.url = "http://testserver/media/input_file.txt"
+        self.content = b"0123456789"
+        self.truncated_ranges = set()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def serve_range(self, request, headers=None):
+        start, end = map(
+            int,
+            re.match(r"bytes=(\d+)-(\d+)", request.headers["Range"]).groups(),
+        )
+        end = min(end, len(self.content) - 1)
+        body = self.content[start:][: end - start + 1]
+        if request.headers["Range"] in self.truncated_ranges:
+            self.truncated_ranges.remove(request.headers["Range"])
+            body = body[:2]
+        response_headers = {
+            "Content-Range": "bytes {}-{}/{}".format(
+                start, end, len(self.content)
+            ),
+            "ETag": '"v1"',
+        }
+        response_headers.update(headers or {})
+        return (206, response_headers, body)
+
+    @responses.activate
+    def test_download_file_with_parallel_ranges(self, mock_sleep):
+        responses.add_callback(responses.GET, self.url, self.serve_range)
+
+        download_file(
+            self.url,
+            self.destination,
+            sha256=hashlib.sha256(self.content).hexdigest(),
+        )
+
+        with open(self.destination, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        ranges = sorted(
+            call.request.headers["Range"] for call in responses.calls
+        )
+        self.assertEqual(ranges, ["bytes=0-3", "bytes=4-7", "bytes=8-9"])
+        for call in responses.calls:
+            if call.request.headers["Range"] != "bytes=0-3":
+                self.assertEqual(call.request.headers["If-Match"], '"v1"')
+
+    @responses.activate
+    def test_download_file_resumes_segment(self, mock_sleep):
+        self.truncated_ranges.add("bytes=4-7")
+        responses.add_callback(responses.GET, self.url, self.serve_range)
+
+        download_file(self.url, self.destination)
+
+        with open(self.destination, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertIn(
+            "bytes=6-7",
+            [call.request.headers["Range"] for call in responses.calls],
+        )
+
+    @responses.activate
+    def test_download_file_without_range_support(self, mock_sleep):
+        responses.add(responses.GET, self.url, body=self.content, status=200)
+
+        download_file(self.url, self.destination)
+
+        with open(self.destination, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+
+    @responses.activate
+    def test_download_file_when_checksum_does_not_match(self, mock_sleep):
+        responses.add_callback(responses.GET, self.url, self.serve_range)
+
+        with self.assertRaises(DownloadError):
+            download_file(self.url, self.destination, sha256="0" * 64)
+
+        self.assertFalse(os.path.exists(self.destination))
+
+    @responses.activate
+    def test_download_file_when_s3_etag_does_not_match(self, mock_sleep):
+        responses.add(
+            responses.GET,
+            self.url,
+            body=self.content,
+            headers={
+                "ETag": '"{}"'.format(hashlib.md5(b"changed").hexdigest()),
+                "x-amz-request-id": "request-id",
+            },
+            status=200,
+        )
+
+        with self.assertRaises(DownloadError):
+            download_file(self.url, self.destination)
+
+        self.assertFalse(os.path.exists(self.destination))
+
+    @responses.activate
+    def test_download_file_when_file_changes(self, mock_sleep):
+        def serve_changed_range(request):
+            if "If-Match" in request.headers:
+                return (412, {}, b"")
+            return self.serve_range(request)
+
+        responses.add_callback(responses.GET, self.url, serve_changed_range)
+
+        with self.assertRaises(DownloadError):
+            download_file(self.url, self.destination)
+
+        self.assertFalse(os.path.exists(self.destination))
+
+    @responses.activate
+    def test_download_file_when_download_fails(self, mock_sleep):
+        responses.add(responses.GET, self.url, status=404)
+
+        with self.assertRaises(DownloadError):
+            download_file(self.url, self.destination)
+
+        self.assertFalse(os.path.exists(self.destination))
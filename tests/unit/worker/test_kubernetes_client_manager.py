@@ -0,0 +1,110 @@
+import base64
+import time
+
+from datetime import datetime, timezone
+from unittest import TestCase
+
+import mock
+
+from kubernetes.client.rest import ApiException
+
+from scripts.workers.kubernetes_client_manager import (
+    EKS_BEARER_TOKEN_LIFETIME,
+    KubernetesClientManager,
+    get_eks_bearer_token_expiry,
+)
+
+
+def get_eks_bearer_token(signed_at):
+    url = (
+        "https://sts.us-east-1.amazonaws.com/?Action=GetCallerIdentity"
+        "&X-Amz-Date={}&X-Amz-Expires=60".format(
+            datetime.fromtimestamp(signed_at, timezone.utc).strftime(
+                "%Y%m%dT%H%M%SZ"
+            )
+        )
+    )
+    return "k8s-aws-v1." + base64.urlsafe_b64encode(
+        url.encode("utf-8")
+    ).decode("utf-8").rstrip("=")
+
+
+class KubernetesClientManagerTest(TestCase):
+    def setUp(self):
+        self.now = int(time.time())
+        self.get_bearer_token = mock.Mock(
+            side_effect=lambda: get_eks_bearer_token(self.now)
+        )
+        self.manager = KubernetesClientManager(
+            "https://cluster.eks.amazonaws.com",
+            self.get_bearer_token,
+            refresh_margin=60,
+        )
+
+    def test_get_eks_bearer_token_expiry(self):
+        token = get_eks_bearer_token(self.now - 30)
+
+        self.assertEqual(
+            get_eks_bearer_token_expiry(token, self.now),
+            self.now - 30 + EKS_BEARER_TOKEN_LIFETIME,
+        )
+        self.assertEqual(
+            get_eks_bearer_token_expiry("k8s-aws-v1.invalid", self.now),
+            self.now + EKS_BEARER_TOKEN_LIFETIME,
+        )
+
+    @mock.patch("scripts.workers.kubernetes_client_manager.time.time")
+    def test_token_is_reused_until_it_is_about_to_expire(self, mock_time):
+        mock_time.return_value = self.now
+        with mock.patch.object(
+            self.manager.batch_v1_api.api, "list_namespaced_job"
+        ) as mock_list:
+            self.manager.batch_v1_api.list_namespaced_job("default")
+            mock_time.return_value = self.now + EKS_BEARER_TOKEN_LIFETIME - 61
+            self.manager.batch_v1_api.list_namespaced_job("default")
+            self.assertEqual(self.get_bearer_token.call_count, 1)
+
+            self.now += EKS_BEARER_TOKEN_LIFETIME
+            mock_time.return_value = self.now
+            self.manager.batch_v1_api.list_namespaced_job("default")
+
+        self.assertEqual(self.get_bearer_token.call_count, 2)
+        self.assertEqual(mock_list.call_count, 3)
+        self.assertEqual(
+            self.manager.configuration.get_api_key_with_prefix(
+                "authorization"
+            ),
+            "Bearer {}".format(get_eks_bearer_token(self.now)),
+        )
+
+    def test_apis_share_the_api_client(self):
+        self.assertIs(
+            self.manager.batch_v1_api.api.api_client,
+            self.manager.core_v1_api.api.api_client,
+        )
+
+    def test_call_is_retried_once_when_token_is_rejected(self):
+        with mock.patch.object(
+            self.manager.core_v1_api.api,
+            "list_namespaced_pod",
+            side_effect=[ApiException(status=401), "pods"],
+        ) as mock_list:
+            self.assertEqual(
+                self.manager.core_v1_api.list_namespaced_pod("default"),
+                "pods",
+            )
+
+        self.assertEqual(mock_list.call_count, 2)
+        self.assertEqual(self.get_bearer_token.call_count, 2)
+
+    def test_call_is_not_retried_on_other_errors(self):
+        with mock.patch.object(
+            self.manager.core_v1_api.api,
+            "list_namespaced_pod",
+            side_effect=ApiException(status=403),
+        ) as mock_list:
+            with self.assertRaises(ApiException):
+                self.manager.core_v1_api.list_namespaced_pod("default")
+
+        self.assertEqual(mock_list.call_count, 1)
+        self.assertEqual(self.get_bearer_token.call_count, 1)
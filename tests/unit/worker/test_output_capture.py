@@ -0,0 +1,81 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from os.path import join
+from unittest import TestCase
+
+from scripts.workers.output_capture import OutputCapture
+
+
+class OutputCaptureTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = join(self.root, "stdout.txt")
+        self.fd = sys.__stdout__.fileno()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def read_captured_output(self, output_capture):
+        with output_capture.open() as f:
+            return f.read()
+
+    def test_capture_output_of_file_descriptor(self):
+        output_capture = OutputCapture(self.fd, self.path, echo=False)
+
+        with output_capture:
+            print("from python", file=sys.__stdout__)
+            os.write(self.fd, b"from the file descriptor\n")
+            subprocess.check_call(["echo", "from a subprocess"])
+        output_capture.write("from the worker\n")
+
+        self.assertEqual(
+            self.read_captured_output(output_capture),
+            b"from python\nfrom the file descriptor\nfrom a subprocess\n"
+            b"from the worker\n",
+        )
+
+    def test_capture_restores_file_descriptor(self):
+        output_capture = OutputCapture(self.fd, self.path, echo=False)
+        stat = os.fstat(self.fd)
+        file_id = (stat.st_dev, stat.st_ino)
+
+        with self.assertRaises(ValueError):
+            with output_capture:
+                raise ValueError
+
+        stat = os.fstat(self.fd)
+        self.assertEqual((stat.st_dev, stat.st_ino), file_id)
+
+    def test_capture_keeps_head_and_tail_of_long_output(self):
+        output_capture = OutputCapture(
+            self.fd, self.path, max_size=8, echo=False
+        )
+
+        with output_capture:
+            os.write(self.fd, b"head")
+            os.write(self.fd, b"-" * 100)
+            os.write(self.fd, b"tail")
+
+        self.assertEqual(
+            self.read_captured_output(output_capture),
+            b"head\n... 100 bytes truncated ...\ntail",
+        )
+
+    def test_capture_python_stream_without_redirecting_file_descriptor(self):
+        output_capture = OutputCapture(
+            self.fd, self.path, echo=False, redirect_fd=False
+        )
+        stdout = sys.stdout
+
+        with output_capture:
+            print("from python")
+            os.write(self.fd, b"from the worker\n")
+        self.assertIs(sys.stdout, stdout)
+
+        self.assertEqual(
+            self.read_captured_output(output_capture), b"from python\n"
+        )
@@ -0,0 +1,175 @@
+from unittest import TestCase
+
+import mock
+
+from kubernetes import client
+
+from scripts.workers.submission_job_tracker import (
+    SubmissionJobTracker,
+    get_submission_labels,
+)
+
+
+class FakeWatchSource:
+    def __init__(self, events):
+        self.items = events
+
+    def events(self):
+        for item in self.items:
+            yield item
+
+
+def get_metadata(name, deletion_timestamp=None, **labels):
+    labels.update(
+        get_submission_labels(
+            {"submission_pk": 1, "challenge_pk": 2, "phase_pk": 3}
+        )
+    )
+    return client.V1ObjectMeta(
+        name=name, labels=labels, deletion_timestamp=deletion_timestamp
+    )
+
+
+def get_job_event(event_type, failed=False, deletion_timestamp=None):
+    conditions = (
+        [client.V1JobCondition(type="Failed", status="True")]
+        if failed
+        else None
+    )
+    job = client.V1Job(
+        metadata=get_metadata("submission-1", deletion_timestamp),
+        status=client.V1JobStatus(conditions=conditions),
+    )
+    return ("job", {"type": event_type, "object": job})
+
+
+def get_pod_event(*terminated_containers):
+    container_statuses = [
+        client.V1ContainerStatus(
+            name=name,
+            image="image",
+            image_id="image_id",
+            ready=True,
+            restart_count=0,
+            state=client.V1ContainerState(
+                terminated=client.V1ContainerStateTerminated(exit_code=1)
+                if name in terminated_containers
+                else None,
+                running=None
+                if name in terminated_containers
+                else client.V1ContainerStateRunning(),
+            ),
+        )
+        for name in ("environment", "agent")
+    ]
+    pod = client.V1Pod(
+        metadata=get_metadata("submission-1-pod", **{"job-name": "submission-1"}),
+        status=client.V1PodStatus(container_statuses=container_statuses),
+    )
+    return ("pod", {"type": "MODIFIED", "object": pod})
+
+
+class SubmissionJobTrackerTest(TestCase):
+    def setUp(self):
+        self.evalai = mock.Mock()
+        self.evalai.get_submission_by_pk.return_value = {"status": "queued"}
+        self.evalai.get_challenge_phase_by_pk.return_value = {
+            "disable_logs": False
+        }
+        self.batch_v1_api = mock.Mock()
+        self.core_v1_api = mock.Mock()
+        self.core_v1_api.read_namespaced_pod_log.return_value.data = (
+            b"Traceback"
+        )
+        self.tracker = SubmissionJobTracker(
+            self.evalai, self.batch_v1_api, self.core_v1_api
+        )
+
+    def run_tracker(self, *events):
+        self.tracker.run(FakeWatchSource(events))
+
+    def test_submission_is_marked_running_once(self):
+        self.run_tracker(
+            get_job_event("ADDED"), get_pod_event(), get_pod_event()
+        )
+
+        self.evalai.update_submission_status.assert_called_once_with(
+            {
+                "submission_status": "running",
+                "submission": 1,
+                "job_name": "submission-1",
+            },
+            2,
+        )
+        self.evalai.get_submission_by_pk.assert_called_once_with(1)
+        self.batch_v1_api.delete_namespaced_job.assert_not_called()
+
+    def test_failed_submission_is_reported_with_logs(self):
+        self.run_tracker(
+            get_job_event("ADDED"),
+            get_pod_event(),
+            get_pod_event("environment"),
+            get_pod_event("environment"),
+            get_job_event("MODIFIED", deletion_timestamp="now"),
+            get_job_event("DELETED"),
+        )
+
+        self.evalai.update_submission_data.assert_called_once()
+        submission_data = self.evalai.update_submission_data.call_args[0][0]
+        self.assertEqual(submission_data["submission_status"], "FAILED")
+        self.assertEqual(submission_data["environment_log"], "Traceback")
+        self.assertEqual(
+            submission_data["stderr"], "Submission Job Failed."
+        )
+        self.core_v1_api.read_namespaced_pod_log.assert_called_once()
+        self.batch_v1_api.delete_namespaced_job.assert_called_once()
+        self.assertEqual(self.tracker.submissions, {})
+        self.assertEqual(self.tracker.deleted_jobs, set())
+
+    def test_finished_submission_is_only_cleaned_up(self):
+        self.evalai.get_submission_by_pk.side_effect = [
+            {"status": "running"},
+            {"status": "finished"},
+        ]
+
+        self.run_tracker(
+            get_job_event("ADDED"), get_pod_event("environment")
+        )
+
+        self.evalai.update_submission_data.assert_not_called()
+        self.batch_v1_api.delete_namespaced_job.assert_called_once()
+        self.assertEqual(
+            self.batch_v1_api.delete_namespaced_job.call_args[1]["name"],
+            "submission-1",
+        )
+
+    def test_failed_job_without_pods_is_reported(self):
+        self.run_tracker(get_job_event("ADDED", failed=True))
+
+        submission_data = self.evalai.update_submission_data.call_args[0][0]
+        self.assertEqual(
+            submission_data["stderr"], "Submission Job Failed."
+        )
+        self.batch_v1_api.delete_namespaced_job.assert_called_once()
+
+    def test_job_of_done_submission_is_deleted_when_tracked(self):
+        self.evalai.get_submission_by_pk.return_value = {
+            "status": "cancelled"
+        }
+
+        self.run_tracker(get_job_event("ADDED"), get_pod_event())
+
+        self.batch_v1_api.delete_namespaced_job.assert_called_once()
+        self.evalai.update_submission_status.assert_not_called()
+
+    def test_resync_deletes_jobs_of_cancelled_submissions(self):
+        self.run_tracker(get_job_event("ADDED"), get_pod_event())
+        self.evalai.get_submission_by_pk.return_value = {
+            "status": "cancelled"
+        }
+
+        self.tracker.resync()
+
+        self.batch_v1_api.delete_namespaced_job.assert_called_once()
+        self.evalai.update_submission_data.assert_not_called()
+        self.assertEqual(self.tracker.submissions, {})
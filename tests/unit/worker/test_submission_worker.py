@@ -1,7 +1,10 @@
+import json
 import os
 import shutil
 import tempfile
+import time
 import zipfile
+from concurrent.futures.process import BrokenProcessPool
 from datetime import timedelta
 from io import BytesIO
 from os.path import join
@@ -20,21 +23,34 @@ from moto import mock_sqs
 from participants.models import ParticipantTeam
 from rest_framework.test import APITestCase
 
+from scripts.workers.downloader import DownloadError
 from scripts.workers.submission_worker import (
     create_dir,
     create_dir_as_python_package,
     download_and_extract_file,
     delete_zip_file,
     download_and_extract_zip_file,
+    execution_time_limit,
+    ExecutionTimeLimitExceeded,
     extract_zip_file,
+    extract_challenge_data,
     extract_submission_data,
+    finish_submission_messages,
+    get_evaluation_slots,
+    get_execution_time_limit,
     load_challenge_and_return_max_submissions,
     return_file_url_per_environment,
     get_or_create_sqs_queue,
+    process_submission_messages_concurrently,
 )
 from settings.common import SQS_RETENTION_PERIOD
 
 
+def evaluate_submission_message(body):
+    """Evaluation run in the evaluation processes instead of the callback"""
+    time.sleep(0.1)
+
+
 class BaseAPITestClass(APITestCase):
     def setUp(self):
 
@@ -246,6 +262,42 @@ class BaseAPITestClass(APITestCase):
         )
         self.assertEqual(value, None)
 
+    @mock.patch(
+        "scripts.workers.submission_worker.create_dir_as_python_package"
+    )
+    @mock.patch("scripts.workers.submission_worker.download_and_extract_file")
+    def test_extract_submission_data_when_download_fails(
+        self, mock_download_and_extract_file, mock_create_dir_as_python_package
+    ):
+        mock_download_and_extract_file.side_effect = DownloadError(
+            "The SHA-256 checksum doesn't match"
+        )
+
+        value = extract_submission_data(self.submission.pk)
+
+        self.assertEqual(value, None)
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, Submission.FAILED)
+        self.assertEqual(
+            self.submission.stderr_file.read().decode("utf-8"),
+            "Failed to download the submission file, error "
+            "The SHA-256 checksum doesn't match",
+        )
+
+    @mock.patch("scripts.workers.submission_worker.get_artifact_cache")
+    @mock.patch(
+        "scripts.workers.submission_worker.create_dir_as_python_package"
+    )
+    def test_extract_challenge_data_when_evaluation_script_fetch_fails(
+        self, mock_create_dir_as_python_package, mock_get_artifact_cache
+    ):
+        mock_get_artifact_cache.return_value.fetch_to.return_value = False
+
+        with self.assertRaises(DownloadError):
+            extract_challenge_data(
+                self.challenge, self.challenge.challengephase_set.all()
+            )
+
     @mock.patch("scripts.workers.submission_worker.load_challenge")
     def test_load_challenge_and_return_max_submissions(
         self, mocked_load_challenge
@@ -346,7 +398,8 @@ class DownloadAndExtractFileTest(BaseAPITestClass):
             self.WORKER_LOGS_PREFIX, self.req_url, error
         )
 
-        download_and_extract_file(self.req_url, self.download_location)
+        with self.assertRaises(DownloadError):
+            download_and_extract_file(self.req_url, self.download_location)
 
         mock_logger.assert_called_with(expected)
         self.assertFalse(os.path.exists(self.download_location))
@@ -412,9 +465,10 @@ class DownloadAndExtractZipFileTest(BaseAPITestClass):
             self.WORKER_LOGS_PREFIX, self.req_url, e
         )
 
-        download_and_extract_zip_file(
-            self.req_url, self.download_location, self.extract_location
-        )
+        with self.assertRaises(DownloadError):
+            download_and_extract_zip_file(
+                self.req_url, self.download_location, self.extract_location
+            )
 
         mock_logger.assert_called_with(error_message)
 
@@ -447,3 +501,180 @@ class DownloadAndExtractZipFileTest(BaseAPITestClass):
 
         delete_zip_file(self.download_location)
         mock_logger.assert_called_with(error_message)
+
+
+class ProcessSubmissionMessagesConcurrentlyTest(BaseAPITestClass):
+    def setUp(self):
+        super(ProcessSubmissionMessagesConcurrentlyTest, self).setUp()
+        self.killer = mock.Mock(kill_now=False)
+        self.messages = [
+            mock.Mock(
+                receipt_handle="receipt_handle_{}".format(index),
+                body=json.dumps(
+                    {
+                        "challenge_pk": self.challenge.pk,
+                        "phase_pk": self.challenge_phase.pk,
+                        "submission_pk": self.submission.pk,
+                    }
+                ),
+                attributes={"ApproximateReceiveCount": "1"},
+            )
+            for index in range(3)
+        ]
+        self.queue = mock.Mock(attributes={"VisibilityTimeout": "30"})
+        self.queue.receive_messages.side_effect = self.receive_messages
+        self.queue.delete_messages.return_value = {}
+        self.queue.change_message_visibility_batch.return_value = {}
+
+    def receive_messages(
+        self, MaxNumberOfMessages, WaitTimeSeconds, AttributeNames
+    ):
+        if self.messages:
+            messages = self.messages[:MaxNumberOfMessages]
+            self.messages = self.messages[MaxNumberOfMessages:]
+            return messages
+        self.killer.kill_now = True
+        return []
+
+    def test_get_evaluation_slots(self):
+        self.assertEqual(get_evaluation_slots(1), 1)
+        self.assertEqual(get_evaluation_slots(0), 1)
+        self.assertLessEqual(get_evaluation_slots(100000), os.cpu_count())
+
+    def test_execution_time_limit(self):
+        with self.assertRaises(ExecutionTimeLimitExceeded):
+            with execution_time_limit(1):
+                time.sleep(2)
+
+    def test_get_execution_time_limit(self):
+        self.challenge.submission_time_limit = 3600
+        self.assertEqual(get_execution_time_limit(self.challenge), 3600)
+        with mock.patch(
+            "scripts.workers.submission_worker.SUBMISSION_EXECUTION_TIME_LIMIT",
+            "0",
+        ):
+            self.assertEqual(get_execution_time_limit(self.challenge), 0)
+
+    @mock.patch(
+        "scripts.workers.submission_worker.increment_and_push_metrics_to_statsd"
+    )
+    @mock.patch(
+        "scripts.workers.submission_worker.django.db.connections.close_all"
+    )
+    @mock.patch(
+        "scripts.workers.submission_worker.process_submission_callback",
+        evaluate_submission_message,
+    )
+    def test_process_submission_messages_concurrently(
+        self, mock_close_all, mock_increment_and_push_metrics_to_statsd
+    ):
+        receipt_handles = [message.receipt_handle for message in self.messages]
+        process_submission_messages_concurrently(
+            self.queue, "queue", 0, self.challenge, 2, self.killer
+        )
+        self.assertEqual(
+            sorted(
+                entry["ReceiptHandle"]
+                for call in self.queue.delete_messages.call_args_list
+                for entry in call[1]["Entries"]
+            ),
+            sorted(receipt_handles),
+        )
+        self.assertEqual(
+            mock_increment_and_push_metrics_to_statsd.call_count, 3
+        )
+
+    @mock.patch(
+        "scripts.workers.submission_worker.django.db.connections.close_all"
+    )
+    def test_process_submission_messages_concurrently_releases_extra_messages(
+        self, mock_close_all
+    ):
+        # The only evaluation slot of the challenge is taken by another worker
+        self.submission.status = Submission.RUNNING
+        self.submission.save()
+        receipt_handles = [message.receipt_handle for message in self.messages]
+        process_submission_messages_concurrently(
+            self.queue, "queue", 0, self.challenge, 1, self.killer
+        )
+        self.queue.delete_messages.assert_not_called()
+        self.assertEqual(
+            [
+                (entry["ReceiptHandle"], entry["VisibilityTimeout"])
+                for call in self.queue.change_message_visibility_batch.call_args_list
+                for entry in call[1]["Entries"]
+            ],
+            [(receipt_handle, 0) for receipt_handle in receipt_handles],
+        )
+
+    @mock.patch(
+        "scripts.workers.submission_worker.increment_and_push_metrics_to_statsd"
+    )
+    def test_finish_submission_messages_when_evaluation_pool_breaks(
+        self, mock_increment_and_push_metrics_to_statsd
+    ):
+        finished_future = mock.Mock()
+        broken_future = mock.Mock()
+        broken_future.result.side_effect = BrokenProcessPool()
+        in_progress = {
+            finished_future: self.messages[0],
+            broken_future: self.messages[1],
+        }
+
+        self.assertFalse(
+            finish_submission_messages(
+                [finished_future, broken_future], in_progress, self.queue, "queue", 0
+            )
+        )
+        self.assertEqual(in_progress, {})
+        self.assertEqual(
+            [
+                entry["ReceiptHandle"]
+                for entry in self.queue.delete_messages.call_args[1]["Entries"]
+            ],
+            [self.messages[0].receipt_handle],
+        )
+        self.assertEqual(
+            self.queue.change_message_visibility_batch.call_args[1]["Entries"],
+            [
+                {
+                    "Id": "0",
+                    "ReceiptHandle": self.messages[1].receipt_handle,
+                    "VisibilityTimeout": 0,
+                }
+            ],
+        )
+        mock_increment_and_push_metrics_to_statsd.assert_called_once_with(
+            "queue", 0
+        )
+
+    @mock.patch(
+        "scripts.workers.submission_worker.increment_and_push_metrics_to_statsd"
+    )
+    def test_finish_submission_messages_fails_submission_after_max_receive_count(
+        self, mock_increment_and_push_metrics_to_statsd
+    ):
+        broken_future = mock.Mock()
+        broken_future.result.side_effect = BrokenProcessPool()
+        self.messages[0].attributes["ApproximateReceiveCount"] = "3"
+        in_progress = {broken_future: self.messages[0]}
+
+        self.assertFalse(
+            finish_submission_messages(
+                [broken_future], in_progress, self.queue, "queue", 0
+            )
+        )
+        self.assertEqual(
+            [
+                entry["ReceiptHandle"]
+                for entry in self.queue.delete_messages.call_args[1]["Entries"]
+            ],
+            [self.messages[0].receipt_handle],
+        )
+        self.queue.change_message_visibility_batch.assert_not_called()
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.status, Submission.FAILED)
+        self.assertEqual(
+            self.submission.stderr_file.read().decode("utf-8"),
+            "The evaluation process died 3 times while evaluating the submission",
+        )